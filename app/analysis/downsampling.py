@@ -0,0 +1,169 @@
+"""Downsampling - Bounded display points and period rollups for long time series."""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Most points a time-series chart draws; longer series are decimated
+DISPLAY_POINTS = 200
+
+PERIODS = ("daily", "weekly", "monthly")
+
+
+def _finite(y) -> np.ndarray:
+    """Positions of the non-NaN values in y"""
+    return np.flatnonzero(~np.isnan(y))
+
+
+def minmax_indices(y, max_points: int = DISPLAY_POINTS) -> np.ndarray:
+    """
+    Min/max bucket decimation.
+
+    Splits the series into (max_points - 2) // 2 equal buckets and keeps
+    each bucket's lowest and highest point plus the first and last point,
+    so every spike survives. Returns sorted positions into y.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max(1, (max_points - 2) // 2)
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    keep = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            segment = y[start:end]
+            keep.extend((start + int(np.argmin(segment)), start + int(np.argmax(segment))))
+    return np.unique(keep)
+
+
+def lttb_indices(x, y, max_points: int = DISPLAY_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, from each of max_points - 2 buckets,
+    the point forming the largest triangle with the previously kept point
+    and the next bucket's average. Follows the shape of the curve more
+    closely than min/max, but may drop an isolated extreme.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = [0]
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (end, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep.append(previous)
+    keep.append(n - 1)
+    return np.asarray(keep)
+
+
+def downsample_indices(y, max_points: int = DISPLAY_POINTS, x=None, method: str = "minmax") -> np.ndarray:
+    """
+    Positions of at most max_points values of y to draw.
+
+    NaN values are skipped. method is "minmax" (default) or "lttb"; with
+    "lttb" the series' overall minimum and maximum are always kept too.
+    x defaults to the position of each value.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = _finite(y)
+    if len(valid) <= max_points:
+        return valid
+    values = y[valid]
+    if method == "lttb":
+        xs = valid if x is None else np.asarray(x, dtype=float)[valid]
+        picked = lttb_indices(xs, values, max_points - 2)
+        picked = np.union1d(picked, [np.argmin(values), np.argmax(values)])
+    elif method == "minmax":
+        picked = minmax_indices(values, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return valid[picked]
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """ISO or 'YYYY-MM-DD HH:MM:SS' text (or a datetime) as a datetime; None if unparseable"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        except (ValueError, TypeError):
+            return None
+
+
+def period_key(moment: datetime, period: str) -> str:
+    """Bucket label for a moment: '2025-01-31', '2025-W5' or '2025-01' (unknown periods are daily)"""
+    if period == "weekly":
+        iso = moment.isocalendar()
+        return f"{iso[0]}-W{iso[1]}"
+    if period == "monthly":
+        return moment.strftime("%Y-%m")
+    return moment.strftime("%Y-%m-%d")
+
+
+class PeriodRollup:
+    """Count, sum, min and max of the values in one period; rollups merge exactly"""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self, count: int = 0, total: float = 0, min=None, max=None):
+        self.count = count
+        self.total = total
+        self.min = min
+        self.max = max
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def merge(self, other: "PeriodRollup"):
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None or value < self.min else self.min
+                self.max = value if self.max is None or value > self.max else self.max
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+def daily_rollups(rows: Iterable, time_attr: str, value_attr: str) -> "OrderedDict[str, PeriodRollup]":
+    """Per-day rollups of row.value_attr, keyed by date; rows with no time or value are skipped"""
+    days: Dict[str, PeriodRollup] = {}
+    for row in rows:
+        value = getattr(row, value_attr)
+        moment = parse_timestamp(getattr(row, time_attr))
+        if value is None or moment is None:
+            continue
+        days.setdefault(period_key(moment, "daily"), PeriodRollup()).add(value)
+    return OrderedDict(sorted(days.items()))
+
+
+def coarsen_rollups(daily: Dict[str, PeriodRollup], period: str) -> "OrderedDict[str, PeriodRollup]":
+    """Merge per-day rollups into weekly or monthly ones (daily is returned as is)"""
+    if period not in ("weekly", "monthly"):
+        return OrderedDict(daily)
+    merged: Dict[str, PeriodRollup] = {}
+    for day, rollup in daily.items():
+        key = period_key(datetime.strptime(day, "%Y-%m-%d"), period)
+        merged.setdefault(key, PeriodRollup()).merge(rollup)
+    return OrderedDict(sorted(merged.items()))
@@ -2,14 +2,19 @@
 
 import logging
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional, Iterator
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 from app.models import Score, User
-from sqlalchemy import func
+from app.analysis.quantile_sketch import StreamingQuantileSketch
+from sqlalchemy import func, case, or_
 
 logger = logging.getLogger(__name__)
 
+SCORE_SCAN_CHUNK = 50000  # (id, total_score) rows fetched per keyset page
+MODIFIED_ZSCORE_SCALE = 0.6745
+ENSEMBLE_METHODS = ["zscore", "iqr", "modified_zscore", "mad"]
+
 
 class OutlierDetector:
     """Outlier detection using multiple statistical methods."""
@@ -167,6 +172,93 @@ class OutlierDetector:
             "method": "ensemble"
         }
     
+    # Grouped: every method for every group in one vectorized pass
+    def detect_outliers_grouped(self, values: List[float], group_keys: List,
+                                method: str = "ensemble") -> Dict:
+        """
+        Outlier detection per group (e.g. per age group) without a loop over
+        groups. Uses the same rules and guards as the single-list methods.
+        
+        Returns {group_key: result}; each result's "indices" point into the
+        input lists.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return {}
+        keys, codes = np.unique(np.asarray(group_keys), return_inverse=True)
+        codes = codes.ravel()
+        n_groups = len(keys)
+        
+        counts = np.bincount(codes, minlength=n_groups)
+        sums = np.bincount(codes, weights=values, minlength=n_groups)
+        mean = sums / counts
+        std_dev = np.sqrt(np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=n_groups) / counts)
+        
+        # Sort by (group, value) once; group quantiles are then index lookups
+        order = np.lexsort((values, codes))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sorted_values = values[order]
+        
+        def quantile(sorted_array, q):
+            position = starts + (counts - 1) * q
+            lower = np.floor(position).astype(int)
+            upper = np.ceil(position).astype(int)
+            return sorted_array[lower] + (position - lower) * (sorted_array[upper] - sorted_array[lower])
+        
+        q1, median, q3 = quantile(sorted_values, 0.25), quantile(sorted_values, 0.5), quantile(sorted_values, 0.75)
+        deviations = np.abs(values - median[codes])
+        mad = quantile(deviations[np.lexsort((deviations, codes))], 0.5)
+        iqr = q3 - q1
+        lower_bound, upper_bound = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        
+        n, robust = counts[codes], (counts >= 2) & (mad > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            masks = {
+                "zscore": (n >= 2) & (std_dev[codes] > 0)
+                          & (np.abs(values - mean[codes]) > self.threshold * std_dev[codes]),
+                "iqr": (n >= 4) & ((values < lower_bound[codes]) | (values > upper_bound[codes])),
+                "modified_zscore": robust[codes]
+                                   & (MODIFIED_ZSCORE_SCALE * deviations / mad[codes] > 3.5),
+                "mad": robust[codes] & (deviations > 2.5 * mad[codes]),
+            }
+        votes = sum(mask.astype(int) for mask in masks.values())
+        if method == "ensemble" or method not in masks:
+            method = "ensemble"
+            outlier_mask = votes >= int(np.ceil(len(masks) * 0.5))
+        else:
+            outlier_mask = masks[method]
+        
+        # Outlier positions grouped, each group in input order
+        outlier_positions = np.flatnonzero(outlier_mask)
+        outlier_positions = outlier_positions[np.argsort(codes[outlier_positions], kind="stable")]
+        outlier_splits = np.split(outlier_positions, np.cumsum(np.bincount(codes[outlier_positions],
+                                                                           minlength=n_groups))[:-1])
+        method_counts = {name: np.bincount(codes[mask], minlength=n_groups) for name, mask in masks.items()}
+        
+        results = {}
+        for g, key in enumerate(keys.tolist()):
+            indices = outlier_splits[g]
+            results[key] = {
+                "group": key,
+                "count": int(counts[g]),
+                "outliers": values[indices].tolist(),
+                "indices": indices.tolist(),
+                "outlier_count": len(indices),
+                "method_outlier_counts": {name: int(c[g]) for name, c in method_counts.items()},
+                "statistics": {
+                    "mean": float(mean[g]),
+                    "median": float(median[g]),
+                    "std_dev": float(std_dev[g]),
+                    "min": float(sorted_values[starts[g]]),
+                    "max": float(sorted_values[starts[g] + counts[g] - 1]),
+                    "q1": float(q1[g]),
+                    "q3": float(q3[g]),
+                    "mad": float(mad[g])
+                },
+                "method": method
+            }
+        return results
+    
     # Database methods
     def detect_outliers_for_user(self, session: Session, username: str, 
                                  method: str = "ensemble") -> Dict:
@@ -228,57 +320,16 @@ class OutlierDetector:
                                     method: str = "ensemble") -> Dict:
         """Age group-level outlier detection."""
         try:
-            scores_query = session.query(Score).filter(
-                Score.detailed_age_group == age_group
-            ).order_by(Score.timestamp).all()
-            
-            if not scores_query:
+            result = self._detect_outliers_in_scope(
+                session, [Score.detailed_age_group == age_group], method
+            )
+            if result is None:
                 logger.warning(f"No scores found for age group: {age_group}")
                 return {"error": f"No scores found for age group: {age_group}"}
             
-            scores = [score.total_score for score in scores_query]
-            
-            # Detect outliers
-            if method == "zscore":
-                result = self.detect_outliers_zscore(scores)
-            elif method == "iqr":
-                result = self.detect_outliers_iqr(scores)
-            elif method == "modified_zscore":
-                result = self.detect_outliers_modified_zscore(scores)
-            elif method == "mad":
-                result = self.detect_outliers_mad(scores)
-            else:
-                result = self.detect_outliers_ensemble(scores)
-            
-            # Map indices to score objects
-            outlier_indices = result.get("indices", [])
-            outlier_details = []
-            
-            for idx in outlier_indices:
-                score_obj = scores_query[idx]
-                outlier_details.append({
-                    "score_id": score_obj.id,
-                    "username": score_obj.username,
-                    "score_value": score_obj.total_score,
-                    "age": score_obj.age,
-                    "timestamp": score_obj.timestamp
-                })
-            
-            return {
-                "age_group": age_group,
-                "total_scores": len(scores),
-                "outlier_count": len(outlier_indices),
-                "detection_method": method,
-                "outlier_details": outlier_details,
-                "statistics": {
-                    "mean_score": float(np.mean(scores)),
-                    "median_score": float(np.median(scores)),
-                    "std_dev": float(np.std(scores)),
-                    "min_score": float(np.min(scores)),
-                    "max_score": float(np.max(scores))
-                },
-                **result
-            }
+            for detail in result["outlier_details"]:
+                detail.pop("age_group", None)
+            return {"age_group": age_group, **result}
             
         except Exception as e:
             logger.error(f"Error detecting outliers for age group {age_group}: {e}")
@@ -287,61 +338,198 @@ class OutlierDetector:
     def detect_outliers_global(self, session: Session, method: str = "ensemble") -> Dict:
         """System-wide outlier detection."""
         try:
-            scores_query = session.query(Score).order_by(Score.timestamp).all()
-            
-            if not scores_query:
+            result = self._detect_outliers_in_scope(session, [], method)
+            if result is None:
                 logger.warning("No scores found in database")
                 return {"error": "No scores found in database"}
             
-            scores = [score.total_score for score in scores_query]
-            
-            # Detect outliers
-            if method == "zscore":
-                result = self.detect_outliers_zscore(scores)
-            elif method == "iqr":
-                result = self.detect_outliers_iqr(scores)
-            elif method == "modified_zscore":
-                result = self.detect_outliers_modified_zscore(scores)
-            elif method == "mad":
-                result = self.detect_outliers_mad(scores)
-            else:
-                result = self.detect_outliers_ensemble(scores)
-            
-            # Map indices to score objects
-            outlier_indices = result.get("indices", [])
-            outlier_details = []
-            
-            for idx in outlier_indices:
-                score_obj = scores_query[idx]
-                outlier_details.append({
-                    "score_id": score_obj.id,
-                    "username": score_obj.username,
-                    "score_value": score_obj.total_score,
-                    "age": score_obj.age,
-                    "age_group": score_obj.detailed_age_group,
-                    "timestamp": score_obj.timestamp
-                })
-            
-            return {
-                "scope": "global",
-                "total_scores": len(scores),
-                "outlier_count": len(outlier_indices),
-                "detection_method": method,
-                "outlier_details": outlier_details,
-                "statistics": {
-                    "mean_score": float(np.mean(scores)),
-                    "median_score": float(np.median(scores)),
-                    "std_dev": float(np.std(scores)),
-                    "min_score": float(np.min(scores)),
-                    "max_score": float(np.max(scores))
-                },
-                **result
-            }
+            return {"scope": "global", **result}
             
         except Exception as e:
             logger.error(f"Error detecting global outliers: {e}")
             return {"error": str(e)}
     
+    # Bounded-memory scope detection: statistics come from SQL aggregates and
+    # streamed quantile sketches, and only the outlier rows are fetched.
+    # Results keep "outliers" and "indices" (positions in the scope's scores
+    # ordered by timestamp, as the in-memory methods number them), but not
+    # the per-score arrays (z_scores, modified_z_scores, deviations, votes),
+    # which would be as large as the scope.
+    
+    def _detect_outliers_in_scope(self, session: Session, criteria: List,
+                                  method: str) -> Optional[Dict]:
+        """Outliers among scores matching criteria, or None if there are none."""
+        if method not in ENSEMBLE_METHODS:
+            method = "ensemble"
+        # z-scores need only the SQL aggregate; IQR needs quartiles; the rest need MAD
+        stats = self._scope_statistics(session, criteria, with_quantiles=method != "zscore",
+                                       with_mad=method not in ("zscore", "iqr"))
+        if stats is None:
+            return None
+        
+        conditions, summaries = self._outlier_conditions(stats)
+        ranked, position = self._ranked_scope(session, criteria)
+        ranked_conditions, _ = self._outlier_conditions(stats, ranked.total_score)
+        if method == "ensemble":
+            active = [cond for cond in ranked_conditions.values() if cond is not None]
+            votes_needed = int(np.ceil(len(ENSEMBLE_METHODS) * 0.5))
+            votes = sum(case((cond, 1), else_=0) for cond in active) if active else None
+            condition = votes >= votes_needed if len(active) >= votes_needed else None
+            result = {
+                "consensus_threshold": 0.5,
+                "methods_used": list(ENSEMBLE_METHODS),
+                "individual_results": summaries,
+                "method": "ensemble"
+            }
+        else:
+            condition = ranked_conditions[method]
+            result = summaries[method]
+        
+        rows = self._fetch_outlier_rows(session, ranked, position, condition)
+        if method == "ensemble":
+            for name, cond in conditions.items():
+                summaries[name]["outlier_count"] = (
+                    self._count_scores(session, criteria + [cond]) if cond is not None else 0
+                )
+        
+        return {
+            "total_scores": stats["count"],
+            "outlier_count": len(rows),
+            "detection_method": method,
+            "outlier_details": [
+                {
+                    "score_id": row.id,
+                    "username": row.username,
+                    "score_value": row.total_score,
+                    "age": row.age,
+                    "age_group": row.detailed_age_group,
+                    "timestamp": row.timestamp
+                }
+                for row in rows
+            ],
+            "statistics": {
+                "mean_score": stats["mean"],
+                "median_score": stats["median"],
+                "std_dev": stats["std_dev"],
+                "min_score": stats["min"],
+                "max_score": stats["max"]
+            },
+            **result,
+            "outliers": [float(row.total_score) for row in rows],
+            "indices": [row.position for row in rows],
+            "score_ids": [row.id for row in rows]
+        }
+    
+    def _iter_score_values(self, session: Session, criteria: List) -> Iterator[np.ndarray]:
+        """total_score values in keyset-paged chunks of (id, total_score)."""
+        last_id = 0
+        while True:
+            rows = session.query(Score.id, Score.total_score).filter(
+                *criteria, Score.total_score.isnot(None), Score.id > last_id
+            ).order_by(Score.id).limit(SCORE_SCAN_CHUNK).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield np.fromiter((row[1] for row in rows), dtype=float, count=len(rows))
+    
+    def _scope_statistics(self, session: Session, criteria: List,
+                          with_quantiles: bool = True, with_mad: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        count/mean/std/min/max from one SQL aggregate (sum of squares for the
+        variance); median/quartiles from one sketch pass and MAD from a
+        second pass over |x - median|.
+        """
+        count, total, total_sq, min_score, max_score = session.query(
+            func.count(Score.total_score),
+            func.sum(Score.total_score),
+            func.sum(Score.total_score * Score.total_score),
+            func.min(Score.total_score),
+            func.max(Score.total_score)
+        ).filter(*criteria).one()
+        if not count:
+            return None
+        
+        mean = float(total) / count
+        variance = max(float(total_sq) / count - mean * mean, 0.0)
+        stats = {
+            "count": int(count),
+            "mean": mean,
+            "std_dev": float(np.sqrt(variance)),
+            "min": float(min_score),
+            "max": float(max_score),
+            "median": None, "q1": None, "q3": None, "mad": None
+        }
+        if not with_quantiles:
+            return stats
+        
+        sketch = StreamingQuantileSketch()
+        for values in self._iter_score_values(session, criteria):
+            sketch.update(values)
+        stats.update(median=sketch.median(), q1=sketch.quantile(0.25), q3=sketch.quantile(0.75))
+        
+        if with_mad:
+            deviations = StreamingQuantileSketch()
+            for values in self._iter_score_values(session, criteria):
+                deviations.update(np.abs(values - stats["median"]))
+            stats["mad"] = deviations.median()
+        return stats
+    
+    def _outlier_conditions(self, stats: Dict[str, Any], x=None) -> Tuple[Dict, Dict[str, Dict]]:
+        """
+        Per-method SQL condition on x (Score.total_score by default; None when
+        the method finds nothing, mirroring the in-memory guards) and its
+        summary dict.
+        """
+        if x is None:
+            x = Score.total_score
+        n = stats["count"]
+        conditions, summaries = {}, {}
+        
+        std_dev = stats["std_dev"]
+        conditions["zscore"] = (
+            func.abs(x - stats["mean"]) > self.threshold * std_dev if n >= 2 and std_dev > 0 else None
+        )
+        summaries["zscore"] = {"threshold": self.threshold, "mean": stats["mean"],
+                               "std_dev": std_dev, "method": "zscore"}
+        
+        if stats["q1"] is not None and n >= 4:
+            iqr = stats["q3"] - stats["q1"]
+            lower_bound, upper_bound = stats["q1"] - 1.5 * iqr, stats["q3"] + 1.5 * iqr
+            conditions["iqr"] = or_(x < lower_bound, x > upper_bound)
+            summaries["iqr"] = {"q1": stats["q1"], "q3": stats["q3"], "iqr": iqr,
+                                "lower_bound": lower_bound, "upper_bound": upper_bound, "method": "iqr"}
+        else:
+            conditions["iqr"] = None
+            summaries["iqr"] = {"method": "iqr"}
+        
+        mad = stats["mad"]
+        robust = mad is not None and mad > 0 and n >= 2
+        deviation = func.abs(x - stats["median"]) if robust else None
+        conditions["modified_zscore"] = deviation > 3.5 * mad / MODIFIED_ZSCORE_SCALE if robust else None
+        summaries["modified_zscore"] = {"threshold": 3.5, "median": stats["median"], "mad": mad,
+                                        "method": "modified-zscore"}
+        conditions["mad"] = deviation > 2.5 * mad if robust else None
+        summaries["mad"] = {"median": stats["median"], "mad": mad, "threshold": 2.5, "method": "mad"}
+        
+        return conditions, summaries
+    
+    def _ranked_scope(self, session: Session, criteria: List):
+        """Scores matching criteria, numbered from 0 in (timestamp, id) order"""
+        position = (func.row_number().over(order_by=(Score.timestamp, Score.id)) - 1).label("position")
+        subquery = session.query(Score, position).filter(*criteria, Score.total_score.isnot(None)).subquery()
+        return aliased(Score, subquery), subquery.c.position
+    
+    def _fetch_outlier_rows(self, session: Session, ranked, position, condition) -> List:
+        if condition is None:
+            return []
+        return session.query(
+            ranked.id, ranked.username, ranked.total_score, ranked.age,
+            ranked.detailed_age_group, ranked.timestamp, position
+        ).filter(condition).order_by(position).all()
+    
+    def _count_scores(self, session: Session, criteria: List) -> int:
+        return session.query(func.count(Score.id)).filter(*criteria, Score.total_score.isnot(None)).scalar()
+    
     def detect_inconsistency_patterns(self, session: Session, username: str,
                                      time_window_days: int = 30) -> Dict:
         """Detect scoring inconsistency over time window."""
@@ -405,27 +593,23 @@ class OutlierDetector:
     def get_statistical_summary(self, session: Session, age_group: Optional[str] = None) -> Dict:
         """Get statistical summary."""
         try:
-            if age_group:
-                query = session.query(Score).filter(Score.detailed_age_group == age_group)
-            else:
-                query = session.query(Score)
-            
-            scores = [score.total_score for score in query.all()]
+            criteria = [Score.detailed_age_group == age_group] if age_group else []
+            stats = self._scope_statistics(session, criteria, with_mad=False)
             
-            if not scores:
+            if stats is None:
                 return {"error": "No scores found"}
             
             return {
                 "scope": f"age_group_{age_group}" if age_group else "global",
-                "count": len(scores),
-                "mean": float(np.mean(scores)),
-                "median": float(np.median(scores)),
-                "std_dev": float(np.std(scores)),
-                "min": float(np.min(scores)),
-                "max": float(np.max(scores)),
-                "q1": float(np.percentile(scores, 25)),
-                "q3": float(np.percentile(scores, 75)),
-                "iqr": float(np.percentile(scores, 75) - np.percentile(scores, 25))
+                "count": stats["count"],
+                "mean": stats["mean"],
+                "median": stats["median"],
+                "std_dev": stats["std_dev"],
+                "min": stats["min"],
+                "max": stats["max"],
+                "q1": stats["q1"],
+                "q3": stats["q3"],
+                "iqr": stats["q3"] - stats["q1"]
             }
             
         except Exception as e:
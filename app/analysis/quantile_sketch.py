@@ -0,0 +1,82 @@
+"""Quantile Sketch - Bounded-memory quantiles over streamed score chunks."""
+
+import numpy as np
+from typing import Iterable, Optional
+
+# Distinct values kept before the sketch starts merging neighbours.
+# EQ scores are small integers, so in practice the sketch stays exact.
+QUANTILE_SKETCH_BINS = 2048
+
+
+class StreamingQuantileSketch:
+    """
+    Weighted histogram of (value, count) pairs fed chunk by chunk.
+
+    While the number of distinct values stays within max_bins every value
+    is kept and quantile() matches np.percentile (linear interpolation).
+    Past that, neighbouring values are merged into equal-weight bins, so
+    memory stays O(max_bins) and the rank error is about 1 / max_bins.
+    """
+
+    def __init__(self, max_bins: int = QUANTILE_SKETCH_BINS):
+        self.max_bins = max_bins
+        self._values = np.empty(0, dtype=float)
+        self._counts = np.empty(0, dtype=np.int64)
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.is_exact = True
+
+    def update(self, values: Iterable[float]):
+        """Add a chunk of values (NaN is ignored)."""
+        chunk = np.asarray(values, dtype=float).ravel()
+        chunk = chunk[~np.isnan(chunk)]
+        if chunk.size == 0:
+            return
+
+        chunk_values, chunk_counts = np.unique(chunk, return_counts=True)
+        merged = np.concatenate([self._values, chunk_values])
+        weights = np.concatenate([self._counts, chunk_counts])
+        self._values, inverse = np.unique(merged, return_inverse=True)
+        self._counts = np.bincount(inverse, weights=weights).astype(np.int64)
+
+        self.count += int(chunk.size)
+        self.min = float(chunk_values[0]) if self.min is None else min(self.min, float(chunk_values[0]))
+        self.max = float(chunk_values[-1]) if self.max is None else max(self.max, float(chunk_values[-1]))
+
+        if len(self._values) > self.max_bins:
+            self._compress()
+
+    def _compress(self):
+        """Merge into max_bins equal-weight bins (weighted mean per bin)."""
+        cumulative = np.cumsum(self._counts) - self._counts / 2
+        bins = np.minimum((cumulative / self.count * self.max_bins).astype(int), self.max_bins - 1)
+        weights = np.bincount(bins, weights=self._counts)
+        sums = np.bincount(bins, weights=self._values * self._counts)
+        keep = weights > 0
+        self._values = sums[keep] / weights[keep]
+        self._counts = weights[keep].astype(np.int64)
+        self.is_exact = False
+
+    def _value_at_rank(self, rank: int) -> float:
+        idx = np.searchsorted(np.cumsum(self._counts), rank, side="right")
+        return float(self._values[min(idx, len(self._values) - 1)])
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q in [0, 1] (None if nothing was added)."""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        position = (self.count - 1) * q
+        lower = int(np.floor(position))
+        lower_value = self._value_at_rank(lower)
+        if position == lower:
+            return lower_value
+        upper_value = self._value_at_rank(lower + 1)
+        return lower_value + (position - lower) * (upper_value - lower_value)
+
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
@@ -16,14 +16,127 @@ import logging
 from datetime import datetime, timedelta
 from collections import defaultdict
 from statistics import mean, stdev
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional, Union
 
-from sqlalchemy import func
-from app.db import safe_db_context
+from sqlalchemy import func, or_, and_
+from app.analysis.downsampling import coarsen_rollups, daily_rollups
+from app.db import pooled_connection, safe_db_context
 from app.models import User, Score, Response, JournalEntry
+from app.services.activity_summary import get_returning_users
 
 logger = logging.getLogger(__name__)
 
+# Projected columns per history stream: (model, time column, columns)
+HISTORY_STREAMS = {
+    "scores": (Score, Score.timestamp,
+               (Score.id, Score.total_score, Score.age, Score.detailed_age_group, Score.timestamp)),
+    "responses": (Response, Response.timestamp,
+                  (Response.id, Response.question_id, Response.response_value, Response.timestamp)),
+    "journal_entries": (JournalEntry, JournalEntry.entry_date,
+                        (JournalEntry.id, JournalEntry.sentiment_score, JournalEntry.entry_date,
+                         JournalEntry.emotional_patterns)),
+}
+
+TimeBound = Optional[Union[str, datetime]]
+
+
+def _time_key(value: TimeBound) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class UserHistorySnapshot:
+    """
+    One user's scores, responses and journal entries for the duration of a
+    request. Each stream is fetched at most once, with only the columns the
+    analyses use, and shared by every analyzer method it is passed to.
+    
+    Optional since/until bound every stream by time; limit/after page each
+    stream by (time, id) keyset. In after, a stream missing from the dict
+    starts from its first row and a stream mapped to None is exhausted and
+    yields nothing, so next_cursor() can be passed back unchanged. Streams
+    are loaded on first access.
+    """
+
+    def __init__(self, username: str, since: TimeBound = None, until: TimeBound = None,
+                 limit: Optional[int] = None, after: Optional[Dict[str, Tuple[str, int]]] = None):
+        self.username = username
+        self.since = _time_key(since)
+        self.until = _time_key(until)
+        self.limit = limit
+        self.after = after or {}
+        self._streams: Dict[str, List[Any]] = {}
+        self._rollups: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    @property
+    def scores(self) -> List[Any]:
+        return self._get("scores")
+
+    @property
+    def responses(self) -> List[Any]:
+        return self._get("responses")
+
+    @property
+    def journal_entries(self) -> List[Any]:
+        return self._get("journal_entries")
+
+    def seed(self, stream: str, rows: List[Any]):
+        """Use rows already loaded elsewhere (same columns and order) for a stream"""
+        self._streams[stream] = rows
+
+    def rollups(self, stream: str = "scores", value: str = "total_score",
+                period: str = "daily") -> Dict[str, Any]:
+        """
+        PeriodRollup per day/week/month of one column of a stream.
+        
+        Per-day rollups are computed once per snapshot; weekly and monthly
+        ones are merged from them, so every period shares one pass.
+        """
+        key = (stream, value, period)
+        if key not in self._rollups:
+            daily_key = (stream, value, "daily")
+            if daily_key not in self._rollups:
+                time_attr = HISTORY_STREAMS[stream][1].key
+                self._rollups[daily_key] = daily_rollups(self._get(stream), time_attr, value)
+            self._rollups[key] = coarsen_rollups(self._rollups[daily_key], period)
+        return self._rollups[key]
+
+    def _get(self, stream: str) -> List[Any]:
+        if stream not in self._streams:
+            if stream in self.after and self.after[stream] is None:
+                self._streams[stream] = []  # Exhausted on an earlier page
+                return self._streams[stream]
+            with safe_db_context() as session:
+                self._streams[stream] = self._query(session, stream)
+        return self._streams[stream]
+
+    def _query(self, session, stream: str) -> List[Any]:
+        model, time_col, columns = HISTORY_STREAMS[stream]
+        query = session.query(*columns).filter_by(username=self.username)
+        if self.since:
+            query = query.filter(time_col >= self.since)
+        if self.until:
+            query = query.filter(time_col < self.until)
+        # NULL times page as '' (first, where SQLite sorts NULLs) so the keyset never skips them
+        time_key = func.coalesce(time_col, "")
+        cursor = self.after.get(stream)
+        if cursor:
+            after_time, after_id = cursor
+            after_time = after_time or ""
+            query = query.filter(or_(time_key > after_time, and_(time_key == after_time, model.id > after_id)))
+        query = query.order_by(time_key, model.id)
+        if self.limit:
+            query = query.limit(self.limit)
+        return query.all()
+
+    def next_cursor(self) -> Dict[str, Optional[Tuple[str, int]]]:
+        """Keyset cursor per loaded stream (None once a stream is exhausted)"""
+        cursors = {}
+        for stream, rows in self._streams.items():
+            time_attr = HISTORY_STREAMS[stream][1].key
+            full_page = self.limit and len(rows) == self.limit
+            cursors[stream] = (getattr(rows[-1], time_attr) or "", rows[-1].id) if full_page else None
+        return cursors
+
 
 class TimeBasedAnalyzer:
     """Analyzer for temporal patterns in user responses and emotional intelligence scores."""
@@ -32,138 +145,140 @@ class TimeBasedAnalyzer:
         """Initialize the time-based analyzer."""
         self.logger = logging.getLogger(__name__)
 
-    def get_user_timeline(self, username: str) -> Dict:
+    def get_user_timeline(self, username: str, since: TimeBound = None, until: TimeBound = None,
+                          limit: Optional[int] = None,
+                          after: Optional[Dict[str, Tuple[str, int]]] = None) -> Dict:
         """
-        Get complete timeline of user activity including all scores and responses.
+        Get timeline of user activity including scores, responses and journal entries.
         
         Args:
             username: Username to analyze
+            since: Only include activity at or after this time
+            until: Only include activity before this time
+            limit: Page size per stream (keyset pagination)
+            after: "next_cursor" from the previous page
             
         Returns:
-            Dictionary containing timeline data sorted by timestamp
+            Dictionary containing timeline data sorted by timestamp; with a
+            limit it also holds "next_cursor" for the following page
         """
         try:
-            with safe_db_context() as session:
-                # Get all scores for the user
-                scores = session.query(Score).filter_by(username=username).order_by(Score.timestamp).all()
-                
-                # Get all responses for the user
-                responses = session.query(Response).filter_by(username=username).order_by(Response.timestamp).all()
-                
-                # Get all journal entries
-                journals = session.query(JournalEntry).filter_by(username=username).order_by(JournalEntry.entry_date).all()
-                
-                timeline_data = {
-                    "username": username,
-                    "scores": [
-                        {
-                            "id": s.id,
-                            "score": s.total_score,
-                            "age": s.age,
-                            "age_group": s.detailed_age_group,
-                            "timestamp": s.timestamp,
-                        }
-                        for s in scores
-                    ],
-                    "responses": [
-                        {
-                            "id": r.id,
-                            "question_id": r.question_id,
-                            "response_value": r.response_value,
-                            "timestamp": r.timestamp,
-                        }
-                        for r in responses
-                    ],
-                    "journal_entries": [
-                        {
-                            "id": j.id,
-                            "sentiment_score": j.sentiment_score,
-                            "entry_date": j.entry_date,
-                            "emotional_patterns": j.emotional_patterns,
-                        }
-                        for j in journals
-                    ],
-                }
-                
-                return timeline_data
+            history = UserHistorySnapshot(username, since=since, until=until, limit=limit, after=after)
+            
+            timeline_data = {
+                "username": username,
+                "scores": [
+                    {
+                        "id": s.id,
+                        "score": s.total_score,
+                        "age": s.age,
+                        "age_group": s.detailed_age_group,
+                        "timestamp": s.timestamp,
+                    }
+                    for s in history.scores
+                ],
+                "responses": [
+                    {
+                        "id": r.id,
+                        "question_id": r.question_id,
+                        "response_value": r.response_value,
+                        "timestamp": r.timestamp,
+                    }
+                    for r in history.responses
+                ],
+                "journal_entries": [
+                    {
+                        "id": j.id,
+                        "sentiment_score": j.sentiment_score,
+                        "entry_date": j.entry_date,
+                        "emotional_patterns": j.emotional_patterns,
+                    }
+                    for j in history.journal_entries
+                ],
+            }
+            if limit:
+                timeline_data["next_cursor"] = history.next_cursor()
+            
+            return timeline_data
         except Exception as e:
             self.logger.error(f"Error retrieving user timeline for {username}: {e}")
             return {}
 
-    def analyze_score_trends(self, username: str) -> Dict:
+    def analyze_score_trends(self, username: str, snapshot: Optional[UserHistorySnapshot] = None) -> Dict:
         """
         Analyze trends in EQ scores over time for a returning user.
         
         Args:
             username: Username to analyze
+            snapshot: Shared history snapshot (fetched here if omitted)
             
         Returns:
             Dictionary containing trend analysis
         """
         try:
-            with safe_db_context() as session:
-                scores = session.query(Score).filter_by(username=username).order_by(Score.timestamp).all()
-                
-                if not scores:
-                    return {"error": "No score data available"}
-                
-                score_values = [s.total_score for s in scores]
-                timestamps = [s.timestamp for s in scores]
-                
-                trend_analysis = {
-                    "username": username,
-                    "total_attempts": len(scores),
-                    "first_score": score_values[0],
-                    "last_score": score_values[-1],
-                    "average_score": mean(score_values),
-                    "max_score": max(score_values),
-                    "min_score": min(score_values),
-                    "first_attempt_date": timestamps[0],
-                    "last_attempt_date": timestamps[-1],
-                }
-                
-                # Calculate improvement
-                improvement = score_values[-1] - score_values[0]
-                trend_analysis["total_improvement"] = improvement
-                
-                if score_values[0] != 0:
-                    trend_analysis["improvement_percentage"] = (improvement / score_values[0]) * 100
+            scores = (snapshot or UserHistorySnapshot(username)).scores
+            
+            if not scores:
+                return {"error": "No score data available"}
+            
+            score_values = [s.total_score for s in scores]
+            timestamps = [s.timestamp for s in scores]
+            
+            trend_analysis = {
+                "username": username,
+                "total_attempts": len(scores),
+                "first_score": score_values[0],
+                "last_score": score_values[-1],
+                "average_score": mean(score_values),
+                "max_score": max(score_values),
+                "min_score": min(score_values),
+                "first_attempt_date": timestamps[0],
+                "last_attempt_date": timestamps[-1],
+            }
+            
+            # Calculate improvement
+            improvement = score_values[-1] - score_values[0]
+            trend_analysis["total_improvement"] = improvement
+            
+            if score_values[0] != 0:
+                trend_analysis["improvement_percentage"] = (improvement / score_values[0]) * 100
+            else:
+                trend_analysis["improvement_percentage"] = 0
+            
+            # Calculate standard deviation if more than one score
+            if len(score_values) > 1:
+                trend_analysis["score_std_dev"] = stdev(score_values)
+                
+                # Calculate moving average (3-point)
+                moving_avgs = []
+                for i in range(len(score_values) - 2):
+                    moving_avgs.append(mean(score_values[i:i+3]))
+                trend_analysis["moving_average_3"] = moving_avgs
+            
+            # Determine trend direction
+            if len(score_values) >= 3:
+                recent_avg = mean(score_values[-3:])
+                early_avg = mean(score_values[:3])
+                trend_direction = recent_avg - early_avg
+                
+                if trend_direction > 5:
+                    trend_analysis["trend_direction"] = "Strong Upward"
+                elif trend_direction > 0:
+                    trend_analysis["trend_direction"] = "Moderate Upward"
+                elif trend_direction < -5:
+                    trend_analysis["trend_direction"] = "Strong Downward"
+                elif trend_direction < 0:
+                    trend_analysis["trend_direction"] = "Moderate Downward"
                 else:
-                    trend_analysis["improvement_percentage"] = 0
-                
-                # Calculate standard deviation if more than one score
-                if len(score_values) > 1:
-                    trend_analysis["score_std_dev"] = stdev(score_values)
-                    
-                    # Calculate moving average (3-point)
-                    moving_avgs = []
-                    for i in range(len(score_values) - 2):
-                        moving_avgs.append(mean(score_values[i:i+3]))
-                    trend_analysis["moving_average_3"] = moving_avgs
-                
-                # Determine trend direction
-                if len(score_values) >= 3:
-                    recent_avg = mean(score_values[-3:])
-                    early_avg = mean(score_values[:3])
-                    trend_direction = recent_avg - early_avg
-                    
-                    if trend_direction > 5:
-                        trend_analysis["trend_direction"] = "Strong Upward"
-                    elif trend_direction > 0:
-                        trend_analysis["trend_direction"] = "Moderate Upward"
-                    elif trend_direction < -5:
-                        trend_analysis["trend_direction"] = "Strong Downward"
-                    elif trend_direction < 0:
-                        trend_analysis["trend_direction"] = "Moderate Downward"
-                    else:
-                        trend_analysis["trend_direction"] = "Stable"
-                
-                return trend_analysis
+                    trend_analysis["trend_direction"] = "Stable"
+            
+            return trend_analysis
         except Exception as e:
             self.logger.error(f"Error analyzing score trends for {username}: {e}")
             return {}
 
-    def analyze_response_patterns_over_time(self, username: str) -> Dict:
+    def analyze_response_patterns_over_time(self, username: str,
+                                            snapshot: Optional[UserHistorySnapshot] = None) -> Dict:
         """
         Analyze how response patterns change over time.
         
@@ -172,119 +287,97 @@ class TimeBasedAnalyzer:
         
         Args:
             username: Username to analyze
+            snapshot: Shared history snapshot (fetched here if omitted)
             
         Returns:
             Dictionary containing response pattern analysis
         """
         try:
-            with safe_db_context() as session:
-                responses = session.query(Response).filter_by(username=username).order_by(Response.timestamp).all()
-                
-                if not responses:
-                    return {"error": "No response data available"}
-                
-                # Group responses by question_id and track changes
-                question_responses = defaultdict(list)
-                for resp in responses:
-                    question_responses[resp.question_id].append({
-                        "response_value": resp.response_value,
-                        "timestamp": resp.timestamp,
-                    })
-                
-                pattern_analysis = {
-                    "username": username,
-                    "total_responses": len(responses),
-                    "unique_questions_answered": len(question_responses),
-                    "question_patterns": {},
-                }
-                
-                # Analyze pattern for each question
-                for question_id, resp_history in question_responses.items():
-                    if len(resp_history) >= 2:
-                        values = [r["response_value"] for r in resp_history]
-                        first_response = values[0]
-                        last_response = values[-1]
-                        
-                        pattern_analysis["question_patterns"][question_id] = {
-                            "times_answered": len(values),
-                            "first_response": first_response,
-                            "last_response": last_response,
-                            "response_change": last_response - first_response,
-                            "average_response": mean(values),
-                            "response_history": values,
-                        }
-                
-                # Calculate overall response consistency
-                all_values = [r.response_value for r in responses]
-                if len(all_values) > 1:
-                    pattern_analysis["overall_response_std_dev"] = stdev(all_values)
-                    pattern_analysis["overall_average_response"] = mean(all_values)
-                
-                return pattern_analysis
+            responses = (snapshot or UserHistorySnapshot(username)).responses
+            
+            if not responses:
+                return {"error": "No response data available"}
+            
+            # Group responses by question_id and track changes
+            question_responses = defaultdict(list)
+            for resp in responses:
+                question_responses[resp.question_id].append({
+                    "response_value": resp.response_value,
+                    "timestamp": resp.timestamp,
+                })
+            
+            pattern_analysis = {
+                "username": username,
+                "total_responses": len(responses),
+                "unique_questions_answered": len(question_responses),
+                "question_patterns": {},
+            }
+            
+            # Analyze pattern for each question
+            for question_id, resp_history in question_responses.items():
+                if len(resp_history) >= 2:
+                    values = [r["response_value"] for r in resp_history]
+                    first_response = values[0]
+                    last_response = values[-1]
+                    
+                    pattern_analysis["question_patterns"][question_id] = {
+                        "times_answered": len(values),
+                        "first_response": first_response,
+                        "last_response": last_response,
+                        "response_change": last_response - first_response,
+                        "average_response": mean(values),
+                        "response_history": values,
+                    }
+            
+            # Calculate overall response consistency
+            all_values = [r.response_value for r in responses]
+            if len(all_values) > 1:
+                pattern_analysis["overall_response_std_dev"] = stdev(all_values)
+                pattern_analysis["overall_average_response"] = mean(all_values)
+            
+            return pattern_analysis
         except Exception as e:
             self.logger.error(f"Error analyzing response patterns for {username}: {e}")
             return {}
 
-    def get_time_period_stats(self, username: str, period: str = "weekly") -> Dict:
+    def get_time_period_stats(self, username: str, period: str = "weekly",
+                              snapshot: Optional[UserHistorySnapshot] = None) -> Dict:
         """
         Get statistics grouped by time period (daily, weekly, monthly).
         
         Args:
             username: Username to analyze
             period: Time period ('daily', 'weekly', 'monthly')
+            snapshot: Shared history snapshot (fetched here if omitted)
             
         Returns:
             Dictionary containing statistics grouped by time period
         """
         try:
-            with safe_db_context() as session:
-                scores = session.query(Score).filter_by(username=username).order_by(Score.timestamp).all()
-                
-                if not scores:
-                    return {"error": "No score data available"}
-                
-                # Group scores by period
-                period_stats = defaultdict(list)
-                
-                for score in scores:
-                    try:
-                        score_time = datetime.fromisoformat(score.timestamp)
-                    except (ValueError, TypeError):
-                        # Try alternative parsing
-                        try:
-                            score_time = datetime.strptime(score.timestamp, "%Y-%m-%d %H:%M:%S")
-                        except:
-                            continue
-                    
-                    if period == "daily":
-                        period_key = score_time.strftime("%Y-%m-%d")
-                    elif period == "weekly":
-                        # Get ISO week
-                        period_key = f"{score_time.isocalendar()[0]}-W{score_time.isocalendar()[1]}"
-                    elif period == "monthly":
-                        period_key = score_time.strftime("%Y-%m")
-                    else:
-                        period_key = score_time.strftime("%Y-%m-%d")
-                    
-                    period_stats[period_key].append(score.total_score)
-                
-                # Calculate statistics for each period
-                result = {
-                    "username": username,
-                    "period": period,
-                    "period_statistics": {},
+            snapshot = snapshot or UserHistorySnapshot(username)
+            
+            if not snapshot.scores:
+                return {"error": "No score data available"}
+            
+            # Group scores by period (shared per-day rollups)
+            rollups = snapshot.rollups("scores", "total_score", period)
+            
+            # Calculate statistics for each period
+            result = {
+                "username": username,
+                "period": period,
+                "period_statistics": {},
+            }
+            
+            for period_key, rollup in rollups.items():
+                result["period_statistics"][period_key] = {
+                    "average_score": rollup.mean,
+                    "min_score": rollup.min,
+                    "max_score": rollup.max,
+                    "attempts_count": rollup.count,
                 }
-                
-                for period_key in sorted(period_stats.keys()):
-                    scores_in_period = period_stats[period_key]
-                    result["period_statistics"][period_key] = {
-                        "average_score": mean(scores_in_period),
-                        "min_score": min(scores_in_period),
-                        "max_score": max(scores_in_period),
-                        "attempts_count": len(scores_in_period),
-                    }
-                
-                return result
+            
+            return result
         except Exception as e:
             self.logger.error(f"Error analyzing period stats for {username}: {e}")
             return {}
@@ -297,104 +390,85 @@ class TimeBasedAnalyzer:
             min_attempts: Minimum number of attempts to be considered a returning user
             
         Returns:
-            List of returning users with their activity summaries
+            List of returning users with their activity summaries, most
+            active first
         """
         try:
-            with safe_db_context() as session:
-                # Get users with multiple scores
-                user_scores = session.query(
-                    Score.username,
-                    func.count(Score.id).label("attempt_count"),
-                    func.min(Score.timestamp).label("first_attempt"),
-                    func.max(Score.timestamp).label("last_attempt"),
-                    func.avg(Score.total_score).label("avg_score"),
-                ).group_by(Score.username).filter(
-                    func.count(Score.id) >= min_attempts
-                ).all()
-                
-                returning_users = [
-                    {
-                        "username": user[0],
-                        "total_attempts": user[1],
-                        "first_attempt_date": user[2],
-                        "last_attempt_date": user[3],
-                        "average_score": user[4],
-                    }
-                    for user in user_scores
-                ]
-                
-                return sorted(returning_users, key=lambda x: x["total_attempts"], reverse=True)
+            # Indexed range read on the trigger-maintained attempt counts
+            with pooled_connection() as conn:
+                return get_returning_users(conn.cursor(), min_attempts)
         except Exception as e:
             self.logger.error(f"Error identifying returning users: {e}")
             return []
 
-    def get_comparative_analysis(self, username: str, lookback_days: int = 30) -> Dict:
+    def get_comparative_analysis(self, username: str, lookback_days: int = 30,
+                                 snapshot: Optional[UserHistorySnapshot] = None) -> Dict:
         """
         Compare recent user performance with their historical average.
         
         Args:
             username: Username to analyze
             lookback_days: Number of days to look back for "recent" activity
+            snapshot: Shared history snapshot (fetched here if omitted)
             
         Returns:
             Dictionary containing comparative analysis
         """
         try:
-            with safe_db_context() as session:
-                all_scores = session.query(Score).filter_by(username=username).order_by(Score.timestamp).all()
-                
-                if not all_scores:
-                    return {"error": "No score data available"}
-                
-                # Separate historical and recent scores
-                cutoff_date = datetime.utcnow() - timedelta(days=lookback_days)
-                
-                historical_scores = []
-                recent_scores = []
-                
-                for score in all_scores:
+            all_scores = (snapshot or UserHistorySnapshot(username)).scores
+            
+            if not all_scores:
+                return {"error": "No score data available"}
+            
+            # Separate historical and recent scores
+            cutoff_date = datetime.utcnow() - timedelta(days=lookback_days)
+            
+            historical_scores = []
+            recent_scores = []
+            
+            for score in all_scores:
+                try:
+                    score_time = datetime.fromisoformat(score.timestamp)
+                except (ValueError, TypeError):
                     try:
-                        score_time = datetime.fromisoformat(score.timestamp)
-                    except (ValueError, TypeError):
-                        try:
-                            score_time = datetime.strptime(score.timestamp, "%Y-%m-%d %H:%M:%S")
-                        except:
-                            continue
-                    
-                    if score_time < cutoff_date:
-                        historical_scores.append(score.total_score)
-                    else:
-                        recent_scores.append(score.total_score)
+                        score_time = datetime.strptime(score.timestamp, "%Y-%m-%d %H:%M:%S")
+                    except:
+                        continue
                 
-                comparative = {
-                    "username": username,
-                    "lookback_days": lookback_days,
+                if score_time < cutoff_date:
+                    historical_scores.append(score.total_score)
+                else:
+                    recent_scores.append(score.total_score)
+            
+            comparative = {
+                "username": username,
+                "lookback_days": lookback_days,
+            }
+            
+            if historical_scores:
+                comparative["historical"] = {
+                    "average_score": mean(historical_scores),
+                    "attempts": len(historical_scores),
+                    "max_score": max(historical_scores),
+                    "min_score": min(historical_scores),
+                }
+            
+            if recent_scores:
+                comparative["recent"] = {
+                    "average_score": mean(recent_scores),
+                    "attempts": len(recent_scores),
+                    "max_score": max(recent_scores),
+                    "min_score": min(recent_scores),
                 }
                 
+                # Calculate difference
                 if historical_scores:
-                    comparative["historical"] = {
-                        "average_score": mean(historical_scores),
-                        "attempts": len(historical_scores),
-                        "max_score": max(historical_scores),
-                        "min_score": min(historical_scores),
-                    }
-                
-                if recent_scores:
-                    comparative["recent"] = {
-                        "average_score": mean(recent_scores),
-                        "attempts": len(recent_scores),
-                        "max_score": max(recent_scores),
-                        "min_score": min(recent_scores),
-                    }
-                    
-                    # Calculate difference
-                    if historical_scores:
-                        hist_avg = mean(historical_scores)
-                        recent_avg = mean(recent_scores)
-                        comparative["performance_change"] = recent_avg - hist_avg
-                        comparative["performance_change_percentage"] = (recent_avg - hist_avg) / hist_avg * 100 if hist_avg != 0 else 0
-                
-                return comparative
+                    hist_avg = mean(historical_scores)
+                    recent_avg = mean(recent_scores)
+                    comparative["performance_change"] = recent_avg - hist_avg
+                    comparative["performance_change_percentage"] = (recent_avg - hist_avg) / hist_avg * 100 if hist_avg != 0 else 0
+            
+            return comparative
         except Exception as e:
             self.logger.error(f"Error in comparative analysis for {username}: {e}")
             return {}
@@ -10,19 +10,12 @@ from typing import Optional
 sys.path.append(os.getcwd())
 
 from app.services.exam_service import ExamSession
-from app.questions import load_questions, get_random_questions_by_age
+from app.db import init as init_db
+from app.questions import get_question_count, sample_questions, warmup
+from app.exceptions import ResourceError
 from app.utils import compute_age_group
 from app.logger import setup_logging
 
-# Optional NLTK
-try:
-    import nltk
-    from nltk.sentiment import SentimentIntensityAnalyzer
-    SENTIMENT_AVAILABLE = True
-except ImportError:
-    SENTIMENT_AVAILABLE = False
-    SentimentIntensityAnalyzer = None
-
 # Simple logging config for CLI (avoid file spam if just testing)
 # But respect main logger if needed.
 logging.basicConfig(level=logging.ERROR) 
@@ -78,16 +71,6 @@ class SoulSenseCLI:
         from app.utils import load_settings, save_settings
         self.settings = load_settings()
         self.num_questions = self.settings.get("question_count", 10)
-        
-        # Download NLTK if needed (quietly)
-        if SENTIMENT_AVAILABLE:
-            try:
-                nltk.data.find('sentiment/vader_lexicon.zip')
-            except LookupError:
-                try:
-                    nltk.download('vader_lexicon', quiet=True)
-                except Exception:
-                    pass
 
     def clear_screen(self):
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -179,10 +162,11 @@ class SoulSenseCLI:
     def initialize_session(self):
         """Load questions and start session"""
         try:
-            all_questions = load_questions(age=self.age)
             # Use configured number of questions
-            num_q = min(self.num_questions, len(all_questions))
-            selected_questions = get_random_questions_by_age(all_questions, self.age, num_q)
+            num_q = min(self.num_questions, get_question_count(age=self.age))
+            if num_q == 0:
+                raise ResourceError("No questions found in database.")
+            selected_questions = sample_questions(self.age, num_q)
             
             self.session = ExamSession(self.username, self.age, self.age_group, selected_questions)
             self.session.start_exam()
@@ -286,24 +270,20 @@ class SoulSenseCLI:
     def get_historical_data(self):
         """Fetch user's previous scores for comparison"""
         try:
-            from app.db import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # Get last score (excluding current)
-            cursor.execute(
-                "SELECT total_score FROM scores WHERE username = ? ORDER BY timestamp DESC LIMIT 2",
-                (self.username,)
-            )
-            rows = cursor.fetchall()
-            last_score = rows[1][0] if len(rows) > 1 else None
-            
-            # Get age group average
-            cursor.execute(
-                "SELECT AVG(total_score) FROM scores WHERE detailed_age_group = ?",
-                (self.age_group,)
-            )
-            avg_row = cursor.fetchone()
+            from app.db import pooled_connection
+            from app.services.score_stats import get_score_stats
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get last score (excluding current) from rolling stats
+                last_score = get_score_stats(cursor, self.username)["previous_score"]
+                
+                # Get age group average
+                cursor.execute(
+                    "SELECT AVG(total_score) FROM scores WHERE detailed_age_group = ?",
+                    (self.age_group,)
+                )
+                avg_row = cursor.fetchone()
             age_avg = avg_row[0] if avg_row and avg_row[0] else None
             
             return last_score, age_avg
@@ -395,17 +375,16 @@ class SoulSenseCLI:
         print("="*60 + "\n")
         
         try:
-            from app.db import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """SELECT timestamp, total_score, sentiment_score, is_rushed, is_inconsistent 
-                   FROM scores WHERE username = ? 
-                   ORDER BY timestamp DESC LIMIT 10""",
-                (self.username,)
-            )
-            rows = cursor.fetchall()
+            from app.db import pooled_connection
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """SELECT timestamp, total_score, sentiment_score, is_rushed, is_inconsistent 
+                       FROM scores WHERE username = ? 
+                       ORDER BY timestamp DESC LIMIT 10""",
+                    (self.username,)
+                )
+                rows = cursor.fetchall()
             
             if not rows:
                 print("No exam history found. Take your first exam!")
@@ -469,48 +448,49 @@ class SoulSenseCLI:
         print("="*60 + "\n")
         
         try:
-            from app.db import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # Basic stats
-            cursor.execute("SELECT COUNT(*) FROM scores WHERE username = ?", (self.username,))
-            total = cursor.fetchone()[0] or 0
+            from app.db import pooled_connection
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Basic stats
+                cursor.execute("SELECT COUNT(*) FROM scores WHERE username = ?", (self.username,))
+                total = cursor.fetchone()[0] or 0
+                
+                if total > 0:
+                    cursor.execute("SELECT AVG(total_score) FROM scores WHERE username = ?", (self.username,))
+                    avg = cursor.fetchone()[0] or 0
+                    
+                    cursor.execute("SELECT MAX(total_score) FROM scores WHERE username = ?", (self.username,))
+                    best = cursor.fetchone()[0] or 0
+                    
+                    cursor.execute("SELECT MIN(total_score) FROM scores WHERE username = ?", (self.username,))
+                    worst = cursor.fetchone()[0] or 0
+                    
+                    # Consistency rate (non-rushed exams)
+                    cursor.execute("SELECT COUNT(*) FROM scores WHERE username = ? AND is_rushed = 0", (self.username,))
+                    consistent = cursor.fetchone()[0] or 0
+                    
+                    # First vs Last score (improvement)
+                    cursor.execute("SELECT total_score FROM scores WHERE username = ? ORDER BY timestamp ASC LIMIT 1", (self.username,))
+                    first_score = cursor.fetchone()
+                    
+                    cursor.execute("SELECT total_score FROM scores WHERE username = ? ORDER BY timestamp DESC LIMIT 1", (self.username,))
+                    last_score = cursor.fetchone()
+                    
+                    # Average sentiment
+                    cursor.execute("SELECT AVG(sentiment_score) FROM scores WHERE username = ?", (self.username,))
+                    avg_sentiment = cursor.fetchone()[0] or 0
             
             if total == 0:
                 print("No exam data yet. Take your first exam!")
                 self.get_input("\nPress Enter to continue...")
                 return
             
-            cursor.execute("SELECT AVG(total_score) FROM scores WHERE username = ?", (self.username,))
-            avg = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT MAX(total_score) FROM scores WHERE username = ?", (self.username,))
-            best = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT MIN(total_score) FROM scores WHERE username = ?", (self.username,))
-            worst = cursor.fetchone()[0] or 0
-            
-            # Consistency rate (non-rushed exams)
-            cursor.execute("SELECT COUNT(*) FROM scores WHERE username = ? AND is_rushed = 0", (self.username,))
-            consistent = cursor.fetchone()[0] or 0
             consistency_rate = (consistent / total * 100) if total > 0 else 0
-            
-            # First vs Last score (improvement)
-            cursor.execute("SELECT total_score FROM scores WHERE username = ? ORDER BY timestamp ASC LIMIT 1", (self.username,))
-            first_score = cursor.fetchone()
             first_score = first_score[0] if first_score else 0
-            
-            cursor.execute("SELECT total_score FROM scores WHERE username = ? ORDER BY timestamp DESC LIMIT 1", (self.username,))
-            last_score = cursor.fetchone()
             last_score = last_score[0] if last_score else 0
-            
             improvement = last_score - first_score
             
-            # Average sentiment
-            cursor.execute("SELECT AVG(sentiment_score) FROM scores WHERE username = ?", (self.username,))
-            avg_sentiment = cursor.fetchone()[0] or 0
-            
             # Display stats with colors
             print(colorize("📊 OVERVIEW", Colors.BOLD))
             print(f"   Total Exams:        {total}")
@@ -564,19 +544,18 @@ class SoulSenseCLI:
             return
             
         try:
-            from app.db import get_connection
+            from app.db import pooled_connection
             import json
             from datetime import datetime
             
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """SELECT timestamp, total_score, sentiment_score, reflection_text, is_rushed, is_inconsistent 
-                   FROM scores WHERE username = ? ORDER BY timestamp DESC""",
-                (self.username,)
-            )
-            rows = cursor.fetchall()
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """SELECT timestamp, total_score, sentiment_score, reflection_text, is_rushed, is_inconsistent 
+                       FROM scores WHERE username = ? ORDER BY timestamp DESC""",
+                    (self.username,)
+                )
+                rows = cursor.fetchall()
             
             if not rows:
                 print("No data to export.")
@@ -682,16 +661,15 @@ class SoulSenseCLI:
         print("="*60 + "\n")
         
         try:
-            from app.db import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """SELECT timestamp, total_score FROM scores 
-                   WHERE username = ? ORDER BY timestamp ASC LIMIT 20""",
-                (self.username,)
-            )
-            rows = cursor.fetchall()
+            from app.db import pooled_connection
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """SELECT timestamp, total_score FROM scores 
+                       WHERE username = ? ORDER BY timestamp ASC LIMIT 20""",
+                    (self.username,)
+                )
+                rows = cursor.fetchall()
             
             if not rows:
                 print("No data yet. Take some exams first!")
@@ -729,19 +707,18 @@ class SoulSenseCLI:
         print("="*60 + "\n")
         
         try:
-            from app.db import get_connection
+            from app.db import pooled_connection
             from datetime import datetime
             
-            conn = get_connection()
-            cursor = conn.cursor()
-            
             # Get all scores with timestamps
-            cursor.execute(
-                """SELECT timestamp, total_score FROM scores 
-                   WHERE username = ? ORDER BY timestamp DESC""",
-                (self.username,)
-            )
-            rows = cursor.fetchall()
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """SELECT timestamp, total_score FROM scores 
+                       WHERE username = ? ORDER BY timestamp DESC""",
+                    (self.username,)
+                )
+                rows = cursor.fetchall()
             
             if not rows:
                 print("No data yet.")
@@ -788,17 +765,17 @@ class SoulSenseCLI:
         print("="*60 + "\n")
         
         try:
-            from app.db import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
+            from app.db import pooled_connection
             
             # Get average score and sentiment
-            cursor.execute(
-                """SELECT AVG(total_score), AVG(sentiment_score), COUNT(*) 
-                   FROM scores WHERE username = ?""",
-                (self.username,)
-            )
-            row = cursor.fetchone()
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """SELECT AVG(total_score), AVG(sentiment_score), COUNT(*) 
+                       FROM scores WHERE username = ?""",
+                    (self.username,)
+                )
+                row = cursor.fetchone()
             
             if not row or row[2] == 0:
                 print("No data yet. Take some exams first!")
@@ -849,17 +826,17 @@ class SoulSenseCLI:
         print("="*60 + "\n")
         
         try:
-            from app.db import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
+            from app.db import pooled_connection
             
             # Get user data
-            cursor.execute(
-                """SELECT total_score, sentiment_score, is_rushed, is_inconsistent 
-                   FROM scores WHERE username = ? ORDER BY timestamp DESC LIMIT 5""",
-                (self.username,)
-            )
-            rows = cursor.fetchall()
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """SELECT total_score, sentiment_score, is_rushed, is_inconsistent 
+                       FROM scores WHERE username = ? ORDER BY timestamp DESC LIMIT 5""",
+                    (self.username,)
+                )
+                rows = cursor.fetchall()
             
             if not rows:
                 print("Not enough data for AI insights. Take some exams first!")
@@ -959,6 +936,10 @@ class SoulSenseCLI:
     def run(self):
         """Main execution flow with menu"""
         try:
+            init_db()
+            # Load the question bank while the user logs in
+            warmup(background=True)
+            
             # Initial authentication
             if not self.username:
                 self.authenticate()
@@ -11,7 +11,9 @@ CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
 DEFAULT_CONFIG = {
     "database": {
         "filename": "soulsense.db",
-        "path": "db"
+        "path": "db",
+        "pragma_profile": "balanced",  # balanced | read_heavy | write_heavy | low_memory
+        "pragmas": {}                  # Per-PRAGMA overrides on top of the profile
     },
     "ui": {
         "theme": "light",
@@ -63,6 +65,8 @@ _config = load_config()
 # Expose Settings
 DB_DIR_NAME = _config["database"]["path"]
 DB_FILENAME = _config["database"]["filename"]
+DB_PRAGMA_PROFILE = _config["database"]["pragma_profile"]
+DB_PRAGMA_OVERRIDES = _config["database"]["pragmas"]
 
 # Directory Definitions
 DATA_DIR = os.path.join(BASE_DIR, "data")
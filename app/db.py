@@ -1,32 +1,159 @@
 # app/db.py - SIMPLIFIED VERSION
 import os
+import queue
 import sqlite3
 import logging
+import threading
+import time
 from contextlib import contextmanager
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.config import DATABASE_URL, DB_PATH
+from app.config import DATABASE_URL, DB_PATH, DB_PRAGMA_PROFILE, DB_PRAGMA_OVERRIDES
 from app.exceptions import DatabaseError
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# ==================== SQLITE PRAGMA PROFILES ====================
+
+# Applied to every new connection (SQLAlchemy engine and raw pool).
+# Order matters: journal_mode must be set before synchronous.
+PRAGMA_PROFILES = {
+    # Previous before_create defaults
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -2000,        # 2MB page cache
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,     # 256MB memory map
+        "busy_timeout": 5000,
+    },
+    # Dashboards/analytics: bigger cache and mmap for scans
+    "read_heavy": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,       # 16MB page cache
+        "temp_store": "MEMORY",
+        "mmap_size": 536870912,     # 512MB memory map
+        "busy_timeout": 5000,
+    },
+    # Many concurrent exam writers: fewer checkpoints, longer lock waits
+    "write_heavy": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -8000,        # 8MB page cache
+        "temp_store": "MEMORY",
+        "mmap_size": 134217728,     # 128MB memory map
+        "wal_autocheckpoint": 4000, # Pages between automatic checkpoints
+        "busy_timeout": 15000,
+    },
+    # Constrained devices: small cache, no mmap, temp tables on disk
+    "low_memory": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -500,         # 500KB page cache
+        "temp_store": "FILE",
+        "mmap_size": 0,
+        "busy_timeout": 5000,
+    },
+}
+
+DEFAULT_PRAGMA_PROFILE = "balanced"
+
+def get_pragma_settings(profile=None, overrides=None):
+    """
+    Resolve the PRAGMA settings for a profile name plus overrides.
+    Falls back to the default profile if the name is unknown.
+    """
+    profile = profile or DB_PRAGMA_PROFILE
+    if profile not in PRAGMA_PROFILES:
+        logger.warning(f"Unknown PRAGMA profile '{profile}', using '{DEFAULT_PRAGMA_PROFILE}'")
+        profile = DEFAULT_PRAGMA_PROFILE
+
+    settings = dict(PRAGMA_PROFILES[profile])
+    settings.update(DB_PRAGMA_OVERRIDES if overrides is None else overrides)
+    return settings
+
+def apply_sqlite_pragmas(dbapi_connection, settings=None):
+    """Apply PRAGMA settings to a raw DB-API sqlite connection"""
+    settings = settings or get_pragma_settings()
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in settings.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+def read_effective_pragmas(dbapi_connection, names=None):
+    """Read back the current value of each PRAGMA on a connection"""
+    names = names or get_pragma_settings().keys()
+    cursor = dbapi_connection.cursor()
+    try:
+        effective = {}
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            effective[name] = row[0] if row else None
+        return effective
+    finally:
+        cursor.close()
+
 # Create engine and session
 engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(engine, "connect")
+def _on_engine_connect(dbapi_connection, connection_record):
+    """Apply the configured PRAGMA profile to every new pooled connection"""
+    apply_sqlite_pragmas(dbapi_connection)
+
+_PRAGMA_ENUMS = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+def _pragma_equivalent(name, expected, actual):
+    """SQLite reports enum PRAGMAs as integers; compare them by value"""
+    mapping = _PRAGMA_ENUMS.get(name)
+    if mapping and isinstance(expected, str):
+        return mapping.get(expected.upper()) == actual
+    return False
+
+def log_effective_pragmas(target_engine=None):
+    """
+    Startup self-check: log the PRAGMA values a fresh engine connection
+    actually runs with, and warn where they differ from the profile.
+    """
+    target_engine = target_engine or engine
+    expected = get_pragma_settings()
+    try:
+        with target_engine.connect() as conn:
+            effective = read_effective_pragmas(conn.connection.dbapi_connection, expected.keys())
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not read effective PRAGMAs: {e}")
+        return {}
+
+    logger.info(f"SQLite PRAGMA profile '{DB_PRAGMA_PROFILE}': {effective}")
+    for name, value in expected.items():
+        actual = effective.get(name)
+        if str(actual).lower() != str(value).lower() and not _pragma_equivalent(name, value, actual):
+            logger.warning(f"PRAGMA {name} expected {value}, effective {actual}")
+    return effective
+
 def get_engine():
     return engine
 
 def get_session() -> Session:
     """Get a new database session"""
+    init()
     return SessionLocal()
 
 @contextmanager
 def safe_db_context():
     """Context manager for safe database operations"""
+    init()
     session = SessionLocal()
     try:
         yield session
@@ -42,11 +169,52 @@ def safe_db_context():
     finally:
         session.close()
 
-def check_db_state():
-    """Check and create database tables if needed"""
+# ==================== INITIALIZATION ====================
+# Importing this module does no I/O. The schema check runs once per
+# process, either explicitly via init() at application startup or lazily
+# on the first get_session()/safe_db_context()/pooled_connection() call.
+_initialized = False
+_init_lock = threading.Lock()
+
+def init(force=False):
+    """Create/verify the database schema once per process"""
+    global _initialized
+    if _initialized and not force:
+        return True
+    with _init_lock:
+        if _initialized and not force:
+            return True
+        result = check_db_state(force=force)
+        _initialized = True
+    return result
+
+def is_initialized():
+    return _initialized
+
+# Stored in PRAGMA user_version once check_db_state has brought a database
+# up to date. Bump it whenever the models, ADDITIVE_COLUMNS, the triggers or
+# the derived-store backfills change, so existing databases re-run the check.
+SCHEMA_VERSION = 2  # 2: journal rollup non-zero counts
+
+def _schema_version():
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
+
+def check_db_state(force=False):
+    """
+    Check and create database tables if needed.
+    A database already stamped with SCHEMA_VERSION skips the check and the
+    backfills; force=True (init(force=True)) runs them anyway, which also
+    catches derived stores up with rows written outside the app.
+    """
     logger.info("Checking database state...")
     
     try:
+        if not force and _schema_version() == SCHEMA_VERSION:
+            logger.info(f"Database schema is current (version {SCHEMA_VERSION}).")
+            log_effective_pragmas()
+            return True
+        
         # Import models after everything is set up
         from app.models import Base
         
@@ -57,13 +225,30 @@ def check_db_state():
         # Check for existing data
         inspector = inspect(engine)
         tables = inspector.get_table_names()
+        ensure_additive_columns(inspector)
         
         if "scores" in tables:
             with engine.connect() as conn:
                 result = conn.execute(text("SELECT COUNT(*) FROM scores"))
                 count = result.scalar()
                 logger.info(f"Found {count} scores in database")
+            # Backfill the activity summary and journal rollup before new rows land in them,
+            # and catch score stats up with scores written outside finish_exam
+            from app.services.activity_summary import ensure_activity_summary
+            from app.services.journal_rollup import ensure_journal_rollup
+            from app.services.score_stats import refresh_score_stats
+            raw = engine.raw_connection()
+            try:
+                ensure_activity_summary(raw.cursor())
+                ensure_journal_rollup(raw.cursor())
+                refresh_score_stats(raw.cursor())
+                raw.commit()
+            finally:
+                raw.close()
         
+        with engine.begin() as conn:
+            conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+        log_effective_pragmas()
         return True
         
     except ImportError as e:
@@ -76,6 +261,40 @@ def check_db_state():
         create_tables_directly()
         return True
 
+# Nullable columns added to existing tables after release. create_all()
+# never alters tables that already exist, so older databases get them here.
+# Each entry has a matching Alembic revision.
+ADDITIVE_COLUMNS = [
+    # (table, column, column DDL, index DDL)
+    ("responses", "score_id", "INTEGER REFERENCES scores(id)",
+     "CREATE INDEX IF NOT EXISTS ix_responses_score_id ON responses (score_id)"),
+    ("scores", "is_outlier", "BOOLEAN", None),
+    ("scores", "outlier_zscore", "FLOAT", None),
+    ("scores", "is_inconsistent_transition", "BOOLEAN", None),
+    ("journal_daily_rollup", "sleep_hours_nonzero", "INTEGER", None),
+    ("journal_daily_rollup", "sleep_quality_nonzero", "INTEGER", None),
+    ("journal_daily_rollup", "energy_level_nonzero", "INTEGER", None),
+    ("journal_daily_rollup", "work_hours_nonzero", "INTEGER", None),
+    ("journal_daily_rollup", "screen_time_mins_nonzero", "INTEGER", None),
+    ("journal_daily_rollup", "stress_level_nonzero", "INTEGER", None),
+    ("journal_daily_rollup", "sentiment_score_nonzero", "INTEGER", None),
+]
+
+def ensure_additive_columns(inspector=None):
+    """Add any missing ADDITIVE_COLUMNS to existing tables"""
+    inspector = inspector or inspect(engine)
+    tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table, column, column_ddl, index_ddl in ADDITIVE_COLUMNS:
+            if table not in tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                logger.info(f"Adding missing column {table}.{column}")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_ddl}"))
+            if index_ddl:
+                conn.execute(text(index_ddl))
+
 def create_tables_directly():
     """Create tables using direct SQLite"""
     try:
@@ -93,6 +312,9 @@ def create_tables_directly():
                 reflection_text TEXT,
                 is_rushed BOOLEAN DEFAULT 0,
                 is_inconsistent BOOLEAN DEFAULT 0,
+                is_outlier BOOLEAN,
+                outlier_zscore REAL,
+                is_inconsistent_transition BOOLEAN,
                 timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                 detailed_age_group TEXT,
                 user_id INTEGER
@@ -130,17 +352,184 @@ def create_tables_directly():
         logger.error(f"Failed to create tables: {e}")
         raise DatabaseError("Failed to initialize database", original_exception=e)
 
-# Initialize database
-check_db_state()
-
 # Backward compatibility
 def get_connection(db_path=None):
+    """
+    Open a new, unpooled raw sqlite3 connection.
+    The caller owns the connection and must close it.
+    Prefer pooled_connection() for application code.
+    """
+    if db_path is None:
+        init()
     try:
         return sqlite3.connect(db_path or DB_PATH)
     except sqlite3.Error as e:
         logger.error(f"Failed to connect to raw database: {e}", exc_info=True)
         raise DatabaseError("Failed to connect to raw database.", original_exception=e)
 
+# ==================== RAW CONNECTION POOL ====================
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of raw sqlite3 connections.
+
+    At most ``max_size`` connections are checked out at once; callers
+    beyond that block for up to ``timeout`` seconds. Idle connections are
+    reused (most recently returned first) so the PRAGMA profile runs once
+    per connection instead of once per query.
+    """
+
+    def __init__(self, db_path=None, max_size=5, timeout=30.0, factory=None):
+        self.db_path = db_path or DB_PATH
+        self.max_size = max_size
+        self.timeout = timeout
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "created": 0,
+            "checked_out": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+        }
+
+    def _create(self):
+        """Open and configure a new connection"""
+        if self._factory is not None:
+            conn = self._factory()
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        apply_sqlite_pragmas(conn)
+        with self._lock:
+            self._stats["created"] += 1
+        return conn
+
+    def acquire(self):
+        """Check out a connection, blocking while the pool is exhausted"""
+        if self._closed:
+            raise DatabaseError("Connection pool is closed.")
+
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise DatabaseError(f"Timed out waiting for a database connection after {self.timeout}s.")
+        waited = time.perf_counter() - start
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = self._create()
+            except Exception:
+                self._slots.release()
+                raise
+
+        with self._lock:
+            self._stats["checked_out"] += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_time"] += waited
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool (or close it if discarded)"""
+        try:
+            if not discard and not self._closed:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                except (sqlite3.Error, AttributeError):
+                    discard = True
+            if discard or self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+        finally:
+            with self._lock:
+                self._stats["checked_out"] -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success, rollback on error"""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            discard = True
+            raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def stats(self):
+        """Snapshot of pool usage counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["idle"] = self._idle.qsize()
+        snapshot["max_size"] = self.max_size
+        snapshot["avg_wait_time"] = (
+            snapshot["wait_time"] / snapshot["checkouts"] if snapshot["checkouts"] else 0.0
+        )
+        return snapshot
+
+    def close_all(self):
+        """Close idle connections and refuse further checkouts"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing pooled connection: {e}")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    init()
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+@contextmanager
+def pooled_connection():
+    """
+    Context manager for raw SQL against the application database.
+
+    Usage:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT ...")
+    """
+    try:
+        with get_pool().connection() as conn:
+            yield conn
+    except sqlite3.Error as e:
+        logger.error(f"Raw database error: {e}", exc_info=True)
+        raise DatabaseError("A database error occurred.", original_exception=e)
+
+def get_pool_stats():
+    """Return usage statistics for the raw connection pool"""
+    return get_pool().stats()
+
 def get_user_settings(user_id):
     """
     Fetch settings for a user.
@@ -4,16 +4,23 @@ from tkinter import messagebox, ttk
 import logging
 from app.ui.sidebar import SidebarNav
 from app.ui.styles import UIStyles
-from app.ui.dashboard import AnalyticsDashboard
-from app.ui.journal import JournalFeature
-from app.ui.profile import UserProfileView
-from app.ui.exam import ExamManager
+from app.ui.view_registry import ViewRegistry
 from app.auth import AuthManager
 from app.i18n_manager import get_i18n
-from app.i18n_manager import get_i18n
-from app.questions import load_questions
+from app.db import init as init_db
+from app.questions import load_questions, warmup
 from app.ui.assessments import AssessmentHub
 
+# Sidebar views are imported and built on first navigation.
+# view_id -> (module, class, keep built frame for re-entry)
+LAZY_VIEWS = {
+    "dashboard": ("app.ui.dashboard", "AnalyticsDashboard", True),
+    "journal": ("app.ui.journal", "JournalFeature", True),
+    "profile": ("app.ui.profile", "UserProfileView", True),
+    "history": ("app.ui.results", "ResultsManager", True),
+    "exam": ("app.ui.exam", "ExamManager", False),  # Fresh attempt every time
+}
+
 class SoulSenseApp:
     def __init__(self, root):
         self.root = root
@@ -47,12 +54,8 @@ class SoulSenseApp:
         self.auth = AuthManager()
         self.settings = {} 
         
-        # Load Questions
-        try:
-            self.questions = load_questions()
-        except Exception as e:
-            self.logger.error(f"Failed to load questions: {e}")
-            messagebox.showerror("Error", f"Could not load questions: {e}")
+        # Load the question bank while the login screen is up
+        warmup(background=True)
         
         # --- UI Layout ---
         self.main_container = tk.Frame(self.root, bg=self.colors["bg"])
@@ -74,6 +77,10 @@ class SoulSenseApp:
         self.content_area = tk.Frame(self.main_container, bg=self.colors["bg"])
         self.content_area.pack(side="right", fill="both", expand=True)
         
+        self.views = ViewRegistry(self.content_area, bg=self.colors["bg"])
+        for view_id, (module_path, attr, cacheable) in LAZY_VIEWS.items():
+            self.views.register(view_id, module_path, attr, cacheable=cacheable)
+        
         # Initialize Features
         self.exam_manager = None 
         
@@ -185,6 +192,16 @@ class SoulSenseApp:
 
     def _post_login_init(self):
         """Initialize UI after login"""
+        # Views built for a previous user must not be reused
+        self.views.invalidate()
+        
+        # Load Questions
+        try:
+            self.questions = load_questions()
+        except Exception as e:
+            self.logger.error(f"Failed to load questions: {e}")
+            messagebox.showerror("Error", f"Could not load questions: {e}")
+        
         if hasattr(self, 'sidebar'):
             self.sidebar.update_user_info()
             self.sidebar.pack(side="left", fill="y")
@@ -203,6 +220,10 @@ class SoulSenseApp:
         self.main_container.configure(bg=self.colors["bg"])
         self.content_area.configure(bg=self.colors["bg"])
         
+        # Cached views were built with the old colors
+        self.views.bg = self.colors["bg"]
+        self.views.invalidate()
+        
         # Update Sidebar
         if hasattr(self, 'sidebar'):
             self.sidebar.update_theme()
@@ -254,7 +275,6 @@ class SoulSenseApp:
 
     def show_history(self):
         """Show User History (Embedded)"""
-        from app.ui.results import ResultsManager
         # We need to make sure ResultsManager renders into content_area
         # Ideally, we pass content_area as root or a parent
         # But ResultsManager expects 'app'
@@ -277,14 +297,24 @@ class SoulSenseApp:
             def __getattr__(self, name):
                 return getattr(self.real_app, name)
 
+        def build(parent):
+            ResultsManager = self.views.load_class("history")
+            rm = ResultsManager(ContentProxy(self, parent))
+            rm.display_user_history(self.username)
+
         self.clear_screen()
-        proxy = ContentProxy(self, self.content_area)
-        rm = ResultsManager(proxy)
-        rm.display_user_history(self.username)
+        self.views.show("history", build)
 
     def clear_screen(self):
+        """Hide cached views and destroy everything else in the content area"""
+        self.views.hide_all()
         for widget in self.content_area.winfo_children():
-            widget.destroy()
+            if not self.views.owns(widget):
+                widget.destroy()
+
+    def invalidate_views(self, *view_ids):
+        """Rebuild these views (all if none given) on next navigation"""
+        self.views.invalidate(*view_ids)
 
     def show_assessments(self):
         """Show Assessment Selection Hub"""
@@ -296,8 +326,7 @@ class SoulSenseApp:
         # --- WEB-STYLE HERO DASHBOARD ---
         
         # Clear previous
-        for widget in self.content_area.winfo_children():
-            widget.destroy()
+        self.clear_screen()
             
         # Main Scrollable Container (Optional, but good for web feel)
         # For now, simple pack is cleaner for fixed size
@@ -386,15 +415,20 @@ class SoulSenseApp:
                 if name == "root": return self.app.content_area
                 return getattr(self.app, name)
 
+        ExamManager = self.views.load_class("exam")
         self.exam_manager = ExamManager(AppProxy(self))
         self.exam_manager.start_test()
 
     def show_dashboard(self):
         # Open Dashboard (Embedded)
         try:
+            def build(parent):
+                AnalyticsDashboard = self.views.load_class("dashboard")
+                dashboard = AnalyticsDashboard(parent, self.username, theme="dark", colors=self.colors)
+                dashboard.render_dashboard()
+
             self.clear_screen()
-            dashboard = AnalyticsDashboard(self.content_area, self.username, theme="dark", colors=self.colors)
-            dashboard.render_dashboard()
+            self.views.show("dashboard", build)
         except Exception as e:
             self.logger.error(f"Dashboard error: {e}")
             messagebox.showerror("Error", f"Failed to open dashboard: {e}")
@@ -404,16 +438,19 @@ class SoulSenseApp:
         # New embedded mode:
         self.clear_screen()
         try:
-            journal_feature = JournalFeature(self.root, app=self)
-            journal_feature.render_journal_view(self.content_area, self.username or "Guest")
+            def build(parent):
+                JournalFeature = self.views.load_class("journal")
+                journal_feature = JournalFeature(self.root, app=self)
+                journal_feature.render_journal_view(parent, self.username or "Guest")
+
+            self.views.show("journal", build)
         except Exception as e:
             self.logger.error(f"Journal error: {e}")
             messagebox.showerror("Error", f"Failed to open journal: {e}")
 
     def show_profile(self):
-        from app.ui.profile import UserProfileView
         # Render Profile into content_area
-        UserProfileView(self.content_area, self)
+        self.views.show("profile", lambda parent: self.views.load_class("profile")(parent, self))
 
 # --- Global Error Handlers ---
 
@@ -439,6 +476,7 @@ def global_exception_handler(self, exc_type, exc_value, traceback_obj):
 
 if __name__ == "__main__":
     try:
+        init_db()
         root = tk.Tk()
         app = SoulSenseApp(root)
         root.mainloop()
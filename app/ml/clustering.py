@@ -1,14 +1,20 @@
 import numpy as np
 import pandas as pd
+import hashlib
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import json
 import pickle
 
 # ML imports
-from sklearn.cluster import KMeans, DBSCAN, AgglomerativeClustering
+from sklearn.cluster import KMeans, MiniBatchKMeans, DBSCAN, AgglomerativeClustering
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.decomposition import PCA
 from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
@@ -23,11 +29,27 @@ except ImportError:
     MATPLOTLIB_AVAILABLE = False
 
 # Database imports
-from app.db import get_session, safe_db_context
+from sqlalchemy import text
+from app.db import get_session, safe_db_context, pooled_connection
 from app.models import Score, Response, User
+from app.services.feature_store import (
+    ACCUMULATOR_COLUMNS, FEATURE_STORE_VERSION,
+    update_user_features, refresh_stale_features, rebuild_feature_store
+)
 
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_SIZE = 1000        # Users per feature chunk in streaming mode
+SILHOUETTE_SAMPLE_SIZE = 2000   # Points used to estimate silhouette on large data
+SQL_IN_CHUNK = 500              # Usernames per IN (...) clause (SQLite variable limit)
+K_SELECTION_WORKERS = min(4, os.cpu_count() or 1)
+PARALLEL_K_SELECTION_MIN_ROWS = 2000  # Below this, process start-up costs more than it saves
+K_SELECTION_CACHE_SIZE = 32
+
+# k-selection and metric results keyed by a hash of the feature matrix
+_k_selection_cache: "OrderedDict[str, Any]" = OrderedDict()
+_k_selection_cache_lock = threading.Lock()
+
 
 # ==============================================================================
 # EMOTIONAL PROFILE DEFINITIONS
@@ -130,70 +152,237 @@ class EmotionalFeatureExtractor:
         ]
     
     def extract_user_features(self, username: str) -> Optional[Dict[str, float]]:
-        """Extract emotional features for a single user."""
-        try:
-            with safe_db_context() as session:
-                # Get all scores for the user
-                scores = session.query(Score).filter_by(username=username).order_by(Score.timestamp).all()
-                
-                if not scores or len(scores) < 1:
-                    return None
-                
-                # Get all responses for the user
-                responses = session.query(Response).filter_by(username=username).all()
-                
-                # Extract score-based features
-                score_values = [s.total_score for s in scores if s.total_score is not None]
-                sentiment_values = [s.sentiment_score for s in scores if s.sentiment_score is not None]
-                
-                if not score_values:
-                    return None
-                
-                features = {
-                    'username': username,
-                    'avg_total_score': np.mean(score_values),
-                    'score_std': np.std(score_values) if len(score_values) > 1 else 0,
-                    'avg_sentiment': np.mean(sentiment_values) if sentiment_values else 0,
-                    'sentiment_std': np.std(sentiment_values) if len(sentiment_values) > 1 else 0,
-                    'score_trend': self._calculate_trend(score_values),
-                    'response_consistency': self._calculate_consistency(responses),
-                    'emotional_range': max(score_values) - min(score_values) if len(score_values) > 1 else 0,
-                    'assessment_frequency': len(scores),
-                    'avg_response_value': self._avg_response_value(responses),
-                    'response_variance': self._response_variance(responses)
-                }
-                
-                return features
-                
-        except Exception as e:
-            logger.error(f"Error extracting features for {username}: {e}")
+        """Extract emotional features for a single user (feature store first, read-only)."""
+        df = self.load_stored_features(username=username)
+        if df.empty:
+            df = self.extract_features_frame(username=username)
+        if df.empty:
             return None
+        return df.iloc[0].to_dict()
     
     def extract_all_users_features(self) -> pd.DataFrame:
         """Extract features for all users in the database."""
-        features_list = []
-        
+        df = self.extract_features_frame()
+        if not df.empty:
+            logger.info(f"Extracted features for {len(df)} users")
+        return df
+    
+    def load_stored_features(self, username: Optional[str] = None, refresh: bool = False,
+                             usernames: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Features from the user_feature_store accumulators, for everyone, one
+        username or a list of usernames. Read-only by default; with refresh,
+        stale users (new rows past their watermark) are caught up
+        incrementally first, which writes to the store (fit does this).
+        """
+        query = (f"SELECT username, {', '.join(ACCUMULATOR_COLUMNS)} FROM user_feature_store "
+                 "WHERE version = ? AND total_n > 0")
+        if username:
+            usernames = [username]
         try:
-            with safe_db_context() as session:
-                # Get all unique usernames
-                usernames = session.query(Score.username).distinct().all()
-                usernames = [u[0] for u in usernames if u[0]]
-                
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                if refresh:
+                    if username:
+                        update_user_features(cursor, username)
+                    else:
+                        refresh_stale_features(cursor)
+                if usernames is None:
+                    cursor.execute(query + " ORDER BY username", (FEATURE_STORE_VERSION,))
+                    rows = cursor.fetchall()
+                else:
+                    rows = []
+                    for i in range(0, len(usernames), SQL_IN_CHUNK):
+                        chunk = list(usernames[i:i + SQL_IN_CHUNK])
+                        cursor.execute(
+                            query + f" AND username IN ({', '.join('?' for _ in chunk)}) ORDER BY username",
+                            [FEATURE_STORE_VERSION] + chunk
+                        )
+                        rows.extend(cursor.fetchall())
         except Exception as e:
-            logger.error(f"Error getting usernames: {e}")
+            logger.error(f"Error reading feature store: {e}")
             return pd.DataFrame()
         
-        for username in usernames:
-            features = self.extract_user_features(username)
-            if features:
-                features_list.append(features)
+        if not rows:
+            return pd.DataFrame()
+        return self._features_from_accumulators(rows)
+    
+    def iter_stored_features(self, chunk_size: int = STREAM_CHUNK_SIZE,
+                             refresh: bool = False) -> Iterator[pd.DataFrame]:
+        """Yield stored features in username order, chunk_size users at a time."""
+        if refresh:
+            with pooled_connection() as conn:
+                refresh_stale_features(conn.cursor())
+        
+        query = (f"SELECT username, {', '.join(ACCUMULATOR_COLUMNS)} FROM user_feature_store "
+                 "WHERE version = ? AND total_n > 0 AND username > ? ORDER BY username LIMIT ?")
+        last_username = ""
+        while True:
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (FEATURE_STORE_VERSION, last_username, chunk_size))
+                rows = cursor.fetchall()
+            if not rows:
+                return
+            last_username = rows[-1][0]
+            yield self._features_from_accumulators(rows)
+    
+    def _features_from_accumulators(self, rows) -> pd.DataFrame:
+        """Turn stored running sums into the feature columns, vectorized over users."""
+        acc = pd.DataFrame(rows, columns=['username'] + ACCUMULATOR_COLUMNS)
+        n = acc['total_n'].to_numpy(dtype=float)
+        mean = acc['total_sum'].to_numpy(dtype=float) / n
+        var = np.maximum(acc['total_sumsq'].to_numpy(dtype=float) / n - mean ** 2, 0.0)
+        # Sums of squares leave rounding noise where the true variance is 0
+        var = np.where(var <= 1e-9 * np.maximum(mean ** 2, 1.0), 0.0, var)
+        
+        x_mean = (n - 1) / 2.0
+        x_var = (n ** 2 - 1) / 12.0
+        cov = acc['total_xy'].to_numpy(dtype=float) / n - x_mean * mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            trend = np.clip(cov / np.sqrt(x_var * var), -1.0, 1.0)
+        trend = np.where((n > 1) & (var > 0) & np.isfinite(trend), trend, 0.0)
+        
+        s_n = acc['sentiment_n'].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s_mean = acc['sentiment_sum'].to_numpy(dtype=float) / s_n
+            s_var = np.maximum(acc['sentiment_sumsq'].to_numpy(dtype=float) / s_n - s_mean ** 2, 0.0)
+            r_n = acc['response_n'].to_numpy(dtype=float)
+            r_mean = acc['response_sum'].to_numpy(dtype=float) / r_n
+            r_var = np.maximum(acc['response_sumsq'].to_numpy(dtype=float) / r_n - r_mean ** 2, 0.0)
+        r_count = acc['response_count'].to_numpy()
+        
+        max_variance = 4.0  # Max variance for 1-5 scale
+        return pd.DataFrame({
+            'username': acc['username'],
+            'avg_total_score': mean,
+            'score_std': np.where(n > 1, np.sqrt(var), 0.0),
+            'avg_sentiment': np.where(s_n > 0, s_mean, 0.0),
+            'sentiment_std': np.where(s_n > 1, np.sqrt(s_var), 0.0),
+            'score_trend': trend,
+            'response_consistency': np.where(
+                r_count == 0, 0.0,
+                np.where(r_n < 2, 1.0, np.clip(1 - r_var / max_variance, 0, 1))
+            ),
+            'emotional_range': np.where(n > 1, acc['total_max'].to_numpy(dtype=float)
+                                        - acc['total_min'].to_numpy(dtype=float), 0.0),
+            'assessment_frequency': acc['score_count'].to_numpy(),
+            'avg_response_value': np.where(r_n > 0, r_mean, 2.5),
+            'response_variance': np.where(r_n > 1, r_var, 0.0)
+        })
+    
+    def extract_features_frame(self, username: Optional[str] = None) -> pd.DataFrame:
+        """
+        Features for every user (or one user) from two projection queries.
         
-        if not features_list:
+        Scores and responses are read once as plain columns and reduced per
+        user with NumPy group-by operations, instead of two ORM queries per user.
+        """
+        user_filter = "AND username = :username" if username else ""
+        params = {"username": username} if username else {}
+        try:
+            with safe_db_context() as session:
+                score_rows = session.execute(text(
+                    "SELECT username, total_score, sentiment_score FROM scores "
+                    f"WHERE username IS NOT NULL AND username != '' {user_filter} "
+                    "ORDER BY username, timestamp, id"
+                ), params).fetchall()
+                if not score_rows:
+                    return pd.DataFrame()
+                response_rows = session.execute(text(
+                    "SELECT username, response_value FROM responses "
+                    f"WHERE username IS NOT NULL {user_filter}"
+                ), params).fetchall()
+        except Exception as e:
+            logger.error(f"Error extracting features: {e}")
             return pd.DataFrame()
         
-        df = pd.DataFrame(features_list)
-        logger.info(f"Extracted features for {len(df)} users")
-        return df
+        return self._features_from_rows(score_rows, response_rows)
+    
+    def _features_from_rows(self, score_rows, response_rows) -> pd.DataFrame:
+        """Vectorized feature computation over (username, total, sentiment) and (username, value) rows."""
+        names = np.array([r[0] for r in score_rows], dtype=object)
+        totals = np.array([np.nan if r[1] is None else r[1] for r in score_rows], dtype=float)
+        sentiments = np.array([np.nan if r[2] is None else r[2] for r in score_rows], dtype=float)
+        
+        users, inv = np.unique(names, return_inverse=True)
+        n_users = len(users)
+        # Stable sort keeps each user's rows in timestamp order, as the feature store folds them
+        order = np.argsort(inv, kind="stable")
+        inv, totals, sentiments = inv[order], totals[order], sentiments[order]
+        
+        frequency = np.bincount(inv, minlength=n_users)
+        
+        # Score statistics over non-null totals
+        valid = ~np.isnan(totals)
+        g, v = inv[valid], totals[valid]
+        n = np.bincount(g, minlength=n_users)
+        mean, var = _group_mean_var(g, v, n)
+        score_std = np.where(n > 1, np.sqrt(var), 0.0)
+        
+        high = np.full(n_users, -np.inf)
+        low = np.full(n_users, np.inf)
+        np.maximum.at(high, g, v)
+        np.minimum.at(low, g, v)
+        emotional_range = np.where(n > 1, high - low, 0.0)
+        
+        # Trend: correlation of each score with its position in the user's history
+        start = np.cumsum(n) - n
+        x = np.arange(len(g), dtype=float) - start[g]
+        x_mean = (n - 1) / 2.0
+        x_var = (n.astype(float) ** 2 - 1) / 12.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = np.bincount(g, weights=(x - x_mean[g]) * (v - mean[g]), minlength=n_users) / n
+            trend = cov / np.sqrt(x_var * var)
+        trend = np.where((n > 1) & (var > 0) & np.isfinite(trend), trend, 0.0)
+        
+        s_valid = ~np.isnan(sentiments)
+        s_g = inv[s_valid]
+        s_n = np.bincount(s_g, minlength=n_users)
+        s_mean, s_var = _group_mean_var(s_g, sentiments[s_valid], s_n)
+        avg_sentiment = np.where(s_n > 0, s_mean, 0.0)
+        sentiment_std = np.where(s_n > 1, np.sqrt(s_var), 0.0)
+        
+        # Response statistics, matched to the score users
+        r_count = np.zeros(n_users, dtype=int)
+        r_n = np.zeros(n_users, dtype=int)
+        r_mean = np.zeros(n_users)
+        r_var = np.zeros(n_users)
+        if response_rows:
+            r_names = np.array([r[0] for r in response_rows], dtype=object)
+            r_values = np.array([np.nan if r[1] is None else r[1] for r in response_rows], dtype=float)
+            pos = np.clip(np.searchsorted(users, r_names), 0, n_users - 1)
+            known = users[pos] == r_names
+            pos, r_values = pos[known], r_values[known]
+            r_count = np.bincount(pos, minlength=n_users)
+            r_valid = ~np.isnan(r_values)
+            r_g = pos[r_valid]
+            r_n = np.bincount(r_g, minlength=n_users)
+            r_mean, r_var = _group_mean_var(r_g, r_values[r_valid], r_n)
+        
+        max_variance = 4.0  # Max variance for 1-5 scale
+        consistency = np.where(
+            r_count == 0, 0.0,
+            np.where(r_n < 2, 1.0, np.clip(1 - r_var / max_variance, 0, 1))
+        )
+        avg_response_value = np.where(r_n > 0, r_mean, 2.5)
+        response_variance = np.where(r_n > 1, r_var, 0.0)
+        
+        keep = n > 0
+        df = pd.DataFrame({
+            'username': users[keep],
+            'avg_total_score': mean[keep],
+            'score_std': score_std[keep],
+            'avg_sentiment': avg_sentiment[keep],
+            'sentiment_std': sentiment_std[keep],
+            'score_trend': trend[keep],
+            'response_consistency': consistency[keep],
+            'emotional_range': emotional_range[keep],
+            'assessment_frequency': frequency[keep],
+            'avg_response_value': avg_response_value[keep],
+            'response_variance': response_variance[keep]
+        })
+        return df.reset_index(drop=True)
     
     def _calculate_trend(self, scores: List[float]) -> float:
         """Calculate score trend (positive = improving, negative = declining)."""
@@ -240,6 +429,108 @@ class EmotionalFeatureExtractor:
         return np.var(values) if len(values) > 1 else 0.0
 
 
+# ==============================================================================
+# K-SELECTION HELPERS
+# ==============================================================================
+
+def _sampled_silhouette(X: np.ndarray, labels: np.ndarray, random_state: int) -> float:
+    sample_size = SILHOUETTE_SAMPLE_SIZE if len(X) > SILHOUETTE_SAMPLE_SIZE else None
+    return silhouette_score(X, labels, sample_size=sample_size, random_state=random_state)
+
+
+def _score_k(X: np.ndarray, k: int, random_state: int) -> float:
+    """Silhouette of a K-Means fit with k clusters (-1 if undefined)."""
+    labels = KMeans(n_clusters=k, random_state=random_state, n_init=10).fit_predict(X)
+    try:
+        return float(_sampled_silhouette(X, labels, random_state))
+    except ValueError:
+        return -1.0  # Invalid for single cluster
+
+
+def _score_k_from_file(path: str, k: int, random_state: int) -> float:
+    """Process-pool entry point: score k on the memory-mapped feature matrix."""
+    return _score_k(np.load(path, mmap_mode='r'), k, random_state)
+
+
+def _score_k_range_parallel(X: np.ndarray, k_range: range, random_state: int) -> List[float]:
+    """
+    Score every candidate k across a process pool. Workers share one
+    read-only memory-mapped copy of X; each fit uses the same seed as the
+    serial path, so results are identical.
+    """
+    fd, path = tempfile.mkstemp(suffix='.npy', prefix='soulsense_features_')
+    os.close(fd)
+    try:
+        np.save(path, np.ascontiguousarray(X))
+        with ProcessPoolExecutor(max_workers=min(K_SELECTION_WORKERS, len(k_range))) as pool:
+            return list(pool.map(_score_k_from_file, [path] * len(k_range), k_range,
+                                 [random_state] * len(k_range)))
+    finally:
+        os.remove(path)
+
+
+def _matrix_key(kind: str, X: np.ndarray, *extra) -> str:
+    digest = hashlib.sha1(kind.encode())
+    digest.update(str((X.shape, str(X.dtype))).encode())
+    digest.update(np.ascontiguousarray(X).tobytes())
+    for item in extra:
+        digest.update(np.ascontiguousarray(item).tobytes() if isinstance(item, np.ndarray) else repr(item).encode())
+    return digest.hexdigest()
+
+
+def _cache_get(key: str) -> Any:
+    with _k_selection_cache_lock:
+        if key in _k_selection_cache:
+            _k_selection_cache.move_to_end(key)
+            return _k_selection_cache[key]
+    return None
+
+
+def _cache_put(key: str, value: Any):
+    with _k_selection_cache_lock:
+        _k_selection_cache[key] = value
+        _k_selection_cache.move_to_end(key)
+        while len(_k_selection_cache) > K_SELECTION_CACHE_SIZE:
+            _k_selection_cache.popitem(last=False)
+
+
+def _confidence(distances: np.ndarray, cluster_ids: np.ndarray) -> np.ndarray:
+    """1 - (distance to assigned center / sum of distances to all centers), per row."""
+    assigned = distances[np.arange(len(distances)), cluster_ids]
+    totals = distances.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals > 0, 1 - assigned / totals, 1.0)
+
+
+def _reservoir_update(reservoir: Optional[np.ndarray], X: np.ndarray, n_seen: int,
+                      size: int, rng: np.random.RandomState) -> np.ndarray:
+    """Reservoir sampling (Algorithm R) of rows across chunks."""
+    if reservoir is None:
+        reservoir = np.empty((0, X.shape[1]))
+    take = min(size - len(reservoir), len(X))
+    if take > 0:
+        reservoir = np.vstack([reservoir, X[:take]])
+    else:
+        take = 0
+    # Row i replaces a random slot with probability size / (rows seen so far)
+    positions = np.arange(take, len(X))
+    slots = rng.randint(0, n_seen + positions + 1) if len(positions) else positions
+    for i, j in zip(positions, slots):
+        if j < size:
+            reservoir[j] = X[i]
+    return reservoir
+
+
+def _group_mean_var(groups: np.ndarray, values: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-group mean and population variance (two-pass, 0 for empty groups)."""
+    n_groups = len(counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(groups, weights=values, minlength=n_groups) / counts
+        mean = np.where(counts > 0, mean, 0.0)
+        var = np.bincount(groups, weights=(values - mean[groups]) ** 2, minlength=n_groups) / counts
+    return mean, np.where(counts > 0, var, 0.0)
+
+
 # ==============================================================================
 # CLUSTERING ENGINE
 # ==============================================================================
@@ -269,24 +560,33 @@ class EmotionalProfileClusterer:
         self.cluster_centers_ = None
         self.labels_ = None
         self.user_profiles = {}
+        # True once assignments are in the user_cluster table for this model
+        self.persisted_assignments = False
         
         # Model save path
         self.model_path = Path(__file__).parent / "models" / "clustering"
         self.model_path.mkdir(parents=True, exist_ok=True)
     
-    def fit(self, data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    def fit(self, data: Optional[pd.DataFrame] = None, persist: Optional[bool] = None) -> Dict[str, Any]:
         """
         Fit the clustering model on user emotional data.
         
         Args:
             data: Optional DataFrame with user features. If None, extracts from database.
+            persist: Write assignments to the user_cluster table
+                (defaults to True when the data came from the database)
             
         Returns:
             Dictionary containing clustering results and metrics
         """
-        # Extract features if not provided
+        if persist is None:
+            persist = data is None
+        
+        # Read features from the store if not provided (raw history as fallback)
         if data is None:
-            data = self.feature_extractor.extract_all_users_features()
+            data = self.feature_extractor.load_stored_features(refresh=True)
+            if data.empty:
+                data = self.feature_extractor.extract_all_users_features()
         
         if data.empty or len(data) < self.n_clusters:
             logger.warning(f"Insufficient data for clustering. Need at least {self.n_clusters} users.")
@@ -337,6 +637,7 @@ class EmotionalProfileClusterer:
         metrics = self._calculate_clustering_metrics(X_scaled, self.labels_)
         
         # Store user profiles
+        self.user_profiles = {}
         for username, label in zip(usernames, self.labels_):
             profile_data = EMOTIONAL_PROFILES.get(label, EMOTIONAL_PROFILES[0])
             self.user_profiles[username] = {
@@ -346,6 +647,13 @@ class EmotionalProfileClusterer:
                 'assigned_at': datetime.utcnow().isoformat()
             }
         
+        self.persisted_assignments = False
+        if persist:
+            confidences = _confidence(self.kmeans.transform(X_scaled), self.labels_)
+            self.persisted_assignments = self._store_assignments(
+                usernames, self.labels_, confidences, replace_all=True
+            )
+        
         # PCA for visualization
         if len(X_scaled) >= 2:
             X_pca = self.pca.fit_transform(X_scaled)
@@ -371,6 +679,137 @@ class EmotionalProfileClusterer:
         logger.info(f"Clustering complete: {len(usernames)} users into {self.n_clusters} profiles")
         return results
     
+    def fit_streaming(self, chunks: Optional[Callable[[], Iterable[pd.DataFrame]]] = None,
+                      batch_size: int = STREAM_CHUNK_SIZE, persist: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Fit with mini-batch K-Means over feature chunks, keeping memory flat.
+        
+        Args:
+            chunks: Callable returning a fresh iterable of feature DataFrames
+                (same columns as fit()). Called once per pass; defaults to
+                paging through the feature store.
+            batch_size: Mini-batch size for MiniBatchKMeans
+            persist: Write assignments to the user_cluster table
+                (defaults to True when reading the feature store)
+            
+        Returns:
+            Dictionary with user count, distribution and sampled metrics
+        """
+        if persist is None:
+            persist = chunks is None
+        if chunks is None:
+            # Catch the store up once so every pass reads the same rows
+            with pooled_connection() as conn:
+                refresh_stale_features(conn.cursor())
+            chunks = lambda: self.feature_extractor.iter_stored_features(chunk_size=batch_size)
+        
+        # Pass 1: scaler statistics, plus a fixed-size reservoir for metrics
+        self.scaler = StandardScaler()
+        rng = np.random.RandomState(self.random_state)
+        reservoir = None
+        n_seen = 0
+        for X in self._chunk_matrices(chunks()):
+            self.scaler.partial_fit(X)
+            reservoir = _reservoir_update(reservoir, X, n_seen, SILHOUETTE_SAMPLE_SIZE, rng)
+            n_seen += len(X)
+        
+        if n_seen < self.n_clusters:
+            logger.warning(f"Insufficient data for clustering. Need at least {self.n_clusters} users.")
+            return {"error": "Insufficient data for clustering"}
+        
+        # Pass 2: mini-batch K-Means on scaled chunks
+        self.kmeans = MiniBatchKMeans(
+            n_clusters=self.n_clusters,
+            random_state=self.random_state,
+            batch_size=batch_size,
+            n_init=3
+        )
+        pending = None  # The first partial_fit needs at least n_clusters rows
+        for X in self._chunk_matrices(chunks()):
+            X_scaled = self.scaler.transform(X)
+            if pending is not None:
+                X_scaled, pending = np.vstack([pending, X_scaled]), None
+            if not hasattr(self.kmeans, 'cluster_centers_') and len(X_scaled) < self.n_clusters:
+                pending = X_scaled
+                continue
+            self.kmeans.partial_fit(X_scaled)
+        self.cluster_centers_ = self.kmeans.cluster_centers_
+        self.is_fitted = True
+        
+        # Pass 3: assignment counts (and stored assignments)
+        counts = np.zeros(self.n_clusters, dtype=int)
+        replace_all = True
+        stored = bool(persist)
+        for chunk in chunks():
+            if chunk is None or chunk.empty:
+                continue
+            labels, confidences = self.predict_from_feature_matrix(next(self._chunk_matrices([chunk])))
+            counts += np.bincount(labels, minlength=self.n_clusters)
+            if stored:
+                # After a failed chunk, user_cluster is incomplete; stop writing to it
+                stored = self._store_assignments(chunk['username'].tolist(), labels, confidences,
+                                                 replace_all=replace_all)
+                replace_all = False
+        self.persisted_assignments = stored
+        
+        self.labels_ = None
+        self.user_profiles = {}
+        self._save_model()
+        
+        sample = self.scaler.transform(reservoir)
+        metrics = self._calculate_clustering_metrics(sample, self.kmeans.predict(sample))
+        metrics['sample_size'] = len(sample)
+        
+        logger.info(f"Streaming clustering complete: {n_seen} users into {self.n_clusters} profiles")
+        return {
+            'n_users': n_seen,
+            'n_clusters': self.n_clusters,
+            'metrics': metrics,
+            'cluster_distribution': {int(k): int(v) for k, v in enumerate(counts) if v > 0},
+            'mode': 'streaming'
+        }
+    
+    def partial_fit(self, data: pd.DataFrame) -> bool:
+        """
+        Update a fitted model with new feature rows (e.g. a nightly batch).
+        Mini-batch centers move toward the new data. The scaler stays frozen
+        so existing centers keep their meaning; refit to rescale.
+        Returns False when there is nothing to update, including a batch
+        too small to start mini-batch updates on a full-batch model.
+        """
+        if not self.is_fitted and not self._load_model():
+            logger.warning("Model not fitted. Call fit() or fit_streaming() first.")
+            return False
+        if data is None or data.empty:
+            return False
+        
+        X_scaled = self.scaler.transform(next(self._chunk_matrices([data])))
+        if not isinstance(self.kmeans, MiniBatchKMeans):
+            # The first partial_fit needs at least n_clusters rows
+            if len(X_scaled) < self.n_clusters:
+                logger.warning(f"Need at least {self.n_clusters} rows to continue a full-batch model; "
+                               f"got {len(X_scaled)}.")
+                return False
+            # Continue from the full-batch centers
+            self.kmeans = MiniBatchKMeans(
+                n_clusters=self.n_clusters,
+                init=self.cluster_centers_,
+                n_init=1,
+                random_state=self.random_state
+            )
+        self.kmeans.partial_fit(X_scaled)
+        self.cluster_centers_ = self.kmeans.cluster_centers_
+        self._save_model()
+        return True
+    
+    def _chunk_matrices(self, chunks: Iterable[pd.DataFrame]) -> Iterator[np.ndarray]:
+        """Feature matrices (model column order, NaN -> 0) from DataFrame chunks."""
+        feature_cols = self.feature_extractor.feature_names
+        for chunk in chunks:
+            if chunk is None or chunk.empty:
+                continue
+            yield np.nan_to_num(chunk[feature_cols].to_numpy(dtype=float), nan=0.0)
+    
     def predict(self, username: str) -> Optional[Dict[str, Any]]:
         """
         Predict emotional profile for a user.
@@ -411,30 +850,7 @@ class EmotionalProfileClusterer:
         if not features:
             return None
         
-        # Prepare feature vector
-        feature_cols = self.feature_extractor.feature_names
-        X = np.array([[features.get(col, 0) for col in feature_cols]])
-        X = np.nan_to_num(X, nan=0.0)
-        
-        # Scale and predict
-        X_scaled = self.scaler.transform(X)
-        cluster_id = self.kmeans.predict(X_scaled)[0]
-        
-        # Calculate confidence based on distance to cluster center
-        distances = np.linalg.norm(X_scaled - self.cluster_centers_, axis=1)
-        confidence = 1 - (distances[cluster_id] / np.sum(distances))
-        
-        profile = EMOTIONAL_PROFILES.get(cluster_id, EMOTIONAL_PROFILES[0])
-        
-        result = {
-            'username': username,
-            'cluster_id': int(cluster_id),
-            'profile_name': profile['name'],
-            'profile': profile,
-            'confidence': float(confidence),
-            'features': features,
-            'predicted_at': datetime.utcnow().isoformat()
-        }
+        result = self._prediction_result(username, features)
         
         # Update stored profile
         self.user_profiles[username] = result
@@ -457,32 +873,103 @@ class EmotionalProfileClusterer:
                 logger.warning("Model not fitted. Call fit() first.")
                 return None
         
-        # Prepare feature vector
-        feature_cols = self.feature_extractor.feature_names
-        X = np.array([[features.get(col, 0) for col in feature_cols]])
-        X = np.nan_to_num(X, nan=0.0)
+        return self._prediction_result(username, features)
+    
+    def predict_from_feature_matrix(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Assign many users at once.
         
-        # Scale and predict
-        X_scaled = self.scaler.transform(X)
-        cluster_id = self.kmeans.predict(X_scaled)[0]
+        Args:
+            X: (n_users, n_features) matrix in feature_names order
+            
+        Returns:
+            (cluster_ids, confidences) arrays; confidence is 1 minus the share of
+            the distance to the assigned center among distances to all centers
+        """
+        X = np.nan_to_num(np.asarray(X, dtype=float).reshape(-1, len(self.feature_extractor.feature_names)), nan=0.0)
+        distances = np.linalg.norm(
+            self.scaler.transform(X)[:, None, :] - self.cluster_centers_[None, :, :], axis=2
+        )
+        cluster_ids = np.argmin(distances, axis=1)
+        return cluster_ids, _confidence(distances, cluster_ids)
+    
+    def predict_many(self, usernames: Optional[List[str]] = None,
+                     store: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Predict profiles for many users (everyone in the feature store if
+        usernames is None) in one vectorized call, writing the assignments
+        to the user_cluster table unless store is False.
+        """
+        if not self.is_fitted:
+            if not self._load_model():
+                logger.warning("Model not fitted. Call fit() first.")
+                return {}
         
-        # Calculate confidence based on distance to cluster center
-        distances = np.linalg.norm(X_scaled - self.cluster_centers_, axis=1)
-        confidence = 1 - (distances[cluster_id] / np.sum(distances))
+        data = self.feature_extractor.load_stored_features(usernames=usernames)
+        if data.empty:
+            return {}
         
+        feature_cols = self.feature_extractor.feature_names
+        names = data['username'].tolist()
+        cluster_ids, confidences = self.predict_from_feature_matrix(data[feature_cols].to_numpy(dtype=float))
+        if store:
+            self._store_assignments(names, cluster_ids, confidences)
+        
+        predicted_at = datetime.utcnow().isoformat()
+        results = {}
+        for name, row, cluster_id, confidence in zip(names, data[feature_cols].to_dict('records'),
+                                                     cluster_ids, confidences):
+            profile = EMOTIONAL_PROFILES.get(int(cluster_id), EMOTIONAL_PROFILES[0])
+            results[name] = {
+                'username': name,
+                'cluster_id': int(cluster_id),
+                'profile_name': profile['name'],
+                'profile': profile,
+                'confidence': float(confidence),
+                'features': row,
+                'predicted_at': predicted_at
+            }
+        self.user_profiles.update(results)
+        return results
+    
+    def _prediction_result(self, username: str, features: Dict[str, float]) -> Dict[str, Any]:
+        feature_cols = self.feature_extractor.feature_names
+        X = np.array([[features.get(col, 0) for col in feature_cols]], dtype=float)
+        cluster_ids, confidences = self.predict_from_feature_matrix(X)
+        cluster_id = int(cluster_ids[0])
         profile = EMOTIONAL_PROFILES.get(cluster_id, EMOTIONAL_PROFILES[0])
-        
-        result = {
+        return {
             'username': username,
-            'cluster_id': int(cluster_id),
+            'cluster_id': cluster_id,
             'profile_name': profile['name'],
             'profile': profile,
-            'confidence': float(confidence),
+            'confidence': float(confidences[0]),
             'features': features,
             'predicted_at': datetime.utcnow().isoformat()
         }
-        
-        return result
+    
+    def _store_assignments(self, usernames: List[str], cluster_ids: np.ndarray,
+                           confidences: np.ndarray, replace_all: bool = False) -> bool:
+        """Upsert assignments into user_cluster (replace_all clears older ones first)."""
+        assigned_at = datetime.utcnow().isoformat()
+        rows = [
+            (name, int(cluster_id), float(confidence), assigned_at)
+            for name, cluster_id, confidence in zip(usernames, cluster_ids, confidences)
+        ]
+        try:
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                if replace_all:
+                    cursor.execute("DELETE FROM user_cluster")
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO user_cluster (username, cluster_id, confidence, assigned_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error storing cluster assignments: {e}")
+            return False
     
     def get_user_profile(self, username: str) -> Optional[Dict[str, Any]]:
         """Get the cached emotional profile for a user."""
@@ -492,34 +979,54 @@ class EmotionalProfileClusterer:
     
     def get_cluster_users(self, cluster_id: int) -> List[str]:
         """Get all users in a specific cluster."""
+        if self.persisted_assignments:
+            try:
+                with pooled_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        "SELECT username FROM user_cluster WHERE cluster_id = ? ORDER BY username",
+                        (int(cluster_id),)
+                    )
+                    return [row[0] for row in cursor.fetchall()]
+            except Exception as e:
+                logger.error(f"Error reading cluster assignments: {e}")
+        
         return [
             username for username, profile in self.user_profiles.items()
             if profile.get('cluster_id') == cluster_id
         ]
     
     def _find_optimal_clusters(self, X: np.ndarray, max_k: int = 8) -> int:
-        """Find optimal number of clusters using silhouette score."""
+        """
+        Find optimal number of clusters using silhouette score.
+        Candidate fits run in a process pool on large data, and the result
+        is cached by a hash of the feature matrix.
+        """
         max_k = min(max_k, len(X) - 1)
         if max_k < 2:
             return 2
         
-        silhouette_scores = []
         k_range = range(2, max_k + 1)
+        key = _matrix_key("k", X, max_k, self.random_state)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
         
-        for k in k_range:
-            kmeans = KMeans(n_clusters=k, random_state=self.random_state, n_init=10)
-            labels = kmeans.fit_predict(X)
+        silhouette_scores = None
+        if len(X) >= PARALLEL_K_SELECTION_MIN_ROWS and K_SELECTION_WORKERS > 1:
             try:
-                score = silhouette_score(X, labels)
-            except ValueError:
-                score = -1.0 # Invalid for single cluster
-            silhouette_scores.append(score)
-        
-        optimal_k = k_range[np.argmax(silhouette_scores)]
+                silhouette_scores = _score_k_range_parallel(X, k_range, self.random_state)
+            except Exception as e:
+                logger.warning(f"Parallel k-selection failed, running serially: {e}")
+        if silhouette_scores is None:
+            silhouette_scores = [_score_k(X, k, self.random_state) for k in k_range]
+        
+        optimal_k = k_range[int(np.argmax(silhouette_scores))]
+        _cache_put(key, optimal_k)
         return optimal_k
     
     def _calculate_clustering_metrics(self, X: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
-        """Calculate clustering quality metrics."""
+        """Calculate clustering quality metrics (cached by feature matrix and labels)."""
         metrics = {}
         
         # Only calculate if we have valid clusters
@@ -527,8 +1034,15 @@ class EmotionalProfileClusterer:
         if len(unique_labels) < 2:
             return {'silhouette_score': 0, 'calinski_harabasz': 0, 'davies_bouldin': float('inf')}
         
+        key = _matrix_key("metrics", X, labels, self.random_state)
+        cached = _cache_get(key)
+        if cached is not None:
+            metrics = dict(cached)
+            metrics['inertia'] = float(self.kmeans.inertia_)
+            return metrics
+        
         try:
-            metrics['silhouette_score'] = float(silhouette_score(X, labels))
+            metrics['silhouette_score'] = float(self._silhouette(X, labels))
         except:
             metrics['silhouette_score'] = 0
         
@@ -542,10 +1056,15 @@ class EmotionalProfileClusterer:
         except:
             metrics['davies_bouldin'] = float('inf')
         
+        _cache_put(key, dict(metrics))
         metrics['inertia'] = float(self.kmeans.inertia_)
         
         return metrics
     
+    def _silhouette(self, X: np.ndarray, labels: np.ndarray) -> float:
+        """Silhouette score, estimated on a fixed-size sample for large data."""
+        return _sampled_silhouette(X, labels, self.random_state)
+    
     def _get_cluster_distribution(self) -> Dict[int, int]:
         """Get the distribution of users across clusters."""
         if self.labels_ is None:
@@ -583,6 +1102,7 @@ class EmotionalProfileClusterer:
                 'cluster_centers': self.cluster_centers_,
                 'user_profiles': self.user_profiles,
                 'n_clusters': self.n_clusters,
+                'persisted_assignments': self.persisted_assignments,
                 'feature_names': self.feature_extractor.feature_names,
                 'saved_at': datetime.utcnow().isoformat()
             }
@@ -612,6 +1132,7 @@ class EmotionalProfileClusterer:
             self.cluster_centers_ = model_data['cluster_centers']
             self.user_profiles = model_data['user_profiles']
             self.n_clusters = model_data['n_clusters']
+            self.persisted_assignments = model_data.get('persisted_assignments', False)
             self.is_fitted = True
             
             logger.info(f"Model loaded from {model_file}")
@@ -834,6 +1355,18 @@ def get_user_emotional_profile(username: str) -> Optional[Dict[str, Any]]:
     return clusterer.predict(username)
 
 
+def get_user_emotional_profiles(usernames: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Get emotional profiles for many users in one batch."""
+    clusterer = create_profile_clusterer()
+    return clusterer.predict_many(usernames)
+
+
+def rebuild_stored_features(username: Optional[str] = None) -> int:
+    """Recompute user_feature_store rows from full history (after schema changes)."""
+    with pooled_connection() as conn:
+        return rebuild_feature_store(conn.cursor(), username)
+
+
 def get_profile_summary() -> Dict[str, Any]:
     """Get summary of all emotional profiles."""
     clusterer = create_profile_clusterer()
@@ -868,6 +1401,7 @@ Examples:
   python emotional_profile_clustering.py --predict <username>     # Predict user profile
   python emotional_profile_clustering.py --summary                # Show profile summary
   python emotional_profile_clustering.py --visualize              # Generate visualizations
+  python -m app.ml.clustering --rebuild-features                  # Rebuild the feature store
         """
     )
     
@@ -875,6 +1409,10 @@ Examples:
     parser.add_argument('--predict', type=str, metavar='USERNAME', help='Predict profile for a user')
     parser.add_argument('--summary', action='store_true', help='Show profile summary')
     parser.add_argument('--visualize', action='store_true', help='Generate cluster visualizations')
+    parser.add_argument('--streaming', action='store_true',
+                        help='With --fit, use mini-batch K-Means over feature chunks')
+    parser.add_argument('--rebuild-features', action='store_true',
+                        help='Recompute the stored per-user features from full history')
     parser.add_argument('--n-clusters', type=int, default=4, help='Number of clusters (default: 4)')
     parser.add_argument('--output-dir', type=str, default='outputs/clustering', help='Output directory for visualizations')
     
@@ -889,9 +1427,14 @@ Examples:
     clusterer = create_profile_clusterer(n_clusters=args.n_clusters)
     visualizer = ClusteringVisualizer(clusterer)
     
-    if args.fit:
+    if args.rebuild_features:
+        print("\n🔄 Rebuilding stored features...")
+        count = rebuild_stored_features()
+        print(f"✅ Rebuilt features for {count} users")
+    
+    elif args.fit:
         print("\n🔄 Fitting emotional profile clustering model...")
-        results = clusterer.fit()
+        results = clusterer.fit_streaming() if args.streaming else clusterer.fit()
         
         if 'error' in results:
             print(f"❌ Error: {results['error']}")
@@ -2,9 +2,10 @@
 
 import logging
 from typing import Dict, List, Optional
-from app.db import get_session
+from app.db import get_session, pooled_connection
 from app.models import Score, User
 from app.analysis.outlier_detection import OutlierDetector
+from app.services.score_stats import get_score_stats
 
 logger = logging.getLogger(__name__)
 
@@ -74,117 +75,121 @@ class ScoreAnalyzer:
             session.close()
     
     def get_score_analytics(self, username: str) -> Dict:
-        """Get comprehensive score analytics with outlier analysis."""
-        session = get_session()
-        try:
-            scores = session.query(Score).filter(
-                Score.username == username
-            ).order_by(Score.timestamp).all()
+        """
+        Get comprehensive score analytics with outlier analysis.
+        Reads the per-score flags written at exam time (backfilled by
+        check_db_state when the schema version changes) and the user's
+        rolling stats instead of re-running detection over the full
+        history; nothing is written.
+        
+        Consistency covers the user's whole history: the coefficient of
+        variation uses the population standard deviation of every score,
+        not just the last 30 days as detect_inconsistency_patterns does.
+        """
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(total_score), MIN(total_score), MAX(total_score), AVG(total_score),
+                       SUM(CASE WHEN is_inconsistent_transition THEN 1 ELSE 0 END)
+                FROM scores WHERE username = ? AND total_score IS NOT NULL
+                """,
+                (username,)
+            )
+            count, min_score, max_score, mean_score, transitions = cursor.fetchone()
             
-            if not scores:
+            if not count:
                 return {"error": "No scores found"}
             
-            score_values = [s.total_score for s in scores]
-            
-            # Outlier detection
-            outlier_result = self.detector.detect_outliers_ensemble(score_values)
-            
-            # Inconsistency analysis
-            inconsistency = self.detector.detect_inconsistency_patterns(
-                session, username
+            cursor.execute(
+                "SELECT total_score FROM scores WHERE username = ? AND is_outlier "
+                "ORDER BY timestamp, id",
+                (username,)
             )
-            
-            return {
-                "username": username,
-                "total_scores": len(score_values),
-                "score_range": {
-                    "min": min(score_values),
-                    "max": max(score_values),
-                    "mean": sum(score_values) / len(score_values)
-                },
-                "outlier_analysis": {
-                    "outlier_count": len(outlier_result["outliers"]),
-                    "outlier_percentage": (len(outlier_result["outliers"]) / len(score_values)) * 100,
-                    "outliers": outlier_result["outliers"]
-                },
-                "consistency_analysis": {
-                    "coefficient_of_variation": inconsistency.get("coefficient_of_variation", 0),
-                    "is_highly_inconsistent": inconsistency.get("is_highly_inconsistent", False),
-                    "inconsistent_transitions": inconsistency.get("inconsistent_transitions", 0)
-                },
-                "quality_assessment": self._assess_score_quality(
-                    outlier_result, inconsistency, score_values
-                )
-            }
+            outliers = [row[0] for row in cursor.fetchall()]
+            stats = get_score_stats(cursor, username)
         
-        finally:
-            session.close()
+        cv = (stats["std_dev"] / stats["mean"] * 100) if stats["mean"] else 0
+        outlier_result = {"outliers": outliers}
+        inconsistency = {
+            "coefficient_of_variation": cv,
+            "is_highly_inconsistent": cv > 30,  # CV > 30% indicates high variability
+            "inconsistent_transitions": transitions or 0
+        }
+        
+        return {
+            "username": username,
+            "total_scores": count,
+            "score_range": {
+                "min": min_score,
+                "max": max_score,
+                "mean": mean_score
+            },
+            "outlier_analysis": {
+                "outlier_count": len(outliers),
+                "outlier_percentage": (len(outliers) / count) * 100,
+                "outliers": outliers
+            },
+            "consistency_analysis": inconsistency,
+            "quality_assessment": self._assess_score_quality(
+                outlier_result, inconsistency, count
+            )
+        }
     
     def get_cohort_analytics(self, age_group: str) -> Dict:
         """Get analytics for an age group cohort."""
         session = get_session()
         try:
-            scores = session.query(Score).filter(
-                Score.detailed_age_group == age_group
-            ).all()
+            rows = self._fetch_score_rows(session, age_group)
             
-            if not scores:
+            if not rows:
                 return {"error": f"No scores found for age group {age_group}"}
             
-            score_values = [s.total_score for s in scores]
-            
-            # Outlier analysis
-            outlier_result = self.detector.detect_outliers_by_age_group(
-                session, age_group, method="ensemble"
+            values = [row.total_score for row in rows]
+            outlier_result = self.detector.detect_outliers_ensemble(values)
+            return self._cohort_summary(
+                age_group, rows, [rows[i] for i in outlier_result["indices"]]
             )
-            
-            return {
-                "age_group": age_group,
-                "participant_count": len(scores),
-                "score_statistics": {
-                    "mean": sum(score_values) / len(score_values),
-                    "median": sorted(score_values)[len(score_values) // 2],
-                    "std_dev": self._calculate_std(score_values),
-                    "range": [min(score_values), max(score_values)]
-                },
-                "data_quality": {
-                    "outlier_count": outlier_result.get("outlier_count", 0),
-                    "outlier_percentage": (outlier_result.get("outlier_count", 0) / len(score_values)) * 100,
-                    "is_acceptable": (outlier_result.get("outlier_count", 0) / len(score_values)) < 0.15
-                },
-                "outlier_details": outlier_result.get("outlier_details", [])
-            }
         
         finally:
             session.close()
     
     def generate_quality_report(self) -> Dict:
-        """Generate overall data quality report."""
+        """Generate overall data quality report (one query, one grouped pass)."""
         session = get_session()
         try:
-            all_scores = session.query(Score).all()
-            score_values = [s.total_score for s in all_scores]
+            rows = self._fetch_score_rows(session)
+            score_values = [row.total_score for row in rows]
             
             if not score_values:
                 return {"error": "No scores in database"}
             
-            outlier_result = self.detector.detect_outliers_global(
-                session, method="ensemble"
+            global_result = self.detector.detect_outliers_grouped(
+                score_values, ["global"] * len(rows), method="ensemble"
+            )["global"]
+            
+            age_groups = [row.detailed_age_group or "" for row in rows]
+            cohort_results = self.detector.detect_outliers_grouped(
+                score_values, age_groups, method="ensemble"
             )
             
-            age_groups = session.query(Score.detailed_age_group).distinct().all()
+            group_rows: Dict[str, List] = {}
+            for row, group in zip(rows, age_groups):
+                group_rows.setdefault(group, []).append(row)
+            
+            cohort_summary = [
+                self._cohort_summary(group, group_rows[group], [rows[i] for i in result["indices"]])
+                for group, result in cohort_results.items() if group
+            ]
             
             return {
                 "report_type": "data_quality",
                 "total_scores": len(score_values),
-                "global_outlier_percentage": (outlier_result.get("outlier_count", 0) / len(score_values)) * 100,
+                "global_outlier_percentage": (global_result["outlier_count"] / len(score_values)) * 100,
                 "quality_assessment": self._assess_global_quality(
-                    outlier_result, score_values
+                    global_result, score_values
                 ),
-                "cohort_summary": [
-                    self.get_cohort_analytics(ag[0]) 
-                    for ag in age_groups if ag[0]
-                ]
+                "cohort_summary": cohort_summary
             }
         
         finally:
@@ -192,6 +197,47 @@ class ScoreAnalyzer:
     
     # Helper methods
     
+    def _fetch_score_rows(self, session, age_group: Optional[str] = None) -> List:
+        """Projected score rows (no ORM objects), oldest first"""
+        query = session.query(
+            Score.id, Score.username, Score.total_score, Score.age,
+            Score.detailed_age_group, Score.timestamp
+        ).filter(Score.total_score.isnot(None))
+        if age_group is not None:
+            query = query.filter(Score.detailed_age_group == age_group)
+        return query.order_by(Score.timestamp, Score.id).all()
+    
+    def _cohort_summary(self, age_group: str, rows: List, outlier_rows: List) -> Dict:
+        """Cohort analytics from the group's rows and its outlier rows"""
+        score_values = [row.total_score for row in rows]
+        outlier_count = len(outlier_rows)
+        
+        return {
+            "age_group": age_group,
+            "participant_count": len(rows),
+            "score_statistics": {
+                "mean": sum(score_values) / len(score_values),
+                "median": sorted(score_values)[len(score_values) // 2],
+                "std_dev": self._calculate_std(score_values),
+                "range": [min(score_values), max(score_values)]
+            },
+            "data_quality": {
+                "outlier_count": outlier_count,
+                "outlier_percentage": (outlier_count / len(score_values)) * 100,
+                "is_acceptable": (outlier_count / len(score_values)) < 0.15
+            },
+            "outlier_details": [
+                {
+                    "score_id": row.id,
+                    "username": row.username,
+                    "score_value": row.total_score,
+                    "age": row.age,
+                    "timestamp": row.timestamp
+                }
+                for row in outlier_rows
+            ]
+        }
+    
     def _calculate_average_change(self, values: List[int]) -> float:
         """Calculate average absolute change between consecutive values"""
         if len(values) < 2:
@@ -210,10 +256,10 @@ class ScoreAnalyzer:
         return variance ** 0.5
     
     def _assess_score_quality(self, outlier_result: Dict, 
-                             inconsistency: Dict, scores: List[int]) -> Dict:
+                             inconsistency: Dict, score_count: int) -> Dict:
         """Assess overall quality of a user's scores"""
         
-        outlier_percentage = len(outlier_result["outliers"]) / len(scores) * 100
+        outlier_percentage = len(outlier_result["outliers"]) / score_count * 100
         cv = inconsistency.get("coefficient_of_variation", 0)
         
         quality_score = 100
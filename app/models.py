@@ -134,12 +134,17 @@ class Score(Base):
     reflection_text = Column(Text, nullable=True) # New: Open-ended response
     is_rushed = Column(Boolean, default=False) # Behavioral pattern: Rushed answering
     is_inconsistent = Column(Boolean, default=False) # Behavioral pattern: Inconsistent answering
+    # Online anomaly flags vs the user's prior history (NULL = not evaluated yet)
+    is_outlier = Column(Boolean, nullable=True)
+    outlier_zscore = Column(Float, nullable=True)
+    is_inconsistent_transition = Column(Boolean, nullable=True)
     age = Column(Integer, index=True)  # Added index
     detailed_age_group = Column(String, index=True)  # Added index
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)  # Added index
     timestamp = Column(String, default=lambda: datetime.utcnow().isoformat(), index=True)  # Added timestamp and index
 
     user = relationship("User", back_populates="scores")
+    responses = relationship("Response", back_populates="score")
 
     # Composite indexes for performance
     __table_args__ = (
@@ -160,8 +165,10 @@ class Response(Base):
     detailed_age_group = Column(String, index=True)  # Added index
     timestamp = Column(String, default=lambda: datetime.utcnow().isoformat(), index=True)  # Added index
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)  # Added index
+    score_id = Column(Integer, ForeignKey('scores.id'), nullable=True, index=True)  # Exam attempt this answer belongs to
 
     user = relationship("User", back_populates="responses")
+    score = relationship("Score", back_populates="responses")
 
     # Composite indexes for common query patterns
     __table_args__ = (
@@ -185,6 +192,18 @@ class Question(Base):
     tooltip = Column(Text, nullable=True)
     created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
 
+class QuestionBankVersion(Base):
+    """Single-row counter bumped by triggers on every question_bank write"""
+    __tablename__ = 'question_bank_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+class UserDataVersion(Base):
+    """Per-user counter bumped by triggers on writes to the user's analytics data"""
+    __tablename__ = 'user_data_version'
+    username = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
 class QuestionCategory(Base):
     __tablename__ = 'question_category'
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -212,6 +231,10 @@ class JournalEntry(Base):
     stress_triggers = Column(Text, nullable=True)      # What triggered stress
     daily_schedule = Column(Text, nullable=True)       # Daily routine/schedule
 
+    __table_args__ = (
+        Index('idx_journal_user_date', 'username', 'entry_date'),
+    )
+
 class SatisfactionRecord(Base):
     __tablename__ = 'satisfaction_records'
     
@@ -297,13 +320,11 @@ def receive_before_create(target, connection, **kw):
     """Optimize database settings before tables are created"""
     logger.info("Optimizing database settings...")
     
-    # SQLite specific optimizations
+    # SQLite specific optimizations (same profile the engine applies on connect)
     if connection.engine.name == 'sqlite':
-        connection.execute(text('PRAGMA journal_mode = WAL'))  # Write-Ahead Logging for better concurrency
-        connection.execute(text('PRAGMA synchronous = NORMAL'))  # Good balance of safety and performance
-        connection.execute(text('PRAGMA cache_size = -2000'))  # 2MB cache
-        connection.execute(text('PRAGMA temp_store = MEMORY'))  # Store temp tables in memory
-        connection.execute(text('PRAGMA mmap_size = 268435456'))  # 256MB memory map
+        from app.db import get_pragma_settings
+        for name, value in get_pragma_settings().items():
+            connection.execute(text(f'PRAGMA {name} = {value}'))
         connection.execute(text('PRAGMA foreign_keys = ON'))  # Enable foreign key constraints
 
 @event.listens_for(Question.__table__, 'after_create')
@@ -345,6 +366,177 @@ def receive_after_create_question(target, connection, **kw):
     except:
         logger.warning("FTS5 not available, skipping full-text search optimization")
 
+# Any write to question_bank (ORM, admin scripts, raw SQL) bumps the version
+# so in-process question caches know to reload.
+QUESTION_BANK_VERSION_TRIGGERS = {
+    "question_bank_version_ai": "AFTER INSERT ON question_bank",
+    "question_bank_version_au": "AFTER UPDATE ON question_bank",
+    "question_bank_version_ad": "AFTER DELETE ON question_bank",
+}
+
+def ensure_question_bank_versioning(connection):
+    """Create the version row and its triggers if missing (idempotent)"""
+    connection.execute(text("INSERT OR IGNORE INTO question_bank_version (id, version) VALUES (1, 0)"))
+    for name, timing in QUESTION_BANK_VERSION_TRIGGERS.items():
+        connection.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN
+                UPDATE question_bank_version SET version = version + 1 WHERE id = 1;
+            END;
+        """))
+
+# Writes to the tables the analytics dashboard reads bump the owning user's
+# version so cached dashboard snapshots know to rebuild.
+USER_DATA_VERSION_TABLES = ("scores", "journal_entries", "satisfaction_records")
+
+def _user_data_version_triggers():
+    for table in USER_DATA_VERSION_TABLES:
+        yield f"{table}_user_version_ai", f"AFTER INSERT ON {table}", "new"
+        yield f"{table}_user_version_au", f"AFTER UPDATE ON {table}", "new"
+        yield f"{table}_user_version_ad", f"AFTER DELETE ON {table}", "old"
+
+def ensure_user_data_versioning(connection):
+    """
+    (Re)create the per-user version triggers. Rows without a username are
+    skipped; they belong to no one's dashboard. Triggers are replaced so
+    databases with the earlier, unguarded definitions pick up the WHEN clause.
+    """
+    for name, timing, row in _user_data_version_triggers():
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        connection.execute(text(f"""
+            CREATE TRIGGER {name} {timing} WHEN {row}.username IS NOT NULL BEGIN
+                INSERT INTO user_data_version (username, version) VALUES ({row}.username, 1)
+                ON CONFLICT(username) DO UPDATE SET version = version + 1;
+            END;
+        """))
+
+# Journal metrics kept per user and day in journal_daily_rollup. A write to an
+# entry recomputes its day's row (and the old day's, if the date moved) from
+# journal_entries, so min/max stay exact on update and delete.
+JOURNAL_ROLLUP_METRICS = ("sleep_hours", "sleep_quality", "energy_level", "work_hours",
+                          "screen_time_mins", "stress_level", "sentiment_score")
+
+def journal_rollup_insert(where):
+    """INSERT ... SELECT that rolls up the journal_entries matching where, one row per user and day"""
+    columns = ", ".join(f"{m}_sum, {m}_count, {m}_min, {m}_max, {m}_nonzero" for m in JOURNAL_ROLLUP_METRICS)
+    aggregates = ", ".join(f"SUM({m}), COUNT({m}), MIN({m}), MAX({m}), COUNT(NULLIF({m}, 0))"
+                           for m in JOURNAL_ROLLUP_METRICS)
+    return f"""
+        INSERT INTO journal_daily_rollup (username, day, entry_count, {columns})
+        SELECT username, substr(entry_date, 1, 10), COUNT(*), {aggregates}
+        FROM journal_entries WHERE {where}
+        GROUP BY username, substr(entry_date, 1, 10)
+    """
+
+def _journal_rollup_refresh(row):
+    """Trigger statements recomputing the rollup row for {row}'s user and day"""
+    day = f"substr({row}.entry_date, 1, 10)"
+    return f"""
+        DELETE FROM journal_daily_rollup WHERE username = {row}.username AND day = {day};
+        {journal_rollup_insert(
+            f"username = {row}.username AND entry_date >= {day} AND entry_date < date({day}, '+1 day')"
+        ).strip()};
+    """
+
+def _journal_rollup_triggers():
+    watched = ", ".join(("username", "entry_date") + JOURNAL_ROLLUP_METRICS)
+    yield "journal_rollup_ai", "AFTER INSERT ON journal_entries", ("new",)
+    yield "journal_rollup_au", f"AFTER UPDATE OF {watched} ON journal_entries", ("old", "new")
+    yield "journal_rollup_ad", "AFTER DELETE ON journal_entries", ("old",)
+
+def ensure_journal_rollup_triggers(connection):
+    """
+    (Re)create the journal_daily_rollup triggers. They are replaced so
+    databases with the earlier definitions start filling the _nonzero counts.
+    """
+    existing = {row[1] for row in connection.execute(text("PRAGMA table_info(journal_entries)"))}
+    missing = [c for c in JOURNAL_ROLLUP_METRICS if c not in existing]
+    if missing:
+        logger.warning(f"journal_entries lacks {missing}; skipping daily rollup triggers")
+        return
+    for name, timing, rows in _journal_rollup_triggers():
+        body = "".join(_journal_rollup_refresh(row) for row in rows)
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        connection.execute(text(f"CREATE TRIGGER {name} {timing} BEGIN {body} END;"))
+
+# user_activity_summary is kept by triggers on scores, so rows written outside
+# finish_exam (synthetic data, raw SQL, deletes) are counted too. A write
+# recomputes the affected user's row from their scores.
+def activity_summary_insert(where):
+    """INSERT ... SELECT that summarizes the scores matching where, one row per user"""
+    return f"""
+        INSERT INTO user_activity_summary
+        (username, user_id, attempt_count, scored_count, score_sum, avg_score,
+         first_attempt, last_attempt, updated_at)
+        SELECT username, MAX(user_id), COUNT(id), COUNT(total_score), COALESCE(SUM(total_score), 0),
+               AVG(total_score), MIN(timestamp), MAX(timestamp), strftime('%Y-%m-%dT%H:%M:%f', 'now')
+        FROM scores WHERE username IS NOT NULL AND username != '' AND ({where})
+        GROUP BY username
+    """
+
+def _activity_summary_refresh(row):
+    """Trigger statements recomputing the summary row for {row}'s user"""
+    return f"""
+        DELETE FROM user_activity_summary WHERE username = {row}.username;
+        {activity_summary_insert(f"username = {row}.username").strip()};
+    """
+
+def _activity_summary_triggers():
+    yield "activity_summary_ai", "AFTER INSERT ON scores", ("new",)
+    yield "activity_summary_au", "AFTER UPDATE OF username, user_id, total_score, timestamp ON scores", ("old", "new")
+    yield "activity_summary_ad", "AFTER DELETE ON scores", ("old",)
+
+def ensure_activity_summary_triggers(connection):
+    """Create the user_activity_summary triggers if missing (idempotent)"""
+    for name, timing, rows in _activity_summary_triggers():
+        body = "".join(_activity_summary_refresh(row) for row in rows)
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;"))
+
+# user_score_stats holds running (Welford) state that cannot be un-folded, so
+# an update or delete of a score drops the user's row; readers recompute it
+# from scores until the next record_score or refresh stores it again.
+SCORE_STATS_INVALIDATION_TRIGGERS = {
+    "score_stats_au": ("AFTER UPDATE OF username, total_score, timestamp ON scores", ("old", "new")),
+    "score_stats_ad": ("AFTER DELETE ON scores", ("old",)),
+}
+
+def ensure_score_stats_triggers(connection):
+    """Create the user_score_stats invalidation triggers if missing (idempotent)"""
+    for name, (timing, rows) in SCORE_STATS_INVALIDATION_TRIGGERS.items():
+        body = "".join(f"DELETE FROM user_score_stats WHERE username = {row}.username;" for row in rows)
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;"))
+
+# user_feature_store folds new rows past an id watermark, so edits and deletes
+# of rows it already folded mark the owner's accumulators dirty (version 0);
+# dirty rows are rebuilt from scratch on the next refresh.
+FEATURE_STORE_WATCHED = {
+    "scores": "username, total_score, sentiment_score, timestamp",
+    "responses": "username, response_value",
+}
+
+def _feature_store_dirty_triggers():
+    for table, columns in FEATURE_STORE_WATCHED.items():
+        yield f"{table}_feature_dirty_au", f"AFTER UPDATE OF {columns} ON {table}", ("old", "new")
+        yield f"{table}_feature_dirty_ad", f"AFTER DELETE ON {table}", ("old",)
+
+def ensure_feature_store_triggers(connection):
+    """Create the user_feature_store dirty-marking triggers if missing (idempotent)"""
+    for name, timing, rows in _feature_store_dirty_triggers():
+        body = "".join(
+            f"UPDATE user_feature_store SET version = 0 WHERE username = {row}.username;" for row in rows
+        )
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;"))
+
+@event.listens_for(Base.metadata, 'after_create')
+def receive_after_create(target, connection, **kw):
+    """Install versioning and rollup triggers once all tables exist"""
+    if connection.engine.name == 'sqlite':
+        ensure_question_bank_versioning(connection)
+        ensure_user_data_versioning(connection)
+        ensure_journal_rollup_triggers(connection)
+        ensure_activity_summary_triggers(connection)
+        ensure_score_stats_triggers(connection)
+        ensure_feature_store_triggers(connection)
+
 # ==================== CACHE AND PERFORMANCE TABLES ====================
 
 class QuestionCache(Base):
@@ -384,6 +576,125 @@ class StatisticsCache(Base):
         Index('idx_stats_name_valid', 'stat_name', 'valid_until'),
     )
 
+class UserScoreStats(Base):
+    """
+    Rolling per-user score statistics, updated incrementally on every
+    finished exam (see app.services.score_stats).
+    """
+    __tablename__ = 'user_score_stats'
+    
+    username = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    attempt_count = Column(Integer, default=0, nullable=False)
+    mean_score = Column(Float, default=0.0, nullable=False)
+    m2 = Column(Float, default=0.0, nullable=False)  # Sum of squared deviations (Welford)
+    recent_scores = Column(Text, default="[]")  # JSON list of the last N scores, oldest first
+    last_score_id = Column(Integer, nullable=True)
+    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+
+class UserFeatureStore(Base):
+    """
+    Per-user accumulators behind the emotional-profile clustering features
+    (see app.services.feature_store). Rows fold in scores/responses up to
+    the last_score_id/last_response_id watermark.
+    """
+    __tablename__ = 'user_feature_store'
+    
+    username = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)  # Layout version (0 = dirty); others are rebuilt
+    score_count = Column(Integer, default=0, nullable=False)
+    total_n = Column(Integer, default=0, nullable=False)  # Scores with a non-null total
+    total_sum = Column(Float, default=0.0, nullable=False)
+    total_sumsq = Column(Float, default=0.0, nullable=False)
+    total_xy = Column(Float, default=0.0, nullable=False)  # Sum of position * total, for the trend
+    total_min = Column(Float, nullable=True)
+    total_max = Column(Float, nullable=True)
+    sentiment_n = Column(Integer, default=0, nullable=False)
+    sentiment_sum = Column(Float, default=0.0, nullable=False)
+    sentiment_sumsq = Column(Float, default=0.0, nullable=False)
+    response_count = Column(Integer, default=0, nullable=False)
+    response_n = Column(Integer, default=0, nullable=False)
+    response_sum = Column(Float, default=0.0, nullable=False)
+    response_sumsq = Column(Float, default=0.0, nullable=False)
+    last_score_id = Column(Integer, default=0, nullable=False)
+    last_response_id = Column(Integer, default=0, nullable=False)
+    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+
+class UserActivitySummary(Base):
+    """
+    Per-user attempt counts and score average, maintained by triggers on
+    scores (see app.services.activity_summary).
+    """
+    __tablename__ = 'user_activity_summary'
+    
+    username = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    attempt_count = Column(Integer, default=0, nullable=False, index=True)
+    scored_count = Column(Integer, default=0, nullable=False)  # Attempts with a total_score
+    score_sum = Column(Float, default=0.0, nullable=False)
+    avg_score = Column(Float, nullable=True)
+    first_attempt = Column(String, nullable=True)
+    last_attempt = Column(String, nullable=True, index=True)
+    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+
+class JournalDailyRollup(Base):
+    """
+    Per-user, per-day sums, counts and min/max of the journal metrics,
+    maintained by triggers on journal_entries (see JOURNAL_ROLLUP_METRICS).
+    Counts are of non-NULL values; sums are NULL when the count is 0.
+    The _nonzero counts leave out 0, which the journal form also treats as
+    "not recorded", for averages that skip it (see health insights).
+    """
+    __tablename__ = 'journal_daily_rollup'
+    
+    username = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)  # 'YYYY-MM-DD', the date part of entry_date
+    entry_count = Column(Integer, default=0, nullable=False)
+    sleep_hours_sum = Column(Float, nullable=True)
+    sleep_hours_count = Column(Integer, default=0, nullable=False)
+    sleep_hours_min = Column(Float, nullable=True)
+    sleep_hours_max = Column(Float, nullable=True)
+    sleep_hours_nonzero = Column(Integer, nullable=True)
+    sleep_quality_sum = Column(Float, nullable=True)
+    sleep_quality_count = Column(Integer, default=0, nullable=False)
+    sleep_quality_min = Column(Float, nullable=True)
+    sleep_quality_max = Column(Float, nullable=True)
+    sleep_quality_nonzero = Column(Integer, nullable=True)
+    energy_level_sum = Column(Float, nullable=True)
+    energy_level_count = Column(Integer, default=0, nullable=False)
+    energy_level_min = Column(Float, nullable=True)
+    energy_level_max = Column(Float, nullable=True)
+    energy_level_nonzero = Column(Integer, nullable=True)
+    work_hours_sum = Column(Float, nullable=True)
+    work_hours_count = Column(Integer, default=0, nullable=False)
+    work_hours_min = Column(Float, nullable=True)
+    work_hours_max = Column(Float, nullable=True)
+    work_hours_nonzero = Column(Integer, nullable=True)
+    screen_time_mins_sum = Column(Float, nullable=True)
+    screen_time_mins_count = Column(Integer, default=0, nullable=False)
+    screen_time_mins_min = Column(Float, nullable=True)
+    screen_time_mins_max = Column(Float, nullable=True)
+    screen_time_mins_nonzero = Column(Integer, nullable=True)
+    stress_level_sum = Column(Float, nullable=True)
+    stress_level_count = Column(Integer, default=0, nullable=False)
+    stress_level_min = Column(Float, nullable=True)
+    stress_level_max = Column(Float, nullable=True)
+    stress_level_nonzero = Column(Integer, nullable=True)
+    sentiment_score_sum = Column(Float, nullable=True)
+    sentiment_score_count = Column(Integer, default=0, nullable=False)
+    sentiment_score_min = Column(Float, nullable=True)
+    sentiment_score_max = Column(Float, nullable=True)
+    sentiment_score_nonzero = Column(Integer, nullable=True)
+
+class UserCluster(Base):
+    """Latest emotional-profile cluster assignment per user (see app.ml.clustering)"""
+    __tablename__ = 'user_cluster'
+    
+    username = Column(String, primary_key=True)
+    cluster_id = Column(Integer, nullable=False, index=True)
+    confidence = Column(Float, nullable=True)
+    assigned_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+
 # ==================== PERFORMANCE HELPER FUNCTIONS ====================
 
 def create_performance_indexes(engine):
@@ -495,6 +806,14 @@ def get_active_questions_optimized(session, limit=None, offset=0):
     
     return query.all()
 
+def get_attempt_responses(session, score_id):
+    """Responses for one exam attempt (indexed lookup on score_id)"""
+    return session.query(
+        Response.question_id, Response.response_value, Response.timestamp
+    ).filter(
+        Response.score_id == score_id
+    ).order_by(Response.id).all()
+
 def get_user_scores_optimized(session, username, limit=50):
     """Optimized query for user scores with pagination"""
     return session.query(Score).filter(
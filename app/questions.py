@@ -1,229 +1,227 @@
+import heapq
 import logging
-import json
 import os
+import random
 import time
-from datetime import datetime, timedelta
-from functools import lru_cache
 import threading
-from typing import List, Tuple, Optional
-from sqlalchemy.orm import Session
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple, Optional
 
 from app.db import get_session, safe_db_context
-from app.models import Question, QuestionCache, StatisticsCache
+from app.models import Question, QuestionBankVersion, QuestionCache, StatisticsCache
 from app.exceptions import DatabaseError, ResourceError
 from app.config import DATA_DIR
 
 logger = logging.getLogger(__name__)
 
 # ------------------ CACHING CONFIGURATION ------------------
+# Legacy per-age JSON cache location (only cleaned up now)
 CACHE_DIR = os.path.join(DATA_DIR, "cache")
-CACHE_FILE = os.path.join(CACHE_DIR, "questions_cache.json")
-CACHE_MAX_AGE_HOURS = 24  # Cache valid for 24 hours
-MEMORY_CACHE_TTL = 300  # 5 minutes for memory cache
-
-# ------------------ PERFORMANCE OPTIMIZATIONS ------------------
-_questions_cache = {}
-_cache_timestamps = {}
-_cache_lock = threading.Lock()
-_last_preload_time = 0
-_preload_interval = 60  # Preload every 60 seconds if needed
-
-def _ensure_cache_dir():
-    """Ensure cache directory exists"""
-    if not os.path.exists(CACHE_DIR):
-        try:
-            os.makedirs(CACHE_DIR)
-        except OSError as e:
-            logger.error(f"Failed to create cache dir: {e}")
+VERSION_CHECK_INTERVAL = 1.0  # Seconds between question bank version checks
+MIN_AGE, MAX_AGE = 0, 120     # Age range covered by the precomputed index
 
-def _get_cache_key(age: Optional[int] = None) -> str:
-    """Generate cache key based on age filter"""
-    return f"questions_age_{age}" if age is not None else "questions_all"
+# (id, question_text, tooltip, min_age, max_age)
+QuestionRow = Tuple[int, str, Optional[str], int, int]
 
-def _is_cache_valid(cache_key: str) -> bool:
-    """Check if cache is still valid in memory"""
-    if cache_key not in _cache_timestamps:
-        return False
-    
-    cache_time = _cache_timestamps[cache_key]
-    return (time.time() - cache_time) < MEMORY_CACHE_TTL
+class QuestionBankCache:
+    """
+    Single in-memory copy of the active question bank.
 
-def safe_thread_run(func, *args, **kwargs):
-    """Wrapper to run a function safely in a thread with exception logging."""
-    def wrapper():
-        try:
-            func(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"Background thread error in {func.__name__}: {e}", exc_info=True)
-    
-    thread = threading.Thread(target=wrapper, daemon=True)
-    thread.start()
+    The cache is keyed by the question_bank_version counter, which DB
+    triggers bump on every insert/update/delete of question_bank (including
+    edits made by the admin scripts in another process). While the version
+    is unchanged, lookups are served from memory; the version itself is
+    re-read at most once per ``check_interval`` seconds.
 
-def _save_to_disk_cache(questions: List[Tuple[int, str, Optional[str]]], age: Optional[int] = None):
-    """Save questions to disk cache file"""
-    try:
-        _ensure_cache_dir()
-        cache_data = {
-            "timestamp": datetime.now().isoformat(),
-            "questions": questions,
-            "age_filter": age,
-            "count": len(questions)
-        }
-        cache_key = "questions" if age is None else f"questions_age_{age}"
-        cache_file = os.path.join(CACHE_DIR, f"{cache_key}.json")
-        
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=2)
-        logger.debug(f"Cached {len(questions)} questions to disk (age filter: {age})")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to save disk cache: {e}")
-        return False
+    Each rebuild also precomputes an age index: one bucket per age in
+    [MIN_AGE, MAX_AGE] holding positions into the bank list, so any age
+    is answered in O(1) without copying question text per age.
+    """
 
-def _load_from_disk_cache(age: Optional[int] = None):
-    """Load questions from disk cache if valid"""
-    try:
-        cache_key = "questions" if age is None else f"questions_age_{age}"
-        cache_file = os.path.join(CACHE_DIR, f"{cache_key}.json")
-        
-        if not os.path.exists(cache_file):
-            return None
-        
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
-        
-        # Check cache age
-        cache_time = datetime.fromisoformat(cache_data.get("timestamp", ""))
-        if datetime.now() - cache_time > timedelta(hours=CACHE_MAX_AGE_HOURS):
-            logger.debug("Disk cache expired")
-            return None
-        
-        # Validate age filter matches
-        if cache_data.get("age_filter") != age:
-            return None
-        
-        questions = [(int(q[0]), q[1], q[2], int(q[3]), int(q[4])) for q in cache_data["questions"]]
-        logger.debug(f"Loaded {len(questions)} questions from disk cache (age filter: {age})")
-        return questions
-    except Exception as e:
-        logger.error(f"Failed to load disk cache: {e}")
-        return None
+    def __init__(self, check_interval: float = VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._version: Optional[int] = None
+        self._questions: List[QuestionRow] = []
+        self._weights: List[float] = []
+        self._age_buckets: List[Tuple[int, ...]] = []
+        self._last_check = 0.0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "rebuilds": 0,
+            "version_checks": 0,
+            "last_rebuild_seconds": 0.0,
+        }
 
-@lru_cache(maxsize=8)  # Cache for different age filters
-def _get_cached_questions_from_db(age: Optional[int] = None) -> List[Tuple[int, str, Optional[str]]]:
-    """Get questions from database with LRU caching"""
-    # Using safe_db_context would be good, but LRU cache expects a return, 
-    # and context manager yields. We can use get_session() but wrap in try..finally properly 
-    # or rely on safe_db_context just for the query.
-    
-    # Since this function returns data and shouldn't commit, get_session is fine if we close it.
-    session = get_session()
-    try:
-        query = session.query(Question).filter(Question.is_active == 1)
+    def _refresh_if_stale(self) -> bool:
+        """Reload the bank if its version changed. Returns True on a rebuild."""
+        now = time.time()
+        if self._version is not None and now - self._last_check < self.check_interval:
+            return False
         
-        if age is not None:
-            query = query.filter(Question.min_age <= age, Question.max_age >= age)
+        session = get_session()
+        try:
+            row = session.query(QuestionBankVersion.version).filter(QuestionBankVersion.id == 1).first()
+            version = row[0] if row else 0
+            self._stats["version_checks"] += 1
+            self._last_check = now
+            if version == self._version:
+                return False
             
-        # Use optimized query with only needed columns
-        questions = query.with_entities(
-            Question.id, 
-            Question.question_text, 
-            Question.tooltip,
-            Question.min_age,
-            Question.max_age
-        ).order_by(Question.id).all()
+            start = time.perf_counter()
+            rows = session.query(
+                Question.id,
+                Question.question_text,
+                Question.tooltip,
+                Question.min_age,
+                Question.max_age,
+                Question.weight
+            ).filter(Question.is_active == 1).order_by(Question.id).all()
+        except Exception as e:
+            raise DatabaseError("Failed to fetch questions from DB.", original_exception=e)
+        finally:
+            session.close()
         
-        # Convert to list of tuples
-        rows = [(q.id, q.question_text, q.tooltip, q.min_age, q.max_age) for q in questions]
+        self._questions = [(q.id, q.question_text, q.tooltip, q.min_age, q.max_age) for q in rows]
+        self._weights = [1.0 if q.weight is None else float(q.weight) for q in rows]
+        self._age_buckets = _build_age_buckets(self._questions)
+        self._version = version
+        self._stats["rebuilds"] += 1
+        self._stats["last_rebuild_seconds"] = time.perf_counter() - start
+        logger.info(f"Loaded {len(self._questions)} questions from DB (bank version {version})")
+        return True
 
-        if not rows:
-            # We raise ResourceError here instead of Runtime for better classification
-            raise ResourceError("No questions found in database.")
-            
-        logger.info(f"Loaded {len(rows)} questions from DB (age filter: {age})")
-        return rows
-    except ResourceError:
-        raise
-    except Exception as e:
-        raise DatabaseError("Failed to fetch questions from DB.", original_exception=e)
-    finally:
-        session.close()
+    def _positions(self, age: Optional[int]) -> Sequence[int]:
+        """Bank positions of questions suitable for ``age``"""
+        if age is None:
+            return range(len(self._questions))
+        if MIN_AGE <= age <= MAX_AGE:
+            return self._age_buckets[age]
+        # Out-of-range ages are rare; fall back to a scan
+        return [
+            i for i, q in enumerate(self._questions)
+            if q[3] is not None and q[4] is not None and q[3] <= age <= q[4]
+        ]
 
-def _try_database_cache(session: Session, age: Optional[int] = None) -> List[Tuple[int, str, Optional[str]]]:
-    """Try to get questions from database cache table first"""
-    try:
-        query = session.query(QuestionCache).filter(QuestionCache.is_active == 1)
-        
-        cached = query.order_by(QuestionCache.question_id).all()
-        
-        if cached:
-            # Update access counts in background
-            def update_access_counts():
-                try:
-                    with safe_db_context() as update_session:
-                        # Need to re-query objects in new session or just execute update
-                        # safe_db_context yields a session
-                        # We can't use 'cached' objects directly easily as they are detached or from other session?
-                        # Actually 'cached' are from 'session' passed in arg. 
-                        # Background thread needs its own session.
-                        # Simplest is:
-                         for c in cached:
-                             # Just execute a raw update or fetch by ID
-                             pass 
-                             # This logic was a bit loose in original code. 
-                             # Let's keep it simple and safe.
-                             pass 
-                except Exception as e:
-                    logger.error(f"Failed to update access counts: {e}")
-            
-            # Use safe_thread_run, but we need to define the target func better
-            # For now keeping it simple as logic below is just a stub
-            
-            result = [(c.question_id, c.question_text, None) for c in cached]
-            logger.debug(f"Loaded {len(result)} questions from DB cache")
-            return result
-    except Exception as e:
-        logger.debug(f"Database cache not available: {e}")
-    
-    return None
+    def _lookup(self, age: Optional[int]) -> Sequence[int]:
+        rebuilt = self._refresh_if_stale()
+        self._stats["misses" if rebuilt else "hits"] += 1
+        return self._positions(age)
 
-def _preload_background(age: Optional[int] = None):
-    """Preload questions in background thread"""
-    def preload():
-        logger.debug(f"Background preloading questions (age filter: {age})")
-        
-        # Load from database (this might raise, but safe_thread_run will catch it)
-        questions = _get_cached_questions_from_db(age)
-        
-        # Update memory cache
-        cache_key = _get_cache_key(age)
-        with _cache_lock:
-            _questions_cache[cache_key] = questions
-            _cache_timestamps[cache_key] = time.time()
+    def get(self, age: Optional[int] = None) -> List[QuestionRow]:
+        """Active questions suitable for ``age`` (all of them if None)"""
+        with self._lock:
+            positions = self._lookup(age)
+            questions = self._questions
+        return [questions[i] for i in positions]
+
+    def count(self, age: Optional[int] = None) -> int:
+        with self._lock:
+            return len(self._lookup(age))
+
+    def sample(self, age: Optional[int], k: int, weighted: bool = True,
+               rng: Optional[random.Random] = None) -> List[QuestionRow]:
+        """
+        Pick ``k`` distinct questions for ``age``.
+        With ``weighted``, selection probability follows Question.weight
+        (Efraimidis-Spirakis keys: u ** (1 / weight), keep the k largest).
+        """
+        rng = rng or random
+        with self._lock:
+            positions = self._lookup(age)
+            questions, weights = self._questions, self._weights
         
-        # Save to disk cache in background
-        safe_thread_run(_save_to_disk_cache, questions, age)
+        if len(positions) < k:
+            raise ValueError("Not enough questions for this age")
         
-        logger.debug(f"Background preload completed: {len(questions)} questions")
-            
-    safe_thread_run(preload)
+        if not weighted:
+            chosen = rng.sample(list(positions), k)
+        else:
+            def key(i):
+                w = weights[i]
+                return rng.random() ** (1.0 / w) if w > 0 else -1.0
+            chosen = heapq.nlargest(k, positions, key=key)
+        return [questions[i] for i in chosen]
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def invalidate(self):
+        """Force a version check (and reload) on the next lookup"""
+        with self._lock:
+            self._version = None
+            self._questions = []
+            self._weights = []
+            self._age_buckets = []
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["version"] = self._version
+            snapshot["questions"] = len(self._questions)
+        return snapshot
+
+def _build_age_buckets(questions: List[QuestionRow]) -> List[Tuple[int, ...]]:
+    """Map every age in [MIN_AGE, MAX_AGE] to the bank positions covering it"""
+    buckets: List[List[int]] = [[] for _ in range(MAX_AGE + 1)]
+    for i, q in enumerate(questions):
+        min_age, max_age = q[3], q[4]
+        if min_age is None or max_age is None:
+            continue
+        for age in range(max(min_age, MIN_AGE), min(max_age, MAX_AGE) + 1):
+            buckets[age].append(i)
+    return [tuple(b) for b in buckets]
+
+_bank_cache = QuestionBankCache()
+
+def get_question_cache_stats() -> Dict[str, float]:
+    """Hit/miss/rebuild metrics for the question bank cache"""
+    return _bank_cache.stats()
 
 def _warmup_cache():
-    """Warm up cache on module import"""
-    global _last_preload_time
+    """Load the question bank into memory"""
+    _bank_cache.get(None)
+
+# Importing this module does no I/O. Callers that want the bank loaded
+# before the first load_questions() call use warmup().
+_warmer: Optional[ThreadPoolExecutor] = None
+_warmer_future: Optional[Future] = None
+_warmer_lock = threading.Lock()
+
+def warmup(background: bool = False) -> Optional[Future]:
+    """
+    Load the question bank into the cache.
+    With background=True the load runs on a single worker thread and the
+    returned Future can be awaited; repeated calls while a load is pending
+    reuse it instead of queueing another one.
+    """
+    global _warmer, _warmer_future
+    if not background:
+        _warmup_cache()
+        return None
     
-    current_time = time.time()
-    if current_time - _last_preload_time > _preload_interval:
-        _preload_background(None)  # Preload all questions
-        _last_preload_time = current_time
+    with _warmer_lock:
+        if _warmer_future is not None and not _warmer_future.done():
+            return _warmer_future
+        if _warmer is None:
+            _warmer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-warmer")
+        _warmer_future = _warmer.submit(_warmup_cache)
+        _warmer_future.add_done_callback(_log_warmup_failure)
+        return _warmer_future
+
+def _log_warmup_failure(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Background question warmup failed: {future.exception()}")
 
 def load_questions(
     age: Optional[int] = None,
     db_path: Optional[str] = None
-) -> List[Tuple[int, str, Optional[str]]]:
+) -> List[QuestionRow]:
     """
-    Load questions from DB using ORM with multi-level caching.
-    Returns list of (id, question_text, tooltip) tuples.
+    Load active questions, served from the versioned question bank cache.
+    Returns list of (id, question_text, tooltip, min_age, max_age) tuples.
     """
     # Backward compatibility
     if isinstance(age, str) and db_path is None:
@@ -232,64 +230,20 @@ def load_questions(
         except ValueError:
             age = None
     
-    cache_key = _get_cache_key(age)
-    
-    # 1. Check memory cache first
-    if _is_cache_valid(cache_key) and cache_key in _questions_cache:
-        logger.debug(f"Memory cache hit for {cache_key}")
-        return _questions_cache[cache_key]
-    
-    # 2. Check disk cache
-    with _cache_lock:
-        if _is_cache_valid(cache_key) and cache_key in _questions_cache:
-            return _questions_cache[cache_key]
-        
-        disk_cache = _load_from_disk_cache(age)
-        if disk_cache is not None:
-            _questions_cache[cache_key] = disk_cache
-            _cache_timestamps[cache_key] = time.time()
-            return disk_cache
-    
-    # 3. Try database cache table
-    session = get_session()
     try:
-        db_cache = _try_database_cache(session, age)
-        if db_cache is not None:
-            with _cache_lock:
-                _questions_cache[cache_key] = db_cache
-                _cache_timestamps[cache_key] = time.time()
-            
-            safe_thread_run(_save_to_disk_cache, db_cache, age)
-            return db_cache
-    finally:
-        session.close()
-    
-    # 4. Load from database (slowest)
-    logger.debug(f"Cache miss for {cache_key}, loading from database...")
-    start_time = time.time()
-    
-    try:
-        # Use LRU cached database function
-        questions = _get_cached_questions_from_db(age)
-        
-        # Update caches
-        with _cache_lock:
-            _questions_cache[cache_key] = questions
-            _cache_timestamps[cache_key] = time.time()
-        
-        safe_thread_run(_save_to_disk_cache, questions, age)
-        
-        load_time = time.time() - start_time
-        logger.info(f"Loaded {len(questions)} questions from DB in {load_time:.3f}s (age filter: {age})")
-        
-        return questions
-        
+        questions = _bank_cache.get(age)
     except Exception as e:
         logger.error(f"Failed to load questions: {e}")
         # Re-raise as ResourceError or DatabaseError
         if isinstance(e, (ResourceError, DatabaseError)):
             raise
         raise DatabaseError("Critical error loading questions.", original_exception=e)
+    
+    if not questions:
+        # We raise ResourceError here instead of Runtime for better classification
+        raise ResourceError("No questions found in database.")
+    
+    return list(questions)
 
 
 SATISFACTION_QUESTIONS = {
@@ -507,78 +461,22 @@ SATISFACTION_OPTIONS = {
 # ------------------ ADDITIONAL OPTIMIZATION FUNCTIONS ------------------
 
 def get_question_count(age: Optional[int] = None) -> int:
-    """Get count of active questions (optimized)"""
-    cache_key = f"count_age_{age}" if age is not None else "count_all"
-    
-    # Check statistics cache first
-    session = get_session()
+    """Get count of active questions (served from the question bank cache)"""
     try:
-        stat = session.query(StatisticsCache).filter(
-            StatisticsCache.stat_name == cache_key,
-            StatisticsCache.valid_until > datetime.now().isoformat()
-        ).first()
-        
-        if stat:
-            return int(stat.stat_value)
-    except Exception:
-        pass # Fallback to DB count
-    finally:
-        session.close()
-    
-    # Count from database
-    session = get_session()
-    try:
-        query = session.query(Question).filter(Question.is_active == 1)
-        
-        if age is not None:
-            query = query.filter(Question.min_age <= age, Question.max_age >= age)
-            
-        count = query.count()
-        
-        # Update cache in background
-        def update_cache():
-            try:
-                with safe_db_context() as update_session:
-                    cache_entry = StatisticsCache(
-                        stat_name=cache_key,
-                        stat_value=float(count),
-                        calculated_at=datetime.now().isoformat(),
-                        valid_until=(datetime.now() + timedelta(hours=1)).isoformat()
-                    )
-                    update_session.merge(cache_entry)
-            except Exception as e:
-                logger.error(f"Failed to update count cache: {e}")
-        
-        safe_thread_run(update_cache)
-        
-        return count
+        return _bank_cache.count(age)
     except Exception as e:
         logger.error(f"Failed to count questions: {e}")
         return 0
-    finally:
-        session.close()
 
 def preload_all_question_sets():
-    """Preload common question sets in background"""
-    common_ages = [None, 18, 25, 35, 50, 65]  # Common age filters
-    
-    for age in common_ages:
-        _preload_background(age)
+    """Preload the question bank (all ages share one cached copy)"""
+    warmup()
 
 def clear_all_caches():
     """Clear all caches"""
-    # Globals modified in this scope via clear/methods, but declaring them global 
-    # isn't strictly necessary if we are mutating the objects in place.
-    # However, flake8 complains they are unused in this function scope.
-    # We just access them.
-    
-    with _cache_lock:
-        _questions_cache.clear()
-        _cache_timestamps.clear()
-        
-    # Clear LRU cache
-    _get_cached_questions_from_db.cache_clear()
+    _bank_cache.invalidate()
     
+    # Remove files left by the old per-age disk cache
     try:
         if os.path.exists(CACHE_DIR):
             for file in os.listdir(CACHE_DIR):
@@ -599,13 +497,22 @@ def clear_all_caches():
     
     return True
 
-import random
+def sample_questions(user_age: Optional[int], num_questions: int, weighted: bool = True) -> List[QuestionRow]:
+    """
+    Randomized, non-repeating set of questions for one attempt, drawn
+    from the age index and weighted by Question.weight.
+    """
+    return _bank_cache.sample(user_age, num_questions, weighted=weighted)
 
 def get_random_questions_by_age(all_questions, user_age, num_questions):
     """
     Filters questions by min_age and max_age, returns randomized,
     non-repeating set of questions for one attempt.
+    Pass all_questions=None to sample straight from the cached age index.
     """
+    if all_questions is None:
+        return sample_questions(user_age, num_questions)
+    
     filtered_questions = [
         q for q in all_questions if q[3] <= user_age <= q[4]
     ]
@@ -617,9 +524,4 @@ def get_random_questions_by_age(all_questions, user_age, num_questions):
     return selected_questions
 
 
-# ------------------ INITIALIZATION ------------------
-_ensure_cache_dir()
-safe_thread_run(_warmup_cache)
-safe_thread_run(preload_all_question_sets)
-
 
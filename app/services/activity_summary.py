@@ -0,0 +1,63 @@
+"""
+Materialized per-user activity summary.
+
+``user_activity_summary`` keeps each user's attempt count, first/last
+attempt time and running score average. Triggers on ``scores`` recompute
+a user's row whenever one of their scores is inserted, updated or deleted
+(see app.models), so it also covers scores written outside finish_exam.
+Returning-user queries become an indexed range read on attempt_count
+instead of a GROUP BY over ``scores``.
+
+All functions take a raw DB-API cursor so they can share the caller's
+transaction.
+"""
+import logging
+from typing import Any, Dict, List
+
+from app.models import activity_summary_insert
+
+logger = logging.getLogger(__name__)
+
+def rebuild_activity_summary(cursor) -> int:
+    """Recompute every summary row from the scores table"""
+    cursor.execute("DELETE FROM user_activity_summary")
+    cursor.execute(activity_summary_insert("1"))
+    count = cursor.rowcount
+    logger.info(f"Rebuilt activity summary for {count} user(s)")
+    return count
+
+def ensure_activity_summary(cursor) -> bool:
+    """
+    Rebuild the summary when its attempt total no longer matches the
+    scores table: databases with scores from before the table or its
+    triggers existed. Both totals are single aggregate reads.
+    """
+    cursor.execute("SELECT COALESCE(SUM(attempt_count), 0) FROM user_activity_summary")
+    summarized = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM scores WHERE username IS NOT NULL AND username != ''")
+    if cursor.fetchone()[0] == summarized:
+        return False
+    rebuild_activity_summary(cursor)
+    return True
+
+def get_returning_users(cursor, min_attempts: int = 2) -> List[Dict[str, Any]]:
+    """Users with at least min_attempts attempts, most active first"""
+    cursor.execute(
+        """
+        SELECT username, attempt_count, first_attempt, last_attempt, avg_score
+        FROM user_activity_summary
+        WHERE attempt_count >= ?
+        ORDER BY attempt_count DESC, username
+        """,
+        (min_attempts,)
+    )
+    return [
+        {
+            "username": username,
+            "total_attempts": attempts,
+            "first_attempt_date": first_attempt,
+            "last_attempt_date": last_attempt,
+            "average_score": avg_score,
+        }
+        for username, attempts, first_attempt, last_attempt, avg_score in cursor.fetchall()
+    ]
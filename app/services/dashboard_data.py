@@ -0,0 +1,246 @@
+"""
+Cached per-user analytics snapshot for the dashboard.
+
+Every AnalyticsDashboard tab renders from one DashboardSnapshot: the user's
+scores, journal metrics and satisfaction surveys loaded in a single query
+batch and held as NumPy columns. Snapshots are keyed by the
+user_data_version counter, which triggers bump on every write to those
+tables, so a cached snapshot is reused until the user's data changes.
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.db import pooled_connection
+from app.models import JOURNAL_ROLLUP_METRICS
+from app.services.journal_rollup import get_journal_days
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_SIZE = 8  # Users whose snapshots are kept in memory
+
+SCORE_COLUMNS = ["id", "total_score", "sentiment_score", "age", "detailed_age_group",
+                 "timestamp", "is_outlier", "is_inconsistent_transition"]
+JOURNAL_COLUMNS = ["id", "entry_date", "sentiment_score", "emotional_patterns",
+                   "sleep_hours", "sleep_quality", "energy_level", "work_hours",
+                   "screen_time_mins", "stress_level"]
+# Added to journal_entries after release; older databases may lack them
+JOURNAL_WELLBEING_COLUMNS = ["sleep_hours", "sleep_quality", "energy_level", "work_hours",
+                             "screen_time_mins", "stress_level"]
+SATISFACTION_COLUMNS = ["id", "timestamp", "satisfaction_score", "positive_factors", "negative_factors"]
+
+# Row shapes handed to UserHistorySnapshot (see HISTORY_STREAMS)
+ScoreRow = namedtuple("ScoreRow", ["id", "total_score", "age", "detailed_age_group", "timestamp"])
+JournalRow = namedtuple("JournalRow", ["id", "sentiment_score", "entry_date", "emotional_patterns"])
+
+
+def _float_column(rows: List[tuple], index: int) -> np.ndarray:
+    """Column as float64, NULL -> NaN"""
+    return np.fromiter((np.nan if r[index] is None else r[index] for r in rows),
+                       dtype=float, count=len(rows))
+
+
+def _object_column(rows: List[tuple], index: int) -> np.ndarray:
+    column = np.empty(len(rows), dtype=object)
+    column[:] = [r[index] for r in rows]
+    return column
+
+
+def _factor_list(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return []
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+
+
+class DashboardSnapshot:
+    """
+    Columnar view of one user's analytics data at a given version.
+
+    Scores (rows with a total_score) and journal entries are ordered by
+    time then id; satisfaction surveys and journal days oldest first.
+    Missing numeric values are NaN.
+    """
+
+    def __init__(self, username: str, version: int, score_rows: List[tuple],
+                 journal_rows: List[tuple], satisfaction_rows: List[tuple],
+                 has_wellbeing_columns: bool = True, journal_days: Optional[Dict[str, Any]] = None):
+        self.username = username
+        self.version = version
+        self.has_wellbeing_columns = has_wellbeing_columns
+
+        self.score_ids = np.fromiter((r[0] for r in score_rows), dtype=np.int64, count=len(score_rows))
+        self.scores = np.fromiter((r[1] for r in score_rows), dtype=np.int64, count=len(score_rows))
+        self.score_sentiments = _float_column(score_rows, 2)
+        self.score_timestamps = _object_column(score_rows, 5)
+        self.score_is_outlier = np.fromiter((bool(r[6]) for r in score_rows), dtype=bool, count=len(score_rows))
+        self.score_is_inconsistent = np.fromiter((bool(r[7]) for r in score_rows), dtype=bool, count=len(score_rows))
+
+        self.journal_ids = np.fromiter((r[0] for r in journal_rows), dtype=np.int64, count=len(journal_rows))
+        self.journal_dates = _object_column(journal_rows, 1)
+        self.journal_sentiments = _float_column(journal_rows, 2)
+        self.journal_patterns = _object_column(journal_rows, 3)
+        self.sleep_hours = _float_column(journal_rows, 4)
+        self.sleep_quality = _float_column(journal_rows, 5)
+        self.energy_level = _float_column(journal_rows, 6)
+        self.work_hours = _float_column(journal_rows, 7)
+        self.screen_time_mins = _float_column(journal_rows, 8)
+        self.stress_level = _float_column(journal_rows, 9)
+
+        self.satisfaction_timestamps = _object_column(satisfaction_rows, 1)
+        self.satisfaction_scores = _float_column(satisfaction_rows, 2)
+        self.positive_factors = [_factor_list(r[3]) for r in satisfaction_rows]
+        self.negative_factors = [_factor_list(r[4]) for r in satisfaction_rows]
+
+        # Per-day journal averages from journal_daily_rollup
+        days = list((journal_days or {}).values())
+        self.journal_days = np.array([d.day for d in days], dtype=object)
+        self.daily_means = {
+            metric: np.fromiter((d.mean(metric, np.nan) for d in days), dtype=float, count=len(days))
+            for metric in JOURNAL_ROLLUP_METRICS
+        }
+
+        # Projected rows for the time-based analyses
+        self._history_rows = {
+            "scores": [ScoreRow(r[0], r[1], r[3], r[4], r[5]) for r in score_rows],
+            "journal_entries": [JournalRow(r[0], r[2], r[1], r[3]) for r in journal_rows],
+        }
+        self._history = None
+
+    @property
+    def score_count(self) -> int:
+        return len(self.scores)
+
+    @property
+    def journal_count(self) -> int:
+        return len(self.journal_ids)
+
+    @property
+    def score_flagged(self) -> np.ndarray:
+        """Attempts flagged as outliers or inconsistent transitions at exam time"""
+        return self.score_is_outlier | self.score_is_inconsistent
+
+    def daily_pairs(self, *metrics: str) -> List[np.ndarray]:
+        """Per-day means of metrics, keeping only the days where all of them were recorded"""
+        columns = [self.daily_means[m] for m in metrics]
+        recorded = np.logical_and.reduce([np.isfinite(c) for c in columns])
+        return [c[recorded] for c in columns]
+
+    def history(self):
+        """
+        UserHistorySnapshot pre-filled with this snapshot's scores and journal
+        entries. Built once, so its period rollups are shared by every tab.
+        """
+        if self._history is None:
+            from app.analysis.time_based_analysis import UserHistorySnapshot
+            history = UserHistorySnapshot(self.username)
+            for stream, rows in self._history_rows.items():
+                history.seed(stream, rows)
+            self._history = history
+        return self._history
+
+
+def get_user_data_version(cursor, username: str) -> int:
+    cursor.execute("SELECT version FROM user_data_version WHERE username = ?", (username,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+class DashboardDataService:
+    """
+    Process-wide cache of DashboardSnapshot objects, one per user, with LRU
+    eviction. Safe to call from several threads.
+    """
+
+    def __init__(self, cache_size: int = DASHBOARD_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, DashboardSnapshot]" = OrderedDict()
+        self._stats = {"hits": 0, "builds": 0}
+
+    def get_snapshot(self, username: str) -> DashboardSnapshot:
+        """Cached snapshot if the user's data version is unchanged, else a fresh one"""
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            version = get_user_data_version(cursor, username)
+            with self._lock:
+                cached = self._cache.get(username)
+                if cached is not None and cached.version == version:
+                    self._cache.move_to_end(username)
+                    self._stats["hits"] += 1
+                    return cached
+            snapshot = self._build(cursor, username)
+
+        with self._lock:
+            self._cache[username] = snapshot
+            self._cache.move_to_end(username)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._stats["builds"] += 1
+        return snapshot
+
+    def _build(self, cursor, username: str) -> DashboardSnapshot:
+        version = get_user_data_version(cursor, username)
+
+        cursor.execute(
+            f"SELECT {', '.join(SCORE_COLUMNS)} FROM scores "
+            "WHERE username = ? AND total_score IS NOT NULL ORDER BY timestamp, id",
+            (username,)
+        )
+        score_rows = cursor.fetchall()
+
+        cursor.execute("PRAGMA table_info(journal_entries)")
+        existing = {row[1] for row in cursor.fetchall()}
+        has_wellbeing_columns = all(c in existing for c in JOURNAL_WELLBEING_COLUMNS)
+        select = [c if c in existing else f"NULL AS {c}" for c in JOURNAL_COLUMNS]
+        cursor.execute(
+            f"SELECT {', '.join(select)} FROM journal_entries "
+            "WHERE username = ? ORDER BY entry_date, id",
+            (username,)
+        )
+        journal_rows = cursor.fetchall()
+
+        cursor.execute(
+            f"SELECT {', '.join(SATISFACTION_COLUMNS)} FROM satisfaction_records "
+            "WHERE username = ? ORDER BY timestamp, id",
+            (username,)
+        )
+        satisfaction_rows = cursor.fetchall()
+
+        journal_days = get_journal_days(cursor, username) if has_wellbeing_columns else None
+
+        logger.debug(f"Built dashboard snapshot for {username} (version {version})")
+        return DashboardSnapshot(username, version, score_rows, journal_rows,
+                                 satisfaction_rows, has_wellbeing_columns, journal_days)
+
+    def invalidate(self, username: Optional[str] = None):
+        """Drop one user's snapshot, or all of them"""
+        with self._lock:
+            if username is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(username, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, size=len(self._cache))
+
+
+_service: Optional[DashboardDataService] = None
+_service_lock = threading.Lock()
+
+
+def get_dashboard_data_service() -> DashboardDataService:
+    """Return the shared dashboard data service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = DashboardDataService()
+    return _service
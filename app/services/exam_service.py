@@ -1,20 +1,54 @@
+import os
+import json
+import hashlib
+import glob
 import time
+import uuid
+import threading
 import statistics
 import logging
 from datetime import datetime
-from typing import List, Tuple, Optional, Any
-from app.db import get_connection
+from typing import Dict, List, Tuple, Optional, Any
+from app.config import DATA_DIR
+from app.db import pooled_connection
 from app.models import Score
+from app.services.score_stats import detect_score_anomaly, get_score_stats, record_score
+from app.services.feature_store import update_user_features
+from app.services.sentiment import get_sentiment_service
 from app.exceptions import DatabaseError
 
-# Try importing NLTK sentiment analyzer
-try:
-    from nltk.sentiment import SentimentIntensityAnalyzer
-except ImportError:
-    SentimentIntensityAnalyzer = None
-
 logger = logging.getLogger(__name__)
 
+# Write-behind persistence for exam responses
+RESPONSE_FLUSH_THRESHOLD = 10    # Buffered answers that trigger an early flush
+RESPONSE_FLUSH_INTERVAL = 30.0   # Seconds before buffered answers are flushed anyway
+RESPONSE_JOURNAL_DIR = os.path.join(DATA_DIR, "exam_journal")
+# Journals untouched this long belong to a dead session (live ones flush on the timer)
+RESPONSE_JOURNAL_STALE_AFTER = 2 * RESPONSE_FLUSH_INTERVAL
+
+_INSERT_RESPONSE_SQL = """
+    INSERT INTO responses
+    (username, question_id, response_value, age_group, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_LINKED_RESPONSE_SQL = """
+    INSERT INTO responses
+    (username, question_id, response_value, age_group, timestamp, score_id, user_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Rows are identified by (username, question_id, timestamp) of the first save
+_UPDATE_RESPONSE_SQL = """
+    UPDATE responses SET response_value = ?
+    WHERE username = ? AND question_id = ? AND timestamp = ?
+"""
+
+_LINK_RESPONSE_SQL = """
+    UPDATE responses SET score_id = ?, user_id = ?
+    WHERE username = ? AND question_id = ? AND timestamp = ?
+"""
+
 class ExamSession:
     """
     Core engine for the Exam functionality.
@@ -22,7 +56,11 @@ class ExamSession:
     Decoupled from any specific UI (Tkinter/CLI).
     """
 
-    def __init__(self, username: str, age: int, age_group: str, questions: List[Tuple]):
+    def __init__(self, username: str, age: int, age_group: str, questions: List[Tuple],
+                 write_behind: bool = True,
+                 flush_threshold: int = RESPONSE_FLUSH_THRESHOLD,
+                 flush_interval: Optional[float] = RESPONSE_FLUSH_INTERVAL,
+                 journal_dir: Optional[str] = None):
         self.username = username
         self.age = age
         self.age_group = age_group
@@ -33,6 +71,19 @@ class ExamSession:
         self.responses: List[int] = []
         self.response_times: List[float] = []
         
+        # Response persistence
+        # write_behind=True buffers answers (plus a journal file) and writes
+        # them in one transaction; False writes each answer immediately.
+        self.write_behind = write_behind
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.journal_dir = journal_dir or RESPONSE_JOURNAL_DIR
+        self.session_id = uuid.uuid4().hex
+        self._pending: Dict[int, Tuple[int, int, str]] = {}    # index -> (question_id, value, timestamp)
+        self._persisted: Dict[int, Tuple[int, str]] = {}       # index -> (question_id, timestamp)
+        self._flush_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        
         # Timing
         self.question_start_time: Optional[float] = None
         
@@ -42,6 +93,8 @@ class ExamSession:
         self.reflection_text = ""
         self.is_rushed = False
         self.is_inconsistent = False
+        self.score_id: Optional[int] = None
+        self.score_flags: Dict[str, Any] = {}
 
     def start_exam(self):
         """Initialize or reset exam state"""
@@ -51,6 +104,9 @@ class ExamSession:
         self.score = 0
         self.sentiment_score = 0.0
         self.reflection_text = ""
+        self.score_id = None
+        self._reset_persistence()
+        recover_response_journals(self.username, self.journal_dir)
         self.start_question_timer()
         logger.info(f"Exam session started for user: {self.username}")
 
@@ -102,8 +158,8 @@ class ExamSession:
             self.responses.append(value)
             self.response_times.append(duration)
             
-        # Optional: Save individual response to DB here if real-time persistence is needed
-        # For simplicity, we save strict data at the end, but could add it here.
+        # Buffered (write-behind) or immediate, depending on session mode.
+        # Re-answers after go_back() update the existing row.
         self._save_response_to_db(value)
 
         # Advance
@@ -131,7 +187,8 @@ class ExamSession:
     def submit_reflection(self, text: str, analyzer: Any = None):
         """
         Analyze reflection text sentiment.
-        Accepts an external analyzer instance (dependency injection) or tries to load default.
+        Accepts an external analyzer instance (dependency injection) or uses
+        the shared sentiment service.
         """
         self.reflection_text = text.strip()
         
@@ -140,16 +197,11 @@ class ExamSession:
             return
 
         try:
-            # Use provided analyzer or default
-            sia = analyzer
-            if not sia and SentimentIntensityAnalyzer:
-                sia = SentimentIntensityAnalyzer()
-            
-            if sia:
-                scores = sia.polarity_scores(self.reflection_text)
+            if analyzer:
+                scores = analyzer.polarity_scores(self.reflection_text)
                 self.sentiment_score = scores['compound'] * 100
             else:
-                self.sentiment_score = 0.0
+                self.sentiment_score = get_sentiment_service().score(self.reflection_text)
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
             self.sentiment_score = 0.0
@@ -175,14 +227,10 @@ class ExamSession:
         # 3. Inconsistent (Historical) - Requires DB access
         # For pure service, we might skip this or inject DB dependency.
         # We'll implement a simple DB check here using our existing db module.
+        # Reads the precomputed last-N scores instead of scanning history.
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT total_score FROM scores WHERE username = ? ORDER BY timestamp DESC LIMIT 10", 
-                (self.username,)
-            )
-            past_scores = [row[0] for row in cursor.fetchall()]
+            with pooled_connection() as conn:
+                past_scores = get_score_stats(conn.cursor(), self.username)["recent"]
             if past_scores:
                 avg_past = statistics.mean(past_scores)
                 if avg_past > 0 and abs(self.score - avg_past) / avg_past > 0.2:
@@ -191,51 +239,267 @@ class ExamSession:
             logger.warning(f"Could not check historical consistency: {e}")
 
     def finish_exam(self) -> bool:
-        """Finalize exam, calculate scores, and save to DB."""
+        """
+        Finalize exam, calculate scores, and save to DB.
+        The score row and every response of the attempt are written in one
+        transaction, with responses linked to the score via score_id. The
+        derived stores are updated after it commits (see _update_derived_stores).
+        """
         self.calculate_metrics()
         
         timestamp = datetime.utcnow().isoformat()
         
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT INTO scores 
-                (username, age, total_score, sentiment_score, reflection_text, 
-                 is_rushed, is_inconsistent, timestamp, detailed_age_group) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (self.username, self.age, self.score, self.sentiment_score, 
-                 self.reflection_text, self.is_rushed, self.is_inconsistent, 
-                 timestamp, self.age_group)
-            )
-            conn.commit()
+            with self._flush_lock:
+                with pooled_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT id FROM users WHERE username = ?", (self.username,))
+                    row = cursor.fetchone()
+                    user_id = row[0] if row else None
+                    
+                    # Flag against the history before this attempt
+                    flags = detect_score_anomaly(get_score_stats(cursor, self.username), self.score)
+                    
+                    cursor.execute(
+                        """
+                        INSERT INTO scores 
+                        (username, age, total_score, sentiment_score, reflection_text, 
+                         is_rushed, is_inconsistent, timestamp, detailed_age_group, user_id,
+                         is_outlier, outlier_zscore, is_inconsistent_transition) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (self.username, self.age, self.score, self.sentiment_score, 
+                         self.reflection_text, self.is_rushed, self.is_inconsistent, 
+                         timestamp, self.age_group, user_id,
+                         flags["is_outlier"], flags["outlier_zscore"], flags["is_inconsistent_transition"])
+                    )
+                    score_id = cursor.lastrowid
+                    self._write_responses(cursor, score_id=score_id, user_id=user_id)
+                
+                self.score_id = score_id
+                self.score_flags = flags
+                self._mark_flushed()
             logger.info(f"Exam saved. Score: {self.score}, Sentiment: {self.sentiment_score}")
-            return True
         except Exception as e:
             logger.error(f"Failed to save exam results: {e}", exc_info=True)
             return False
+        
+        self._update_derived_stores(score_id, user_id)
+        return True
+
+    def _update_derived_stores(self, score_id: int, user_id: Optional[int]):
+        """
+        Fold a committed attempt into the rolling score stats and the
+        clustering feature store. Best-effort: each store gets its own
+        transaction, and a failure is logged without touching the saved
+        exam. Both stores notice rows they missed (score_stats by its
+        watermark, the feature store by last_score_id) and catch up later.
+        """
+        steps = (
+            ("score stats", lambda cursor: record_score(cursor, self.username, self.score, score_id, user_id)),
+            ("feature store", lambda cursor: update_user_features(cursor, self.username)),
+        )
+        for name, step in steps:
+            try:
+                with pooled_connection() as conn:
+                    step(conn.cursor())
+            except Exception as e:
+                logger.warning(f"Could not update {name} for score {score_id}: {e}", exc_info=True)
 
     def _save_response_to_db(self, answer_value: int):
-        """Helper to save single response"""
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
+        """Record the answer for the current question (buffered or immediate)"""
+        # Map index to correct ID if possible
+        q_data = self.questions[self.current_question_index]
+        q_id = q_data[0] if (isinstance(q_data, tuple) and isinstance(q_data[0], int)) else (self.current_question_index + 1)
+        
+        with self._flush_lock:
+            previous = self._persisted.get(self.current_question_index)
+            # Keep the original timestamp so an overwrite targets the same row
+            timestamp = previous[1] if previous else datetime.utcnow().isoformat()
+            self._pending[self.current_question_index] = (q_id, answer_value, timestamp)
             
-            # Map index to correct ID if possible
-            q_data = self.questions[self.current_question_index]
-            q_id = q_data[0] if (isinstance(q_data, tuple) and isinstance(q_data[0], int)) else (self.current_question_index + 1)
+            if self.write_behind:
+                self._append_journal(self.current_question_index, q_id, answer_value, timestamp)
+                if len(self._pending) >= self.flush_threshold:
+                    self._safe_flush()
+                else:
+                    self._schedule_flush()
+            else:
+                self._safe_flush()
+
+    # ==================== WRITE-BEHIND PERSISTENCE ====================
+
+    def flush_responses(self) -> int:
+        """
+        Write all buffered responses in a single transaction.
+        New answers are inserted, re-answers update their existing row.
+        Returns the number of responses written.
+        """
+        with self._flush_lock:
+            if not self._pending:
+                return 0
+            
+            with pooled_connection() as conn:
+                self._write_responses(conn.cursor())
             
-            cursor.execute(
-                """
-                INSERT INTO responses
-                (username, question_id, response_value, age_group, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (self.username, q_id, answer_value, self.age_group, datetime.utcnow().isoformat())
-            )
-            conn.commit()
+            written = self._mark_flushed()
+            logger.debug(f"Flushed {written} responses for {self.username}")
+            return written
+
+    def _write_responses(self, cursor, score_id: Optional[int] = None, user_id: Optional[int] = None):
+        """
+        Write buffered responses on the caller's cursor (no commit).
+        When score_id is given, every response of this attempt (including
+        ones flushed earlier) is linked to that score row.
+        """
+        inserts, updates = [], []
+        for index, (q_id, value, timestamp) in self._pending.items():
+            if index in self._persisted:
+                updates.append((value, self.username, q_id, timestamp))
+            elif score_id is not None:
+                inserts.append((self.username, q_id, value, self.age_group, timestamp, score_id, user_id))
+            else:
+                inserts.append((self.username, q_id, value, self.age_group, timestamp))
+        
+        if inserts:
+            sql = _INSERT_LINKED_RESPONSE_SQL if score_id is not None else _INSERT_RESPONSE_SQL
+            cursor.executemany(sql, inserts)
+        if updates:
+            cursor.executemany(_UPDATE_RESPONSE_SQL, updates)
+        if score_id is not None and self._persisted:
+            cursor.executemany(_LINK_RESPONSE_SQL, [
+                (score_id, user_id, self.username, q_id, timestamp)
+                for q_id, timestamp in self._persisted.values()
+            ])
+
+    def _mark_flushed(self) -> int:
+        """Move pending responses to persisted after a committed write"""
+        written = len(self._pending)
+        for index, (q_id, _value, timestamp) in self._pending.items():
+            self._persisted[index] = (q_id, timestamp)
+        self._pending.clear()
+        self._cancel_flush_timer()
+        self._remove_journal()
+        return written
+
+    def _safe_flush(self):
+        """Flush without raising; failed writes stay buffered (and journaled)"""
+        try:
+            self.flush_responses()
         except Exception as e:
             logger.error(f"Failed to save response: {e}")
+
+    def _schedule_flush(self):
+        """Start the flush timer if one isn't already pending"""
+        if not self.flush_interval or self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(self.flush_interval, self._on_flush_timer)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _on_flush_timer(self):
+        with self._flush_lock:
+            self._flush_timer = None
+            self._safe_flush()
+
+    def _cancel_flush_timer(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _reset_persistence(self):
+        """Drop buffered state and start a fresh journal for a new attempt"""
+        with self._flush_lock:
+            self._cancel_flush_timer()
+            self._pending.clear()
+            self._persisted.clear()
+            self.session_id = uuid.uuid4().hex
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.journal_dir, f"{_journal_prefix(self.username)}{self.session_id}.jsonl")
+
+    def _append_journal(self, index: int, q_id: int, value: int, timestamp: str):
+        """Append a buffered answer to the crash-recovery journal"""
+        record = {
+            "index": index,
+            "username": self.username,
+            "question_id": q_id,
+            "response_value": value,
+            "age_group": self.age_group,
+            "timestamp": timestamp,
+        }
+        try:
+            os.makedirs(self.journal_dir, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+        except OSError as e:
+            logger.warning(f"Could not write response journal: {e}")
+
+    def _remove_journal(self):
+        try:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        except OSError as e:
+            logger.warning(f"Could not remove response journal: {e}")
+
+
+def _journal_prefix(username: str) -> str:
+    """Filesystem-safe, unambiguous journal file prefix for a user"""
+    return hashlib.sha1((username or "").encode("utf-8")).hexdigest()[:16] + "-"
+
+def recover_response_journals(username: Optional[str] = None, journal_dir: Optional[str] = None,
+                              stale_after: float = RESPONSE_JOURNAL_STALE_AFTER) -> int:
+    """
+    Replay journals left behind by sessions that never flushed (e.g. a crash).
+    Only journals older than ``stale_after`` seconds are touched, so live
+    sessions are left alone. Safe to run repeatedly: rows already in the DB
+    are updated, not duplicated. Returns the number of responses recovered.
+    """
+    journal_dir = journal_dir or RESPONSE_JOURNAL_DIR
+    pattern = f"{_journal_prefix(username)}*.jsonl" if username else "*.jsonl"
+    paths = glob.glob(os.path.join(journal_dir, pattern))
+    if not paths:
+        return 0
+    
+    recovered = 0
+    now = time.time()
+    for path in paths:
+        try:
+            if now - os.path.getmtime(path) < stale_after:
+                continue
+        except OSError:
+            continue
+        
+        latest: Dict[Any, Dict[str, Any]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from a crash mid-write
+                    latest[record["index"]] = record
+            
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                for record in latest.values():
+                    cursor.execute(
+                        _UPDATE_RESPONSE_SQL,
+                        (record["response_value"], record["username"], record["question_id"], record["timestamp"])
+                    )
+                    if cursor.rowcount == 0:
+                        cursor.execute(
+                            _INSERT_RESPONSE_SQL,
+                            (record["username"], record["question_id"], record["response_value"],
+                             record["age_group"], record["timestamp"])
+                        )
+            os.remove(path)
+            recovered += len(latest)
+        except (OSError, KeyError, DatabaseError) as e:
+            logger.warning(f"Could not recover response journal {path}: {e}")
+    
+    if recovered:
+        logger.info(f"Recovered {recovered} journaled responses")
+    return recovered
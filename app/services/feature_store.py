@@ -0,0 +1,174 @@
+"""
+Incremental per-user feature accumulators for emotional-profile clustering.
+
+Each ``user_feature_store`` row holds running counts, sums and sums of
+squares of a user's scores, sentiments and responses, plus the sum of
+position * score that gives the trend regression. New rows are folded in
+past the row's watermark (last_score_id / last_response_id), so keeping a
+user current costs only the rows added since the last update.
+
+A score's position in the trend regression is its rank by (timestamp, id)
+within the user's scores, the order the raw extraction path and the
+dashboard use. New rows usually sort last; when one sorts before an
+already folded score (imported or backfilled history), positions shift
+and the user is rebuilt from scratch instead.
+
+Rows whose ``version`` differs from FEATURE_STORE_VERSION are recomputed
+from scratch; bump it whenever the accumulator layout or meaning changes
+and run ``python -m app.ml.clustering --rebuild-features``. Triggers on
+scores and responses set it to 0 when an already folded row may have been
+updated or deleted (see app.models), so edits such as
+scripts/rescore_sentiment.py are picked up too.
+
+All functions take a raw DB-API cursor so they can share the caller's
+transaction (see ExamSession.finish_exam).
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FEATURE_STORE_VERSION = 1
+
+ACCUMULATOR_COLUMNS = [
+    "score_count", "total_n", "total_sum", "total_sumsq", "total_xy", "total_min", "total_max",
+    "sentiment_n", "sentiment_sum", "sentiment_sumsq",
+    "response_count", "response_n", "response_sum", "response_sumsq",
+    "last_score_id", "last_response_id",
+]
+
+def _empty_accumulators() -> Dict[str, Any]:
+    acc = {name: 0 for name in ACCUMULATOR_COLUMNS}
+    acc["total_min"] = acc["total_max"] = None
+    return acc
+
+def _load(cursor, username: str) -> Optional[Dict[str, Any]]:
+    cursor.execute(
+        f"SELECT version, {', '.join(ACCUMULATOR_COLUMNS)} FROM user_feature_store WHERE username = ?",
+        (username,)
+    )
+    row = cursor.fetchone()
+    if row is None or row[0] != FEATURE_STORE_VERSION:
+        return None
+    return dict(zip(ACCUMULATOR_COLUMNS, row[1:]))
+
+def _backdated(cursor, username: str, acc: Dict[str, Any], first_timestamp) -> bool:
+    """Whether a folded score sorts after first_timestamp (NULLs sort first, as in ORDER BY)"""
+    cursor.execute(
+        "SELECT 1 FROM scores WHERE username = ? AND id <= ? "
+        "AND COALESCE(timestamp, '') > COALESCE(?, '') LIMIT 1",
+        (username, acc["last_score_id"], first_timestamp)
+    )
+    return cursor.fetchone() is not None
+
+def _fold(cursor, username: str, acc: Dict[str, Any]) -> bool:
+    """Fold scores/responses past the watermark into acc. Returns True if anything changed."""
+    cursor.execute(
+        "SELECT id, total_score, sentiment_score, timestamp FROM scores "
+        "WHERE username = ? AND id > ? ORDER BY timestamp, id",
+        (username, acc["last_score_id"])
+    )
+    score_rows = cursor.fetchall()
+    if score_rows and acc["score_count"] and _backdated(cursor, username, acc, score_rows[0][3]):
+        acc.update(_empty_accumulators())
+        return _fold(cursor, username, acc)
+    cursor.execute(
+        "SELECT id, response_value FROM responses WHERE username = ? AND id > ?",
+        (username, acc["last_response_id"])
+    )
+    response_rows = cursor.fetchall()
+
+    for score_id, total, sentiment, _timestamp in score_rows:
+        acc["score_count"] += 1
+        acc["last_score_id"] = max(acc["last_score_id"], score_id)
+        if total is not None:
+            position = acc["total_n"]  # Index of this score in the user's history
+            acc["total_n"] += 1
+            acc["total_sum"] += total
+            acc["total_sumsq"] += total * total
+            acc["total_xy"] += position * total
+            acc["total_min"] = total if acc["total_min"] is None else min(acc["total_min"], total)
+            acc["total_max"] = total if acc["total_max"] is None else max(acc["total_max"], total)
+        if sentiment is not None:
+            acc["sentiment_n"] += 1
+            acc["sentiment_sum"] += sentiment
+            acc["sentiment_sumsq"] += sentiment * sentiment
+
+    for response_id, value in response_rows:
+        acc["response_count"] += 1
+        acc["last_response_id"] = max(acc["last_response_id"], response_id)
+        if value is not None:
+            acc["response_n"] += 1
+            acc["response_sum"] += value
+            acc["response_sumsq"] += value * value
+
+    return bool(score_rows or response_rows)
+
+def _store(cursor, username: str, acc: Dict[str, Any]):
+    columns = ["username", "version"] + ACCUMULATOR_COLUMNS + ["updated_at"]
+    values = [username, FEATURE_STORE_VERSION] + [acc[name] for name in ACCUMULATOR_COLUMNS]
+    values.append(datetime.utcnow().isoformat())
+    cursor.execute(
+        f"INSERT OR REPLACE INTO user_feature_store ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        values
+    )
+
+def update_user_features(cursor, username: str) -> Dict[str, Any]:
+    """
+    Bring one user's accumulators up to date.
+    Call after inserting scores/responses, on the same cursor/transaction.
+    Missing or outdated-version rows are rebuilt from the full history.
+    """
+    acc = _load(cursor, username)
+    if acc is None:
+        acc = _empty_accumulators()
+        _fold(cursor, username, acc)
+        _store(cursor, username, acc)
+    elif _fold(cursor, username, acc):
+        _store(cursor, username, acc)
+    return acc
+
+def get_stale_usernames(cursor) -> List[str]:
+    """Users with scores or responses past their watermark, or no current row"""
+    cursor.execute(
+        """
+        SELECT DISTINCT s.username FROM scores s
+        LEFT JOIN user_feature_store f ON f.username = s.username
+        WHERE s.username IS NOT NULL AND s.username != ''
+          AND (f.username IS NULL OR f.version != ? OR s.id > f.last_score_id)
+        UNION
+        SELECT DISTINCT r.username FROM responses r
+        JOIN user_feature_store f ON f.username = r.username
+        WHERE r.id > f.last_response_id
+        """,
+        (FEATURE_STORE_VERSION,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def refresh_stale_features(cursor) -> int:
+    """Catch up every stale user; returns how many were updated"""
+    usernames = get_stale_usernames(cursor)
+    for name in usernames:
+        update_user_features(cursor, name)
+    if usernames:
+        logger.info(f"Refreshed stored features for {len(usernames)} user(s)")
+    return len(usernames)
+
+def rebuild_feature_store(cursor, username: Optional[str] = None) -> int:
+    """Drop and recompute accumulators for one user or everyone"""
+    if username:
+        cursor.execute("DELETE FROM user_feature_store WHERE username = ?", (username,))
+        usernames = [username]
+    else:
+        cursor.execute("DELETE FROM user_feature_store")
+        cursor.execute("SELECT DISTINCT username FROM scores WHERE username IS NOT NULL AND username != ''")
+        usernames = [row[0] for row in cursor.fetchall()]
+
+    for name in usernames:
+        acc = _empty_accumulators()
+        _fold(cursor, name, acc)
+        _store(cursor, name, acc)
+    logger.info(f"Rebuilt feature store for {len(usernames)} user(s)")
+    return len(usernames)
@@ -0,0 +1,123 @@
+"""
+Per-day journal metric rollups.
+
+``journal_daily_rollup`` holds, per user and day, the entry count and the
+sum, count, min and max of each metric in JOURNAL_ROLLUP_METRICS, plus
+how many of its values were not 0. Triggers
+on journal_entries keep it current (see app.models), so weekly and monthly
+views and health insights are a primary-key range read instead of a scan
+of journal_entries.
+
+All functions take a raw DB-API cursor so they can share the caller's
+transaction.
+"""
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from app.analysis.downsampling import PeriodRollup, period_key
+from app.models import JOURNAL_ROLLUP_METRICS, journal_rollup_insert
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLUMNS = ["day", "entry_count"] + [
+    f"{m}_{stat}" for m in JOURNAL_ROLLUP_METRICS for stat in ("sum", "count", "min", "max", "nonzero")
+]
+
+
+class JournalDay:
+    """One user's journal metrics for one day"""
+
+    def __init__(self, day: str, entry_count: int, metrics: Dict[str, PeriodRollup],
+                 nonzero: Optional[Dict[str, int]] = None):
+        self.day = day
+        self.entry_count = entry_count
+        self.metrics = metrics
+        self.nonzero = nonzero or {}
+
+    @classmethod
+    def from_row(cls, row) -> "JournalDay":
+        metrics, nonzero = {}, {}
+        for i, metric in enumerate(JOURNAL_ROLLUP_METRICS):
+            total, count, low, high, nonzero_count = row[2 + 5 * i: 7 + 5 * i]
+            metrics[metric] = PeriodRollup(count, total or 0, low, high)
+            nonzero[metric] = nonzero_count or 0
+        return cls(row[0], row[1], metrics, nonzero)
+
+    def mean(self, metric: str, default=None):
+        """Day's average of a metric, or default if it was never recorded that day"""
+        value = self.metrics[metric].mean
+        return default if value is None else value
+
+
+def rebuild_journal_rollup(cursor) -> int:
+    """Recompute every rollup row from journal_entries"""
+    cursor.execute("DELETE FROM journal_daily_rollup")
+    cursor.execute(journal_rollup_insert("username IS NOT NULL AND entry_date IS NOT NULL"))
+    count = cursor.rowcount
+    logger.info(f"Rebuilt journal daily rollup ({count} user-days)")
+    return count
+
+
+def ensure_journal_rollup(cursor) -> bool:
+    """
+    Add the (username, entry_date) index and build the rollup once for
+    databases with journal entries from before the table existed, or with
+    rows from before the _nonzero counts.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_journal_user_date ON journal_entries (username, entry_date)")
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM journal_daily_rollup WHERE sleep_hours_nonzero IS NULL)")
+    if cursor.fetchone()[0]:
+        rebuild_journal_rollup(cursor)
+        return True
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM journal_daily_rollup)")
+    if cursor.fetchone()[0]:
+        return False
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM journal_entries WHERE username IS NOT NULL)")
+    if not cursor.fetchone()[0]:
+        return False
+    rebuild_journal_rollup(cursor)
+    return True
+
+
+def get_journal_days(cursor, username: str, start_day: Optional[str] = None,
+                     end_day: Optional[str] = None) -> "OrderedDict[str, JournalDay]":
+    """Rollups for username's days between start_day and end_day inclusive ('YYYY-MM-DD'), oldest first"""
+    query = f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM journal_daily_rollup WHERE username = ?"
+    params = [username]
+    if start_day:
+        query += " AND day >= ?"
+        params.append(start_day)
+    if end_day:
+        query += " AND day <= ?"
+        params.append(end_day)
+    cursor.execute(query + " ORDER BY day", params)
+    return OrderedDict((row[0], JournalDay.from_row(row)) for row in cursor.fetchall())
+
+
+def combine_days(days: Iterable[JournalDay]) -> Dict[str, PeriodRollup]:
+    """Merge several days into one rollup per metric (e.g. for a range average)"""
+    combined = {metric: PeriodRollup() for metric in JOURNAL_ROLLUP_METRICS}
+    for day in days:
+        for metric, rollup in day.metrics.items():
+            combined[metric].merge(rollup)
+    return combined
+
+
+def nonzero_mean(days: Iterable[JournalDay], metric: str) -> Optional[float]:
+    """Average of a metric over several days, skipping 0 values (None if there are none)"""
+    total = count = 0
+    for day in days:
+        total += day.metrics[metric].total
+        count += day.nonzero.get(metric, 0)
+    return total / count if count else None
+
+
+def group_days(days: Iterable[JournalDay], period: str = "weekly") -> "OrderedDict[str, Dict[str, PeriodRollup]]":
+    """Combine days into weekly or monthly per-metric rollups, keyed like get_time_period_stats"""
+    grouped: Dict[str, list] = {}
+    for day in days:
+        key = period_key(datetime.strptime(day.day, "%Y-%m-%d"), period)
+        grouped.setdefault(key, []).append(day)
+    return OrderedDict((key, combine_days(grouped[key])) for key in sorted(grouped))
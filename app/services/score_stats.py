@@ -0,0 +1,234 @@
+"""
+Rolling per-user score statistics.
+
+Each finished exam folds its score into the user's ``user_score_stats``
+row (Welford running mean/M2 plus a ring buffer of the last N scores), so
+consistency checks and history summaries are a primary-key lookup
+instead of a scan over ``scores``.
+
+The same state flags each new score online, against the history before
+it: ``is_outlier`` (z-score vs the running mean/std) and
+``is_inconsistent_transition`` (change from the previous score vs the
+recent-diff window). Flags are stored on the score row; NULL means the
+row predates flagging and is filled in by refresh_score_stats().
+
+Standard deviations are population ones (divide by n), like
+OutlierDetector's np.std, so a stored flag agrees with running
+detect_outliers_zscore over the same prior history.
+
+Reads return the stored row as is. Triggers on scores drop a user's row
+when one of their scores is updated or deleted (see app.models), and the
+next read recomputes it from the scores table. Scores inserted outside
+finish_exam (synthetic data, raw SQL) are caught up by
+refresh_score_stats(), which init runs with the other backfills when the
+schema version changes or on init(force=True).
+
+All functions take a raw DB-API cursor so they can share the caller's
+transaction (see ExamSession.finish_exam).
+"""
+import json
+import math
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RECENT_SCORES_WINDOW = 10
+OUTLIER_Z_THRESHOLD = 2.5  # Same default as OutlierDetector
+MIN_RECENT_DIFFS = 3       # Transitions needed before changes are judged
+
+def _welford(count: int, mean: float, m2: float, value: float):
+    """Fold one value into running (count, mean, M2)"""
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return count, mean, m2
+
+def _to_stats(username: str, count: int, mean: float, m2: float,
+              recent: List[float], last_score_id: Optional[int]) -> Dict[str, Any]:
+    variance = m2 / count if count > 1 else 0.0  # Population variance, as in OutlierDetector
+    return {
+        "username": username,
+        "count": count,
+        "mean": mean,
+        "m2": m2,
+        "variance": variance,
+        "std_dev": math.sqrt(variance),
+        "recent": recent,
+        "last_score": recent[-1] if recent else None,
+        "previous_score": recent[-2] if len(recent) > 1 else None,
+        "last_score_id": last_score_id,
+    }
+
+def detect_score_anomaly(stats: Dict[str, Any], score: float,
+                         threshold: float = OUTLIER_Z_THRESHOLD) -> Dict[str, Any]:
+    """
+    Flag a new score against the user's stats from before it (no DB access).
+    A transition is inconsistent when the change from the previous score
+    exceeds mean + 2*std of the absolute changes in the recent window.
+    """
+    zscore = None
+    if stats["count"] >= 2 and stats["std_dev"] > 0:
+        zscore = (score - stats["mean"]) / stats["std_dev"]
+    
+    recent = stats["recent"]
+    change = score - recent[-1] if recent else None
+    diffs = [abs(b - a) for a, b in zip(recent, recent[1:])]
+    is_inconsistent_transition = False
+    if change is not None and len(diffs) >= MIN_RECENT_DIFFS:
+        mean_diff = sum(diffs) / len(diffs)
+        std_diff = math.sqrt(sum((d - mean_diff) ** 2 for d in diffs) / len(diffs))
+        is_inconsistent_transition = abs(change) > mean_diff + 2 * std_diff
+    
+    return {
+        "is_outlier": zscore is not None and abs(zscore) > threshold,
+        "outlier_zscore": zscore,
+        "is_inconsistent_transition": is_inconsistent_transition,
+        "change": change,
+    }
+
+def _scored_filter(username: str, exclude_score_id: Optional[int]):
+    query = " FROM scores WHERE username = ? AND total_score IS NOT NULL"
+    params: List[Any] = [username]
+    if exclude_score_id is not None:
+        query += " AND id != ?"
+        params.append(exclude_score_id)
+    return query, params
+
+def _seed_stats(cursor, username: str, exclude_score_id: Optional[int] = None,
+                write_flags: bool = False, store: bool = True) -> Dict[str, Any]:
+    """
+    Build a user's stats from the scores table, storing them unless store
+    is False. With write_flags, every score's anomaly flags are recomputed
+    on the way.
+    """
+    query, params = _scored_filter(username, exclude_score_id)
+    cursor.execute("SELECT id, total_score, user_id" + query + " ORDER BY timestamp, id", params)
+    
+    count, mean, m2 = 0, 0.0, 0.0
+    recent: List[float] = []
+    last_score_id = user_id = None
+    flag_rows = []
+    for score_id, total_score, row_user_id in cursor.fetchall():
+        if write_flags:
+            flags = detect_score_anomaly(_to_stats(username, count, mean, m2, recent, last_score_id), total_score)
+            flag_rows.append((flags["is_outlier"], flags["outlier_zscore"],
+                              flags["is_inconsistent_transition"], score_id))
+        count, mean, m2 = _welford(count, mean, m2, total_score)
+        recent = (recent + [total_score])[-RECENT_SCORES_WINDOW:]
+        last_score_id = max(last_score_id or 0, score_id)  # Watermark, not the latest by time
+        user_id = row_user_id or user_id
+    
+    if not store:
+        return _to_stats(username, count, mean, m2, recent, last_score_id)
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO user_score_stats
+        (username, user_id, attempt_count, mean_score, m2, recent_scores, last_score_id, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (username, user_id, count, mean, m2, json.dumps(recent), last_score_id, datetime.utcnow().isoformat())
+    )
+    if flag_rows:
+        cursor.executemany(
+            "UPDATE scores SET is_outlier = ?, outlier_zscore = ?, is_inconsistent_transition = ? WHERE id = ?",
+            flag_rows
+        )
+    return _to_stats(username, count, mean, m2, recent, last_score_id)
+
+def get_score_stats(cursor, username: str, exclude_score_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Return a user's rolling score statistics (read-only): one primary-key
+    lookup. Users without a stats row (history from before this table, or
+    a row dropped by the invalidation triggers), or whose row already holds
+    exclude_score_id, are recomputed from their scores without writing.
+    """
+    cursor.execute(
+        "SELECT attempt_count, mean_score, m2, recent_scores, last_score_id FROM user_score_stats WHERE username = ?",
+        (username,)
+    )
+    row = cursor.fetchone()
+    if row is None or (exclude_score_id is not None and row[4] == exclude_score_id):
+        return _seed_stats(cursor, username, exclude_score_id, store=False)
+    
+    count, mean, m2, recent_json, last_score_id = row
+    try:
+        recent = json.loads(recent_json or "[]")
+    except (TypeError, ValueError):
+        recent = []
+    return _to_stats(username, count, mean, m2, recent, last_score_id)
+
+def record_score(cursor, username: str, score: float, score_id: Optional[int] = None,
+                 user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fold a newly inserted score into the user's stats.
+    Call after inserting the score row, on the same cursor/transaction.
+    """
+    stats = get_score_stats(cursor, username, exclude_score_id=score_id)
+    count, mean, m2 = _welford(stats["count"], stats["mean"], stats["m2"], score)
+    recent = (stats["recent"] + [score])[-RECENT_SCORES_WINDOW:]
+    
+    cursor.execute(
+        """
+        INSERT INTO user_score_stats
+        (username, user_id, attempt_count, mean_score, m2, recent_scores, last_score_id, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(username) DO UPDATE SET
+            attempt_count = excluded.attempt_count, mean_score = excluded.mean_score,
+            m2 = excluded.m2, recent_scores = excluded.recent_scores,
+            last_score_id = excluded.last_score_id,
+            user_id = COALESCE(excluded.user_id, user_id), updated_at = excluded.updated_at
+        """,
+        (username, user_id, count, mean, m2, json.dumps(recent), score_id, datetime.utcnow().isoformat())
+    )
+    return _to_stats(username, count, mean, m2, recent, score_id)
+
+def rebuild_score_stats(cursor, username: Optional[str] = None) -> int:
+    """Recompute stats and score flags from the scores table for one user or everyone"""
+    if username:
+        usernames = [username]
+    else:
+        cursor.execute("SELECT DISTINCT username FROM scores WHERE username IS NOT NULL")
+        usernames = [row[0] for row in cursor.fetchall()]
+    
+    for name in usernames:
+        _seed_stats(cursor, name, write_flags=True)
+    logger.info(f"Rebuilt score stats for {len(usernames)} user(s)")
+    return len(usernames)
+
+def refresh_score_stats(cursor) -> int:
+    """
+    Rebuild the stats rows and score flags of every user whose row is
+    missing, no longer matches the scores table, or who has unflagged
+    scores; drop rows of users with no scores left. One grouped pass over
+    scores finds them. Returns the number of users rebuilt.
+    """
+    cursor.execute(
+        """
+        SELECT s.username FROM (
+            SELECT username, COUNT(*) AS scored, MAX(id) AS max_id, SUM(total_score) AS total,
+                   SUM(is_outlier IS NULL) AS unflagged
+            FROM scores WHERE username IS NOT NULL AND total_score IS NOT NULL
+            GROUP BY username
+        ) s
+        LEFT JOIN user_score_stats t ON t.username = s.username
+        WHERE t.username IS NULL OR s.unflagged > 0 OR t.attempt_count != s.scored
+           OR t.last_score_id IS NOT s.max_id
+           OR ABS(t.mean_score * t.attempt_count - s.total) > 1e-6 * MAX(1.0, ABS(s.total))
+        """
+    )
+    usernames = [row[0] for row in cursor.fetchall()]
+    for name in usernames:
+        _seed_stats(cursor, name, write_flags=True)
+    cursor.execute(
+        """
+        DELETE FROM user_score_stats WHERE username NOT IN (
+            SELECT username FROM scores WHERE username IS NOT NULL AND total_score IS NOT NULL
+        )
+        """
+    )
+    if usernames:
+        logger.info(f"Refreshed stale score stats for {len(usernames)} user(s)")
+    return len(usernames)
@@ -0,0 +1,155 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_CACHE_SIZE = 1024  # Distinct normalized texts kept in the LRU
+
+# Keyword fallback used when NLTK/VADER is unavailable
+POSITIVE_WORDS = ['happy', 'joy', 'excited', 'grateful', 'peaceful', 'confident']
+NEGATIVE_WORDS = ['sad', 'angry', 'frustrated', 'anxious', 'worried', 'stressed']
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace; case is kept because VADER scores capitals"""
+    return " ".join(text.split())
+
+
+def keyword_score(text: str) -> float:
+    """Simple keyword matching score in [-100, 100]"""
+    text_lower = text.lower()
+    positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+    negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+
+    total_words = len(text.split())
+    if total_words == 0:
+        return 0.0
+
+    score = (positive_count - negative_count) / max(total_words, 1) * 100
+    return max(-100, min(100, score))
+
+
+class SentimentService:
+    """
+    Process-wide sentiment scorer.
+
+    The VADER lexicon is loaded once, on first use. Scores are in [-100, 100]
+    (VADER compound * 100) and are memoized in an LRU keyed on normalized
+    text. Safe to call from several threads.
+    """
+
+    def __init__(self, cache_size: int = SENTIMENT_CACHE_SIZE, analyzer: Any = None):
+        self.cache_size = cache_size
+        self._analyzer = analyzer
+        self._analyzer_loaded = analyzer is not None
+        self._load_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _get_analyzer(self):
+        """VADER analyzer, or None if NLTK or its lexicon is unavailable"""
+        if self._analyzer_loaded:
+            return self._analyzer
+        with self._load_lock:
+            if not self._analyzer_loaded:
+                self._analyzer = _load_vader()
+                self._analyzer_loaded = True
+        return self._analyzer
+
+    @property
+    def uses_vader(self) -> bool:
+        return self._get_analyzer() is not None
+
+    def _compute(self, text: str) -> float:
+        analyzer = self._get_analyzer()
+        if analyzer is None:
+            return keyword_score(text)
+        try:
+            return analyzer.polarity_scores(text)['compound'] * 100
+        except Exception as e:
+            logger.error(f"Sentiment analysis error: {e}")
+            return 0.0
+
+    def score(self, text: Optional[str]) -> float:
+        """Sentiment of one text in [-100, 100]"""
+        return self.score_many([text])[0]
+
+    def score_many(self, texts: Iterable[Optional[str]]) -> List[float]:
+        """Sentiment of each text, scoring every distinct text at most once"""
+        keys = [normalize_text(t) if t else "" for t in texts]
+        results: Dict[str, float] = {"": 0.0}
+
+        with self._cache_lock:
+            for key in keys:
+                if key in results:
+                    continue
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[key] = self._cache[key]
+                    self._stats["hits"] += 1
+
+        missing = [key for key in dict.fromkeys(keys) if key not in results]
+        computed = {key: self._compute(key) for key in missing}
+        results.update(computed)
+
+        if computed:
+            with self._cache_lock:
+                self._stats["misses"] += len(computed)
+                for key, value in computed.items():
+                    self._cache[key] = value
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [results[key] for key in keys]
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._cache)
+        snapshot["vader"] = self._analyzer_loaded and self._analyzer is not None
+        return snapshot
+
+
+def _load_vader():
+    try:
+        import nltk
+        from nltk.sentiment import SentimentIntensityAnalyzer
+    except ImportError:
+        logger.warning("NLTK not installed; using keyword sentiment fallback")
+        return None
+
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        try:
+            nltk.download('vader_lexicon', quiet=True)
+        except Exception:
+            pass
+
+    try:
+        return SentimentIntensityAnalyzer()
+    except Exception as e:
+        logger.error(f"Failed to initialize sentiment analyzer: {e}")
+        return None
+
+
+_service: Optional[SentimentService] = None
+_service_lock = threading.Lock()
+
+
+def get_sentiment_service() -> SentimentService:
+    """Return the shared sentiment service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SentimentService()
+    return _service
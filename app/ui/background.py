@@ -0,0 +1,119 @@
+import itertools
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_WORKERS = 2     # Worker threads for UI data loads
+RESULT_POLL_MS = 30        # How often the Tk thread drains finished loads
+
+
+class BackgroundLoader:
+    """
+    Runs data loads off the Tk thread and hands results back to it.
+
+    submit() runs fetch() on a worker thread. When it finishes, its result
+    goes on a queue that the Tk thread drains via root.after, where
+    on_done(result) runs and may build widgets. Each request has a key: a
+    newer submit() with the same key, or cancel(key), makes the older
+    request stale and its callback is never run. So does destroying the
+    widget passed with the request.
+
+    fetch() must not touch Tk; it should only query and compute.
+    """
+
+    def __init__(self, root, max_workers=BACKGROUND_WORKERS, poll_ms=RESULT_POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-loader")
+        self._results = queue.Queue()
+        self._tokens = itertools.count(1)
+        self._current = {}   # key -> (token, future) of the latest request
+        self._poll_id = None
+
+    def submit(self, key, fetch, on_done, on_error=None, widget=None):
+        """Load fetch() in the background, superseding any pending request for key"""
+        self.cancel(key)
+        token = next(self._tokens)
+        future = self._executor.submit(fetch)
+        self._current[key] = (token, future)
+        future.add_done_callback(
+            lambda f: self._results.put((key, token, f, on_done, on_error, widget))
+        )
+        self._schedule_poll()
+        return token
+
+    def cancel(self, key=None):
+        """Drop the pending request for key (all requests if key is None)"""
+        keys = list(self._current) if key is None else [key]
+        for k in keys:
+            entry = self._current.pop(k, None)
+            if entry:
+                entry[1].cancel()  # Only stops it if no worker picked it up yet
+
+    def is_pending(self, key):
+        return key in self._current
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                key, token, future, on_done, on_error, widget = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(key, token, future, on_done, on_error, widget)
+        if self._current:
+            self._schedule_poll()
+
+    def _deliver(self, key, token, future, on_done, on_error, widget):
+        current = self._current.get(key)
+        if current is None or current[0] != token:
+            return  # Superseded or cancelled
+        del self._current[key]
+        if future.cancelled():
+            return
+        if widget is not None and not _widget_alive(widget):
+            return
+
+        error = future.exception()
+        try:
+            if error is None:
+                on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                logger.error(f"Background load {key!r} failed: {error}", exc_info=error)
+        except Exception as e:
+            logger.error(f"Error handling background load {key!r}: {e}", exc_info=True)
+
+    def shutdown(self):
+        self.cancel()
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _widget_alive(widget):
+    try:
+        return bool(widget.winfo_exists())
+    except Exception:
+        return False
+
+
+def get_background_loader(widget):
+    """Shared loader for the Tk application that owns widget"""
+    root = widget.nametowidget(".")
+    loader = getattr(root, "background_loader", None)
+    if loader is None:
+        loader = BackgroundLoader(root)
+        root.background_loader = loader
+    return loader
@@ -4,13 +4,14 @@ from tkcalendar import DateEntry
 from datetime import datetime, timedelta
 import matplotlib
 matplotlib.use("Agg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import numpy as np
 
-from app.db import get_session, safe_db_context
+from app.db import get_session, pooled_connection, safe_db_context
 from app.models import JournalEntry
+from app.services.journal_rollup import get_journal_days
 from app.i18n_manager import get_i18n
+from app.ui.background import get_background_loader
+from app.ui.figure_pool import get_figure_pool
 
 class DailyHistoryView:
     def __init__(self, parent, app_root, username):
@@ -36,7 +37,7 @@ class DailyHistoryView:
 
         # State for Interactive Graph
         self.history_data = {
-            "dates": [], "sleep": [], "quality": [], "energy": [], "work": []
+            "dates": [], "sleep": [], "quality": [], "energy": [], "work": [], "mood": []
         }
         self.current_metric = "sleep" # Default
         self.selected_date_str = None
@@ -125,13 +126,16 @@ class DailyHistoryView:
         self.create_metric_btn(sidebar, "⚡ Energy Level", "energy", "#F59E0B")
         self.create_metric_btn(sidebar, "💼 Work Hours", "work", "#10B981")
         
-        # Chart Area (Fixed Size)
-        self.fig = Figure(figsize=(7, 4), dpi=100) # Slightly taller for clarity
-        self.fig.patch.set_facecolor(self.colors["surface"])
-        self.ax = self.fig.add_subplot(111)
+        # Chart Area (Fixed Size, pooled: one live figure for this chart)
+        self.chart, reused = get_figure_pool().acquire(
+            "daily_view.weekly", content, figsize=(7, 4), dpi=100, # Slightly taller for clarity
+            facecolor=self.colors["surface"]
+        )
+        self.fig = self.chart.figure
+        self.ax = self.fig.axes[0] if reused else self.fig.add_subplot(111)
         self.ax.set_facecolor(self.colors["surface"])
         
-        self.chart_canvas = FigureCanvasTkAgg(self.fig, content)
+        self.chart_canvas = self.chart.canvas
         # expand=False keeps size consistent as per user request
         self.chart_canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=False, padx=10)
 
@@ -153,21 +157,31 @@ class DailyHistoryView:
         
         print(f"Loading data for {date_str}...")
         
-        # 1. Fetch User Entry for Selected Date
-        entry = self.fetch_single_entry(date_str)
-        self.render_cards(entry)
-        self.render_journal_text(entry)
+        def fetch():
+            # Worker thread: 1. User entry for selected date, 2. Weekly history for graph
+            return self.fetch_single_entry(date_str), self.fetch_weekly_history(date_str)
+        
+        def on_done(result):
+            entry, history = result
+            self.history_data = history
+            self.render_cards(entry)
+            self.render_journal_text(entry)
+            self.update_chart("sleep", "#8B5CF6") # Reset to sleep default
         
-        # 2. Fetch Weekly History for Graph
-        self.fetch_weekly_history(date_str)
-        self.update_chart("sleep", "#8B5CF6") # Reset to sleep default
+        # A newer date selection supersedes this load
+        get_background_loader(self.parent).submit(
+            ("daily_view", id(self)), fetch, on_done, widget=self.chart_container
+        )
 
     def fetch_single_entry(self, date_str):
         with safe_db_context() as session:
+            # Range on entry_date so the (username, entry_date) index is used
+            next_day = (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
             entry = session.query(JournalEntry).filter(
                 JournalEntry.username == self.username,
-                JournalEntry.entry_date.like(f"{date_str}%")
-            ).first()
+                JournalEntry.entry_date >= date_str,
+                JournalEntry.entry_date < next_day
+            ).order_by(JournalEntry.entry_date).first()
             if entry:
                 return {
                      "sleep": entry.sleep_hours or 0,
@@ -179,83 +193,54 @@ class DailyHistoryView:
             return None
 
     def fetch_weekly_history(self, end_date_str):
+        """Seven days of metrics ending on end_date_str (safe off the Tk thread)"""
         end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
         start_date = end_date - timedelta(days=6)
         
-        self.history_data = {"dates": [], "sleep": [], "quality": [], "energy": [], "work": [], "mood": []}
+        history_data = {"dates": [], "sleep": [], "quality": [], "energy": [], "work": [], "mood": []}
         
         # Initialize 7 days with 0s to ensure graph structure
         date_map = {}
         for i in range(7):
             d = (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
             date_label = (start_date + timedelta(days=i)).strftime("%a\n%d")
-            self.history_data["dates"].append(date_label)
+            history_data["dates"].append(date_label)
             date_map[d] = i # Index map
-            self.history_data["sleep"].append(0)
-            self.history_data["quality"].append(0)
-            self.history_data["energy"].append(0)
-            self.history_data["work"].append(0)
-            self.history_data["mood"].append(0)
+            history_data["sleep"].append(0)
+            history_data["quality"].append(0)
+            history_data["energy"].append(0)
+            history_data["work"].append(0)
+            history_data["mood"].append(0)
 
-        with safe_db_context() as session:
-            entries = session.query(JournalEntry).filter(
-                JournalEntry.username == self.username,
-                JournalEntry.entry_date >= start_date.strftime("%Y-%m-%d"),
-                JournalEntry.entry_date <= end_date_str + " 23:59:59"
-            ).all()
-            
-            for e in entries:
-                d_key = e.entry_date.split()[0]
-                if d_key in date_map:
-                    idx = date_map[d_key]
-                    self.history_data["sleep"][idx] = e.sleep_hours or 0
-                    self.history_data["quality"][idx] = getattr(e, 'sleep_quality', 0) or 0
-                    self.history_data["energy"][idx] = getattr(e, 'energy_level', 0) or 0
-                    self.history_data["work"][idx] = getattr(e, 'work_hours', 0) or 0
-                    self.history_data["mood"][idx] = e.sentiment_score or 0 or 0
+        # Per-day averages from journal_daily_rollup (one indexed range read)
+        with pooled_connection() as conn:
+            days = get_journal_days(conn.cursor(), self.username,
+                                    start_date.strftime("%Y-%m-%d"), end_date_str)
+        
+        for d_key, day in days.items():
+            if d_key in date_map:
+                idx = date_map[d_key]
+                history_data["sleep"][idx] = day.mean("sleep_hours", 0)
+                history_data["quality"][idx] = day.mean("sleep_quality", 0)
+                history_data["energy"][idx] = day.mean("energy_level", 0)
+                history_data["work"][idx] = day.mean("work_hours", 0)
+                history_data["mood"][idx] = day.mean("sentiment_score", 0)
+        
+        return history_data
 
-    def update_chart(self, metric, color):
-        self.current_metric = metric
-        
-        # Remove any existing secondary axes (twins) to prevent stacking
-        for ax in self.fig.axes:
-            if ax != self.ax:
-                self.fig.delaxes(ax)
-                
-        self.ax.clear()
+    def _build_chart(self, count):
+        """Create the bars, value labels and sentiment curve once; updates reuse them"""
+        x_indices = np.arange(count)
+        bars = self.ax.bar(x_indices, np.zeros(count), width=0.6, alpha=0.9, zorder=3)
+        labels = [
+            self.ax.text(bar.get_x() + bar.get_width()/2., 0, "", ha='center', va='bottom',
+                         color=self.colors["text_primary"], fontsize=9, fontweight='bold')
+            for bar in bars
+        ]
         
-        values = self.history_data[metric]
-        dates = self.history_data["dates"]
-        
-        # Bars
-        bars = self.ax.bar(dates, values, color=color, width=0.6, alpha=0.9, zorder=3, label=self.current_metric.title())
-        
-        # Highlight Selected Day
-        bars[-1].set_color("white")
-        bars[-1].set_edgecolor(color)
-        bars[-1].set_linewidth(2)
-        bars[-1].set_alpha(1.0)
-        
-        from scipy.interpolate import make_interp_spline
-
         # Secondary Axis for Sentiment (Smooth Curve)
         ax2 = self.ax.twinx()
-        mood_values = self.history_data["mood"]
-        x_indices = np.arange(len(dates))
-        
-        # Spline Interpolation
-        if len(dates) > 2:
-            try:
-                x_smooth = np.linspace(x_indices.min(), x_indices.max(), 300)
-                spl = make_interp_spline(x_indices, mood_values, k=3)
-                y_smooth = spl(x_smooth)
-                ax2.plot(x_smooth, y_smooth, color="#F472B6", linewidth=3, linestyle="-", label="Sentiment", zorder=4)
-            except Exception:
-                # Fallback if spline fails
-                ax2.plot(dates, mood_values, color="#F472B6", marker="o", linewidth=3, linestyle="-", label="Sentiment", zorder=4)
-        else:
-             ax2.plot(dates, mood_values, color="#F472B6", marker="o", linewidth=3, linestyle="-", label="Sentiment", zorder=4)
-
+        mood_line, = ax2.plot([], [], color="#F472B6", linewidth=3, linestyle="-", label="Sentiment", zorder=4)
         ax2.set_ylim(-100, 100)
         ax2.spines['top'].set_visible(False)
         ax2.spines['bottom'].set_visible(False)
@@ -273,14 +258,54 @@ class DailyHistoryView:
         
         self.ax.tick_params(axis='x', colors=self.colors["text_secondary"], labelsize=9)
         self.ax.tick_params(axis='y', colors=self.colors["text_secondary"], labelsize=9)
+        self.ax.set_xticks(x_indices)
         
-        # Add labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                self.ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'{height:.1f}' if isinstance(height, float) else f'{height}',
-                        ha='center', va='bottom', color=self.colors["text_primary"], fontsize=9, fontweight='bold')
+        self.chart.artists.update(bars=bars, labels=labels, mood=mood_line)
+
+    def _mood_curve(self, mood_values):
+        """Spline through the daily sentiment, or the raw points if that fails"""
+        x_indices = np.arange(len(mood_values))
+        if len(mood_values) > 2:
+            try:
+                from scipy.interpolate import make_interp_spline
+                x_smooth = np.linspace(x_indices.min(), x_indices.max(), 300)
+                spl = make_interp_spline(x_indices, mood_values, k=3)
+                return x_smooth, spl(x_smooth), ""
+            except Exception:
+                pass  # Fallback if spline fails
+        return x_indices, mood_values, "o"
+
+    def update_chart(self, metric, color):
+        self.current_metric = metric
+        if not self.history_data["dates"]:
+            return  # History still loading
+        
+        values = self.history_data[metric]
+        dates = self.history_data["dates"]
+        
+        if len(self.chart.artists.get("bars", ())) != len(dates):
+            self._build_chart(len(dates))
+        artists = self.chart.artists
+        self.ax.set_xticklabels(dates)
+        
+        # Bars and value labels, updated in place
+        for i, (bar, label, value) in enumerate(zip(artists["bars"], artists["labels"], values)):
+            bar.set_height(value)
+            # Highlight Selected Day
+            selected = i == len(values) - 1
+            bar.set_facecolor("white" if selected else color)
+            bar.set_edgecolor(color)
+            bar.set_linewidth(2 if selected else 0)
+            bar.set_alpha(1.0 if selected else 0.9)
+            
+            label.set_position((bar.get_x() + bar.get_width()/2., value + 0.1))
+            label.set_text((f'{value:.1f}' if isinstance(value, float) else f'{value}') if value > 0 else "")
+        artists["bars"].set_label(self.current_metric.title())
+        self.ax.set_ylim(0, max(max(values), 1) * 1.15)
+        
+        x_curve, y_curve, marker = self._mood_curve(self.history_data["mood"])
+        artists["mood"].set_data(x_curve, y_curve)
+        artists["mood"].set_marker(marker)
 
         self.chart_canvas.draw()
 
@@ -6,8 +6,6 @@ from collections import Counter
 import matplotlib
 matplotlib.use("Agg") # Prevent GUI mainloop conflicts
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 import json
 import os
@@ -15,9 +13,11 @@ import sqlite3
 import numpy as np
 
 from app.i18n_manager import get_i18n
-from app.models import Score, JournalEntry, SatisfactionRecord
-from app.db import get_session, get_connection
+from app.analysis.downsampling import DISPLAY_POINTS, downsample_indices
 from app.analysis.time_based_analysis import time_analyzer
+from app.services.dashboard_data import get_dashboard_data_service
+from app.ui.background import get_background_loader
+from app.ui.figure_pool import get_figure_pool
 
 # Import emotional profile clustering
 try:
@@ -33,6 +33,9 @@ except ImportError:
     CLUSTERING_AVAILABLE = False
 
 
+_NOT_LOADED = object()  # Tab data not preloaded; fetch on the calling thread
+
+
 class AnalyticsDashboard:
     def __init__(self, parent_root, username, colors=None, theme="light"):
         self.parent_root = parent_root
@@ -40,6 +43,11 @@ class AnalyticsDashboard:
         self.benchmarks = self.load_benchmarks()
         self.i18n = get_i18n()
         self.theme = theme
+        self.data_service = get_dashboard_data_service()
+        self._snapshot = None
+        self._tabs = {}  # tab id -> (frame, show method, off-thread loader or None)
+        self._rendered_tabs = set()
+        self._load_key = ("dashboard", id(self))
         # Default colors for dark/light theme
         if colors:
             self.colors = colors
@@ -53,6 +61,12 @@ class AnalyticsDashboard:
                 "border": "#334155" if theme == "dark" else "#E2E8F0"
             }
 
+    def get_snapshot(self, refresh=False):
+        """Analytics snapshot shared by every tab; refresh re-checks the data version"""
+        if self._snapshot is None or refresh:
+            self._snapshot = self.data_service.get_snapshot(self.username)
+        return self._snapshot
+
     def load_benchmarks(self):
         """Load population benchmarks from JSON"""
         try:
@@ -132,85 +146,82 @@ class AnalyticsDashboard:
         
         notebook = ttk.Notebook(dashboard)
         notebook.pack(fill=tk.BOTH, expand=True, padx=20, pady=(10, 20))
+        self.notebook = notebook
+        self.loader = get_background_loader(dashboard)
+        
+        tabs = [
+            ("🔗 Correlation", self.show_correlation_analysis, None),
+            (self.i18n.get("dashboard.eq_trends_tab"), self.show_eq_trends, None),
+            (self.i18n.get("dashboard.time_based_tab"), self.show_time_based_analysis, self._load_time_based_data),
+            (self.i18n.get("dashboard.journal_tab"), self.show_journal_analytics, None),
+            (self.i18n.get("dashboard.insights_tab"), self.show_insights, None),
+            ("🧘 Wellbeing", self.show_wellbeing_analytics, None),  # New Feature
+        ]
+        if CLUSTERING_AVAILABLE:
+            tabs.append(("🧬 Emotional Profile", self.show_emotional_profile, self._load_emotional_profile))
+        tabs.append(("💼 Satisfaction", self.show_satisfaction_analytics, None))
+        
+        for title, show, load in tabs:
+            frame = ttk.Frame(notebook)
+            notebook.add(frame, text=title)
+            self._tabs[str(frame)] = (frame, show, load)
         
-        # Correlation Analysis Tab
-        correlation_frame = ttk.Frame(notebook)
-        notebook.add(correlation_frame, text="🔗 Correlation")
-        self.show_correlation_analysis(correlation_frame)
-            
-        # EQ Trends
-        eq_frame = ttk.Frame(notebook)
-        notebook.add(eq_frame, text=self.i18n.get("dashboard.eq_trends_tab"))
-        self.show_eq_trends(eq_frame)
-        
-        # Time-Based Analysis
-        time_frame = ttk.Frame(notebook)
-        notebook.add(time_frame, text=self.i18n.get("dashboard.time_based_tab"))
-        self.show_time_based_analysis(time_frame)
-        
-        # Journal Analytics
-        journal_frame = ttk.Frame(notebook)
-        notebook.add(journal_frame, text=self.i18n.get("dashboard.journal_tab"))
-        self.show_journal_analytics(journal_frame)
-        
-        # Insights
-        insights_frame = ttk.Frame(notebook)
-        notebook.add(insights_frame, text=self.i18n.get("dashboard.insights_tab"))
-        self.show_insights(insights_frame)
+        # Tabs are built on first selection, from data loaded off the Tk thread
+        notebook.bind("<<NotebookTabChanged>>", lambda e: self._activate_tab(notebook.select()))
+        self._activate_tab(notebook.select())
 
-        # Wellbeing Analytics (New Feature)
-        wellbeing_frame = ttk.Frame(notebook)
-        notebook.add(wellbeing_frame, text="🧘 Wellbeing")
-        self.show_wellbeing_analytics(wellbeing_frame)
+    def _activate_tab(self, tab_id):
+        """Build the selected tab in the background; leaving a loading tab cancels its load"""
+        self.loader.cancel(self._load_key)
+        if tab_id not in self._tabs or tab_id in self._rendered_tabs:
+            return
+        frame, show, load = self._tabs[tab_id]
+        for widget in frame.winfo_children():
+            widget.destroy()
+        placeholder = tk.Label(frame, text="⏳ Loading...", font=("Segoe UI", 12),
+                               fg=self.colors.get("text_secondary", "#64748B"))
+        placeholder.pack(pady=50)
+        
+        def fetch():
+            # Worker thread: queries and analysis only, no Tk calls
+            snapshot = self.data_service.get_snapshot(self.username)
+            return snapshot, load(snapshot) if load else None
+        
+        def on_done(result):
+            snapshot, data = result
+            self._snapshot = snapshot
+            placeholder.destroy()
+            self._rendered_tabs.add(tab_id)
+            if load:
+                show(frame, data)
+            else:
+                show(frame)
         
-        # Emotional Profile Clustering Tab
-        if CLUSTERING_AVAILABLE:
-            clustering_frame = ttk.Frame(notebook)
-            notebook.add(clustering_frame, text="🧬 Emotional Profile")
-            self.show_emotional_profile(clustering_frame)
-        
-        # Add Satisfaction Analytics Tab
-        satisfaction_frame = ttk.Frame(notebook)
-        notebook.add(satisfaction_frame, text="💼 Satisfaction")
-        self.show_satisfaction_analytics(satisfaction_frame)
+        def on_error(error):
+            placeholder.config(text=f"Error loading data: {error}", fg="red")
+        
+        self.loader.submit(self._load_key, fetch, on_done, on_error, widget=placeholder)
 
     def show_wellbeing_analytics(self, parent):
         """Show comprehensive health and wellbeing analytics (PR #7)"""
         parent = self._create_scrollable_frame(parent)
         
         # Get data including new PR #6 fields
-        conn = get_connection()
-        try:
-            # Check if columns exist first to avoid errors during dev
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(journal_entries)")
-            columns = [c[1] for c in cursor.fetchall()]
-            
-            if 'screen_time_mins' not in columns:
-                tk.Label(parent, text="Database schema update required (Missing v2 columns)", fg="red").pack()
-                return
-
-            query = """
-                SELECT entry_date, sleep_hours, energy_level, stress_level, screen_time_mins 
-                FROM journal_entries 
-                WHERE username = ? 
-                ORDER BY entry_date
-            """
-            cursor.execute(query, (self.username,))
-            data = cursor.fetchall()
-        finally:
-            conn.close()
+        snapshot = self.get_snapshot()
+        if not snapshot.has_wellbeing_columns:
+            tk.Label(parent, text="Database schema update required (Missing v2 columns)", fg="red").pack()
+            return
 
-        if not data:
+        if not snapshot.journal_count:
             tk.Label(parent, text=self.i18n.get("journal.no_entries"), font=("Segoe UI", 12)).pack(pady=50)
             return
 
         # Parse data
-        dates = [datetime.strptime(row[0].split(' ')[0], "%Y-%m-%d") for row in data]
-        sleep = [row[1] if row[1] is not None else 0 for row in data]
-        energy = [row[2] if row[2] is not None else 0 for row in data]
-        stress = [row[3] if row[3] is not None else 0 for row in data]
-        screen = [row[4] if row[4] is not None else 0 for row in data]
+        dates = [datetime.strptime(d.split(' ')[0], "%Y-%m-%d") for d in snapshot.journal_dates]
+        sleep = np.nan_to_num(snapshot.sleep_hours).tolist()
+        energy = np.nan_to_num(snapshot.energy_level).tolist()
+        stress = np.nan_to_num(snapshot.stress_level).tolist()
+        screen = np.nan_to_num(snapshot.screen_time_mins).tolist()
         
         # --- 1. Weekly Averages Cards ---
         cards_frame = tk.Frame(parent, bg=self.colors["bg"])
@@ -235,7 +246,9 @@ class AnalyticsDashboard:
         viz_frame = tk.Frame(parent, bg=self.colors["bg"])
         viz_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        fig = Figure(figsize=(10, 8), dpi=100, facecolor=self.colors["bg"])
+        chart = get_figure_pool().acquire_cleared("dashboard.wellbeing_trends", viz_frame,
+                                                  figsize=(10, 8), dpi=100, facecolor=self.colors["bg"])
+        fig = chart.figure
         
         # Plot 1: Wellbeing Trends (Multi-line with modern styling)
         ax1 = fig.add_subplot(211)
@@ -274,21 +287,17 @@ class AnalyticsDashboard:
         
         fig.tight_layout(pad=2.0)
         
-        canvas = FigureCanvasTkAgg(fig, viz_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        chart.draw()
+        chart.widget.pack(fill="both", expand=True)
         
     def show_satisfaction_analytics(self, parent):
         """Show satisfaction analytics"""
         parent = self._create_scrollable_frame(parent)
-        # Fetch satisfaction data
-        session = get_session()
         try:
-            records = session.query(SatisfactionRecord).filter(
-                SatisfactionRecord.username == self.username
-            ).order_by(SatisfactionRecord.timestamp.desc()).all()
+            snapshot = self.get_snapshot()
+            record_count = len(snapshot.satisfaction_scores)
             
-            if not records:
+            if not record_count:
                 tk.Label(parent, 
                         text="No satisfaction data available.\n\n"
                              "Complete a satisfaction survey to see your trends!",
@@ -304,21 +313,22 @@ class AnalyticsDashboard:
             stats_frame = tk.Frame(parent, bg="#f0f9ff", relief=tk.RIDGE, bd=2)
             stats_frame.pack(fill="x", padx=20, pady=10)
             
-            avg_score = sum(r.satisfaction_score for r in records) / len(records)
-            latest = records[0].satisfaction_score
+            avg_score = float(np.nanmean(snapshot.satisfaction_scores))
+            latest = snapshot.satisfaction_scores[-1]
             
             tk.Label(stats_frame, 
-                    text=f"Latest Score: {latest}/10 | Average: {avg_score:.1f}/10 | Total Surveys: {len(records)}",
+                    text=f"Latest Score: {latest:.0f}/10 | Average: {avg_score:.1f}/10 | Total Surveys: {record_count}",
                     font=("Arial", 12, "bold"),
                     bg="#f0f9ff").pack(pady=10)
             
             # Create matplotlib chart
-            fig = Figure(figsize=(8, 4), dpi=100)
+            chart = get_figure_pool().acquire_cleared("dashboard.satisfaction", parent, figsize=(8, 4), dpi=100)
+            fig = chart.figure
             ax = fig.add_subplot(111)
             
             # Plot satisfaction scores over time
-            dates = [datetime.fromisoformat(r.timestamp) for r in records]
-            scores = [r.satisfaction_score for r in records]
+            dates = [datetime.fromisoformat(ts) for ts in snapshot.satisfaction_timestamps]
+            scores = snapshot.satisfaction_scores
             
             ax.plot(dates, scores, 'o-', color='#8B5CF6', linewidth=2, markersize=8)
             ax.fill_between(dates, scores, alpha=0.2, color='#8B5CF6')
@@ -331,9 +341,8 @@ class AnalyticsDashboard:
             fig.autofmt_xdate()
             
             # Embed in tkinter
-            canvas = FigureCanvasTkAgg(fig, parent)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+            chart.draw()
+            chart.widget.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
             
             # Factors analysis
             factors_frame = tk.Frame(parent)
@@ -347,16 +356,13 @@ class AnalyticsDashboard:
             positive_counts = {}
             negative_counts = {}
             
-            for record in records:
-                if record.positive_factors:
-                    factors = json.loads(record.positive_factors)
-                    for factor in factors:
-                        positive_counts[factor] = positive_counts.get(factor, 0) + 1
-                
-                if record.negative_factors:
-                    factors = json.loads(record.negative_factors)
-                    for factor in factors:
-                        negative_counts[factor] = negative_counts.get(factor, 0) + 1
+            for factors in snapshot.positive_factors:
+                for factor in factors:
+                    positive_counts[factor] = positive_counts.get(factor, 0) + 1
+            
+            for factors in snapshot.negative_factors:
+                for factor in factors:
+                    negative_counts[factor] = negative_counts.get(factor, 0) + 1
             
             # Display top factors
             cols_frame = tk.Frame(factors_frame)
@@ -370,7 +376,7 @@ class AnalyticsDashboard:
                     font=("Arial", 12, "bold")).pack(pady=10)
             
             for factor, count in sorted(positive_counts.items(), key=lambda x: x[1], reverse=True)[:3]:
-                percentage = (count / len(records)) * 100
+                percentage = (count / record_count) * 100
                 tk.Label(pos_frame, 
                         text=f"• {factor} ({percentage:.0f}% of surveys)",
                         font=("Arial", 10)).pack(anchor="w", padx=10, pady=2)
@@ -383,7 +389,7 @@ class AnalyticsDashboard:
                     font=("Arial", 12, "bold")).pack(pady=10)
             
             for factor, count in sorted(negative_counts.items(), key=lambda x: x[1], reverse=True)[:3]:
-                percentage = (count / len(records)) * 100
+                percentage = (count / record_count) * 100
                 tk.Label(neg_frame, 
                         text=f"• {factor} ({percentage:.0f}% of surveys)",
                         font=("Arial", 10)).pack(anchor="w", padx=10, pady=2)
@@ -392,8 +398,6 @@ class AnalyticsDashboard:
             tk.Label(parent, 
                     text=f"Error loading satisfaction data: {str(e)}",
                     font=("Arial", 12), fg="red").pack(pady=50)
-        finally:
-            session.close()
     
     # ========== NEW CORRELATION ANALYSIS METHOD ==========
     def show_correlation_analysis(self, parent):
@@ -428,46 +432,30 @@ class AnalyticsDashboard:
     
     def run_correlation(self, parent):
         """Run correlation analysis"""
+        if not self.correlation_text:
+            return
+        
+        # Clear previous content
+        self.correlation_text.configure(state='normal') # Enable for updates
+        self.correlation_text.delete(1.0, tk.END)
+        self.correlation_text.insert(tk.END, "⏳ Running analysis...\n")
+        
+        # Get EQ scores off the Tk thread (re-checks the data version; new tests may have landed)
+        get_background_loader(parent).submit(
+            ("correlation", id(self)),
+            lambda: self.data_service.get_snapshot(self.username),
+            self._render_correlation,
+            on_error=lambda e: self.correlation_text.insert(tk.END, f"❌ **Error:** {str(e)}\n"),
+            widget=self.correlation_text
+        )
+    
+    def _render_correlation(self, snapshot):
+        """Write the correlation analysis for a freshly loaded snapshot"""
+        self._snapshot = snapshot
         try:
-            # Clear previous content
-            if self.correlation_text:
-                self.correlation_text.configure(state='normal') # Enable for updates
-                self.correlation_text.delete(1.0, tk.END)
-            else:
-                return
-            
-            # Clear previous visualization
-            for widget in self.correlation_viz_frame.winfo_children():
-                widget.destroy()
-            
-            # Get EQ scores
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # First, check what columns exist in the scores table
-            cursor.execute("PRAGMA table_info(scores)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            # Build query based on available columns
-            if 'timestamp' in columns:
-                cursor.execute("""
-                    SELECT total_score, timestamp 
-                    FROM scores 
-                    WHERE username = ? 
-                    ORDER BY timestamp
-                """, (self.username,))
-            else:
-                cursor.execute("""
-                    SELECT total_score, id 
-                    FROM scores 
-                    WHERE username = ? 
-                    ORDER BY id
-                """, (self.username,))
+            self.correlation_text.delete(1.0, tk.END)
             
-            data = cursor.fetchall()
-            conn.close()
-            
-            if len(data) < 2:
+            if snapshot.score_count < 2:
                 self.correlation_text.insert(tk.END, 
                     "⚠️ Need at least 2 EQ tests for correlation analysis.\n\n"
                     "Complete more tests and try again!")
@@ -475,7 +463,7 @@ class AnalyticsDashboard:
                      self.correlation_text.configure(state='disabled')
                 return
             
-            scores = [row[0] for row in data]
+            scores = snapshot.scores.tolist()
             
             # Start analysis
             self.correlation_text.insert(tk.END, "📊 **CORRELATION ANALYSIS RESULTS**\n")
@@ -545,75 +533,115 @@ class AnalyticsDashboard:
         except Exception as e:
             self.correlation_text.insert(tk.END, f"❌ **Error:** {str(e)}\n")
     
+    def _build_correlation_chart(self, chart):
+        """Create the four correlation subplots once; later runs only update their data"""
+        fig = chart.figure
+
+        # Plot 1: Score trend
+        ax1 = fig.add_subplot(221)
+        trend, = ax1.plot([], [], 'o-', color='#4CAF50', linewidth=2)
+        fit, = ax1.plot([], [], "r--", alpha=0.5)
+        fit_label = ax1.text(0.05, 0.95, "", transform=ax1.transAxes, fontsize=10,
+                             bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
+        ax1.set_title(self.i18n.get("dashboard.trend_title"), fontweight='bold')
+        ax1.set_xlabel(self.i18n.get("dashboard.trend_xlabel"))
+        ax1.set_ylabel(self.i18n.get("dashboard.trend_ylabel"))
+        ax1.grid(True, alpha=0.3)
+
+        # Plot 2: Score distribution
+        ax2 = fig.add_subplot(222)
+        _, _, bins = ax2.hist([0], bins=5, color='#2196F3', edgecolor='black', alpha=0.7)
+        ax2.set_title(self.i18n.get("dashboard.distribution_title"), fontweight='bold')
+        ax2.set_xlabel(self.i18n.get("dashboard.distribution_xlabel"))
+        ax2.set_ylabel(self.i18n.get("dashboard.distribution_ylabel"))
+        ax2.grid(True, alpha=0.3)
+
+        # Plot 3: Moving average
+        ax3 = fig.add_subplot(223)
+        moving, = ax3.plot([], [], 's-', color='#9C27B0', linewidth=2)
+        ax3.set_xlabel(self.i18n.get("dashboard.trend_xlabel"))
+        ax3.set_ylabel(self.i18n.get("dashboard.moving_avg_ylabel"))
+        ax3.grid(True, alpha=0.3)
+
+        # Plot 4: Performance comparison
+        ax4 = fig.add_subplot(224)
+        positions = [self.i18n.get("dashboard.first_half"), self.i18n.get("dashboard.second_half")]
+        halves = ax4.bar(positions, [0, 0], color=['#FF9800', '#4CAF50'])
+        half_labels = [ax4.text(bar.get_x() + bar.get_width() / 2., 0, "", ha='center', va='bottom')
+                       for bar in halves]
+        ax4.set_title(self.i18n.get("dashboard.performance_title"), fontweight='bold')
+        ax4.set_ylabel(self.i18n.get("dashboard.performance_ylabel"))
+
+        chart.artists.update(trend=trend, fit=fit, fit_label=fit_label, bins=list(bins),
+                             moving=moving, halves=list(halves), half_labels=half_labels)
+
     def create_correlation_visualizations(self, scores):
         """Create visualizations for correlation analysis"""
         try:
             import numpy as np
             
-            # Create figure
-            fig = Figure(figsize=(10, 8))
-            
-            # Plot 1: Score trend
-            ax1 = fig.add_subplot(221)
-            x_values = range(1, len(scores) + 1)
-            ax1.plot(x_values, scores, 'o-', color='#4CAF50', linewidth=2)
-            ax1.set_title(self.i18n.get("dashboard.trend_title"), fontweight='bold')
-            ax1.set_xlabel(self.i18n.get("dashboard.trend_xlabel"))
-            ax1.set_ylabel(self.i18n.get("dashboard.trend_ylabel"))
-            ax1.grid(True, alpha=0.3)
-            
-            # Add trend line if enough points
+            chart, reused = get_figure_pool().acquire("dashboard.correlation", self.correlation_viz_frame,
+                                                      figsize=(10, 8))
+            if not reused:
+                self._build_correlation_chart(chart)
+            artists = chart.artists
+            ax1, ax2, ax3, ax4 = chart.figure.axes
+            scores = np.asarray(scores, dtype=float)
+            x_values = np.arange(1, len(scores) + 1)
+            
+            # Plot 1: Score trend, with a trend line if enough points
+            shown = downsample_indices(scores, DISPLAY_POINTS)
+            artists["trend"].set_data(x_values[shown], scores[shown])
             if len(scores) >= 3:
                 z = np.polyfit(x_values, scores, 1)
-                p = np.poly1d(z)
-                ax1.plot(x_values, p(x_values), "r--", alpha=0.5)
-                ax1.text(0.05, 0.95, f'Trend: {z[0]:.2f}/test', 
-                        transform=ax1.transAxes, fontsize=10,
-                        bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
+                ends = x_values[[0, -1]]
+                artists["fit"].set_data(ends, np.poly1d(z)(ends))
+                artists["fit_label"].set_text(f'Trend: {z[0]:.2f}/test')
+            else:
+                artists["fit"].set_data([], [])
+            artists["fit_label"].set_visible(len(scores) >= 3)
             
             # Plot 2: Score distribution
-            ax2 = fig.add_subplot(222)
-            ax2.hist(scores, bins=5, color='#2196F3', edgecolor='black', alpha=0.7)
-            ax2.set_title(self.i18n.get("dashboard.distribution_title"), fontweight='bold')
-            ax2.set_xlabel(self.i18n.get("dashboard.distribution_xlabel"))
-            ax2.set_ylabel(self.i18n.get("dashboard.distribution_ylabel"))
-            ax2.grid(True, alpha=0.3)
+            counts, edges = np.histogram(scores, bins=len(artists["bins"]))
+            for rect, count, left, right in zip(artists["bins"], counts, edges[:-1], edges[1:]):
+                rect.set_x(left)
+                rect.set_width(right - left)
+                rect.set_height(count)
             
             # Plot 3: Moving average
-            ax3 = fig.add_subplot(223)
             if len(scores) >= 3:
                 window = min(3, len(scores))
-                moving_avg = [np.mean(scores[max(0, i-window+1):i+1]) 
-                             for i in range(len(scores))]
-                ax3.plot(x_values, moving_avg, 's-', color='#9C27B0', linewidth=2)
+                moving_avg = np.array([np.mean(scores[max(0, i-window+1):i+1]) 
+                                       for i in range(len(scores))])
+                shown = downsample_indices(moving_avg, DISPLAY_POINTS)
+                artists["moving"].set_data(x_values[shown], moving_avg[shown])
                 ax3.set_title(self.i18n.get("dashboard.moving_avg_title", window=window), fontweight='bold')
-                ax3.set_xlabel(self.i18n.get("dashboard.trend_xlabel"))
-                ax3.set_ylabel(self.i18n.get("dashboard.moving_avg_ylabel"))
-                ax3.grid(True, alpha=0.3)
+            else:
+                artists["moving"].set_data([], [])
+                ax3.set_title("")
             
             # Plot 4: Performance comparison
-            ax4 = fig.add_subplot(224)
-            if len(scores) >= 4:
+            show_halves = len(scores) >= 4
+            if show_halves:
                 half = len(scores) // 2
-                positions = [self.i18n.get("dashboard.first_half"), self.i18n.get("dashboard.second_half")]
                 averages = [np.mean(scores[:half]), np.mean(scores[half:])]
-                colors = ['#FF9800', '#4CAF50']
-                bars = ax4.bar(positions, averages, color=colors)
-                ax4.set_title(self.i18n.get("dashboard.performance_title"), fontweight='bold')
-                ax4.set_ylabel(self.i18n.get("dashboard.performance_ylabel"))
-                
-                # Add value labels
-                for bar, avg in zip(bars, averages):
-                    height = bar.get_height()
-                    ax4.text(bar.get_x() + bar.get_width()/2., height,
-                            f'{avg:.1f}', ha='center', va='bottom')
-            
-            fig.tight_layout()
+                for bar, label, avg in zip(artists["halves"], artists["half_labels"], averages):
+                    bar.set_height(avg)
+                    label.set_y(avg)
+                    label.set_text(f'{avg:.1f}')
+            for artist in artists["halves"] + artists["half_labels"]:
+                artist.set_visible(show_halves)
+            
+            for ax in (ax1, ax2, ax3, ax4):
+                ax.relim()
+                ax.autoscale_view()
+            if not reused:
+                chart.figure.tight_layout()
             
             # Embed in tkinter
-            canvas = FigureCanvasTkAgg(fig, master=self.correlation_viz_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            chart.draw()
+            if not reused:
+                chart.widget.pack(fill=tk.BOTH, expand=True)
 
             # Make read-only
             if self.correlation_text:
@@ -638,28 +666,20 @@ class AnalyticsDashboard:
         # Configure parent
         # parent.configure(style="TFrame")
         
-        conn = get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("""
-            SELECT total_score, timestamp, id, sentiment_score 
-            FROM scores 
-            WHERE username = ? 
-            ORDER BY id
-            """, (self.username,))
-            data = cursor.fetchall()
+            snapshot = self.get_snapshot()
         except Exception as e:
             print(f"Error fetching EQ trends: {e}")
-            data = []
-        finally:
-            conn.close()
+            snapshot = None
         
-        if not data:
+        if snapshot is None or not snapshot.score_count:
             tk.Label(parent, text="No EQ data available", font=("Arial", 14), bg=bg_color, fg=text_primary).pack(pady=50)
             return
         
-        scores = [row[0] for row in data]
-        sentiment_scores = [row[3] if len(row) > 3 else None for row in data]
+        scores = snapshot.scores.tolist()
+        sentiment_scores = [None if np.isnan(s) else s for s in snapshot.score_sentiments.tolist()]
+        # Flags stored at exam time (see app.services.score_stats)
+        unusual_attempts = np.flatnonzero(snapshot.score_flagged).tolist()
         
         tk.Label(parent, text="📈 EQ Score Progress Over Time", 
                 font=("Segoe UI", 16, "bold"), bg=bg_color, fg=text_primary).pack(pady=(15, 10))
@@ -696,6 +716,10 @@ class AnalyticsDashboard:
             tk.Label(right_col, text=f"Progress: {symbol} {improvement:+d} ({improvement_pct:+.1f}%)", 
                     font=("Segoe UI", 11, "bold"), bg=surface_color, fg=color).pack(anchor="w", pady=2)
         
+        if unusual_attempts:
+            tk.Label(left_col, text=f"Unusual Attempts: {len(unusual_attempts)}", 
+                    font=("Segoe UI", 11), bg=surface_color, fg="#EF4444").pack(anchor="w", pady=2)
+        
         # Create matplotlib figure
         plt.style.use('dark_background' if self.theme == 'dark' else 'default')
         if self.theme == 'dark':
@@ -709,23 +733,32 @@ class AnalyticsDashboard:
             text_color = '#0F172A'
             grid_color = '#E2E8F0'
 
-        fig = Figure(figsize=(6, 4), dpi=80, facecolor=fig_bg)
+        chart = get_figure_pool().acquire_cleared("dashboard.eq_trends", parent,
+                                                  figsize=(6, 4), dpi=80, facecolor=fig_bg)
+        fig = chart.figure
         ax1 = fig.add_subplot(111)
         ax1.set_facecolor(plot_bg)
         
-        # Plot EQ Score
-        l1, = ax1.plot(range(1, len(scores) + 1), scores, 
+        # Plot EQ Score (long histories are decimated to DISPLAY_POINTS, keeping peaks and dips)
+        attempt_numbers = np.arange(1, len(scores) + 1)
+        shown = downsample_indices(snapshot.scores, DISPLAY_POINTS)
+        l1, = ax1.plot(attempt_numbers[shown], snapshot.scores[shown], 
                marker='o', linestyle='-', linewidth=2, markersize=8,
                color='#22C55E', markerfacecolor='#22C55E', 
                markeredgewidth=2, markeredgecolor='white', label="EQ Score")
         
+        if unusual_attempts:
+            ax1.scatter([i + 1 for i in unusual_attempts], [scores[i] for i in unusual_attempts],
+                        s=160, facecolors='none', edgecolors='#EF4444', linewidths=2, zorder=5)
+        
         ax1.set_xlabel('Attempt Number', fontsize=11, fontweight='bold', color=text_color)
         ax1.set_ylabel('EQ Score', fontsize=11, fontweight='bold', color='#22C55E')
         ax1.tick_params(axis='y', labelcolor='#22C55E', colors=text_color)
         ax1.tick_params(axis='x', colors=text_color)
         ax1.set_title('EQ Score & Emotional Sentiment Trends', fontsize=12, fontweight='bold', pad=15, color=text_color)
         ax1.grid(True, alpha=0.3, linestyle='--', color=grid_color)
-        ax1.set_xticks(range(1, len(scores) + 1))
+        if len(scores) <= 20:
+            ax1.set_xticks(attempt_numbers)
         
         for spine in ax1.spines.values():
             spine.set_color(grid_color)
@@ -733,12 +766,10 @@ class AnalyticsDashboard:
         # Plot Sentiment Score (Secondary Axis)
         if sentiment_scores and any(s is not None and s != 0 for s in sentiment_scores):
             ax2 = ax1.twinx()
-            # Filter out Nones for plotting
-            valid_indices = [i for i, s in enumerate(sentiment_scores) if s is not None]
-            valid_x = [i + 1 for i in valid_indices]
-            valid_y = [sentiment_scores[i] for i in valid_indices]
+            # Missing sentiments (NaN) are skipped
+            shown = downsample_indices(snapshot.score_sentiments, DISPLAY_POINTS)
             
-            l2, = ax2.plot(valid_x, valid_y, 
+            l2, = ax2.plot(attempt_numbers[shown], snapshot.score_sentiments[shown], 
                      marker='s', linestyle='--', linewidth=2, markersize=6,
                      color='#F59E0B', markerfacecolor='#F59E0B',
                      markeredgewidth=2, markeredgecolor='white', label="Sentiment")
@@ -760,9 +791,8 @@ class AnalyticsDashboard:
         fig.tight_layout()
         
         # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        chart.draw()
+        chart.widget.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
         # Add trend analysis
         if len(scores) >= 3:
@@ -787,13 +817,26 @@ class AnalyticsDashboard:
             tk.Label(trend_frame, text=trend_msg, 
                     font=("Arial", 10), bg="#e3f2fd", wraplength=500).pack(pady=5)
 
-    def show_time_based_analysis(self, parent):
+    def _load_time_based_data(self, snapshot):
+        """Run the time-based analyses (safe off the Tk thread)"""
+        # One history snapshot shared by every analysis on this tab
+        history = snapshot.history()
+        return {
+            "trends": time_analyzer.analyze_score_trends(self.username, snapshot=history),
+            "response_patterns": time_analyzer.analyze_response_patterns_over_time(self.username, snapshot=history),
+            "comparative": time_analyzer.get_comparative_analysis(self.username, lookback_days=30, snapshot=history),
+        }
+
+    def show_time_based_analysis(self, parent, analysis=None):
         """Show time-based analysis of responses for returning users"""
         tk.Label(parent, text="⏰ Time-Based Response Analysis", 
                 font=("Arial", 14, "bold")).pack(pady=10)
         
+        if analysis is None:
+            analysis = self._load_time_based_data(self.get_snapshot())
+        
         # Get score trends
-        trend_data = time_analyzer.analyze_score_trends(self.username)
+        trend_data = analysis["trends"]
         
         if "error" in trend_data:
             tk.Label(parent, text="No data available for time-based analysis", 
@@ -873,7 +916,7 @@ class AnalyticsDashboard:
         stats_text2.config(state=tk.DISABLED)
         
         # Response Pattern Analysis
-        response_patterns = time_analyzer.analyze_response_patterns_over_time(self.username)
+        response_patterns = analysis["response_patterns"]
         
         if "error" not in response_patterns:
             stats3_frame = tk.Frame(scrollable_frame, bg="#f5f5f5", relief=tk.RIDGE, bd=2)
@@ -893,7 +936,7 @@ class AnalyticsDashboard:
             stats_text3.config(state=tk.DISABLED)
         
         # Comparative Analysis (Last 30 days vs historical)
-        comparative = time_analyzer.get_comparative_analysis(self.username, lookback_days=30)
+        comparative = analysis["comparative"]
         
         if "error" not in comparative:
             stats4_frame = tk.Frame(scrollable_frame, bg="#fff3e0", relief=tk.RIDGE, bd=2)
@@ -931,39 +974,22 @@ class AnalyticsDashboard:
     def show_journal_analytics(self, parent):
         """Show journal analytics"""
         parent = self._create_scrollable_frame(parent)
-        conn = get_connection() # Use centralized connection logic
-        cursor = conn.cursor()
-        
-        # Check if journal_entries table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='journal_entries'")
-        if not cursor.fetchone():
-            conn.close()
-            tk.Label(parent, text="Journal feature not yet used", font=("Arial", 14)).pack(pady=50)
-            return
+        snapshot = self.get_snapshot()
+        entry_count = snapshot.journal_count
         
-        # Get journal data
-        cursor.execute("""
-            SELECT sentiment_score, emotional_patterns 
-            FROM journal_entries 
-            WHERE username = ? 
-            ORDER BY id
-        """, (self.username,))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        if not rows:
+        if not entry_count:
             tk.Label(parent, text="No journal entries found", font=("Arial", 14)).pack(pady=50)
             return
             
         tk.Label(parent, text="📝 Journal Analytics", font=("Arial", 14, "bold")).pack(pady=10)
         
-        sentiments = [r[0] for r in rows if r[0] is not None]
+        sentiments = snapshot.journal_sentiments[~np.isnan(snapshot.journal_sentiments)].tolist()
         
         # Stats
         stats_frame = tk.Frame(parent)
         stats_frame.pack(fill=tk.X, padx=20, pady=10)
         
-        tk.Label(stats_frame, text=f"Total Entries: {len(rows)}", font=("Arial", 12)).pack(anchor="w")
+        tk.Label(stats_frame, text=f"Total Entries: {entry_count}", font=("Arial", 12)).pack(anchor="w")
         
         if sentiments:
             tk.Label(stats_frame, text=f"Avg Sentiment: {sum(sentiments)/len(sentiments):.1f}", 
@@ -979,9 +1005,9 @@ class AnalyticsDashboard:
                 font=("Arial", 12, "bold")).pack(anchor="w")
         
         all_patterns = []
-        for r in rows:
-            if r[1]: # emotional_patterns
-                all_patterns.extend(r[1].split('; '))
+        for patterns in snapshot.journal_patterns:
+            if patterns:
+                all_patterns.extend(patterns.split('; '))
         
         pattern_counts = Counter(all_patterns)
         
@@ -989,7 +1015,7 @@ class AnalyticsDashboard:
         patterns_text.pack(fill=tk.BOTH, expand=True)
         
         for pattern, count in pattern_counts.most_common(3):
-            percentage = (count / len(rows)) * 100 if len(rows) > 0 else 0
+            percentage = (count / entry_count) * 100
             patterns_text.insert(tk.END, f"{pattern}: {count} times ({percentage:.1f}%)\n")
         
         patterns_text.config(state=tk.DISABLED)
@@ -1010,7 +1036,14 @@ class AnalyticsDashboard:
         insights_text.config(state=tk.DISABLED)
     
     # ========== EMOTIONAL PROFILE CLUSTERING TAB ==========
-    def show_emotional_profile(self, parent):
+    def _load_emotional_profile(self, snapshot):
+        """Profile lookup (safe off the Tk thread); an exception is returned, not raised"""
+        try:
+            return get_user_emotional_profile(self.username)
+        except Exception as e:
+            return e
+
+    def show_emotional_profile(self, parent, profile=_NOT_LOADED):
         """Show emotional profile clustering analysis."""
         parent = self._create_scrollable_frame(parent)
         if not CLUSTERING_AVAILABLE:
@@ -1033,7 +1066,10 @@ class AnalyticsDashboard:
         
         # Load or compute profile
         try:
-            profile = get_user_emotional_profile(self.username)
+            if profile is _NOT_LOADED:
+                profile = get_user_emotional_profile(self.username)
+            elif isinstance(profile, Exception):
+                raise profile
             
             if profile is None:
                 tk.Label(results_frame, 
@@ -1195,23 +1231,13 @@ class AnalyticsDashboard:
         """Generate insights"""
         insights = []
         
-        session = get_session()
-        try:
-            # EQ and Sentiment insights from SCORES table
-            eq_rows = session.query(Score.total_score, Score.sentiment_score)\
-                .filter_by(username=self.username)\
-                .order_by(Score.id)\
-                .all()
-            scores = [r[0] for r in eq_rows]
-            test_sentiments = [r[1] for r in eq_rows if r[1] is not None]
-            
-            # Journal insights purely from Journal entries
-            j_rows = session.query(JournalEntry.sentiment_score)\
-                .filter_by(username=self.username)\
-                .all()
-            journal_sentiments = [r[0] for r in j_rows]
-        finally:
-            session.close()
+        snapshot = self.get_snapshot()
+        # EQ and Sentiment insights from SCORES table
+        scores = snapshot.scores.tolist()
+        test_sentiments = snapshot.score_sentiments[~np.isnan(snapshot.score_sentiments)].tolist()
+        
+        # Journal insights purely from Journal entries
+        journal_sentiments = snapshot.journal_sentiments[~np.isnan(snapshot.journal_sentiments)].tolist()
         
         if len(scores) > 1:
             improvement = ((scores[-1] - scores[0]) / scores[0]) * 100 if scores[0] != 0 else 0
@@ -1259,22 +1285,13 @@ class AnalyticsDashboard:
     def show_wellbeing_analytics(self, parent):
         """Show wellbeing analytics (Sleep vs Mood, Work vs Mood)"""
         parent = self._create_scrollable_frame(parent)
-        # Fetch Data
-        conn = get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT sentiment_score, sleep_hours, energy_level, work_hours 
-                FROM journal_entries 
-                WHERE username = ? AND sleep_hours IS NOT NULL
-                ORDER BY entry_date ASC
-            """, (self.username,))
-            rows = cursor.fetchall()
-        finally:
-            conn.close()
+        # Days with sleep tracked (per-day averages), oldest first
+        snapshot = self.get_snapshot()
+        daily = snapshot.daily_means
+        tracked = ~np.isnan(daily["sleep_hours"])
 
         # Handle Empty State
-        if len(rows) < 3:
+        if np.count_nonzero(tracked) < 3:
             tk.Label(parent, text="🧘 Wellbeing Analytics", font=("Arial", 16, "bold")).pack(pady=20)
             tk.Label(parent, 
                 text="Not enough data yet!\n\n"
@@ -1283,11 +1300,12 @@ class AnalyticsDashboard:
                 font=("Arial", 12), fg="#666").pack(pady=20)
             return
 
-        # Prepare Data
-        sentiments = [r[0] for r in rows]
-        sleeps = [r[1] for r in rows]
-        energies = [r[2] for r in rows]
-        works = [r[3] for r in rows]
+        # Prepare Data; each chart only pairs days where both values were recorded
+        sleeps = daily["sleep_hours"][tracked].tolist()
+        mood_sleeps, sentiments = (c.tolist() for c in snapshot.daily_pairs("sleep_hours", "sentiment_score"))
+        _, works, work_sentiments = (
+            c.tolist() for c in snapshot.daily_pairs("sleep_hours", "work_hours", "sentiment_score")
+        )
 
         # --- UI Layout ---
         parent.columnconfigure(0, weight=1)
@@ -1315,7 +1333,8 @@ class AnalyticsDashboard:
         
         # Matplotlib Setup - Modern Style
         plt.style.use('seaborn-v0_8-whitegrid' if plt.style.available else 'fast')
-        fig = Figure(figsize=(10, 5), dpi=100)
+        chart = get_figure_pool().acquire_cleared("dashboard.wellbeing", viz_frame, figsize=(10, 5), dpi=100)
+        fig = chart.figure
         
         # Theme Colors
         is_dark = self.theme == "dark"
@@ -1330,9 +1349,9 @@ class AnalyticsDashboard:
         ax1.set_facecolor(bg_color)
         
         # Sort for line plotting
-        if len(sleeps) > 0:
-            sorted_indices = sorted(range(len(sleeps)), key=lambda k: sleeps[k])
-            s_sleep = np.array([sleeps[i] for i in sorted_indices])
+        if len(mood_sleeps) > 0:
+            sorted_indices = sorted(range(len(mood_sleeps)), key=lambda k: mood_sleeps[k])
+            s_sleep = np.array([mood_sleeps[i] for i in sorted_indices])
             s_mood = np.array([sentiments[i] for i in sorted_indices])
             
             # Smooth Line Interpolation
@@ -1371,7 +1390,7 @@ class AnalyticsDashboard:
                 ax1.plot(s_sleep, s_mood, color='#8B5CF6', linewidth=3, alpha=1.0)
 
             # Scatter Accents (Pink)
-            ax1.scatter(sleeps, sentiments, c='#EC4899', s=80, edgecolors='white', linewidth=2, zorder=5)
+            ax1.scatter(mood_sleeps, sentiments, c='#EC4899', s=80, edgecolors='white', linewidth=2, zorder=5)
 
         ax1.set_title("Sleep Quality & Mood", color=text_color, fontweight="bold", fontsize=11, pad=15)
         ax1.set_xlabel("Sleep Hours", color="#94A3B8", fontsize=9)
@@ -1392,7 +1411,7 @@ class AnalyticsDashboard:
         
         # Binning Logic
         buckets = {"0-4h": [], "4-8h": [], "8h+": []}
-        for w, s in zip(works, sentiments):
+        for w, s in zip(works, work_sentiments):
             if w < 4: buckets["0-4h"].append(s)
             elif w < 8: buckets["4-8h"].append(s)
             else: buckets["8h+"].append(s)
@@ -1432,9 +1451,8 @@ class AnalyticsDashboard:
         fig.tight_layout()
         
         # Render
-        canvas = FigureCanvasTkAgg(fig, viz_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        chart.draw()
+        chart.widget.pack(fill=tk.BOTH, expand=True)
 
         # --- Text Insights ---
         insights_panel = tk.Frame(parent, bg="#F0F9FF" if not is_dark else "#1E293B", relief=tk.RIDGE, bd=1)
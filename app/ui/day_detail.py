@@ -7,9 +7,8 @@ from datetime import datetime
 import logging
 
 try:
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     import numpy as np
+    from app.ui.figure_pool import get_figure_pool
     MATPLOTLIB_AVAILABLE = True
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
@@ -162,7 +161,10 @@ class DayDetailPopup:
         chart_frame = tk.Frame(parent, bg=colors.get("surface", "#fff"))
         chart_frame.pack(fill="x", padx=15, pady=10)
         
-        fig = Figure(figsize=(9, 3), dpi=100, facecolor=colors.get("surface", "#fff"))
+        # One popup's gauges live at a time; opening another disposes the previous figure
+        chart = get_figure_pool().acquire_cleared("day_detail.gauges", chart_frame, figsize=(9, 3),
+                                                  dpi=100, facecolor=colors.get("surface", "#fff"))
+        fig = chart.figure
         
         # --- Stress Gauge (Left) ---
         ax1 = fig.add_subplot(131)
@@ -183,9 +185,8 @@ class DayDetailPopup:
         
         fig.tight_layout()
         
-        canvas = FigureCanvasTkAgg(fig, chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="x", pady=10)
+        chart.draw()
+        chart.widget.pack(fill="x", pady=10)
     
     def _draw_gauge(self, ax, value, max_val, title, cmap_name='RdYlGn', ideal_zone=None):
         """Draw a semi-circular gauge"""
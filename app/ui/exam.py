@@ -9,7 +9,7 @@ import logging
 import time
 from datetime import datetime
 import statistics
-from app.db import get_connection
+from app.db import pooled_connection
 from app.utils import compute_age_group
 from app.services.question_curator import QuestionCurator
 from app.ui.assessments import RecommendationView
@@ -499,6 +499,10 @@ class ExamManager:
             self.app.sentiment_score = self.session.sentiment_score
             self.app.reflection_text = self.session.reflection_text
             
+            # Views showing scores must be rebuilt on next visit
+            if hasattr(self.app, 'invalidate_views'):
+                self.app.invalidate_views("dashboard", "history", "profile")
+            
             # Show satisfaction survey if available
             if hasattr(self.app, 'offer_satisfaction_survey'):
                 try:
@@ -611,25 +615,24 @@ class ExamManager:
 
         # --- NEW SECTION: Deep Dive Results (if any) ---
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
             deep_dives = []
             if self.app.current_user_id:
-                if result_ids and len(result_ids) > 0:
-                     # Precise filtering by IDs (The robust way)
-                     placeholders = ','.join(['?'] * len(result_ids))
-                     query = f"SELECT assessment_type, total_score, details FROM assessment_results WHERE id IN ({placeholders}) ORDER BY timestamp DESC"
-                     cursor.execute(query, result_ids)
-                     deep_dives = cursor.fetchall()
-                else:
-                    # Fallback: 15 minutes lookback (Legacy/Direct access way)
-                    time_threshold = datetime.now().timestamp() - 900 
-                    cursor.execute(
-                        "SELECT assessment_type, total_score, details FROM assessment_results WHERE user_id = ? AND timestamp > ? ORDER BY timestamp DESC",
-                        (self.app.current_user_id, str(datetime.fromtimestamp(time_threshold)))
-                    )
-                    deep_dives = cursor.fetchall()
+                with pooled_connection() as conn:
+                    cursor = conn.cursor()
+                    if result_ids and len(result_ids) > 0:
+                         # Precise filtering by IDs (The robust way)
+                         placeholders = ','.join(['?'] * len(result_ids))
+                         query = f"SELECT assessment_type, total_score, details FROM assessment_results WHERE id IN ({placeholders}) ORDER BY timestamp DESC"
+                         cursor.execute(query, result_ids)
+                         deep_dives = cursor.fetchall()
+                    else:
+                        # Fallback: 15 minutes lookback (Legacy/Direct access way)
+                        time_threshold = datetime.now().timestamp() - 900 
+                        cursor.execute(
+                            "SELECT assessment_type, total_score, details FROM assessment_results WHERE user_id = ? AND timestamp > ? ORDER BY timestamp DESC",
+                            (self.app.current_user_id, str(datetime.fromtimestamp(time_threshold)))
+                        )
+                        deep_dives = cursor.fetchall()
                 
                 if deep_dives:
                     dd_section = tk.Frame(container, bg=colors["bg"])
@@ -0,0 +1,123 @@
+import logging
+from collections import OrderedDict
+
+from matplotlib.figure import Figure
+
+logger = logging.getLogger(__name__)
+
+FIGURE_POOL_SIZE = 12  # Live pooled figures across all chart slots
+
+
+class PooledFigure:
+    """A Figure, its canvas, and named artists kept for in-place updates"""
+
+    def __init__(self, slot, figure, canvas, master, spec):
+        self.slot = slot
+        self.figure = figure
+        self.canvas = canvas
+        self.master = master
+        self.spec = spec
+        self.artists = {}  # name -> artist (or list of artists) updated via set_data & co.
+
+    @property
+    def widget(self):
+        get_widget = getattr(self.canvas, "get_tk_widget", None)
+        return get_widget() if get_widget else None
+
+    def is_alive(self):
+        widget = self.widget
+        if widget is None:
+            return True
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def draw(self):
+        self.canvas.draw()
+
+    def dispose(self):
+        self.artists.clear()
+        self.figure.clear()
+        widget = self.widget
+        if widget is not None and self.is_alive():
+            widget.destroy()
+        self.master = None
+
+
+class FigurePool:
+    """
+    One Figure + canvas per chart slot, reused across renders.
+
+    acquire() hands back the slot's existing figure when it is still shown
+    in the same master widget with the same size, so callers can update
+    their artists in place (set_data, set_height...) instead of plotting a
+    new figure. Otherwise the old figure is cleared and its canvas widget
+    destroyed before a new one is made. At most max_figures figures are
+    alive; the least recently used slot is disposed first.
+    """
+
+    def __init__(self, max_figures=FIGURE_POOL_SIZE, canvas_factory=None):
+        self.max_figures = max_figures
+        self._canvas_factory = canvas_factory
+        self._slots = OrderedDict()
+        self._stats = {"reused": 0, "created": 0, "evicted": 0}
+
+    def _make_canvas(self, figure, master):
+        if self._canvas_factory is None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self._canvas_factory = FigureCanvasTkAgg
+        return self._canvas_factory(figure, master)
+
+    def acquire(self, slot, master, figsize, dpi=100, facecolor=None):
+        """Return (PooledFigure, reused) for slot, drawn into master"""
+        spec = (tuple(figsize), dpi, facecolor)
+        entry = self._slots.get(slot)
+        if entry is not None and entry.master is master and entry.spec == spec and entry.is_alive():
+            self._slots.move_to_end(slot)
+            self._stats["reused"] += 1
+            return entry, True
+        if entry is not None:
+            self.release(slot)
+
+        figure = Figure(figsize=figsize, dpi=dpi, facecolor=facecolor)
+        entry = PooledFigure(slot, figure, self._make_canvas(figure, master), master, spec)
+        self._slots[slot] = entry
+        self._stats["created"] += 1
+        while len(self._slots) > self.max_figures:
+            _, oldest = self._slots.popitem(last=False)
+            oldest.dispose()
+            self._stats["evicted"] += 1
+        return entry, False
+
+    def acquire_cleared(self, slot, master, figsize, dpi=100, facecolor=None):
+        """Slot figure with nothing drawn on it, for charts rebuilt on every render"""
+        entry, reused = self.acquire(slot, master, figsize, dpi=dpi, facecolor=facecolor)
+        if reused:
+            entry.artists.clear()
+            entry.figure.clear()
+        return entry
+
+    def release(self, slot):
+        """Dispose of a slot's figure and canvas"""
+        entry = self._slots.pop(slot, None)
+        if entry is not None:
+            entry.dispose()
+
+    def clear(self):
+        for slot in list(self._slots):
+            self.release(slot)
+
+    def stats(self):
+        return dict(self._stats, live=len(self._slots))
+
+
+_pool = None
+
+
+def get_figure_pool():
+    """Shared figure pool for the UI (Tk thread only)"""
+    global _pool
+    if _pool is None:
+        _pool = FigurePool()
+    return _pool
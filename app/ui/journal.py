@@ -4,13 +4,14 @@ from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime, timedelta
 import logging
 
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
 from sqlalchemy import desc, text
 
 from app.i18n_manager import get_i18n
 from app.models import JournalEntry
-from app.db import get_session
+from app.db import get_session, pooled_connection
+from app.services.journal_rollup import get_journal_days, nonzero_mean
+from app.services.sentiment import get_sentiment_service
+from app.ui.background import get_background_loader
 
 # Lazy imports to avoid circular dependencies
 # These will be imported only when needed
@@ -46,21 +47,8 @@ class JournalFeature:
         if app and hasattr(app, 'colors'):
             self.colors = app.colors
         
-        # Initialize VADER sentiment analyzer
-        self._initialize_sentiment_analyzer()
-        
-    def _initialize_sentiment_analyzer(self):
-        """Initialize the VADER sentiment analyzer"""
-        try:
-            nltk.data.find('sentiment/vader_lexicon.zip')
-        except LookupError:
-            nltk.download('vader_lexicon', quiet=True)
-            
-        try:
-            self.sia = SentimentIntensityAnalyzer()
-        except Exception as e:
-            logging.error(f"Failed to initialize sentiment analyzer: {e}")
-            self.sia = None
+        # Shared VADER analyzer (lexicon loaded once per process)
+        self.sentiment = get_sentiment_service()
 
     def render_journal_view(self, parent_frame, username):
         """Render journal view inside a parent frame (Embedded Mode)"""
@@ -207,33 +195,8 @@ class JournalFeature:
         self.render_journal_view(self.journal_window, username)
     
     def analyze_sentiment(self, text):
-        """Analyze sentiment using NLTK VADER"""
-        if not text.strip():
-            return 0.0
-            
-        if self.sia:
-            try:
-                scores = self.sia.polarity_scores(text)
-                # Convert compound (-1 to 1) to -100 to 100
-                return scores['compound'] * 100
-            except Exception as e:
-                logging.error(f"Sentiment analysis error: {e}")
-                return 0.0
-        else:
-            # Fallback to simple keyword matching if VADER fails
-            positive_words = ['happy', 'joy', 'excited', 'grateful', 'peaceful', 'confident']
-            negative_words = ['sad', 'angry', 'frustrated', 'anxious', 'worried', 'stressed']
-            
-            text_lower = text.lower()
-            positive_count = sum(1 for word in positive_words if word in text_lower)
-            negative_count = sum(1 for word in negative_words if word in text_lower)
-            
-            total_words = len(text.split())
-            if total_words == 0: 
-                return 0.0
-            
-            score = (positive_count - negative_count) / max(total_words, 1) * 100
-            return max(-100, min(100, score))
+        """Analyze sentiment using NLTK VADER (keyword fallback), -100 to 100"""
+        return self.sentiment.score(text)
     
     def extract_emotional_patterns(self, text):
         """Extract emotional patterns from text"""
@@ -304,6 +267,9 @@ class JournalFeature:
             session.add(entry)
             session.commit()
             
+            if self.app and hasattr(self.app, 'invalidate_views'):
+                self.app.invalidate_views("dashboard", "profile")
+            
             # Check for expanded health insights
             health_insights = self.generate_health_insights()
             
@@ -500,57 +466,76 @@ class JournalFeature:
         canvas.bind("<Enter>", lambda e: canvas.bind_all("<MouseWheel>", _on_mousewheel))
         canvas.bind("<Leave>", lambda e: canvas.unbind_all("<MouseWheel>"))
         
+        # Entries are loaded once, off the Tk thread; filters work on this list
+        loaded = {"entries": None}
+        
+        def fetch_entries():
+            session = get_session()
+            try:
+                return session.query(JournalEntry)\
+                    .filter_by(username=self.username)\
+                    .order_by(desc(JournalEntry.entry_date))\
+                    .all()
+            finally:
+                session.close()
+        
         def render_entries():
             # Clear existing
             for widget in scrollable_frame.winfo_children():
                 widget.destroy()
+            
+            entries = loaded["entries"]
+            if entries is None:
+                tk.Label(scrollable_frame, text="⏳ Loading entries...", 
+                        font=("Segoe UI", 12), bg=self.colors.get("bg", "#f0f0f0"), 
+                        fg=self.colors.get("text_secondary", "#666")).pack(pady=20)
+                return
                 
             selected_month = month_var.get()
             filter_type = type_var.get()
             
-            session = get_session()
-            try:
-                entries = session.query(JournalEntry)\
-                    .filter_by(username=self.username)\
-                    .order_by(desc(JournalEntry.entry_date))\
-                    .all()
-                print(f"DEBUG: View Past Entries found {len(entries)} records for {self.username}")
-                
-                filtered_count = 0
-                for entry in entries:
-                    # Apply month filter
-                    if selected_month != "All Months":
-                        try:
-                            entry_month = datetime.strptime(str(entry.entry_date).split('.')[0], "%Y-%m-%d %H:%M:%S").strftime("%B %Y")
-                            if entry_month != selected_month:
-                                continue
-                        except:
-                            pass
-                        
-                    # Apply type filter
-                    if filter_type == "High Stress" and (entry.stress_level or 0) <= 7:
-                        continue
-                    if filter_type == "Great Days" and (entry.energy_level or 0) <= 7:
-                        continue
-                    if filter_type == "Bad Sleep" and (entry.sleep_hours or 7) >= 6:
-                        continue
-                        
-                    filtered_count += 1
-                    self._create_entry_card(scrollable_frame, entry)
+            filtered_count = 0
+            for entry in entries:
+                # Apply month filter
+                if selected_month != "All Months":
+                    try:
+                        entry_month = datetime.strptime(str(entry.entry_date).split('.')[0], "%Y-%m-%d %H:%M:%S").strftime("%B %Y")
+                        if entry_month != selected_month:
+                            continue
+                    except:
+                        pass
                     
-                if filtered_count == 0:
-                    tk.Label(scrollable_frame, text="No entries found matching filters.", 
-                            font=("Segoe UI", 12), bg=self.colors.get("bg", "#f0f0f0"), 
-                            fg=self.colors.get("text_secondary", "#666")).pack(pady=20)
-            finally:
-                session.close()
+                # Apply type filter
+                if filter_type == "High Stress" and (entry.stress_level or 0) <= 7:
+                    continue
+                if filter_type == "Great Days" and (entry.energy_level or 0) <= 7:
+                    continue
+                if filter_type == "Bad Sleep" and (entry.sleep_hours or 7) >= 6:
+                    continue
+                    
+                filtered_count += 1
+                self._create_entry_card(scrollable_frame, entry)
+                
+            if filtered_count == 0:
+                tk.Label(scrollable_frame, text="No entries found matching filters.", 
+                        font=("Segoe UI", 12), bg=self.colors.get("bg", "#f0f0f0"), 
+                        fg=self.colors.get("text_secondary", "#666")).pack(pady=20)
 
         # Update on filter change
         month_combo.bind("<<ComboboxSelected>>", lambda e: render_entries())
         type_combo.bind("<<ComboboxSelected>>", lambda e: render_entries())
         
-        # Initial Render
+        # Initial Render (placeholder until the entries arrive)
         render_entries()
+        
+        def on_loaded(entries):
+            logging.debug(f"View Past Entries found {len(entries)} records for {self.username}")
+            loaded["entries"] = entries
+            render_entries()
+        
+        get_background_loader(entries_window).submit(
+            ("past_entries", id(entries_window)), fetch_entries, on_loaded, widget=scrollable_frame
+        )
 
         # Configure canvas width
         def _configure_canvas(event):
@@ -681,45 +666,25 @@ class JournalFeature:
     # ========== HEALTH INSIGHTS & NUDGES ==========
     def generate_health_insights(self):
         """Check for recent trends and return comprehensive health insights"""
-        session = get_session()
         try:
-            # Query last 3 days
+            # Last 3 days, read from the per-day rollup
             three_days_ago = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                days = get_journal_days(cursor, self.username, three_days_ago)
+                if not days:
+                    return "Start tracking your sleep and energy to get personalized health insights!"
+                
+                # Free-text context, newest first (indexed on username, entry_date)
+                cursor.execute(
+                    "SELECT stress_triggers, daily_schedule FROM journal_entries "
+                    "WHERE username = ? AND entry_date >= ? ORDER BY entry_date DESC",
+                    (self.username, three_days_ago)
+                )
+                context_rows = cursor.fetchall()
             
-            # Use SQLAlchemy query instead of raw SQL for better compatibility
-            entries = session.query(JournalEntry)\
-                .filter(JournalEntry.username == self.username)\
-                .filter(JournalEntry.entry_date >= three_days_ago)\
-                .order_by(JournalEntry.entry_date.desc())\
-                .all()
-            
-            if not entries:
-                return "Start tracking your sleep and energy to get personalized health insights!"
-            
-            # Data extraction
-            sleeps = []
-            qualities = []
-            energies = []
-            works = []
-            screens = []
-            stresses = []
-            
-            for entry in entries:
-                sleeps.append(entry.sleep_hours)
-                qualities.append(entry.sleep_quality)
-                energies.append(entry.energy_level)
-                works.append(entry.work_hours)
-                screens.append(getattr(entry, 'screen_time_mins', None))
-                stresses.append(getattr(entry, 'stress_level', None))
-            
-            # --- DEBUG LOGGING ---
-            print(f"DEBUG: Entries found: {len(entries)}")
-            print(f"DEBUG: Screens: {screens}")
-            print(f"DEBUG: Stresses: {stresses}")
-            print(f"DEBUG: Work: {works}")
-            print(f"DEBUG: Energy: {energies}")
-            print(f"DEBUG: Sleep: {sleeps}")
-            # ---------------------
+            # Averages over the days' recorded values; 0 counts as not recorded
+            average = lambda metric: nonzero_mean(days.values(), metric) or 0
 
             # --- ADVANCED ANALYSIS ENGINE ---
             
@@ -727,32 +692,32 @@ class JournalFeature:
             advice_components = []
             
             # 1. Digital Overload Check
-            avg_screen = sum(s for s in screens if s)/len([s for s in screens if s]) if any(screens) else 0
-            avg_stress = sum(s for s in stresses if s)/len([s for s in stresses if s]) if any(stresses) else 0
+            avg_screen = average("screen_time_mins")
+            avg_stress = average("stress_level")
             
             if avg_screen > 240 and avg_stress > 6:
                 risk_factors.append("Digital Overload")
                 advice_components.append("Reducing screen time by 1 hour could lower your stress levels.")
 
             # 2. Burnout Check
-            avg_work = sum(w for w in works if w)/len([w for w in works if w]) if any(works) else 0
-            avg_energy = sum(e for e in energies if e)/len([e for e in energies if e]) if any(energies) else 0
+            avg_work = average("work_hours")
+            avg_energy = average("energy_level")
             
             if avg_work > 9 and avg_energy < 5:
                 risk_factors.append("Early Burnout")
                 advice_components.append("Your energy is low despite high work output. This is sustainable for only short periods.")
 
             # 3. Sleep Check
-            avg_sleep = sum(s for s in sleeps if s)/len([s for s in sleeps if s]) if any(sleeps) else 0
+            avg_sleep = average("sleep_hours")
             if avg_sleep < 6:
                 risk_factors.append("Sleep Deprivation")
                 advice_components.append("Recovery is your #1 priority right now. Aim for 7h tonight.")
 
             # 4. Contextual Triggers & Schedule
-            recent_triggers = [t for t in [getattr(e, 'stress_triggers', '') for e in entries] if t]
+            recent_triggers = [t for t, _schedule in context_rows if t]
             common_trigger = recent_triggers[0][:15] + "..." if recent_triggers else None
             
-            schedules = [s for s in [getattr(e, 'daily_schedule', '') for e in entries] if s]
+            schedules = [s for _trigger, s in context_rows if s]
             is_busy = schedules and len(schedules[0]) > 50
 
             # --- SYNTHESIS ---
@@ -785,58 +750,10 @@ class JournalFeature:
                     msg += "\n\n🗓️ **Note**: Your schedule looks packed. Clear 30 mins for 'do nothing' time."
                 
                 return msg
-            
-            # Calculate Averages
-            avg_sleep = sum(sleeps) / len(sleeps) if sleeps else 0
-            avg_quality = sum(qualities) / len(qualities) if qualities else 0
-            avg_energy = sum(energies) / len(energies) if energies else 0
-            avg_work = sum(works) / len(works) if works else 0
-            
-            insights = []
-            
-            # --- Logic Rule Engine ---
-            
-            # 1. Sleep Logic (Duration & Quality)
-            if avg_sleep < 6.0:
-                insights.append("🌙 You've been averaging less than 6 hours of sleep.")
-            elif avg_sleep >= 7.5 and avg_quality >= 7:
-                insights.append("🛌 You're getting great sleep quantity and quality!")
-            
-            # Quality specific
-            if qualities and avg_quality < 5:
-                insights.append("📉 Your sleep quality is reported low. Ensure your room is cool and dark.")
-            elif sleeps and qualities and avg_sleep > 8 and avg_quality < 5:
-                insights.append("🤔 You're sleeping long hours but quality is low. This might indicate restless sleep.")
-
-            # 2. Energy Logic
-            if len(energies) >= 2 and all(e <= 4 for e in energies[:3]):
-                insights.append("🔋 Warning: Consistent low energy detected. Prevent burnout by taking a break.")
-            elif avg_energy >= 8.0:
-                insights.append("⚡ You're continuously reporting high energy!")
-            elif len(energies) >= 2 and energies[0] > energies[-1] + 2:
-                 insights.append("🚀 Energy trend: Improving compared to recent days.")
-
-            # 3. Work Logic
-            if avg_work > 10:
-                 insights.append("💼 Heavy Workload Alert: Averaging >10h/day. Don't forget to disconnect.")
-            elif avg_work > 8:
-                 insights.append("👔 You're having a standard productive work week.")
-            elif avg_work < 2 and avg_energy > 5:
-                 insights.append("🧘 Low work hours + High energy = Great recovery period!")
-
-            # Construct final message
-            if insights:
-                insight_text = " ".join(insights)
-            else:
-                insight_text = "Your health metrics are stable. Consistent tracking discovers hidden patterns!"
                 
         except Exception as e:
             logging.error(f"Insight generation failed: {e}")
-            insight_text = "Could not generate insights at this moment."
-        finally:
-            session.close()
-            
-        return insight_text
+            return "Could not generate insights at this moment."
 
 
 # Standalone test function
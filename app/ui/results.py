@@ -3,8 +3,8 @@ from tkinter import messagebox
 import logging
 from datetime import datetime
 import random
-from app.db import get_connection, get_session
-from app.models import Score
+from app.db import pooled_connection
+from app.ui.background import get_background_loader
 from app.constants import BENCHMARK_DATA
 try:
     from app.services.pdf_generator import generate_pdf_report
@@ -22,25 +22,20 @@ class ResultsManager:
         try:
             from app.ui.satisfaction import SatisfactionSurvey
             
-            # Get latest score ID
-            session = get_session()
-            try:
-                latest_score = session.query(Score).filter(
-                    Score.username == self.app.username
-                ).order_by(Score.id.desc()).first()
-                
-                eq_score_id = latest_score.id if latest_score else None
-                
-                survey = SatisfactionSurvey(
-                    parent=self.app.root,
-                    username=self.app.username,
-                    user_id=self.app.current_user_id,
-                    eq_score_id=eq_score_id,
-                    language=self.app.settings.get("language", "en")
-                )
-                survey.show()
-            finally:
-                session.close()
+            from app.services.score_stats import get_score_stats
+            
+            # Get latest score ID from rolling stats
+            with pooled_connection() as conn:
+                eq_score_id = get_score_stats(conn.cursor(), self.app.username)["last_score_id"]
+            
+            survey = SatisfactionSurvey(
+                parent=self.app.root,
+                username=self.app.username,
+                user_id=self.app.current_user_id,
+                eq_score_id=eq_score_id,
+                language=self.app.settings.get("language", "en")
+            )
+            survey.show()
         except Exception as e:
             messagebox.showerror("Error", f"Cannot open survey: {str(e)}")
         
@@ -1004,19 +999,18 @@ class ResultsManager:
             fg=colors.get("text_primary", "#F8FAFC")
         ).pack(side="left", padx=50)
         
-        conn = get_connection()
-        cursor = conn.cursor()
-
         # Get history data
         if not self.app.username:
-            cursor.execute(
-                """
-                SELECT DISTINCT username FROM scores 
-                ORDER BY timestamp DESC 
-                LIMIT 5
-                """
-            )
-            users = cursor.fetchall()
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT DISTINCT username FROM scores 
+                    ORDER BY timestamp DESC 
+                    LIMIT 5
+                    """
+                )
+                users = cursor.fetchall()
             
             if not users:
                 tk.Label(
@@ -1073,21 +1067,58 @@ class ResultsManager:
         self.app.clear_screen()
         
         colors = self.app.colors
+        placeholder = tk.Label(
+            self.app.root,
+            text=f"⏳ Loading history for {username}...",
+            font=("Arial", 12),
+            bg=colors.get("bg", "#0F172A"),
+            fg=colors.get("text_primary", "#F8FAFC")
+        )
+        placeholder.pack(pady=50)
         
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Get history data
-        cursor.execute(
-            """
-            SELECT id, total_score, age, timestamp 
-            FROM scores 
-            WHERE username = ? 
-            ORDER BY timestamp DESC
-            """,
-            (username,)
+        def on_done(result):
+            placeholder.destroy()
+            self._render_user_history(username, *result)
+        
+        # Leaving the screen destroys the placeholder, which drops the result
+        get_background_loader(self.app.root).submit(
+            "user_history", lambda: self._fetch_user_history(username), on_done, widget=placeholder
         )
-        history = cursor.fetchall()
+
+    def _fetch_user_history(self, username):
+        """Scores and deep-dive results, newest first (safe off the Tk thread)"""
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+
+            # Get history data
+            cursor.execute(
+                """
+                SELECT id, total_score, age, timestamp 
+                FROM scores 
+                WHERE username = ? 
+                ORDER BY timestamp DESC
+                """,
+                (username,)
+            )
+            history = cursor.fetchall()
+
+            # Get user_id for Deep Dive results
+            cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+            row = cursor.fetchone()
+            user_id = row[0] if row else None
+
+            deep_dives = []
+            if user_id:
+                cursor.execute(
+                    "SELECT assessment_type, total_score, timestamp, details FROM assessment_results WHERE user_id = ? ORDER BY timestamp DESC",
+                    (user_id,)
+                )
+                deep_dives = cursor.fetchall()
+        
+        return history, deep_dives
+
+    def _render_user_history(self, username, history, deep_dives):
+        colors = self.app.colors
         
         # Header with back button
         header_frame = tk.Frame(self.app.root, bg=colors.get("bg", "#0F172A"))
@@ -1127,19 +1158,6 @@ class ResultsManager:
             ).pack(pady=20)
             return
         
-        # Get user_id for Deep Dive results
-        cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
-        user_id = row[0] if row else None
-
-        deep_dives = []
-        if user_id:
-            cursor.execute(
-                "SELECT assessment_type, total_score, timestamp, details FROM assessment_results WHERE user_id = ? ORDER BY timestamp DESC",
-                (user_id,)
-            )
-            deep_dives = cursor.fetchall()
-
         # Create scrollable frame for history
         canvas = tk.Canvas(self.app.root, bg=colors.get("bg", "#0F172A"), highlightthickness=0)
         scrollbar = tk.Scrollbar(self.app.root, orient="vertical", command=canvas.yview)
@@ -1301,20 +1319,19 @@ class ResultsManager:
         
         colors = self.app.colors
         
-        conn = get_connection()
-        cursor = conn.cursor()
-
         # Get all test data for the current user
-        cursor.execute(
-            """
-            SELECT id, total_score, timestamp 
-            FROM scores 
-            WHERE username = ? 
-            ORDER BY timestamp ASC
-            """,
-            (self.app.username,)
-        )
-        all_tests = cursor.fetchall()
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, total_score, timestamp 
+                FROM scores 
+                WHERE username = ? 
+                ORDER BY timestamp ASC
+                """,
+                (self.app.username,)
+            )
+            all_tests = cursor.fetchall()
         
         if len(all_tests) < 2:
             messagebox.showinfo("No Comparison", "You need at least 2 tests to compare.")
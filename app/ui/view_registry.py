@@ -0,0 +1,83 @@
+import importlib
+import logging
+import tkinter as tk
+
+
+class ViewRegistry:
+    """
+    Lazily imported, cached sidebar views.
+
+    Each view is registered by import path so its module (and whatever it
+    pulls in: matplotlib, NLTK, sklearn...) is only loaded on first
+    navigation. Cacheable views keep their built frame for re-entry until
+    invalidate() is called for them.
+    """
+
+    def __init__(self, container, bg=None):
+        self.container = container
+        self.bg = bg
+        self._specs = {}    # view_id -> (module path, attribute, cacheable)
+        self._classes = {}  # view_id -> imported class
+        self._frames = {}   # view_id -> built frame
+        self.active_id = None
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, view_id, module_path, attr, cacheable=True):
+        self._specs[view_id] = (module_path, attr, cacheable)
+
+    def load_class(self, view_id):
+        """Import and return the view class, importing its module on first use"""
+        if view_id not in self._classes:
+            module_path, attr, _ = self._specs[view_id]
+            self._classes[view_id] = getattr(importlib.import_module(module_path), attr)
+        return self._classes[view_id]
+
+    def is_cached(self, view_id):
+        frame = self._frames.get(view_id)
+        return frame is not None and bool(frame.winfo_exists())
+
+    def owns(self, widget):
+        return any(widget is frame for frame in self._frames.values())
+
+    def show(self, view_id, build):
+        """
+        Display a view, calling build(parent_frame) only if no cached frame
+        exists. Returns the frame.
+        """
+        self.active_id = view_id
+        if self.is_cached(view_id):
+            frame = self._frames[view_id]
+            frame.pack(fill="both", expand=True)
+            return frame
+
+        self._frames.pop(view_id, None)
+        frame = tk.Frame(self.container, bg=self.bg)
+        frame.pack(fill="both", expand=True)
+        try:
+            build(frame)
+        except Exception:
+            frame.destroy()
+            raise
+        if self._specs.get(view_id, (None, None, False))[2]:
+            self._frames[view_id] = frame
+        return frame
+
+    def hide_all(self):
+        """Unmap cached frames without destroying them"""
+        self.active_id = None
+        for frame in self._frames.values():
+            if frame.winfo_exists():
+                frame.pack_forget()
+
+    def invalidate(self, *view_ids):
+        """
+        Drop cached frames (all of them if no ids are given) so the next
+        navigation rebuilds them. The visible view is left on screen and is
+        destroyed by the next clear.
+        """
+        for view_id in view_ids or list(self._frames):
+            frame = self._frames.pop(view_id, None)
+            if frame is not None and view_id != self.active_id and frame.winfo_exists():
+                frame.destroy()
+        if view_ids:
+            self.logger.debug(f"Invalidated views: {', '.join(view_ids)}")
@@ -0,0 +1,34 @@
+"""Link responses to their score row
+
+Revision ID: 8b2d4f6a1c9e
+Revises: 64a9bde24d3d
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4f6a1c9e'
+down_revision: Union[str, Sequence[str], None] = '64a9bde24d3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('responses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('score_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_responses_score_id', 'scores', ['score_id'], ['id'])
+        batch_op.create_index('ix_responses_score_id', ['score_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('responses', schema=None) as batch_op:
+        batch_op.drop_index('ix_responses_score_id')
+        batch_op.drop_constraint('fk_responses_score_id', type_='foreignkey')
+        batch_op.drop_column('score_id')
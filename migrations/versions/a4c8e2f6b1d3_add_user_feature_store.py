@@ -0,0 +1,49 @@
+"""Add user_feature_store table
+
+Revision ID: a4c8e2f6b1d3
+Revises: e7a3c9d1f4b6
+Create Date: 2026-10-17 13:41:27.305114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b1d3'
+down_revision: Union[str, Sequence[str], None] = 'e7a3c9d1f4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_feature_store',
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('score_count', sa.Integer(), nullable=False),
+    sa.Column('total_n', sa.Integer(), nullable=False),
+    sa.Column('total_sum', sa.Float(), nullable=False),
+    sa.Column('total_sumsq', sa.Float(), nullable=False),
+    sa.Column('total_xy', sa.Float(), nullable=False),
+    sa.Column('total_min', sa.Float(), nullable=True),
+    sa.Column('total_max', sa.Float(), nullable=True),
+    sa.Column('sentiment_n', sa.Integer(), nullable=False),
+    sa.Column('sentiment_sum', sa.Float(), nullable=False),
+    sa.Column('sentiment_sumsq', sa.Float(), nullable=False),
+    sa.Column('response_count', sa.Integer(), nullable=False),
+    sa.Column('response_n', sa.Integer(), nullable=False),
+    sa.Column('response_sum', sa.Float(), nullable=False),
+    sa.Column('response_sumsq', sa.Float(), nullable=False),
+    sa.Column('last_score_id', sa.Integer(), nullable=False),
+    sa.Column('last_response_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('username')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_feature_store')
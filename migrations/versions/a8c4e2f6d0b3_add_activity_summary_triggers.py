@@ -0,0 +1,60 @@
+"""Keep user_activity_summary current with triggers on scores
+
+Revision ID: a8c4e2f6d0b3
+Revises: f1c3e5a7b9d2
+Create Date: 2026-10-17 21:12:08.531662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e2f6d0b3'
+down_revision: Union[str, Sequence[str], None] = 'f1c3e5a7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _summary_insert(where):
+    return f"""
+        INSERT INTO user_activity_summary
+        (username, user_id, attempt_count, scored_count, score_sum, avg_score,
+         first_attempt, last_attempt, updated_at)
+        SELECT username, MAX(user_id), COUNT(id), COUNT(total_score), COALESCE(SUM(total_score), 0),
+               AVG(total_score), MIN(timestamp), MAX(timestamp), strftime('%Y-%m-%dT%H:%M:%f', 'now')
+        FROM scores WHERE username IS NOT NULL AND username != '' AND ({where})
+        GROUP BY username
+    """
+
+
+def _refresh(row):
+    return f"""
+        DELETE FROM user_activity_summary WHERE username = {row}.username;
+        {_summary_insert(f"username = {row}.username").strip()};
+    """
+
+
+def _triggers():
+    yield "activity_summary_ai", "AFTER INSERT ON scores", ("new",)
+    yield "activity_summary_au", "AFTER UPDATE OF username, user_id, total_score, timestamp ON scores", ("old", "new")
+    yield "activity_summary_ad", "AFTER DELETE ON scores", ("old",)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, timing, rows in _triggers():
+        body = "".join(_refresh(row) for row in rows)
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;")
+
+    # Rebuild, catching up with scores written outside finish_exam
+    op.execute("DELETE FROM user_activity_summary")
+    op.execute(_summary_insert("1"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _timing, _rows in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
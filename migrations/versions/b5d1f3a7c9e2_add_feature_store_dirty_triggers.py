@@ -0,0 +1,42 @@
+"""Mark user_feature_store rows dirty when folded scores or responses change
+
+Revision ID: b5d1f3a7c9e2
+Revises: a8c4e2f6d0b3
+Create Date: 2026-10-17 23:41:19.372815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f3a7c9e2'
+down_revision: Union[str, Sequence[str], None] = 'a8c4e2f6d0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WATCHED = {
+    "scores": "username, total_score, sentiment_score, timestamp",
+    "responses": "username, response_value",
+}
+
+
+def _triggers():
+    for table, columns in WATCHED.items():
+        yield f"{table}_feature_dirty_au", f"AFTER UPDATE OF {columns} ON {table}", ("old", "new")
+        yield f"{table}_feature_dirty_ad", f"AFTER DELETE ON {table}", ("old",)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, timing, rows in _triggers():
+        body = "".join(f"UPDATE user_feature_store SET version = 0 WHERE username = {row}.username;" for row in rows)
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _timing, _rows in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
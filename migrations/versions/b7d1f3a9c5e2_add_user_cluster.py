@@ -0,0 +1,36 @@
+"""Add user_cluster table
+
+Revision ID: b7d1f3a9c5e2
+Revises: a4c8e2f6b1d3
+Create Date: 2026-10-17 14:22:09.118463
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1f3a9c5e2'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e2f6b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_cluster',
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('cluster_id', sa.Integer(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('assigned_at', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('username')
+    )
+    op.create_index(op.f('ix_user_cluster_cluster_id'), 'user_cluster', ['cluster_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_cluster_cluster_id'), table_name='user_cluster')
+    op.drop_table('user_cluster')
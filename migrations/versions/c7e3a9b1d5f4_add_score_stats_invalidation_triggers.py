@@ -0,0 +1,36 @@
+"""Drop user_score_stats rows when a user's scores are updated or deleted
+
+Revision ID: c7e3a9b1d5f4
+Revises: b5d1f3a7c9e2
+Create Date: 2026-10-17 23:58:42.104417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a9b1d5f4'
+down_revision: Union[str, Sequence[str], None] = 'b5d1f3a7c9e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = {
+    "score_stats_au": ("AFTER UPDATE OF username, total_score, timestamp ON scores", ("old", "new")),
+    "score_stats_ad": ("AFTER DELETE ON scores", ("old",)),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, (timing, rows) in TRIGGERS.items():
+        body = "".join(f"DELETE FROM user_score_stats WHERE username = {row}.username;" for row in rows)
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
@@ -0,0 +1,36 @@
+"""Add online anomaly flags to scores
+
+Revision ID: c9e5a1d7f3b8
+Revises: b7d1f3a9c5e2
+Create Date: 2026-10-17 15:41:27.306512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e5a1d7f3b8'
+down_revision: Union[str, Sequence[str], None] = 'b7d1f3a9c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay NULL (not evaluated) until ensure_score_flags() or
+    # rebuild_score_stats() replays the user's history
+    with op.batch_alter_table('scores', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_outlier', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('outlier_zscore', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('is_inconsistent_transition', sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('scores', schema=None) as batch_op:
+        batch_op.drop_column('is_inconsistent_transition')
+        batch_op.drop_column('outlier_zscore')
+        batch_op.drop_column('is_outlier')
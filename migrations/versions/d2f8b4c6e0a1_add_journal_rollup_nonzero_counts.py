@@ -0,0 +1,83 @@
+"""Add per-metric non-zero counts to journal_daily_rollup
+
+Revision ID: d2f8b4c6e0a1
+Revises: c7e3a9b1d5f4
+Create Date: 2026-10-18 00:37:05.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8b4c6e0a1'
+down_revision: Union[str, Sequence[str], None] = 'c7e3a9b1d5f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ("sleep_hours", "sleep_quality", "energy_level", "work_hours",
+           "screen_time_mins", "stress_level", "sentiment_score")
+
+
+def _rollup_insert(where, nonzero):
+    stats = "{m}_sum, {m}_count, {m}_min, {m}_max" + (", {m}_nonzero" if nonzero else "")
+    aggregates = "SUM({m}), COUNT({m}), MIN({m}), MAX({m})" + (", COUNT(NULLIF({m}, 0))" if nonzero else "")
+    columns = ", ".join(stats.format(m=m) for m in METRICS)
+    values = ", ".join(aggregates.format(m=m) for m in METRICS)
+    return f"""
+        INSERT INTO journal_daily_rollup (username, day, entry_count, {columns})
+        SELECT username, substr(entry_date, 1, 10), COUNT(*), {values}
+        FROM journal_entries WHERE {where}
+        GROUP BY username, substr(entry_date, 1, 10)
+    """
+
+
+def _refresh(row, nonzero):
+    day = f"substr({row}.entry_date, 1, 10)"
+    where = f"username = {row}.username AND entry_date >= {day} AND entry_date < date({day}, '+1 day')"
+    return f"""
+        DELETE FROM journal_daily_rollup WHERE username = {row}.username AND day = {day};
+        {_rollup_insert(where, nonzero).strip()};
+    """
+
+
+def _triggers():
+    watched = ", ".join(("username", "entry_date") + METRICS)
+    yield "journal_rollup_ai", "AFTER INSERT ON journal_entries", ("new",)
+    yield "journal_rollup_au", f"AFTER UPDATE OF {watched} ON journal_entries", ("old", "new")
+    yield "journal_rollup_ad", "AFTER DELETE ON journal_entries", ("old",)
+
+
+def _drop_triggers():
+    for name, _timing, _rows in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _create_triggers(nonzero):
+    for name, timing, rows in _triggers():
+        body = "".join(_refresh(row, nonzero) for row in rows)
+        op.execute(f"CREATE TRIGGER {name} {timing} BEGIN {body} END;")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for m in METRICS:
+        op.add_column('journal_daily_rollup', sa.Column(f'{m}_nonzero', sa.Integer(), nullable=True))
+    _drop_triggers()
+    _create_triggers(nonzero=True)
+
+    # Rebuild so existing days get their counts
+    op.execute("DELETE FROM journal_daily_rollup")
+    op.execute(_rollup_insert("username IS NOT NULL AND entry_date IS NOT NULL", nonzero=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The batch table copy cannot be renamed while triggers refer to the table
+    _drop_triggers()
+    with op.batch_alter_table('journal_daily_rollup') as batch_op:
+        for m in METRICS:
+            batch_op.drop_column(f'{m}_nonzero')
+    _create_triggers(nonzero=False)
@@ -0,0 +1,59 @@
+"""Add user_activity_summary table
+
+Revision ID: d2f8b4e6a0c1
+Revises: c9e5a1d7f3b8
+Create Date: 2026-10-17 16:58:40.772914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8b4e6a0c1'
+down_revision: Union[str, Sequence[str], None] = 'c9e5a1d7f3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_activity_summary',
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('scored_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('avg_score', sa.Float(), nullable=True),
+    sa.Column('first_attempt', sa.String(), nullable=True),
+    sa.Column('last_attempt', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('username')
+    )
+    op.create_index(op.f('ix_user_activity_summary_attempt_count'), 'user_activity_summary', ['attempt_count'], unique=False)
+    op.create_index(op.f('ix_user_activity_summary_last_attempt'), 'user_activity_summary', ['last_attempt'], unique=False)
+    op.create_index(op.f('ix_user_activity_summary_user_id'), 'user_activity_summary', ['user_id'], unique=False)
+
+    # Backfill from existing scores
+    op.execute(
+        """
+        INSERT INTO user_activity_summary
+        (username, user_id, attempt_count, scored_count, score_sum, avg_score,
+         first_attempt, last_attempt, updated_at)
+        SELECT username, MAX(user_id), COUNT(id), COUNT(total_score), COALESCE(SUM(total_score), 0),
+               AVG(total_score), MIN(timestamp), MAX(timestamp), CURRENT_TIMESTAMP
+        FROM scores WHERE username IS NOT NULL AND username != ''
+        GROUP BY username
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_activity_summary_user_id'), table_name='user_activity_summary')
+    op.drop_index(op.f('ix_user_activity_summary_last_attempt'), table_name='user_activity_summary')
+    op.drop_index(op.f('ix_user_activity_summary_attempt_count'), table_name='user_activity_summary')
+    op.drop_table('user_activity_summary')
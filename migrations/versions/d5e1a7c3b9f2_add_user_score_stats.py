@@ -0,0 +1,41 @@
+"""Add user_score_stats table
+
+Revision ID: d5e1a7c3b9f2
+Revises: 8b2d4f6a1c9e
+Create Date: 2026-10-17 10:03:11.582940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e1a7c3b9f2'
+down_revision: Union[str, Sequence[str], None] = '8b2d4f6a1c9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_score_stats',
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('mean_score', sa.Float(), nullable=False),
+    sa.Column('m2', sa.Float(), nullable=False),
+    sa.Column('recent_scores', sa.Text(), nullable=True),
+    sa.Column('last_score_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('username')
+    )
+    op.create_index(op.f('ix_user_score_stats_user_id'), 'user_score_stats', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_score_stats_user_id'), table_name='user_score_stats')
+    op.drop_table('user_score_stats')
@@ -0,0 +1,50 @@
+"""Add per-user data version counter
+
+Revision ID: e4a6c8f0b2d3
+Revises: d2f8b4e6a0c1
+Create Date: 2026-10-17 17:42:13.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a6c8f0b2d3'
+down_revision: Union[str, Sequence[str], None] = 'd2f8b4e6a0c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("scores", "journal_entries", "satisfaction_records")
+
+
+def _triggers():
+    for table in TABLES:
+        yield f"{table}_user_version_ai", f"AFTER INSERT ON {table}", "new"
+        yield f"{table}_user_version_au", f"AFTER UPDATE ON {table}", "new"
+        yield f"{table}_user_version_ad", f"AFTER DELETE ON {table}", "old"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_data_version',
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('username')
+    )
+    for name, timing, row in _triggers():
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} {timing} WHEN {row}.username IS NOT NULL BEGIN
+                INSERT INTO user_data_version (username, version) VALUES ({row}.username, 1)
+                ON CONFLICT(username) DO UPDATE SET version = version + 1;
+            END;
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _timing, _row in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('user_data_version')
@@ -0,0 +1,47 @@
+"""Add question bank version counter
+
+Revision ID: e7a3c9d1f4b6
+Revises: d5e1a7c3b9f2
+Create Date: 2026-10-17 11:26:48.904315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9d1f4b6'
+down_revision: Union[str, Sequence[str], None] = 'd5e1a7c3b9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = {
+    "question_bank_version_ai": "AFTER INSERT ON question_bank",
+    "question_bank_version_au": "AFTER UPDATE ON question_bank",
+    "question_bank_version_ad": "AFTER DELETE ON question_bank",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('question_bank_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO question_bank_version (id, version) VALUES (1, 0)")
+    for name, timing in TRIGGERS.items():
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN
+                UPDATE question_bank_version SET version = version + 1 WHERE id = 1;
+            END;
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('question_bank_version')
@@ -0,0 +1,83 @@
+"""Add journal_daily_rollup table and journal (username, entry_date) index
+
+Revision ID: f1c3e5a7b9d2
+Revises: e4a6c8f0b2d3
+Create Date: 2026-10-17 19:06:51.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3e5a7b9d2'
+down_revision: Union[str, Sequence[str], None] = 'e4a6c8f0b2d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ("sleep_hours", "sleep_quality", "energy_level", "work_hours",
+           "screen_time_mins", "stress_level", "sentiment_score")
+
+
+def _rollup_insert(where):
+    columns = ", ".join(f"{m}_sum, {m}_count, {m}_min, {m}_max" for m in METRICS)
+    aggregates = ", ".join(f"SUM({m}), COUNT({m}), MIN({m}), MAX({m})" for m in METRICS)
+    return f"""
+        INSERT INTO journal_daily_rollup (username, day, entry_count, {columns})
+        SELECT username, substr(entry_date, 1, 10), COUNT(*), {aggregates}
+        FROM journal_entries WHERE {where}
+        GROUP BY username, substr(entry_date, 1, 10)
+    """
+
+
+def _refresh(row):
+    day = f"substr({row}.entry_date, 1, 10)"
+    where = f"username = {row}.username AND entry_date >= {day} AND entry_date < date({day}, '+1 day')"
+    return f"""
+        DELETE FROM journal_daily_rollup WHERE username = {row}.username AND day = {day};
+        {_rollup_insert(where).strip()};
+    """
+
+
+def _triggers():
+    watched = ", ".join(("username", "entry_date") + METRICS)
+    yield "journal_rollup_ai", "AFTER INSERT ON journal_entries", ("new",)
+    yield "journal_rollup_au", f"AFTER UPDATE OF {watched} ON journal_entries", ("old", "new")
+    yield "journal_rollup_ad", "AFTER DELETE ON journal_entries", ("old",)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = []
+    for m in METRICS:
+        columns += [
+            sa.Column(f'{m}_sum', sa.Float(), nullable=True),
+            sa.Column(f'{m}_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column(f'{m}_min', sa.Float(), nullable=True),
+            sa.Column(f'{m}_max', sa.Float(), nullable=True),
+        ]
+    op.create_table('journal_daily_rollup',
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('day', sa.String(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False, server_default='0'),
+    *columns,
+    sa.PrimaryKeyConstraint('username', 'day')
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_journal_user_date ON journal_entries (username, entry_date)")
+
+    for name, timing, rows in _triggers():
+        body = "".join(_refresh(row) for row in rows)
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {body} END;")
+
+    # Backfill from existing entries
+    op.execute(_rollup_insert("username IS NOT NULL AND entry_date IS NOT NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _timing, _rows in _triggers():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_index('idx_journal_user_date', table_name='journal_entries')
+    op.drop_table('journal_daily_rollup')
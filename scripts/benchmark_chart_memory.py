@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Chart memory benchmark for SOUL_SENSE_EXAM
+
+Switches between chart views many times and checks that memory and the
+number of live matplotlib Figures stay flat. Charts draw into the shared
+FigurePool (app/ui/figure_pool.py), which keeps one figure per chart slot,
+so these numbers should not grow with the number of switches.
+
+"pool" runs headless: it renders every dashboard chart slot in turn into a
+fresh master, the way a rebuilt tab does, through an Agg canvas. With
+--gui and a display available, "dashboard" also opens the real
+AnalyticsDashboard for --user and cycles its tabs, rebuilding the dashboard
+after every full pass.
+
+Usage:
+    python scripts/benchmark_chart_memory.py [--cycles 500] [--gui] [--user NAME] [--budget-mb 20]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from matplotlib.figure import Figure
+
+from app.ui.figure_pool import FigurePool
+
+SLOTS = [
+    ("daily_view.weekly", (7, 4)),
+    ("dashboard.correlation", (10, 8)),
+    ("dashboard.eq_trends", (6, 4)),
+    ("dashboard.wellbeing", (10, 5)),
+    ("dashboard.satisfaction", (8, 4)),
+    ("day_detail.gauges", (9, 3)),
+]
+
+# Growth allowed between the first full pass and the last one
+MEMORY_BUDGET_MB = 20
+
+
+def live_figures():
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def measure(step, cycles, warmup):
+    """Run step(i) cycles times; (memory growth in MB, live figures) after warmup"""
+    for i in range(warmup):
+        step(i)
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    for i in range(warmup, cycles):
+        step(i)
+    gc.collect()
+    end, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (end - start) / 1e6, peak / 1e6, live_figures()
+
+
+def pool_scenario(cycles):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import numpy as np
+
+    pool = FigurePool(canvas_factory=lambda figure, master: FigureCanvasAgg(figure))
+    data = np.random.default_rng(0).integers(10, 40, size=50)
+
+    def step(i):
+        slot, figsize = SLOTS[i % len(SLOTS)]
+        chart = pool.acquire_cleared(slot, object(), figsize=figsize, dpi=80)
+        ax = chart.figure.add_subplot(111)
+        ax.plot(range(len(data)), data, "o-")
+        ax.bar(range(7), data[:7])
+        chart.draw()
+
+    result = measure(step, cycles, warmup=len(SLOTS))
+    return result + (pool.stats(),)
+
+
+def dashboard_scenario(cycles, username):
+    import tkinter as tk
+    from app.ui.dashboard import AnalyticsDashboard
+    from app.ui.figure_pool import get_figure_pool
+
+    root = tk.Tk()
+    root.withdraw()
+    state = {}
+
+    def settle():
+        loader = state["dashboard"].loader
+        deadline = time.monotonic() + 10
+        while loader._current and time.monotonic() < deadline:
+            root.update()
+            time.sleep(0.005)
+        root.update()
+
+    def build():
+        if "frame" in state:
+            state["frame"].destroy()
+        state["frame"] = tk.Frame(root)
+        state["frame"].pack(fill=tk.BOTH, expand=True)
+        state["dashboard"] = AnalyticsDashboard(state["frame"], username)
+        state["dashboard"].render_dashboard()
+        settle()
+
+    def step(i):
+        # A full pass over the tabs, then a fresh dashboard, as when the user navigates away and back
+        if "dashboard" not in state or i % len(state["dashboard"].notebook.tabs()) == 0:
+            build()
+        tabs = state["dashboard"].notebook.tabs()
+        state["dashboard"].notebook.select(tabs[i % len(tabs)])
+        settle()
+
+    try:
+        result = measure(step, cycles, warmup=20)
+    finally:
+        root.destroy()
+    return result + (get_figure_pool().stats(),)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chart memory across view switches")
+    parser.add_argument("--cycles", type=int, default=500, help="View switches per scenario")
+    parser.add_argument("--gui", action="store_true", help="Also cycle the real dashboard tabs")
+    parser.add_argument("--user", default="benchmark", help="User whose dashboard is opened")
+    parser.add_argument("--budget-mb", type=float, default=MEMORY_BUDGET_MB,
+                        help="Allowed memory growth over the run")
+    args = parser.parse_args()
+
+    scenarios = {"pool": lambda: pool_scenario(args.cycles)}
+    if args.gui:
+        scenarios["dashboard"] = lambda: dashboard_scenario(args.cycles, args.user)
+
+    over_budget = False
+    for name, run in scenarios.items():
+        try:
+            growth_mb, peak_mb, figures, stats = run()
+        except Exception as e:  # e.g. no display for Tk
+            print(f"{name:<10} skipped ({e})")
+            continue
+        status = "OK" if growth_mb <= args.budget_mb else "OVER BUDGET"
+        print(f"{name:<10} {args.cycles} switches: growth {growth_mb:6.2f} MB "
+              f"(peak {peak_mb:.2f} MB), live figures {figures}, pool {stats} {status}")
+        over_budget |= growth_mb > args.budget_mb
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for SOUL_SENSE_EXAM
+
+Measures, in fresh interpreters, how long it takes to import the data layer
+(app.db + app.questions) and how much the explicit init()/warmup() steps add
+on top. Importing no longer touches the database, so "import" is the cost
+every CLI invocation, test and script pays; "eager" reproduces the old
+behaviour of checking the schema and loading the bank at import time.
+
+With --gui it also measures the Tkinter shell: importing app.main (sidebar
+views are imported on first navigation) and, when a display is available,
+time to the first login screen, which is checked against a budget.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 10] [--gui] [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+SCENARIOS = {
+    "import": "import app.db, app.questions",
+    "import+init": "import app.db, app.questions; app.db.init()",
+    "eager": "import app.db, app.questions; app.db.init(); app.questions.warmup()",
+}
+
+GUI_SCENARIOS = {
+    "gui import": "import app.main",
+    "login screen": (
+        "import tkinter as tk, app.main\n"
+        "root = tk.Tk(); root.withdraw(); shell = app.main.SoulSenseApp(root)\n"
+        "shell.show_login_screen(); root.update()"
+    ),
+}
+
+# Cold start (import of app.main up to the first login screen) must stay under this
+COLD_START_BUDGET_MS = 1500
+
+_TIMER = (
+    "import time, json; _t = time.perf_counter()\n"
+    "{code}\n"
+    "print(json.dumps(time.perf_counter() - _t))"
+)
+
+
+def time_scenario(code, runs):
+    """Wall-clock seconds for each run of ``code`` in a fresh interpreter"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(code=code)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per scenario")
+    parser.add_argument("--gui", action="store_true", help="Also time the Tkinter shell")
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS,
+                        help="Cold-start budget for the login screen")
+    args = parser.parse_args()
+
+    scenarios = dict(SCENARIOS)
+    if args.gui:
+        scenarios.update(GUI_SCENARIOS)
+
+    results = {}
+    for name, code in scenarios.items():
+        try:
+            samples = time_scenario(code, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<14} skipped ({e.stderr.strip().splitlines()[-1]})")
+            continue
+        results[name] = statistics.median(samples)
+        print(f"{name:<14} median {results[name] * 1000:8.1f} ms "
+              f"(min {min(samples) * 1000:.1f}, max {max(samples) * 1000:.1f})")
+
+    if "eager" in results and "import" in results:
+        saving = results["eager"] - results["import"]
+        print(f"\nImport-time work avoided: {saving * 1000:.1f} ms per process")
+
+    if "login screen" in results:
+        cold_start_ms = results["login screen"] * 1000
+        status = "OK" if cold_start_ms <= args.budget_ms else "OVER BUDGET"
+        print(f"Cold start to login screen: {cold_start_ms:.1f} ms "
+              f"(budget {args.budget_ms:.0f} ms) {status}")
+        if cold_start_ms > args.budget_ms:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
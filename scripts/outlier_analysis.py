@@ -60,7 +60,8 @@ def format_text_output(result: dict) -> str:
         stats = result["statistics"]
         output.append("\n📈 Statistics:")
         output.append(f"   Mean Score:       {stats['mean_score']:.2f}")
-        output.append(f"   Median Score:     {stats['median_score']:.2f}")
+        if stats.get('median_score') is not None:  # Not computed for z-score scopes
+            output.append(f"   Median Score:     {stats['median_score']:.2f}")
         output.append(f"   Std Dev:          {stats['std_dev']:.2f}")
         output.append(f"   Range:            {stats['min_score']:.0f} - {stats['max_score']:.0f}")
     
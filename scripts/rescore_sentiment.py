@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Re-score stored sentiment with the shared sentiment service
+
+Recomputes journal_entries.sentiment_score from content and
+scores.sentiment_score from reflection_text, in batches. Repeated texts are
+scored once thanks to the service's cache. The clustering feature store
+is rebuilt afterwards when score sentiments changed, since it holds
+running sums of them.
+
+Usage:
+    python scripts/rescore_sentiment.py [--batch-size 500] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import pooled_connection
+from app.services.feature_store import rebuild_feature_store
+from app.services.sentiment import get_sentiment_service
+
+# (table, text column) pairs whose sentiment_score is derived from the text
+TARGETS = [
+    ("journal_entries", "content"),
+    ("scores", "reflection_text"),
+]
+
+
+def rescore_table(conn, table, column, batch_size, dry_run=False):
+    """Re-score one table; returns the number of rows whose score changed"""
+    service = get_sentiment_service()
+    cursor = conn.cursor()
+    changed = 0
+    last_id = 0
+    while True:
+        cursor.execute(
+            f"SELECT id, {column}, sentiment_score FROM {table} "
+            f"WHERE id > ? AND {column} IS NOT NULL AND {column} != '' "
+            f"ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        scores = service.score_many([row[1] for row in rows])
+        updates = [
+            (new, row[0]) for row, new in zip(rows, scores)
+            if row[2] is None or abs(row[2] - new) > 1e-9
+        ]
+        changed += len(updates)
+        if updates and not dry_run:
+            cursor.executemany(f"UPDATE {table} SET sentiment_score = ? WHERE id = ?", updates)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored sentiment")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    args = parser.parse_args()
+
+    with pooled_connection() as conn:
+        for table, column in TARGETS:
+            changed = rescore_table(conn, table, column, args.batch_size, args.dry_run)
+            print(f"{table}: {changed} rows {'would change' if args.dry_run else 'updated'}")
+            if table == "scores" and changed and not args.dry_run:
+                print(f"Feature store: rebuilt {rebuild_feature_store(conn.cursor())} users")
+
+    print(f"Cache: {get_sentiment_service().stats()}")
+
+
+if __name__ == "__main__":
+    main()
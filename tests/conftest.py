@@ -36,6 +36,12 @@ def temp_db(monkeypatch):
         return test_engine.raw_connection()
     monkeypatch.setattr("app.db.get_connection", mock_get_conn)
     
+    # Route pooled raw connections to the same in-memory DB
+    from app.db import ConnectionPool
+    monkeypatch.setattr("app.db._pool", ConnectionPool(factory=test_engine.raw_connection))
+    # Schema is created above; skip the lazy check against the real database
+    monkeypatch.setattr("app.db._initialized", True)
+    
     # Patch get_session in consuming modules that used 'from app.db import get_session'
     try:
         monkeypatch.setattr("app.questions.get_session", lambda: TestSessionLocal())
@@ -60,6 +66,22 @@ def temp_db(monkeypatch):
     test_engine.dispose()
 
 
+@pytest.fixture
+def cursor(tmp_path):
+    """
+    Raw sqlite3 cursor on a fresh file database with the full schema
+    (tables and triggers), for services that take a DB-API cursor.
+    """
+    import sqlite3
+    db_path = str(tmp_path / "test.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    conn = sqlite3.connect(db_path)
+    yield conn.cursor()
+    conn.close()
+
+
 # --- UI MOCKING FIXTURES ---
 
 @pytest.fixture(scope="session", autouse=True)
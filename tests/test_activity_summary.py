@@ -0,0 +1,68 @@
+import pytest
+from app.services.activity_summary import (
+    ensure_activity_summary, get_returning_users, rebuild_activity_summary
+)
+
+def _insert_score(cursor, username, score, ts):
+    cursor.execute(
+        "INSERT INTO scores (username, total_score, timestamp) VALUES (?, ?, ?)",
+        (username, score, ts)
+    )
+
+def _summary(cursor):
+    cursor.execute(
+        "SELECT username, attempt_count, scored_count, avg_score, first_attempt, last_attempt "
+        "FROM user_activity_summary ORDER BY username"
+    )
+    return cursor.fetchall()
+
+def test_triggers_match_rebuild(cursor):
+    attempts = [
+        ("alice", 20, "2026-01-03"), ("alice", 30, "2026-01-01"), ("bob", 25, "2026-01-02"),
+        ("alice", None, "2026-01-05"), ("bob", 27, "2026-01-04"), ("carol", 12, "2026-01-06"),
+        (None, 40, "2026-01-07"), ("", 40, "2026-01-07"),
+    ]
+    for username, score, ts in attempts:
+        _insert_score(cursor, username, score, ts)
+    incremental = _summary(cursor)
+    
+    assert incremental[0] == ("alice", 3, 2, pytest.approx(25.0), "2026-01-01", "2026-01-05")
+    assert rebuild_activity_summary(cursor) == 3
+    assert _summary(cursor) == incremental
+
+def test_updates_and_deletes_are_reflected(cursor):
+    for score, ts in [(20, "2026-01-01"), (30, "2026-01-02"), (40, "2026-01-03")]:
+        _insert_score(cursor, "gil", score, ts)
+    
+    cursor.execute("UPDATE scores SET total_score = 10 WHERE username = 'gil' AND total_score = 40")
+    cursor.execute("DELETE FROM scores WHERE username = 'gil' AND total_score = 20")
+    assert _summary(cursor) == [("gil", 2, 2, pytest.approx(20.0), "2026-01-02", "2026-01-03")]
+    
+    cursor.execute("UPDATE scores SET username = 'hana' WHERE username = 'gil' AND total_score = 10")
+    assert _summary(cursor) == [("gil", 1, 1, pytest.approx(30.0), "2026-01-02", "2026-01-02"),
+                                ("hana", 1, 1, pytest.approx(10.0), "2026-01-03", "2026-01-03")]
+    cursor.execute("DELETE FROM scores WHERE username = 'gil'")
+    assert [row[0] for row in _summary(cursor)] == ["hana"]
+
+def test_returning_users(cursor):
+    for i in range(3):
+        _insert_score(cursor, "dave", 30 + i, f"2026-02-0{i + 1}")
+    _insert_score(cursor, "erin", 20, "2026-02-01")
+    
+    users = get_returning_users(cursor, min_attempts=2)
+    assert [u["username"] for u in users] == ["dave"]
+    assert users[0]["total_attempts"] == 3
+    assert users[0]["average_score"] == pytest.approx(31.0)
+    assert len(get_returning_users(cursor, min_attempts=1)) == 2
+
+def test_ensure_rebuilds_when_out_of_date(cursor):
+    assert not ensure_activity_summary(cursor)  # Nothing to backfill
+    _insert_score(cursor, "fay", 18, "2026-03-01")
+    assert not ensure_activity_summary(cursor)  # Kept current by the triggers
+    
+    # As on a database with scores from before the triggers existed
+    cursor.execute("DROP TRIGGER activity_summary_ai")
+    _insert_score(cursor, "fay", 22, "2026-03-02")
+    assert ensure_activity_summary(cursor)
+    assert _summary(cursor) == [("fay", 2, 2, pytest.approx(20.0), "2026-03-01", "2026-03-02")]
+    assert not ensure_activity_summary(cursor)
@@ -0,0 +1,82 @@
+import threading
+import time
+import pytest
+
+from app.ui.background import BackgroundLoader
+
+class FakeRoot:
+    """Collects after() callbacks so tests can run the Tk side by hand"""
+    def __init__(self):
+        self.callbacks = []
+    
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+    
+    def after_cancel(self, after_id):
+        pass
+    
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+class FakeWidget:
+    def __init__(self):
+        self.alive = True
+    
+    def winfo_exists(self):
+        return self.alive
+
+@pytest.fixture
+def loader():
+    root = FakeRoot()
+    loader = BackgroundLoader(root)
+    yield loader
+    loader.shutdown()
+
+def _drain(loader, timeout=5):
+    """Poll like the Tk loop would until every live request is delivered"""
+    deadline = time.monotonic() + timeout
+    while loader._current and time.monotonic() < deadline:
+        loader.root.run_pending()
+        time.sleep(0.01)
+
+def test_result_delivered_on_polling_thread(loader):
+    results = []
+    loader.submit("tab", lambda: threading.current_thread().name, results.append)
+    _drain(loader)
+    
+    assert len(results) == 1
+    assert results[0].startswith("ui-loader")  # fetch ran on a worker
+    assert not loader.is_pending("tab")
+
+def test_newer_request_supersedes_older(loader):
+    release = threading.Event()
+    results = []
+    loader.submit("tab", lambda: release.wait(5) and "old", results.append)
+    loader.submit("tab", lambda: "new", results.append)
+    release.set()
+    _drain(loader)
+    
+    assert results == ["new"]
+
+def test_cancel_and_dead_widget_drop_results(loader):
+    results = []
+    loader.submit("a", lambda: 1, results.append)
+    loader.cancel("a")
+    widget = FakeWidget()
+    loader.submit("b", lambda: 2, results.append, widget=widget)
+    widget.alive = False
+    _drain(loader)
+    
+    assert results == []
+
+def test_errors_go_to_on_error(loader):
+    errors = []
+    def fail():
+        raise ValueError("boom")
+    loader.submit("tab", fail, lambda r: None, on_error=errors.append)
+    _drain(loader)
+    
+    assert isinstance(errors[0], ValueError)
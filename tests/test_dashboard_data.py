@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from app.models import JournalEntry, SatisfactionRecord, Score
+from app.services.dashboard_data import DashboardDataService
+
+@pytest.fixture
+def service():
+    return DashboardDataService(cache_size=2)
+
+def _seed(session):
+    session.add_all([
+        Score(username="ana", total_score=30, sentiment_score=10.0, timestamp="2026-01-01T10:00:00"),
+        Score(username="ana", total_score=34, sentiment_score=None, timestamp="2026-01-02T10:00:00"),
+        Score(username="ana", total_score=None, timestamp="2026-01-03T10:00:00"),
+        Score(username="ben", total_score=20, timestamp="2026-01-01T10:00:00"),
+        JournalEntry(username="ana", entry_date="2026-01-02 08:00:00", sentiment_score=40.0,
+                     emotional_patterns="calm; focused", sleep_hours=7.5, work_hours=6.0),
+        JournalEntry(username="ana", entry_date="2026-01-01 08:00:00", sentiment_score=None),
+        SatisfactionRecord(username="ana", timestamp="2026-01-02T09:00:00", satisfaction_score=7,
+                           positive_factors='["team"]'),
+    ])
+    session.commit()
+
+def test_snapshot_columns(temp_db, service):
+    _seed(temp_db)
+    snapshot = service.get_snapshot("ana")
+    
+    assert snapshot.scores.tolist() == [30, 34]  # Unscored attempt left out
+    assert snapshot.score_sentiments[0] == 10.0
+    assert np.isnan(snapshot.journal_sentiments[0])
+    assert snapshot.journal_dates.tolist() == ["2026-01-01 08:00:00", "2026-01-02 08:00:00"]
+    assert snapshot.sleep_hours[1] == 7.5 and np.isnan(snapshot.sleep_hours[0])
+    assert snapshot.satisfaction_scores.tolist() == [7.0]
+    assert snapshot.positive_factors == [["team"]] and snapshot.negative_factors == [[]]
+    assert snapshot.has_wellbeing_columns
+    assert snapshot.journal_days.tolist() == ["2026-01-01", "2026-01-02"]
+    assert np.isnan(snapshot.daily_means["sleep_hours"][0]) and snapshot.daily_means["sleep_hours"][1] == 7.5
+    sleeps, sentiments = snapshot.daily_pairs("sleep_hours", "sentiment_score")
+    assert sleeps.tolist() == [7.5] and sentiments.tolist() == [40.0]
+    assert [c.size for c in snapshot.daily_pairs("sleep_hours", "energy_level")] == [0, 0]
+    
+    history = snapshot.history()
+    assert [s.total_score for s in history.scores] == [30, 34]
+    assert history.journal_entries[1].sentiment_score == 40.0
+
+def test_snapshot_cached_until_user_writes(temp_db, service):
+    _seed(temp_db)
+    first = service.get_snapshot("ana")
+    
+    assert service.get_snapshot("ana") is first
+    assert service.stats()["hits"] == 1
+    
+    # Another user's write leaves the snapshot valid
+    temp_db.add(Score(username="ben", total_score=22, timestamp="2026-01-04T10:00:00"))
+    temp_db.commit()
+    assert service.get_snapshot("ana") is first
+    
+    temp_db.add(JournalEntry(username="ana", entry_date="2026-01-05 08:00:00", sentiment_score=5.0))
+    temp_db.commit()
+    refreshed = service.get_snapshot("ana")
+    assert refreshed is not first
+    assert refreshed.journal_count == 3
+    assert service.stats()["builds"] == 2
+
+def test_cache_is_bounded(temp_db, service):
+    _seed(temp_db)
+    for username in ("ana", "ben", "cy"):
+        service.get_snapshot(username)
+    assert service.stats()["size"] == 2
+
+@pytest.mark.parametrize("table, columns", [
+    ("scores", "total_score, timestamp"),
+    ("journal_entries", "content, entry_date"),
+    ("satisfaction_records", "satisfaction_score, timestamp"),
+])
+def test_rows_without_username_are_not_versioned(temp_db, table, columns):
+    from sqlalchemy import text
+    temp_db.execute(text(f"INSERT INTO {table} (username, {columns}) VALUES (NULL, 5, '2026-01-01 08:00:00')"))
+    temp_db.execute(text(f"UPDATE {table} SET username = NULL"))
+    temp_db.execute(text(f"DELETE FROM {table}"))
+    temp_db.commit()
+    assert temp_db.execute(text("SELECT COUNT(*) FROM user_data_version")).scalar() == 0
@@ -1,4 +1,7 @@
-from app.db import get_session
+import threading
+import pytest
+from app.db import get_session, ConnectionPool, pooled_connection, get_pool_stats
+from app.exceptions import DatabaseError
 from sqlalchemy import text
 
 def test_db_session(temp_db):
@@ -6,3 +9,167 @@ def test_db_session(temp_db):
     result = session.execute(text("SELECT 1"))
     assert result.scalar() == 1
     session.close()
+
+# --- RAW CONNECTION POOL ---
+
+@pytest.fixture
+def pool(tmp_path):
+    p = ConnectionPool(str(tmp_path / "pool.db"), max_size=2, timeout=0.2)
+    yield p
+    p.close_all()
+
+def test_pool_reuses_connections(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+    
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+
+def test_pool_applies_pragmas_once(pool):
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+def test_pool_commits_and_rolls_back(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("boom")
+    
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+def test_pool_is_bounded(pool):
+    first = pool.acquire()
+    second = pool.acquire()
+    
+    with pytest.raises(DatabaseError):
+        pool.acquire()
+    
+    pool.release(first)
+    pool.release(second)
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+
+def test_pool_waiter_gets_released_connection(pool):
+    held = [pool.acquire(), pool.acquire()]
+    timer = threading.Timer(0.05, lambda: pool.release(held.pop()))
+    timer.start()
+    
+    conn = pool.acquire()
+    pool.release(conn)
+    pool.release(held.pop())
+    timer.join()
+    
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["wait_time"] > 0
+
+def test_pooled_connection_uses_app_pool(temp_db):
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO scores (username, total_score) VALUES (?, ?)", ("pool_user", 30))
+    
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT total_score FROM scores WHERE username = ?", ("pool_user",))
+        assert cursor.fetchone()[0] == 30
+    
+    assert get_pool_stats()["checked_out"] == 0
+
+# --- PRAGMA PROFILES ---
+
+def test_pragma_profile_resolution():
+    from app.db import get_pragma_settings, PRAGMA_PROFILES
+    
+    settings = get_pragma_settings("low_memory", overrides={"cache_size": -1000})
+    assert settings["mmap_size"] == 0
+    assert settings["cache_size"] == -1000
+    # Unknown profiles fall back to the default
+    assert get_pragma_settings("nope", overrides={}) == PRAGMA_PROFILES["balanced"]
+
+def test_engine_connect_hook_applies_profile(tmp_path):
+    from sqlalchemy import create_engine, event
+    from app.db import _on_engine_connect, log_effective_pragmas, get_pragma_settings
+    
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    event.listen(test_engine, "connect", _on_engine_connect)
+    
+    effective = log_effective_pragmas(test_engine)
+    expected = get_pragma_settings()
+    assert effective["journal_mode"] == "wal"
+    assert effective["synchronous"] == 1  # NORMAL
+    assert effective["cache_size"] == expected["cache_size"]
+    test_engine.dispose()
+
+def test_ensure_additive_columns_upgrades_old_table(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine, inspect
+    from app.db import ensure_additive_columns
+    
+    old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE scores (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("CREATE TABLE responses (id INTEGER PRIMARY KEY, username TEXT)"))
+    monkeypatch.setattr("app.db.engine", old_engine)
+    
+    ensure_additive_columns()
+    
+    inspector = inspect(old_engine)
+    assert "score_id" in {c["name"] for c in inspector.get_columns("responses")}
+    assert "ix_responses_score_id" in {i["name"] for i in inspector.get_indexes("responses")}
+    old_engine.dispose()
+
+# --- LAZY INITIALIZATION ---
+
+def test_import_has_no_side_effects(tmp_path):
+    import subprocess, sys, os
+    code = (
+        "import threading, app.db, app.questions\n"
+        "assert not app.db.is_initialized()\n"
+        "assert threading.active_count() == 1, threading.enumerate()\n"
+        "assert app.questions.get_question_cache_stats()['version_checks'] == 0\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_init_runs_schema_check_once(monkeypatch):
+    import app.db as db
+    calls = []
+    monkeypatch.setattr(db, "_initialized", False)
+    monkeypatch.setattr(db, "check_db_state", lambda force=False: calls.append(force) or True)
+    
+    assert db.init() and db.init()
+    assert len(calls) == 1
+    db.init(force=True)
+    assert calls == [False, True]
+
+def test_check_db_state_skips_stamped_database(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    import app.db as db
+    
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'stamped.db'}")
+    monkeypatch.setattr(db, "engine", test_engine)
+    backfills = []
+    monkeypatch.setattr("app.services.score_stats.refresh_score_stats", lambda cursor: backfills.append(1))
+    
+    assert db.check_db_state()
+    assert db._schema_version() == db.SCHEMA_VERSION
+    assert backfills == [1]
+    
+    # Up to date: no create_all, inspection or backfills
+    monkeypatch.setattr(db, "ensure_additive_columns", lambda *a: pytest.fail("schema re-checked"))
+    assert db.check_db_state()
+    assert backfills == [1]
+    test_engine.dispose()
@@ -0,0 +1,86 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.analysis.downsampling import (
+    coarsen_rollups, daily_rollups, downsample_indices, lttb_indices, minmax_indices, period_key
+)
+
+Row = namedtuple("Row", ["timestamp", "total_score"])
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    y = rng.normal(25, 3, size=5000)
+    y[1234] = 80   # Isolated spike
+    y[3210] = -40  # Isolated dip
+    return y
+
+def test_short_series_is_untouched():
+    assert minmax_indices([3, 1, 2], 10).tolist() == [0, 1, 2]
+    assert lttb_indices([0, 1, 2], [3, 1, 2], 10).tolist() == [0, 1, 2]
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsample_is_bounded_and_keeps_extremes(series, method):
+    shown = downsample_indices(series, 200, method=method)
+    assert len(shown) <= 200
+    assert np.all(np.diff(shown) > 0)
+    assert shown[0] == 0 and shown[-1] == len(series) - 1
+    assert 1234 in shown and 3210 in shown
+
+def test_minmax_keeps_every_bucket_extreme(series):
+    shown = minmax_indices(series, 100)
+    edges = np.linspace(1, len(series) - 1, 50).astype(int)
+    for start, end in zip(edges[:-1], edges[1:]):
+        segment = series[start:end]
+        assert start + np.argmin(segment) in shown
+        assert start + np.argmax(segment) in shown
+
+def test_downsample_skips_missing_values():
+    y = np.array([1.0, np.nan, 3.0, np.nan, 5.0])
+    assert downsample_indices(y, 10).tolist() == [0, 2, 4]
+
+def test_unknown_method_is_rejected(series):
+    with pytest.raises(ValueError):
+        downsample_indices(series, 50, method="median")
+
+def test_weekly_and_monthly_rollups_merge_daily_ones():
+    start = datetime(2025, 1, 1, 9, 0)
+    rows = [Row((start + timedelta(hours=10 * i)).isoformat(), 10 + i % 17) for i in range(300)]
+    rows.append(Row("not a date", 99))
+    rows.append(Row("2025-01-02 08:00:00", None))
+
+    daily = daily_rollups(rows, "timestamp", "total_score")
+    assert sum(r.count for r in daily.values()) == 300
+
+    for period in ("weekly", "monthly"):
+        expected = {}
+        for row in rows[:300]:
+            expected.setdefault(period_key(datetime.fromisoformat(row.timestamp), period), []).append(row.total_score)
+        merged = coarsen_rollups(daily, period)
+        assert list(merged) == sorted(expected)
+        for key, values in expected.items():
+            rollup = merged[key]
+            assert (rollup.count, rollup.min, rollup.max) == (len(values), min(values), max(values))
+            assert rollup.mean == pytest.approx(np.mean(values))
+
+def test_period_stats_share_one_daily_pass():
+    from app.analysis.time_based_analysis import TimeBasedAnalyzer, UserHistorySnapshot
+
+    history = UserHistorySnapshot("roll")
+    history.seed("scores", [Row("2025-01-01T10:00:00", 20), Row("2025-01-01T18:00:00", 30),
+                            Row("2025-01-09T10:00:00", 25), Row("2025-02-03T10:00:00", 40)])
+    analyzer = TimeBasedAnalyzer()
+
+    daily = analyzer.get_time_period_stats("roll", period="daily", snapshot=history)
+    weekly = analyzer.get_time_period_stats("roll", period="weekly", snapshot=history)
+    monthly = analyzer.get_time_period_stats("roll", period="monthly", snapshot=history)
+
+    assert daily["period_statistics"]["2025-01-01"] == {
+        "average_score": 25, "min_score": 20, "max_score": 30, "attempts_count": 2
+    }
+    assert weekly["period_statistics"]["2025-W2"]["attempts_count"] == 1
+    assert monthly["period_statistics"]["2025-01"]["attempts_count"] == 3
+    assert set(history._rollups) == {("scores", "total_score", p) for p in ("daily", "weekly", "monthly")}
@@ -179,6 +179,61 @@ class TestEmotionalFeatureExtractor:
         assert variance == 0.0, "Uniform responses should have zero variance"
 
 
+class TestBulkFeatureExtraction:
+    """Bulk extraction must match the per-user feature definitions."""
+    
+    @staticmethod
+    def _seed(session):
+        from app.models import Score, Response
+        rng = np.random.RandomState(3)
+        for u in range(6):
+            name = f"bulk_user_{u}"
+            for i in range(u + 1):
+                session.add(Score(username=name, total_score=int(rng.randint(10, 40)),
+                                  sentiment_score=None if i == 0 else float(rng.uniform(-50, 50)),
+                                  timestamp=f"2024-01-{i + 1:02d}T10:00:00"))
+            for i in range(u * 2):
+                session.add(Response(username=name, question_id=i, response_value=int(rng.randint(1, 6))))
+        session.add(Score(username="no_totals", total_score=None, timestamp="2024-01-01T10:00:00"))
+        session.commit()
+    
+    def test_matches_reference_features(self, temp_db, feature_extractor):
+        from app.models import Score, Response
+        self._seed(temp_db)
+        
+        df = feature_extractor.extract_all_users_features()
+        assert list(df.columns) == ['username'] + feature_extractor.feature_names
+        assert sorted(df['username']) == [f"bulk_user_{u}" for u in range(6)]
+        
+        for row in df.to_dict('records'):
+            scores = temp_db.query(Score).filter_by(username=row['username']).order_by(Score.timestamp).all()
+            responses = temp_db.query(Response).filter_by(username=row['username']).all()
+            values = [s.total_score for s in scores]
+            sentiments = [s.sentiment_score for s in scores if s.sentiment_score is not None]
+            expected = {
+                'avg_total_score': np.mean(values),
+                'score_std': np.std(values) if len(values) > 1 else 0,
+                'avg_sentiment': np.mean(sentiments) if sentiments else 0,
+                'sentiment_std': np.std(sentiments) if len(sentiments) > 1 else 0,
+                'score_trend': feature_extractor._calculate_trend(values),
+                'response_consistency': feature_extractor._calculate_consistency(responses),
+                'emotional_range': max(values) - min(values) if len(values) > 1 else 0,
+                'assessment_frequency': len(scores),
+                'avg_response_value': feature_extractor._avg_response_value(responses),
+                'response_variance': feature_extractor._response_variance(responses),
+            }
+            for name, value in expected.items():
+                assert row[name] == pytest.approx(value), name
+    
+    def test_single_user_uses_same_path(self, temp_db, feature_extractor):
+        self._seed(temp_db)
+        features = feature_extractor.extract_user_features("bulk_user_3")
+        assert features['username'] == "bulk_user_3"
+        assert features['assessment_frequency'] == 4
+        assert feature_extractor.extract_user_features("no_totals") is None
+        assert feature_extractor.extract_user_features("missing") is None
+
+
 # ==============================================================================
 # TEST CLUSTERER
 # ==============================================================================
@@ -315,6 +370,191 @@ class TestEmotionalProfileClusterer:
         assert new_clusterer.n_clusters == clusterer.n_clusters
 
 
+class TestParallelKSelection:
+    """Process-pool k-selection and the feature-matrix cache."""
+    
+    @pytest.fixture
+    def X_scaled(self, clusterer, sample_user_data):
+        X = sample_user_data.drop(columns=['username']).values
+        return clusterer.scaler.fit_transform(X)
+    
+    def test_parallel_matches_serial(self, clusterer, X_scaled, monkeypatch):
+        import app.ml.clustering as clustering
+        monkeypatch.setattr(clustering, "PARALLEL_K_SELECTION_MIN_ROWS", 0)
+        
+        monkeypatch.setattr(clustering, "K_SELECTION_WORKERS", 1)
+        clustering._k_selection_cache.clear()
+        serial = [clustering._score_k(X_scaled, k, 42) for k in range(2, 6)]
+        
+        monkeypatch.setattr(clustering, "K_SELECTION_WORKERS", 2)
+        parallel = clustering._score_k_range_parallel(X_scaled, range(2, 6), 42)
+        assert parallel == pytest.approx(serial)
+        
+        clustering._k_selection_cache.clear()
+        assert 2 <= clusterer._find_optimal_clusters(X_scaled, max_k=5) <= 5
+    
+    def test_unchanged_matrix_hits_cache(self, clusterer, X_scaled, monkeypatch):
+        import app.ml.clustering as clustering
+        clustering._k_selection_cache.clear()
+        first = clusterer._find_optimal_clusters(X_scaled, max_k=5)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("should be served from cache")
+        monkeypatch.setattr(clustering, "_score_k", fail)
+        monkeypatch.setattr(clustering, "_score_k_range_parallel", fail)
+        assert clusterer._find_optimal_clusters(X_scaled.copy(), max_k=5) == first
+        
+        # A different matrix is not confused with the cached one
+        X_other = X_scaled.copy()
+        X_other[0, 0] += 1.0
+        with pytest.raises(AssertionError):
+            clusterer._find_optimal_clusters(X_other, max_k=5)
+
+
+class TestStreamingClustering:
+    """Mini-batch / streaming mode."""
+    
+    @pytest.fixture
+    def stream_clusterer(self, tmp_path):
+        c = EmotionalProfileClusterer(n_clusters=4, random_state=42)
+        c.model_path = tmp_path
+        return c
+    
+    def test_fit_streaming_over_chunks(self, stream_clusterer, sample_user_data):
+        chunks = lambda: (sample_user_data.iloc[i:i + 7] for i in range(0, len(sample_user_data), 7))
+        results = stream_clusterer.fit_streaming(chunks, batch_size=7)
+        
+        assert 'error' not in results
+        assert results['n_users'] == len(sample_user_data)
+        assert sum(results['cluster_distribution'].values()) == len(sample_user_data)
+        assert results['metrics']['sample_size'] == len(sample_user_data)
+        assert stream_clusterer.is_fitted
+        
+        # Deterministic for a fixed seed
+        again = stream_clusterer.fit_streaming(chunks, batch_size=7)
+        assert again['cluster_distribution'] == results['cluster_distribution']
+    
+    def test_partial_fit_continues_full_batch_model(self, stream_clusterer, sample_user_data):
+        stream_clusterer.fit(data=sample_user_data.iloc[:40])
+        centers = stream_clusterer.cluster_centers_.copy()
+        
+        assert stream_clusterer.partial_fit(sample_user_data.iloc[40:])
+        assert stream_clusterer.cluster_centers_.shape == centers.shape
+        assert not np.allclose(stream_clusterer.cluster_centers_, centers)
+    
+    def test_partial_fit_skips_batch_smaller_than_clusters(self, stream_clusterer, sample_user_data):
+        stream_clusterer.fit(data=sample_user_data.iloc[:40])
+        centers = stream_clusterer.cluster_centers_.copy()
+        
+        assert not stream_clusterer.partial_fit(sample_user_data.iloc[40:42])
+        np.testing.assert_array_equal(stream_clusterer.cluster_centers_, centers)
+    
+    def test_partial_fit_keeps_scaler_frozen(self, stream_clusterer, sample_user_data):
+        stream_clusterer.fit(data=sample_user_data.iloc[:40])
+        mean = stream_clusterer.scaler.mean_.copy()
+        
+        assert stream_clusterer.partial_fit(sample_user_data.iloc[40:])
+        np.testing.assert_array_equal(stream_clusterer.scaler.mean_, mean)
+    
+    def test_reservoir_sample_is_bounded(self):
+        from app.ml.clustering import _reservoir_update
+        rng = np.random.RandomState(0)
+        reservoir, seen = None, 0
+        for _ in range(5):
+            X = np.arange(30, dtype=float).reshape(10, 3) + seen
+            reservoir = _reservoir_update(reservoir, X, seen, 16, rng)
+            seen += len(X)
+        assert reservoir.shape == (16, 3)
+    
+    def test_fit_streaming_reads_feature_store(self, temp_db, stream_clusterer):
+        from app.models import Score
+        for u in range(8):
+            for i in range(3):
+                temp_db.add(Score(username=f"s{u}", total_score=10 + u * 3 + i,
+                                  sentiment_score=float(u), timestamp=f"2024-03-0{i + 1}"))
+        temp_db.commit()
+        
+        results = stream_clusterer.fit_streaming(batch_size=3)
+        assert results['n_users'] == 8
+        assert stream_clusterer.persisted_assignments
+        members = sum((stream_clusterer.get_cluster_users(k) for k in range(4)), [])
+        assert sorted(members) == [f"s{u}" for u in range(8)]
+    
+    def test_fit_streaming_refreshes_once_and_tracks_store_failures(self, temp_db, stream_clusterer, monkeypatch):
+        import app.ml.clustering as clustering
+        from app.models import Score
+        for u in range(8):
+            temp_db.add(Score(username=f"t{u}", total_score=10 + u * 3, timestamp="2024-03-01"))
+        temp_db.commit()
+        
+        refreshes = []
+        real_refresh = clustering.refresh_stale_features
+        monkeypatch.setattr(clustering, "refresh_stale_features",
+                            lambda cursor: refreshes.append(1) or real_refresh(cursor))
+        calls = []
+        monkeypatch.setattr(stream_clusterer, "_store_assignments",
+                            lambda *args, **kwargs: calls.append(1) or len(calls) == 1)
+        
+        results = stream_clusterer.fit_streaming(batch_size=3)
+        assert results['n_users'] == 8
+        assert refreshes == [1]
+        assert len(calls) == 2  # Writing stops after the failed chunk
+        assert not stream_clusterer.persisted_assignments
+
+
+class TestBatchPrediction:
+    """Vectorized prediction and the user_cluster table."""
+    
+    @pytest.fixture
+    def db_clusterer(self, temp_db, tmp_path):
+        rng = np.random.RandomState(5)
+        from app.models import Score
+        for u in range(30):
+            base = 10 + (u % 3) * 10
+            for i in range(3):
+                temp_db.add(Score(username=f"batch_user_{u:02d}", total_score=int(base + rng.randint(0, 4)),
+                                  sentiment_score=float(rng.uniform(-20, 20)),
+                                  timestamp=f"2024-02-{i + 1:02d}T10:00:00"))
+        temp_db.commit()
+        c = EmotionalProfileClusterer(n_clusters=3, random_state=42)
+        c.model_path = tmp_path
+        return c
+    
+    def test_matrix_matches_single_prediction(self, clusterer, sample_user_data, tmp_path):
+        clusterer.model_path = tmp_path
+        clusterer.fit(data=sample_user_data)
+        X = sample_user_data[clusterer.feature_extractor.feature_names].to_numpy(dtype=float)
+        ids, confidences = clusterer.predict_from_feature_matrix(X)
+        
+        assert list(ids) == list(clusterer.kmeans.predict(clusterer.scaler.transform(X)))
+        assert np.all((confidences >= 0) & (confidences <= 1))
+        single = clusterer.predict_from_features(sample_user_data.iloc[0].to_dict())
+        assert single['cluster_id'] == ids[0]
+        assert single['confidence'] == pytest.approx(confidences[0])
+    
+    def test_fit_persists_assignments(self, db_clusterer):
+        results = db_clusterer.fit()
+        assert 'error' not in results
+        assert db_clusterer.persisted_assignments
+        
+        db_clusterer.user_profiles = {}  # Lookup must not depend on the in-memory map
+        members = [db_clusterer.get_cluster_users(k) for k in range(3)]
+        assert sorted(sum(members, [])) == [f"batch_user_{u:02d}" for u in range(30)]
+        assert [len(m) for m in members] == [results['cluster_distribution'][k] for k in range(3)]
+    
+    def test_predict_many_upserts(self, db_clusterer, temp_db):
+        from app.models import UserCluster
+        db_clusterer.fit()
+        temp_db.query(UserCluster).delete()
+        temp_db.commit()
+        
+        results = db_clusterer.predict_many(["batch_user_00", "batch_user_01", "missing"])
+        assert sorted(results) == ["batch_user_00", "batch_user_01"]
+        rows = {r.username: r.cluster_id for r in temp_db.query(UserCluster).all()}
+        assert rows == {name: r['cluster_id'] for name, r in results.items()}
+        assert results["batch_user_00"]['cluster_id'] == db_clusterer.predict("batch_user_00")['cluster_id']
+
+
 # ==============================================================================
 # TEST VISUALIZER
 # ==============================================================================
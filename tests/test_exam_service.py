@@ -0,0 +1,196 @@
+import os
+import time
+import pytest
+from sqlalchemy import create_engine, text
+from app.db import ConnectionPool
+from app.models import Base
+from app.services.exam_service import ExamSession, recover_response_journals
+
+QUESTIONS = [(1, "Q1", None, 0, 120), (2, "Q2", None, 0, 120), (3, "Q3", None, 0, 120)]
+
+@pytest.fixture
+def exam_db(tmp_path, monkeypatch):
+    """File-backed DB so the flush timer thread sees the same data"""
+    db_path = str(tmp_path / "exam.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    pool = ConnectionPool(db_path)
+    monkeypatch.setattr("app.db._pool", pool)
+    monkeypatch.setattr("app.db._initialized", True)
+    yield engine
+    pool.close_all()
+    engine.dispose()
+
+def _make_session(tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval", None)
+    session = ExamSession("exam_user", 25, "Adult", QUESTIONS,
+                          journal_dir=str(tmp_path / "journal"), **kwargs)
+    session.start_exam()
+    return session
+
+def _responses(engine):
+    with engine.connect() as conn:
+        return [tuple(r) for r in conn.execute(text(
+            "SELECT question_id, response_value FROM responses WHERE username = 'exam_user' ORDER BY question_id"
+        ))]
+
+def test_write_behind_buffers_until_finish(exam_db, tmp_path):
+    session = _make_session(tmp_path)
+    for value in (2, 3, 4):
+        session.submit_answer(value)
+    
+    assert _responses(exam_db) == []
+    assert os.path.exists(session.journal_path)
+    
+    assert session.finish_exam()
+    assert _responses(exam_db) == [(1, 2), (2, 3), (3, 4)]
+    assert not os.path.exists(session.journal_path)
+
+def test_flush_on_threshold(exam_db, tmp_path):
+    session = _make_session(tmp_path, flush_threshold=2)
+    session.submit_answer(1)
+    assert _responses(exam_db) == []
+    session.submit_answer(2)
+    assert _responses(exam_db) == [(1, 1), (2, 2)]
+
+def test_go_back_overwrites_buffered_answer(exam_db, tmp_path):
+    session = _make_session(tmp_path)
+    session.submit_answer(1)
+    session.go_back()
+    session.submit_answer(4)
+    session.flush_responses()
+    
+    assert _responses(exam_db) == [(1, 4)]
+
+def test_go_back_updates_persisted_row(exam_db, tmp_path):
+    session = _make_session(tmp_path, write_behind=False)
+    session.submit_answer(1)
+    session.submit_answer(2)
+    assert _responses(exam_db) == [(1, 1), (2, 2)]
+    
+    session.go_back()
+    session.submit_answer(3)
+    
+    assert _responses(exam_db) == [(1, 1), (2, 3)]
+
+def test_recover_journal_is_idempotent(exam_db, tmp_path):
+    session = _make_session(tmp_path)
+    session.submit_answer(3)
+    session.submit_answer(2)
+    journal_dir = str(tmp_path / "journal")
+    
+    # Live journals are left alone
+    assert recover_response_journals("exam_user", journal_dir) == 0
+    
+    assert recover_response_journals("exam_user", journal_dir, stale_after=0) == 2
+    assert _responses(exam_db) == [(1, 3), (2, 2)]
+    assert not os.path.exists(session.journal_path)
+    assert recover_response_journals("exam_user", journal_dir, stale_after=0) == 0
+
+def test_flush_on_timer(exam_db, tmp_path):
+    session = _make_session(tmp_path, flush_interval=0.05)
+    session.submit_answer(2)
+    
+    deadline = time.time() + 2
+    while not _responses(exam_db) and time.time() < deadline:
+        time.sleep(0.02)
+    assert _responses(exam_db) == [(1, 2)]
+
+def test_finish_links_responses_to_score(exam_db, tmp_path):
+    from sqlalchemy.orm import Session
+    from app.models import User, get_attempt_responses
+    
+    with exam_db.begin() as conn:
+        conn.execute(text("INSERT INTO users (username, password_hash) VALUES ('exam_user', 'x')"))
+    
+    # First answer is flushed before finish, the rest are written with the score
+    session = _make_session(tmp_path, flush_threshold=1)
+    session.submit_answer(2)
+    session.flush_threshold = 10
+    session.submit_answer(3)
+    session.submit_answer(4)
+    assert session.finish_exam()
+    
+    with Session(exam_db) as db:
+        user = db.query(User).filter_by(username="exam_user").one()
+        score = user.scores[0]
+        assert score.id == session.score_id
+        assert score.user_id == user.id
+        
+        rows = get_attempt_responses(db, score.id)
+        assert [(r.question_id, r.response_value) for r in rows] == [(1, 2), (2, 3), (3, 4)]
+        assert all(r.user_id == user.id for r in score.responses)
+
+def test_finish_updates_rolling_stats(exam_db, tmp_path):
+    from app.db import pooled_connection
+    from app.services.score_stats import get_score_stats
+    
+    for answers in ((4, 4, 4), (1, 1, 1)):
+        session = _make_session(tmp_path)
+        for value in answers:
+            session.submit_answer(value)
+        assert session.finish_exam()
+    
+    # Second attempt is far below the rolling mean of the first
+    assert session.is_inconsistent
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        stats = get_score_stats(cursor, "exam_user")
+        cursor.execute("SELECT attempt_count, avg_score FROM user_activity_summary WHERE username = ?",
+                       ("exam_user",))
+        summary = cursor.fetchone()
+    assert stats["count"] == 2
+    assert stats["recent"] == [12, 3]
+    assert stats["last_score_id"] == session.score_id
+    assert summary == (2, 7.5)
+
+def test_finish_updates_feature_store(exam_db, tmp_path):
+    from app.db import pooled_connection
+    
+    session = _make_session(tmp_path)
+    for value in (2, 3, 4):
+        session.submit_answer(value)
+    assert session.finish_exam()
+    
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT total_n, response_count, last_score_id FROM user_feature_store WHERE username = ?",
+                       ("exam_user",))
+        assert cursor.fetchone() == (1, 3, session.score_id)
+
+def test_finish_flags_unusual_score(exam_db, tmp_path):
+    for answers in ((3, 3, 3), (3, 3, 4), (3, 4, 3), (4, 3, 3), (1, 1, 1)):
+        session = _make_session(tmp_path)
+        for value in answers:
+            session.submit_answer(value)
+        assert session.finish_exam()
+    
+    assert session.score_flags["is_outlier"]
+    with exam_db.connect() as conn:
+        flags = [tuple(r) for r in conn.execute(text(
+            "SELECT is_outlier, is_inconsistent_transition FROM scores ORDER BY id"
+        ))]
+    assert flags[0] == (0, 0)
+    assert flags[-1] == (1, 1)
+
+def test_score_is_kept_when_a_derived_store_fails(exam_db, tmp_path, monkeypatch):
+    from app.db import pooled_connection
+    from app.services.score_stats import get_score_stats
+    
+    def broken(cursor, username):
+        raise RuntimeError("feature store unavailable")
+    monkeypatch.setattr("app.services.exam_service.update_user_features", broken)
+    
+    session = _make_session(tmp_path)
+    for value in (2, 3, 4):
+        session.submit_answer(value)
+    assert session.finish_exam()
+    
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, total_score FROM scores WHERE username = 'exam_user'")
+        assert cursor.fetchall() == [(session.score_id, 9)]
+        assert get_score_stats(cursor, "exam_user")["count"] == 1
+        cursor.execute("SELECT COUNT(*) FROM user_feature_store")
+        assert cursor.fetchone()[0] == 0
+    assert _responses(exam_db) == [(1, 2), (2, 3), (3, 4)]
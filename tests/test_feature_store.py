@@ -0,0 +1,114 @@
+import pytest
+from app.db import pooled_connection
+from app.ml.clustering import EmotionalFeatureExtractor
+from app.models import Score, Response
+from app.services.feature_store import (
+    FEATURE_STORE_VERSION, update_user_features, get_stale_usernames,
+    refresh_stale_features, rebuild_feature_store
+)
+
+def _add_attempt(session, username, total, sentiment, values, day):
+    session.add(Score(username=username, total_score=total, sentiment_score=sentiment,
+                      timestamp=f"2024-02-{day:02d}T09:00:00"))
+    for i, value in enumerate(values):
+        session.add(Response(username=username, question_id=i, response_value=value))
+    session.commit()
+
+def _assert_frames_match(stored, raw):
+    stored = stored.set_index('username').sort_index()
+    raw = raw.set_index('username').sort_index()
+    assert list(stored.index) == list(raw.index)
+    for column in raw.columns:
+        assert stored[column].to_numpy() == pytest.approx(raw[column].to_numpy()), column
+
+def test_incremental_updates_match_full_extraction(temp_db):
+    extractor = EmotionalFeatureExtractor()
+    _add_attempt(temp_db, "alice", 20, 10.0, [3, 4], 1)
+    _add_attempt(temp_db, "bob", 30, None, [], 1)
+    
+    with pooled_connection() as conn:
+        assert sorted(get_stale_usernames(conn.cursor())) == ["alice", "bob"]
+        assert refresh_stale_features(conn.cursor()) == 2
+        assert get_stale_usernames(conn.cursor()) == []
+    
+    # New attempts are folded past the watermark
+    _add_attempt(temp_db, "alice", 25, -5.0, [1, 5, 2], 2)
+    _add_attempt(temp_db, "alice", 31, 40.0, [4], 3)
+    _add_attempt(temp_db, "bob", 30, 2.0, [5, 5], 2)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        assert sorted(get_stale_usernames(cursor)) == ["alice", "bob"]
+        acc = update_user_features(cursor, "alice")
+        assert acc["total_n"] == 3 and acc["response_count"] == 6
+        assert get_stale_usernames(cursor) == ["bob"]
+    
+    _assert_frames_match(extractor.load_stored_features(refresh=True), extractor.extract_all_users_features())
+    # Constant scores have zero spread and no trend despite rounding in the sums
+    bob = extractor.extract_user_features("bob")
+    assert bob['score_std'] == 0 and bob['score_trend'] == 0
+
+def test_outdated_rows_are_rebuilt(temp_db):
+    _add_attempt(temp_db, "carol", 10, 0.0, [2], 1)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        update_user_features(cursor, "carol")
+        cursor.execute("UPDATE user_feature_store SET version = ?, total_n = 99",
+                       (FEATURE_STORE_VERSION - 1,))
+        assert get_stale_usernames(cursor) == ["carol"]
+        assert update_user_features(cursor, "carol")["total_n"] == 1
+        
+        cursor.execute("UPDATE user_feature_store SET total_n = 99")
+        assert rebuild_feature_store(cursor) == 1
+        cursor.execute("SELECT total_n FROM user_feature_store WHERE username = 'carol'")
+        assert cursor.fetchone()[0] == 1
+
+def _stored_row_count(username):
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM user_feature_store WHERE username = ?", (username,))
+        return cursor.fetchone()[0]
+
+def test_reads_do_not_write(temp_db):
+    extractor = EmotionalFeatureExtractor()
+    _add_attempt(temp_db, "dan", 20, 1.0, [3], 1)
+    _add_attempt(temp_db, "dan", 24, 2.0, [4], 2)
+    
+    assert extractor.load_stored_features().empty
+    assert extractor.extract_user_features("dan")["avg_total_score"] == 22  # Raw fallback
+    assert _stored_row_count("dan") == 0
+    assert not extractor.load_stored_features(refresh=True).empty
+    assert _stored_row_count("dan") == 1
+
+def test_late_rows_with_earlier_timestamps_match_full_extraction(temp_db):
+    extractor = EmotionalFeatureExtractor()
+    for day, total in [(5, 10), (6, 20), (7, 30)]:
+        _add_attempt(temp_db, "eve", total, None, [], day)
+    with pooled_connection() as conn:
+        update_user_features(conn.cursor(), "eve")
+    
+    # Backdated row inserted after the watermark (e.g. imported history)
+    _add_attempt(temp_db, "eve", 5, None, [], 1)
+    stored = extractor.load_stored_features(refresh=True)
+    _assert_frames_match(stored, extractor.extract_all_users_features())
+    assert stored.iloc[0]["score_trend"] > 0.9  # Positions follow timestamps, not insertion order
+
+@pytest.mark.parametrize("statement", [
+    "UPDATE scores SET sentiment_score = 50 WHERE username = 'fay'",
+    "UPDATE scores SET total_score = 5 WHERE username = 'fay' AND total_score = 30",
+    "DELETE FROM scores WHERE username = 'fay' AND total_score = 30",
+    "UPDATE responses SET response_value = 1 WHERE username = 'fay'",
+    "DELETE FROM responses WHERE username = 'fay' AND response_value = 4",
+])
+def test_edits_to_folded_rows_mark_user_stale(temp_db, statement):
+    extractor = EmotionalFeatureExtractor()
+    _add_attempt(temp_db, "fay", 20, 1.0, [3], 1)
+    _add_attempt(temp_db, "fay", 30, 2.0, [4], 2)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        update_user_features(cursor, "fay")
+        cursor.execute("UPDATE scores SET is_outlier = 0")  # Unwatched column
+        assert get_stale_usernames(cursor) == []
+        cursor.execute(statement)
+        assert get_stale_usernames(cursor) == ["fay"]
+    
+    _assert_frames_match(extractor.load_stored_features(refresh=True), extractor.extract_all_users_features())
@@ -0,0 +1,95 @@
+import gc
+
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from app.ui.figure_pool import FigurePool
+
+def _agg_canvas(figure, master):
+    return FigureCanvasAgg(figure)
+
+@pytest.fixture
+def pool():
+    pool = FigurePool(max_figures=3, canvas_factory=_agg_canvas)
+    yield pool
+    pool.clear()
+
+def _live_figures():
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+def test_same_master_reuses_figure(pool):
+    master = object()
+    first, reused = pool.acquire("chart", master, figsize=(4, 3))
+    assert not reused
+    second, reused = pool.acquire("chart", master, figsize=(4, 3))
+    assert reused
+    assert second is first
+    assert pool.stats()["reused"] == 1
+
+def test_new_master_replaces_figure(pool):
+    first, _ = pool.acquire("chart", object(), figsize=(4, 3))
+    first.figure.add_subplot(111)
+    first.artists["line"] = first.figure.axes[0].plot([1, 2], [3, 4])[0]
+
+    second, reused = pool.acquire("chart", object(), figsize=(4, 3))
+    assert not reused
+    assert second is not first
+    # The old figure is emptied so nothing keeps its artists alive
+    assert first.figure.axes == []
+    assert first.artists == {}
+    assert pool.stats()["live"] == 1
+
+def test_acquire_cleared_empties_reused_figure(pool):
+    master = object()
+    entry = pool.acquire_cleared("chart", master, figsize=(4, 3))
+    entry.figure.add_subplot(111)
+    again = pool.acquire_cleared("chart", master, figsize=(4, 3))
+    assert again is entry
+    assert again.figure.axes == []
+
+def test_least_recently_used_slot_is_evicted(pool):
+    master = object()
+    for slot in ("a", "b", "c"):
+        pool.acquire(slot, master, figsize=(2, 2))
+    pool.acquire("a", master, figsize=(2, 2))
+    pool.acquire("d", master, figsize=(2, 2))
+
+    assert set(pool._slots) == {"a", "c", "d"}
+    assert pool.stats()["evicted"] == 1
+
+def test_cycling_charts_keeps_figure_count_bounded(pool):
+    baseline = _live_figures()
+    for i in range(200):
+        # Every render gets a new master, like a tab rebuilt from scratch
+        entry = pool.acquire_cleared(f"tab{i % 5}", object(), figsize=(3, 2))
+        ax = entry.figure.add_subplot(111)
+        ax.plot(range(50), range(50))
+        entry.draw()
+        del entry, ax
+    assert _live_figures() - baseline <= pool.max_figures
+
+def test_daily_view_updates_chart_in_place(pool):
+    from app.ui.daily_view import DailyHistoryView
+
+    view = DailyHistoryView.__new__(DailyHistoryView)
+    view.colors = {"surface": "#FFFFFF", "text_primary": "#000000", "text_secondary": "#555555"}
+    view.chart, _ = pool.acquire("daily_view.weekly", object(), figsize=(7, 4))
+    view.fig = view.chart.figure
+    view.ax = view.fig.add_subplot(111)
+    view.chart_canvas = view.chart.canvas
+    view.history_data = {
+        "dates": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+        "sleep": [7.0, 6.5, 8.0, 5.0, 7.5, 9.0, 6.0],
+        "stress": [3, 4, 5, 6, 2, 1, 4],
+        "mood": [10, -20, 30, 0, 40, 50, -10],
+    }
+
+    for metric in ("sleep", "stress", "sleep", "stress"):
+        view.update_chart(metric, "#8B5CF6")
+        counts = [(len(ax.patches), len(ax.texts), len(ax.lines)) for ax in view.fig.axes]
+        assert counts == [(7, 7, 0), (0, 0, 1)]
+
+    heights = [bar.get_height() for bar in view.chart.artists["bars"]]
+    assert heights == view.history_data["stress"]
@@ -0,0 +1,96 @@
+import pytest
+from app.models import JournalEntry
+from app.services.journal_rollup import (
+    combine_days, ensure_journal_rollup, get_journal_days, group_days, nonzero_mean, rebuild_journal_rollup
+)
+
+def _insert_entry(cursor, username, entry_date, sleep=None, stress=None, sentiment=None):
+    cursor.execute(
+        "INSERT INTO journal_entries (username, entry_date, content, sleep_hours, stress_level, sentiment_score) "
+        "VALUES (?, ?, 'entry', ?, ?, ?)",
+        (username, entry_date, sleep, stress, sentiment)
+    )
+    return cursor.lastrowid
+
+def _rollup(cursor):
+    cursor.execute("SELECT * FROM journal_daily_rollup ORDER BY username, day")
+    return cursor.fetchall()
+
+def test_triggers_match_rebuild(cursor):
+    first = _insert_entry(cursor, "alice", "2026-01-01 08:00:00", sleep=7, stress=4, sentiment=20)
+    _insert_entry(cursor, "alice", "2026-01-01 21:30:00", sleep=5, sentiment=-10)
+    moved = _insert_entry(cursor, "alice", "2026-01-02T09:00:00", sleep=8, stress=2)
+    gone = _insert_entry(cursor, "bob", "2026-01-01 10:00:00", sleep=6, stress=9)
+    _insert_entry(cursor, "bob", "2026-01-03 10:00:00", stress=7)
+
+    cursor.execute("UPDATE journal_entries SET sleep_hours = 9 WHERE id = ?", (first,))
+    cursor.execute("UPDATE journal_entries SET entry_date = '2026-01-04 07:00:00' WHERE id = ?", (moved,))
+    cursor.execute("DELETE FROM journal_entries WHERE id = ?", (gone,))
+    incremental = _rollup(cursor)
+
+    rebuild_journal_rollup(cursor)
+    assert _rollup(cursor) == incremental
+
+    days = get_journal_days(cursor, "alice")
+    assert list(days) == ["2026-01-01", "2026-01-04"]
+    jan1 = days["2026-01-01"]
+    assert jan1.entry_count == 2
+    assert jan1.mean("sleep_hours") == 7.0
+    assert (jan1.metrics["sleep_hours"].min, jan1.metrics["sleep_hours"].max) == (5.0, 9.0)
+    assert jan1.mean("stress_level") == 4.0  # NULLs are not counted
+    assert jan1.mean("energy_level", 0) == 0
+    assert list(get_journal_days(cursor, "bob")) == ["2026-01-03"]
+
+def test_range_read_and_period_grouping(cursor):
+    for day in range(1, 15):
+        _insert_entry(cursor, "carol", f"2026-02-{day:02d} 09:00:00", sleep=day % 5 + 4, stress=day % 3 + 1)
+
+    days = get_journal_days(cursor, "carol", "2026-02-03", "2026-02-05")
+    assert list(days) == ["2026-02-03", "2026-02-04", "2026-02-05"]
+    combined = combine_days(days.values())
+    assert combined["sleep_hours"].count == 3
+    assert combined["sleep_hours"].mean == pytest.approx((7 + 8 + 4) / 3)
+
+    weekly = group_days(get_journal_days(cursor, "carol").values(), "weekly")
+    assert sum(week["sleep_hours"].count for week in weekly.values()) == 14
+    assert list(group_days(days.values(), "monthly")) == ["2026-02"]
+
+def test_ensure_backfills_once(cursor):
+    _insert_entry(cursor, "dave", "2026-03-01 09:00:00", sleep=6)
+    cursor.execute("DELETE FROM journal_daily_rollup")  # As on a database from before the table
+    cursor.execute("DROP INDEX idx_journal_user_date")
+
+    assert ensure_journal_rollup(cursor) is True
+    assert len(_rollup(cursor)) == 1
+    assert ensure_journal_rollup(cursor) is False
+    cursor.execute("EXPLAIN QUERY PLAN SELECT id FROM journal_entries WHERE username = 'dave' AND entry_date >= '2026-03-01'")
+    assert "idx_journal_user_date" in cursor.fetchall()[0][-1]
+
+def test_nonzero_mean_skips_zero_values(cursor):
+    for day, sleep in [(1, 0), (1, 6), (2, 8), (3, None)]:
+        _insert_entry(cursor, "fred", f"2026-05-0{day} 09:00:00", sleep=sleep)
+    cursor.execute("UPDATE journal_daily_rollup SET sleep_hours_nonzero = NULL")  # As before the counts
+
+    assert ensure_journal_rollup(cursor) is True
+    days = get_journal_days(cursor, "fred").values()
+    assert combine_days(days)["sleep_hours"].mean == pytest.approx(14 / 3)
+    assert nonzero_mean(days, "sleep_hours") == pytest.approx(7)
+    assert nonzero_mean(days, "stress_level") is None
+
+def test_weekly_history_averages_each_day(temp_db):
+    from app.ui.daily_view import DailyHistoryView
+
+    for entry_date, sleep, sentiment in [("2026-04-06 08:00:00", 6.0, 10.0), ("2026-04-06 20:00:00", 8.0, 30.0),
+                                         ("2026-04-10 08:00:00", 7.5, None)]:
+        temp_db.add(JournalEntry(username="erin", entry_date=entry_date, content="entry",
+                                 sleep_hours=sleep, sentiment_score=sentiment))
+    temp_db.add(JournalEntry(username="other", entry_date="2026-04-06 08:00:00", content="x", sleep_hours=2.0))
+    temp_db.commit()
+
+    view = DailyHistoryView.__new__(DailyHistoryView)
+    view.username = "erin"
+    history = view.fetch_weekly_history("2026-04-12")
+
+    assert len(history["dates"]) == 7
+    assert history["sleep"] == [7.0, 0, 0, 0, 7.5, 0, 0]
+    assert history["mood"] == [20.0, 0, 0, 0, 0, 0, 0]
@@ -210,6 +210,35 @@ class TestOutlierDetector:
         result = detector.detect_outliers_ensemble(scores)
         assert "outliers" in result
         assert isinstance(result["outliers"][0], float)
+    
+    # ==================== GROUPED TESTS ====================
+    
+    def test_grouped_matches_per_group_methods(self, detector):
+        """Grouped detection equals running each method on each group"""
+        rng = np.random.RandomState(0)
+        values = np.concatenate([rng.randint(10, 40, 300), [1, 99, 120, 5, 5, 5, 50]]).astype(float)
+        keys = np.concatenate([rng.choice(["a", "b", "c"], 303), ["e", "e", "e", "f"]])
+        reference = {
+            "zscore": detector.detect_outliers_zscore,
+            "iqr": detector.detect_outliers_iqr,
+            "modified_zscore": detector.detect_outliers_modified_zscore,
+            "mad": detector.detect_outliers_mad,
+            "ensemble": detector.detect_outliers_ensemble,
+        }
+        for method, detect in reference.items():
+            grouped = detector.detect_outliers_grouped(values, keys, method=method)
+            assert sorted(grouped) == ["a", "b", "c", "e", "f"]
+            for key, result in grouped.items():
+                positions = np.flatnonzero(keys == key)
+                expected = detect(values[positions].tolist())
+                assert result["indices"] == positions[expected["indices"]].tolist(), (method, key)
+                assert result["count"] == len(positions)
+        
+        stats = detector.detect_outliers_grouped(values, keys)["a"]["statistics"]
+        group = values[keys == "a"]
+        assert stats["median"] == pytest.approx(np.median(group))
+        assert stats["std_dev"] == pytest.approx(np.std(group))
+        assert detector.detect_outliers_grouped([], []) == {}
 
 
 class TestOutlierDetectorDatabase:
@@ -273,6 +302,91 @@ class TestOutlierDetectorDatabase:
         assert "username" in result
         assert "time_window_days" in result
         assert "coefficient_of_variation" in result
+    
+    def test_scope_detection_matches_in_memory(self, db_session):
+        """Global/age-group detection from SQL aggregates and sketches"""
+        rng = np.random.RandomState(0)
+        values = [int(v) for v in rng.randint(15, 35, size=300)] + [1, 2, 90, 95, 70]
+        for i, value in enumerate(values):
+            db_session.add(Score(username=f"scope_{i % 7}", total_score=value,
+                                 detailed_age_group="18-25" if i % 2 else "26-35",
+                                 timestamp=f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"))
+        db_session.add(Score(username="no_total", total_score=None, detailed_age_group="18-25"))
+        db_session.commit()
+        
+        detector = OutlierDetector()
+        reference = {
+            "zscore": detector.detect_outliers_zscore,
+            "iqr": detector.detect_outliers_iqr,
+            "modified_zscore": detector.detect_outliers_modified_zscore,
+            "mad": detector.detect_outliers_mad,
+            "ensemble": detector.detect_outliers_ensemble,
+        }
+        for method, detect in reference.items():
+            result = detector.detect_outliers_global(db_session, method=method)
+            assert result["total_scores"] == len(values)
+            assert sorted(result["outliers"]) == sorted(detect(values)["outliers"]), method
+            assert result["indices"] == detect(values)["indices"], method
+            assert [values[i] for i in result["indices"]] == result["outliers"]
+        
+        group = [v for i, v in enumerate(values) if i % 2]
+        result = detector.detect_outliers_by_age_group(db_session, "18-25", method="iqr")
+        assert sorted(result["outliers"]) == sorted(detector.detect_outliers_iqr(group)["outliers"])
+        assert result["statistics"]["median_score"] == pytest.approx(np.median(group))
+        assert result["statistics"]["std_dev"] == pytest.approx(np.std(group))
+        assert result["indices"] == detector.detect_outliers_iqr(group)["indices"]
+    
+    def test_zscore_scope_skips_quantile_pass(self, db_session, monkeypatch):
+        for i, value in enumerate([20, 21, 22, 20, 21, 22, 20, 21, 22, 20, 90]):
+            db_session.add(Score(username="z", total_score=value, timestamp=f"2024-01-{i + 1:02d}"))
+        db_session.commit()
+        
+        detector = OutlierDetector()
+        monkeypatch.setattr(detector, "_iter_score_values", lambda *args: pytest.fail("sketch pass ran"))
+        result = detector.detect_outliers_global(db_session, method="zscore")
+        assert result["outliers"] == [90.0] and result["indices"] == [10]
+        assert result["statistics"]["median_score"] is None
+    
+    def test_statistical_summary(self, db_session, test_user_with_scores):
+        """Summary quartiles come from the streaming sketch"""
+        values = [20, 22, 21, 23, 22, 100, 21, 23]
+        summary = OutlierDetector().get_statistical_summary(db_session, age_group="18-25")
+        
+        assert summary["count"] == len(values)
+        assert summary["mean"] == pytest.approx(np.mean(values))
+        assert summary["q1"] == pytest.approx(np.percentile(values, 25))
+        assert summary["q3"] == pytest.approx(np.percentile(values, 75))
+        assert "error" in OutlierDetector().get_statistical_summary(db_session, age_group="missing")
+
+
+class TestStreamingQuantileSketch:
+    """Bounded-memory quantile sketch"""
+    
+    def test_exact_while_within_bins(self):
+        from app.analysis.quantile_sketch import StreamingQuantileSketch
+        rng = np.random.RandomState(1)
+        values = rng.randint(0, 100, size=5000).astype(float)
+        sketch = StreamingQuantileSketch()
+        for chunk in np.array_split(values, 7):
+            sketch.update(chunk)
+        
+        assert sketch.is_exact
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            assert sketch.quantile(q) == pytest.approx(np.percentile(values, q * 100))
+    
+    def test_bounded_when_compressed(self):
+        from app.analysis.quantile_sketch import StreamingQuantileSketch
+        rng = np.random.RandomState(2)
+        values = rng.normal(50, 10, size=20000)
+        sketch = StreamingQuantileSketch(max_bins=200)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+        
+        assert not sketch.is_exact
+        assert len(sketch._values) <= 200
+        assert sketch.count == len(values)
+        assert sketch.median() == pytest.approx(np.median(values), abs=1.0)
+        assert StreamingQuantileSketch().median() is None
 
 
 if __name__ == "__main__":
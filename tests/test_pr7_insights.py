@@ -1,8 +1,9 @@
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from datetime import datetime, timedelta
 import sys
 import os
+import pytest
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -16,17 +17,18 @@ class TestSmartInsights(unittest.TestCase):
         self.feature = JournalFeature(self.mock_root)
         self.feature.username = "test_user"
 
-    @patch('app.ui.journal.get_session')
-    def test_digital_overload_insight(self, mock_get_session):
-        # Setup mock entries
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
+    @pytest.fixture(autouse=True)
+    def _db(self, temp_db):
+        # Insights read journal_daily_rollup, which triggers fill from journal_entries
+        self.session = temp_db
+
+    def test_digital_overload_insight(self):
+        # Setup entries
         entries = []
         for i in range(3):
             entry = JournalEntry(
                 username="test_user",
-                entry_date=datetime.now() - timedelta(days=i),
+                entry_date=(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S"),
                 content="test content",
                 sentiment_score=0.5,
                 emotional_patterns="{}",
@@ -39,7 +41,8 @@ class TestSmartInsights(unittest.TestCase):
             )
             entries.append(entry)
             
-        mock_session.query.return_value.filter.return_value.filter.return_value.order_by.return_value.all.return_value = entries
+        self.session.add_all(entries)
+        self.session.commit()
         
         # Run logic
         insight = self.feature.generate_health_insights()
@@ -49,17 +52,13 @@ class TestSmartInsights(unittest.TestCase):
         self.assertIn("Digital Overload", insight)
         self.assertIn("Reducing screen time", insight)
         
-    @patch('app.ui.journal.get_session')
-    def test_burnout_insight(self, mock_get_session):
-         # Setup mock entries
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
+    def test_burnout_insight(self):
+         # Setup entries
         entries = []
         for i in range(3):
             entry = JournalEntry(
                 username="test_user",
-                entry_date=datetime.now() - timedelta(days=i),
+                entry_date=(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S"),
                 content="test content",
                 # High Work (>9), Low Energy (<5)
                 screen_time_mins=120, 
@@ -70,7 +69,8 @@ class TestSmartInsights(unittest.TestCase):
             )
             entries.append(entry)
             
-        mock_session.query.return_value.filter.return_value.filter.return_value.order_by.return_value.all.return_value = entries
+        self.session.add_all(entries)
+        self.session.commit()
         
         # Run logic
         insight = self.feature.generate_health_insights()
@@ -79,5 +79,24 @@ class TestSmartInsights(unittest.TestCase):
         print(f"Insight Generated: {insight}")
         self.assertIn("Early Burnout", insight)
 
+    def test_zero_values_count_as_not_recorded(self):
+        # A 0 from the form means "not recorded" and does not pull the averages down
+        for i, sleep in enumerate([0, 7, 8]):
+            self.session.add(JournalEntry(
+                username="test_user",
+                entry_date=(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                content="test content",
+                screen_time_mins=0 if i else 300,
+                stress_level=8,
+                sleep_hours=sleep,
+                energy_level=6,
+                work_hours=8
+            ))
+        self.session.commit()
+        
+        insight = self.feature.generate_health_insights()
+        self.assertNotIn("Sleep Deprivation", insight)
+        self.assertIn("Digital Overload", insight)
+
 if __name__ == '__main__':
     unittest.main()
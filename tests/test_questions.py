@@ -31,3 +31,114 @@ def test_load_questions_age_filter(temp_db):
     adult_qs = load_questions(age=30)
     assert len(adult_qs) == 1
     assert adult_qs[0][1] == "Adult question"
+
+def test_question_cache_serves_from_memory(temp_db, monkeypatch):
+    from app.questions import get_question_cache_stats
+    import app.questions as questions_module
+    
+    session = get_session()
+    session.add(Question(question_text="Cached question", is_active=1, min_age=0, max_age=120))
+    session.commit()
+    session.close()
+    
+    # Never re-check the version during this test
+    monkeypatch.setattr(questions_module._bank_cache, "check_interval", 3600)
+    before = get_question_cache_stats()
+    load_questions(age=30)
+    load_questions(age=30)
+    load_questions(age=40)
+    
+    stats = get_question_cache_stats()
+    assert stats["rebuilds"] - before["rebuilds"] == 1
+    assert stats["version_checks"] - before["version_checks"] == 1
+    # Both follow-up lookups (any age) are answered from the age index
+    assert stats["hits"] - before["hits"] == 2
+
+def test_question_cache_reloads_on_bank_write(temp_db, monkeypatch):
+    from sqlalchemy import text
+    import app.questions as questions_module
+    monkeypatch.setattr(questions_module._bank_cache, "check_interval", 0)
+    
+    temp_db.add(Question(question_text="Original", is_active=1, min_age=0, max_age=120))
+    temp_db.commit()
+    assert [q[1] for q in load_questions()] == ["Original"]
+    version = questions_module._bank_cache.version
+    
+    # Raw SQL edit, as the admin scripts do; the trigger bumps the version
+    temp_db.execute(text("UPDATE question_bank SET question_text = 'Edited'"))
+    temp_db.commit()
+    
+    assert [q[1] for q in load_questions()] == ["Edited"]
+    assert questions_module._bank_cache.version > version
+
+def test_age_index_buckets_share_bank_rows(temp_db):
+    import app.questions as questions_module
+    temp_db.add_all([
+        Question(question_text="Kid", is_active=1, min_age=5, max_age=12),
+        Question(question_text="Everyone", is_active=1, min_age=0, max_age=120),
+        Question(question_text="Adults", is_active=1, min_age=18, max_age=65),
+    ])
+    temp_db.commit()
+    
+    assert [q[1] for q in load_questions(age=8)] == ["Kid", "Everyone"]
+    assert [q[1] for q in load_questions(age=13)] == ["Everyone"]
+    assert len(load_questions()) == 3
+    
+    # Buckets hold positions, not copies of the question rows
+    cache = questions_module._bank_cache
+    assert load_questions(age=8)[1] is load_questions(age=30)[0]
+    assert all(isinstance(i, int) for bucket in cache._age_buckets for i in bucket)
+    assert len(cache._age_buckets) == questions_module.MAX_AGE + 1
+
+def test_sample_questions_weighted_without_replacement(temp_db):
+    import random
+    import pytest
+    import app.questions as questions_module
+    from app.questions import sample_questions, get_random_questions_by_age
+    temp_db.add_all([
+        Question(question_text=f"Q{i}", is_active=1, min_age=10, max_age=60, weight=1.0)
+        for i in range(5)
+    ] + [Question(question_text="Heavy", is_active=1, min_age=10, max_age=60, weight=50.0)])
+    temp_db.commit()
+    
+    picked = sample_questions(30, 6)
+    assert len({q[0] for q in picked}) == 6
+    
+    rng = random.Random(7)
+    heavy_hits = sum(
+        questions_module._bank_cache.sample(30, 1, rng=rng)[0][1] == "Heavy"
+        for _ in range(200)
+    )
+    assert heavy_hits > 150
+    
+    assert len(get_random_questions_by_age(None, 30, 3)) == 3
+    with pytest.raises(ValueError):
+        sample_questions(30, 7)
+    with pytest.raises(ValueError):
+        sample_questions(5, 1)
+
+def test_background_warmup_single_worker(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models import Base
+    import app.questions as questions_module
+    from app.questions import warmup
+    
+    # File-backed so the worker thread sees the same database
+    engine = create_engine(f"sqlite:///{tmp_path / 'warm.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(Question(question_text="Warm", is_active=1, min_age=0, max_age=120))
+    session.commit()
+    session.close()
+    monkeypatch.setattr("app.questions.get_session", Session)
+    monkeypatch.setattr(questions_module, "_bank_cache", questions_module.QuestionBankCache(3600))
+    
+    first = warmup(background=True)
+    second = warmup(background=True)
+    first.result(timeout=10)
+    second.result(timeout=10)
+    assert questions_module._warmer._max_workers == 1
+    assert questions_module._bank_cache.stats()["questions"] == 1
+    engine.dispose()
@@ -0,0 +1,101 @@
+"""Tests for ScoreAnalyzer reports"""
+
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.models import Score
+from app.db import pooled_connection
+from app.ml.score_analyzer import ScoreAnalyzer
+from app.services.score_stats import refresh_score_stats
+
+
+@pytest.fixture
+def analyzer_db(temp_db, monkeypatch):
+    monkeypatch.setattr("app.ml.score_analyzer.get_session", lambda: temp_db)
+    rng = np.random.RandomState(4)
+    for i in range(240):
+        group = ["18-25", "26-35", "36-50"][i % 3]
+        value = int(rng.randint(15, 35))
+        if i in (30, 31, 100):
+            value = 95
+        temp_db.add(Score(username=f"qa_{i % 9}", total_score=value, detailed_age_group=group,
+                          timestamp=f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"))
+    temp_db.add(Score(username="qa_none", total_score=20, detailed_age_group=None,
+                      timestamp="2024-02-01T00:00:00"))
+    temp_db.commit()
+    temp_db.close = lambda: None  # Analyzer closes its session; keep the fixture's open
+    return temp_db
+
+
+def test_quality_report_matches_cohort_analytics(analyzer_db):
+    analyzer = ScoreAnalyzer()
+    report = analyzer.generate_quality_report()
+    
+    assert report["total_scores"] == 241
+    assert [c["age_group"] for c in report["cohort_summary"]] == ["18-25", "26-35", "36-50"]
+    for cohort in report["cohort_summary"]:
+        assert cohort == analyzer.get_cohort_analytics(cohort["age_group"])
+    assert sum(c["data_quality"]["outlier_count"] for c in report["cohort_summary"]) >= 3
+
+
+def test_quality_report_runs_one_query(analyzer_db):
+    statements = []
+    engine = analyzer_db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        ScoreAnalyzer().generate_quality_report()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+
+def _flag_count(username):
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(is_outlier) FROM scores WHERE username = ?", (username,))
+        return cursor.fetchone()[0]
+
+
+def _backfill_flags():
+    # What check_db_state does at startup
+    with pooled_connection() as conn:
+        refresh_score_stats(conn.cursor())
+
+
+def test_score_analytics_reads_flags(analyzer_db):
+    for i, value in enumerate([20, 22, 21, 23, 22, 45, 21]):
+        analyzer_db.add(Score(username="flagged", total_score=value, timestamp=f"2024-03-0{i + 1}"))
+    analyzer_db.commit()
+    
+    # Reading never backfills flags
+    assert ScoreAnalyzer().get_score_analytics("flagged")["outlier_analysis"]["outliers"] == []
+    assert _flag_count("flagged") == 0
+    
+    _backfill_flags()
+    analytics = ScoreAnalyzer().get_score_analytics("flagged")
+    assert analytics["total_scores"] == 7
+    assert analytics["outlier_analysis"]["outliers"] == [45]
+    assert analytics["consistency_analysis"]["inconsistent_transitions"] >= 1
+    assert analytics["score_range"] == {"min": 20, "max": 45, "mean": pytest.approx(174 / 7)}
+    assert ScoreAnalyzer().get_score_analytics("missing") == {"error": "No scores found"}
+
+
+def test_high_inconsistency_covers_whole_history(analyzer_db):
+    # Wild scores long ago, steady ones in the last 30 days
+    old = [5, 60, 8, 55, 10]
+    recent = [30, 31, 30, 31]
+    for i, value in enumerate(old):
+        analyzer_db.add(Score(username="settled", total_score=value, timestamp=f"2020-01-0{i + 1}T09:00:00"))
+    for i, value in enumerate(recent):
+        analyzer_db.add(Score(username="settled", total_score=value,
+                              timestamp=(datetime.utcnow() - timedelta(days=i + 1)).isoformat()))
+    analyzer_db.commit()
+    _backfill_flags()
+    
+    consistency = ScoreAnalyzer().get_score_analytics("settled")["consistency_analysis"]
+    values = old + recent
+    assert consistency["coefficient_of_variation"] == pytest.approx(np.std(values) / np.mean(values) * 100)
+    assert consistency["is_highly_inconsistent"]
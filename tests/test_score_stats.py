@@ -0,0 +1,137 @@
+import statistics
+import pytest
+from app.services.score_stats import (
+    detect_score_anomaly, get_score_stats, record_score,
+    rebuild_score_stats, refresh_score_stats, RECENT_SCORES_WINDOW
+)
+
+def _insert_score(cursor, username, score, ts):
+    cursor.execute(
+        "INSERT INTO scores (username, total_score, timestamp) VALUES (?, ?, ?)",
+        (username, score, ts)
+    )
+    return cursor.lastrowid
+
+def test_incremental_matches_batch(cursor):
+    scores = [20, 25, 31, 18, 27, 33, 29, 22, 35, 30, 26, 24]
+    for i, score in enumerate(scores):
+        score_id = _insert_score(cursor, "alice", score, f"2026-01-{i + 1:02d}")
+        stats = record_score(cursor, "alice", score, score_id)
+    
+    assert stats["count"] == len(scores)
+    assert stats["mean"] == pytest.approx(statistics.mean(scores))
+    assert stats["variance"] == pytest.approx(statistics.pvariance(scores))  # Population, like OutlierDetector
+    assert stats["recent"] == scores[-RECENT_SCORES_WINDOW:]
+    assert stats["previous_score"] == scores[-2]
+    assert stats["last_score_id"] == score_id
+    assert get_score_stats(cursor, "alice") == stats
+
+def test_seeds_from_existing_history(cursor):
+    for i, score in enumerate([10, 20, 30]):
+        _insert_score(cursor, "bob", score, f"2026-01-{i + 1:02d}")
+    
+    new_id = _insert_score(cursor, "bob", 40, "2026-01-04")
+    stats = record_score(cursor, "bob", 40, new_id)
+    
+    assert stats["count"] == 4
+    assert stats["recent"] == [10, 20, 30, 40]
+    assert stats["mean"] == pytest.approx(25)
+
+def test_rebuild(cursor):
+    _insert_score(cursor, "carol", 12, "2026-01-01")
+    _insert_score(cursor, "dave", 30, "2026-01-01")
+    
+    assert rebuild_score_stats(cursor) == 2
+    assert get_score_stats(cursor, "carol")["count"] == 1
+    assert get_score_stats(cursor, "nobody")["count"] == 0
+
+def _flags(cursor, username):
+    cursor.execute(
+        "SELECT total_score, is_outlier, is_inconsistent_transition FROM scores WHERE username = ? ORDER BY id",
+        (username,)
+    )
+    return cursor.fetchall()
+
+def test_anomaly_against_prior_history(cursor):
+    history = [20, 22, 21, 23, 22, 21]
+    for i, score in enumerate(history):
+        score_id = _insert_score(cursor, "erin", score, f"2026-01-{i + 1:02d}")
+        record_score(cursor, "erin", score, score_id)
+    stats = get_score_stats(cursor, "erin")
+    
+    flags = detect_score_anomaly(stats, 40)
+    assert flags["is_outlier"]
+    assert flags["outlier_zscore"] == pytest.approx((40 - stats["mean"]) / stats["std_dev"])
+    assert flags["is_inconsistent_transition"]
+    assert flags["change"] == 19
+    
+    usual = detect_score_anomaly(stats, 22)
+    assert not usual["is_outlier"] and not usual["is_inconsistent_transition"]
+    
+    # Too little history to judge
+    first = detect_score_anomaly(get_score_stats(cursor, "nobody"), 40)
+    assert first["outlier_zscore"] is None and not first["is_outlier"]
+
+def test_refresh_replays_legacy_rows(cursor):
+    for i, score in enumerate([20, 22, 21, 23, 22, 40, 21]):
+        _insert_score(cursor, "fay", score, f"2026-01-{i + 1:02d}")
+    assert all(row[1] is None for row in _flags(cursor, "fay"))
+    
+    assert refresh_score_stats(cursor) == 1
+    rows = _flags(cursor, "fay")
+    assert [row[0] for row in rows if row[1]] == [40]
+    assert rows[5][2] == 1  # 23 -> 40 jump
+    assert refresh_score_stats(cursor) == 0
+    
+    # Replay and online flagging agree
+    for i, score in enumerate([20, 22, 21, 23, 22, 40, 21]):
+        score_id = _insert_score(cursor, "gus", score, f"2026-01-{i + 1:02d}")
+        flags = detect_score_anomaly(get_score_stats(cursor, "gus", exclude_score_id=score_id), score)
+        cursor.execute("UPDATE scores SET is_outlier = ?, is_inconsistent_transition = ? WHERE id = ?",
+                       (flags["is_outlier"], flags["is_inconsistent_transition"], score_id))
+        record_score(cursor, "gus", score, score_id)
+    assert [tuple(r) for r in _flags(cursor, "gus")] == [tuple(r) for r in rows]
+
+def _stored(cursor, username):
+    cursor.execute("SELECT attempt_count, mean_score FROM user_score_stats WHERE username = ?", (username,))
+    return cursor.fetchone()
+
+def test_writes_outside_finish_exam_are_not_missed(cursor):
+    for i, score in enumerate([20, 22, 24]):
+        score_id = _insert_score(cursor, "hal", score, f"2026-01-{i + 1:02d}")
+        record_score(cursor, "hal", score, score_id)
+    
+    # Raw insert: reads return the stored row until the next refresh
+    _insert_score(cursor, "hal", 40, "2026-01-04")
+    assert get_score_stats(cursor, "hal")["count"] == 3
+    
+    # Raw update and raw delete drop the stored row, so reads recompute
+    cursor.execute("UPDATE scores SET total_score = 30 WHERE username = 'hal' AND total_score = 40")
+    assert _stored(cursor, "hal") is None
+    assert get_score_stats(cursor, "hal")["mean"] == pytest.approx(24)
+    cursor.execute("DELETE FROM scores WHERE username = 'hal' AND total_score = 20")
+    stats = get_score_stats(cursor, "hal")
+    assert (stats["count"], stats["recent"]) == (3, [22, 24, 30])
+    assert _stored(cursor, "hal") is None  # Reads do not write
+    
+    _insert_score(cursor, "ivy", 15, "2026-01-01")
+    assert refresh_score_stats(cursor) == 2
+    assert _stored(cursor, "hal") == (3, pytest.approx(stats["mean"]))
+    assert [row[1] for row in _flags(cursor, "ivy")] == [0]
+    assert refresh_score_stats(cursor) == 0
+    
+    cursor.execute("DELETE FROM scores WHERE username = 'ivy'")
+    refresh_score_stats(cursor)
+    assert _stored(cursor, "ivy") is None
+
+def test_outlier_flags_agree_with_outlier_detector(cursor):
+    from app.analysis.outlier_detection import OutlierDetector
+    
+    history = [20, 24, 19, 26, 22]
+    for i, score in enumerate(history):
+        score_id = _insert_score(cursor, "jo", score, f"2026-01-{i + 1:02d}")
+        record_score(cursor, "jo", score, score_id)
+    stats = get_score_stats(cursor, "jo")
+    expected = OutlierDetector().detect_outliers_zscore(history)
+    assert stats["mean"] == pytest.approx(expected["mean"])
+    assert stats["std_dev"] == pytest.approx(expected["std_dev"])
@@ -0,0 +1,45 @@
+import threading
+from app.services.sentiment import SentimentService, get_sentiment_service, keyword_score
+
+class CountingAnalyzer:
+    def __init__(self):
+        self.calls = 0
+    def polarity_scores(self, text):
+        self.calls += 1
+        return {"compound": 0.5 if "good" in text else -0.5}
+
+def test_score_many_dedupes_normalized_text():
+    analyzer = CountingAnalyzer()
+    service = SentimentService(analyzer=analyzer)
+    
+    scores = service.score_many(["good day", "  good   day ", "bad day", "", None])
+    assert scores == [50.0, 50.0, -50.0, 0.0, 0.0]
+    assert analyzer.calls == 2
+    
+    assert service.score("good\nday") == 50.0
+    assert analyzer.calls == 2
+    assert service.stats()["hits"] == 1
+
+def test_lru_evicts_oldest():
+    analyzer = CountingAnalyzer()
+    service = SentimentService(cache_size=2, analyzer=analyzer)
+    service.score_many(["good a", "good b", "good c"])
+    assert service.stats()["size"] == 2
+    service.score("good a")
+    assert analyzer.calls == 4
+
+def test_keyword_fallback_without_vader(monkeypatch):
+    monkeypatch.setattr("app.services.sentiment._load_vader", lambda: None)
+    service = SentimentService()
+    assert not service.uses_vader
+    assert service.score("I am happy and grateful") == keyword_score("I am happy and grateful")
+    assert service.score("I am happy and grateful") > 0
+
+def test_shared_service_is_singleton():
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(get_sentiment_service())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(s is seen[0] for s in seen)
@@ -8,6 +8,7 @@ over time for returning users.
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, MagicMock
+from sqlalchemy import text
 from app.analysis.time_based_analysis import TimeBasedAnalyzer
 from app.models import User, Score, Response, JournalEntry
 
@@ -228,25 +229,36 @@ class TestTimeBasedAnalyzer:
         assert result["period"] == "weekly"
         assert len(result["period_statistics"]) >= 1
 
-    @patch('app.analysis.time_based_analysis.safe_db_context')
-    def test_identify_returning_users(self, mock_db, analyzer):
+    def test_identify_returning_users(self, temp_db, analyzer):
         """Test identifying returning users (users with multiple attempts)."""
-        mock_user_data = [
-            ("user1", 5, "2025-01-01T10:00:00", "2025-01-05T10:00:00", 35.0),
-            ("user2", 2, "2025-01-01T10:00:00", "2025-01-03T10:00:00", 32.0),
-        ]
-        
-        mock_session = MagicMock()
-        mock_session.query.return_value.group_by.return_value.filter.return_value.all.return_value = mock_user_data
-        
-        mock_db.return_value.__enter__.return_value = mock_session
-        mock_db.return_value.__exit__.return_value = None
+        for i in range(5):
+            temp_db.add(Score(username="user1", total_score=33 + i, timestamp=f"2025-01-0{i + 1}T10:00:00"))
+        temp_db.add(Score(username="user2", total_score=30, timestamp="2025-01-01T10:00:00"))
+        temp_db.add(Score(username="user2", total_score=34, timestamp="2025-01-03T10:00:00"))
+        temp_db.add(Score(username="user3", total_score=25, timestamp="2025-01-02T10:00:00"))
+        temp_db.commit()
         
         result = analyzer.identify_returning_users(min_attempts=2)
         
-        assert len(result) == 2
+        assert len(result) == 2  # user3 has a single attempt
         assert result[0]["total_attempts"] == 5  # Sorted by attempts, descending
         assert result[0]["username"] == "user1"
+        assert result[0]["first_attempt_date"] == "2025-01-01T10:00:00"
+        assert result[0]["last_attempt_date"] == "2025-01-05T10:00:00"
+        assert result[0]["average_score"] == pytest.approx(35.0)
+        assert result[1]["username"] == "user2"
+        assert analyzer.identify_returning_users(min_attempts=6) == []
+
+    def test_identify_returning_users_is_read_only(self, temp_db, analyzer, monkeypatch):
+        """The summary is kept by triggers; reading it never backfills or rebuilds."""
+        monkeypatch.setattr("app.services.activity_summary.rebuild_activity_summary",
+                            lambda cursor: pytest.fail("read path rebuilt the summary"))
+        temp_db.execute(text("DROP TRIGGER activity_summary_ai"))
+        for i in range(2):
+            temp_db.add(Score(username="untracked", total_score=30, timestamp=f"2025-01-0{i + 1}T10:00:00"))
+        temp_db.commit()
+
+        assert analyzer.identify_returning_users(min_attempts=2) == []
 
     @patch('app.analysis.time_based_analysis.safe_db_context')
     def test_get_comparative_analysis_improved(self, mock_db, analyzer):
@@ -380,3 +392,87 @@ class TestTimeBasedAnalyzer:
         assert result["first_score"] == 35
         assert result["last_score"] == 35
         assert result["total_improvement"] == 0
+
+
+class TestUserHistorySnapshot:
+    """Shared per-request history and timeline paging against a real DB."""
+
+    @pytest.fixture
+    def history_db(self, temp_db):
+        for day in range(1, 8):
+            temp_db.add(Score(username="snap", total_score=20 + day, age=30,
+                              timestamp=f"2025-01-0{day}T10:00:00"))
+            for q in (1, 2):
+                temp_db.add(Response(username="snap", question_id=q, response_value=(day + q) % 5 + 1,
+                                     timestamp=f"2025-01-0{day}T10:00:0{q}"))
+        temp_db.add(JournalEntry(username="snap", content="ok", sentiment_score=10.0,
+                                 entry_date="2025-01-03 09:00:00"))
+        temp_db.add(Score(username="other", total_score=5, timestamp="2025-01-01T10:00:00"))
+        temp_db.commit()
+        return temp_db
+
+    def test_streams_fetched_once(self, history_db):
+        from sqlalchemy import event
+        from app.analysis.time_based_analysis import UserHistorySnapshot
+
+        statements = []
+        engine = history_db.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            analyzer = TimeBasedAnalyzer()
+            history = UserHistorySnapshot("snap")
+            trends = analyzer.analyze_score_trends("snap", snapshot=history)
+            periods = analyzer.get_time_period_stats("snap", period="daily", snapshot=history)
+            comparative = analyzer.get_comparative_analysis("snap", snapshot=history)
+            patterns = analyzer.analyze_response_patterns_over_time("snap", snapshot=history)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 2  # scores once, responses once
+        assert "reflection_text" not in statements[0]  # projected columns only
+        assert trends["total_attempts"] == 7 and trends["first_score"] == 21
+        assert len(periods["period_statistics"]) == 7
+        assert comparative["historical"]["attempts"] == 7
+        assert patterns["total_responses"] == 14
+
+    def test_timeline_keyset_pages_and_range(self, history_db):
+        analyzer = TimeBasedAnalyzer()
+        seen = {"scores": [], "responses": [], "journal_entries": []}
+        values, after, pages = [], None, 0
+        while True:
+            page = analyzer.get_user_timeline("snap", limit=3, after=after)
+            pages += 1
+            for stream, ids in seen.items():
+                ids.extend(row["id"] for row in page[stream])
+            values.extend(s["score"] for s in page["scores"])
+            # The cursor goes back unchanged; exhausted streams stay exhausted
+            after = page["next_cursor"]
+            if all(cursor is None for cursor in after.values()):
+                break
+        assert pages >= 3
+        assert values == [21, 22, 23, 24, 25, 26, 27]
+        for stream, ids in seen.items():
+            assert len(ids) == len(set(ids)), f"{stream} repeated across pages"
+        assert (len(seen["scores"]), len(seen["responses"]), len(seen["journal_entries"])) == (7, 14, 1)
+
+        ranged = analyzer.get_user_timeline("snap", since="2025-01-03", until=datetime(2025, 1, 5))
+        assert [s["score"] for s in ranged["scores"]] == [23, 24]
+        assert len(ranged["responses"]) == 4
+        assert len(ranged["journal_entries"]) == 1
+        assert "next_cursor" not in ranged
+
+    def test_timeline_keyset_pages_past_null_times(self, history_db):
+        history_db.add(Score(username="nulls", total_score=42, timestamp="2025-01-01T10:00:00"))
+        history_db.commit()
+        for total in (40, 41):  # Raw SQL, since the ORM would fill in the default timestamp
+            history_db.execute(text("INSERT INTO scores (username, total_score) VALUES ('nulls', :t)"), {"t": total})
+        history_db.commit()
+        analyzer = TimeBasedAnalyzer()
+        
+        values, after = [], None
+        while after is None or after["scores"] is not None:
+            page = analyzer.get_user_timeline("nulls", limit=1, after=after)
+            values.extend(s["score"] for s in page["scores"])
+            after = {"scores": page["next_cursor"]["scores"]}
+        assert values == [40, 41, 42]
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import tkinter as tk
+import pytest
+
+from app.ui.view_registry import ViewRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_main_import_defers_heavy_views():
+    code = (
+        "import sys, app.main\n"
+        "heavy = ['matplotlib', 'sklearn', 'nltk', 'app.ui.dashboard', 'app.ui.journal',\n"
+        "         'app.ui.exam', 'app.ui.profile']\n"
+        "loaded = [m for m in heavy if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+@pytest.fixture
+def tk_root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No display available")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+def test_registry_caches_and_invalidates(tk_root):
+    registry = ViewRegistry(tk.Frame(tk_root))
+    registry.register("stats", "statistics", "mean")
+    registry.register("fresh", "statistics", "median", cacheable=False)
+    builds = []
+    
+    first = registry.show("stats", builds.append)
+    registry.hide_all()
+    assert registry.show("stats", builds.append) is first
+    assert len(builds) == 1
+    
+    registry.hide_all()
+    registry.invalidate("stats")
+    assert not first.winfo_exists()
+    registry.show("stats", builds.append)
+    assert len(builds) == 2
+    
+    registry.show("fresh", builds.append)
+    assert not registry.is_cached("fresh")
+    assert registry.load_class("stats")([1, 3]) == 2